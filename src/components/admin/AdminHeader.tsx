@@ -58,6 +58,7 @@ export default function AdminHeader({ userName = 'Admin', onMenuClick }: AdminHe
         {/* Hamburger menu - visible on mobile/tablet */}
         <button
           onClick={onMenuClick}
+          aria-label="Open menu"
           className="lg:hidden w-12 h-12 rounded-xl bg-white flex items-center justify-center hover:bg-gray-50 transition-all"
           style={{ border: '1px solid #e5e5e5' }}
         >
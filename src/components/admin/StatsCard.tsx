@@ -32,6 +32,7 @@ export default function StatsCard({
 
   return (
     <div
+      data-testid="stats-card"
       className="bg-white rounded-2xl p-6 shadow-sm"
       style={{ border: '1px solid #e5e5e5' }}
     >
@@ -228,6 +228,7 @@ export function ActivityTimeline({
           return (
             <div
               key={event.id}
+              data-testid="activity-event"
               className="flex items-center gap-3 px-3 py-2.5 rounded-lg hover:bg-slate-50 transition-colors"
             >
               <div className={`h-8 w-8 rounded-full flex items-center justify-center flex-shrink-0 ${bgColor}`}>
@@ -279,6 +280,7 @@ export function ActivityTimeline({
         return (
           <div
             key={event.id}
+            data-testid="activity-event"
             className={`relative pl-6 ${isLast ? 'pb-0' : 'pb-4'} ${isLast ? '' : 'border-l-2 border-gray-200'} ml-[7px]`}
           >
             {/* Timeline dot */}
@@ -554,6 +554,7 @@ export default function LeadCard({
 
   return (
     <div
+      data-testid="lead-card"
       className="bg-white rounded-xl border border-slate-200 p-5 shadow-apple hover:shadow-apple-hover
         transition-shadow cursor-pointer relative group"
       onClick={() => onViewLead(lead.id, lead.status)}
@@ -30,6 +30,7 @@ export default function PipelineTabs({
           return (
             <button
               key={status.value}
+              data-testid="pipeline-tab"
               onClick={() => onStatusChange(status.value)}
               className={`
                 flex items-center gap-2 px-4 py-2.5 rounded-full text-sm font-medium
@@ -160,6 +160,7 @@ export function ScheduleCalendar({
                   return (
                     <div
                       key={event.id}
+                      data-testid="calendar-event"
                       className="absolute left-0.5 right-0.5 rounded-lg shadow-sm p-2 flex flex-col gap-0.5 cursor-pointer hover:brightness-95 transition-all overflow-hidden"
                       style={{
                         top: `${top}%`,
@@ -79,6 +79,7 @@ function DailyEventCard({ event, onClick }: { event: CalendarEvent; onClick: ()
 
   return (
     <button
+      data-testid="calendar-event"
       onClick={onClick}
       className="w-full flex items-stretch rounded-xl overflow-hidden shadow-sm hover:brightness-95 transition-all text-left"
       style={{
@@ -199,6 +199,7 @@ export function ScheduleHeader({
         {technicians.map((tech) => (
           <button
             key={tech.id}
+            data-testid="technician-filter"
             onClick={() => {
               onShowCancelledChange(false);
               onTechnicianChange(selectedTechnician === tech.id ? null : tech.id);
@@ -110,6 +110,7 @@ export default function AdminDashboard() {
 
   return (
     <div
+      data-testid="screen-admin-dashboard"
       className="min-h-screen"
       style={{
         backgroundColor: '#f5f7f8',
@@ -499,7 +499,7 @@ export default function AdminInvoiceHelper() {
   }
 
   return (
-    <div className="max-w-3xl mx-auto p-4 pb-28 space-y-4">
+    <div data-testid="screen-admin-invoice-helper" className="max-w-3xl mx-auto p-4 pb-28 space-y-4">
       <div className="flex items-center justify-between gap-2">
         <Button variant="ghost" className="h-10 px-2" onClick={() => navigate(-1)}>
           <ArrowLeft className="h-4 w-4 mr-1" />Back
@@ -81,6 +81,7 @@ export default function AdminSchedule() {
 
   return (
     <div
+      data-testid="screen-admin-schedule"
       className="h-screen overflow-hidden"
       style={{
         backgroundColor: '#f6f7f8',
@@ -180,6 +180,7 @@ export default function AdminTechnicianDetail() {
 
   return (
     <div
+      data-testid="screen-admin-technician-detail"
       className="min-h-screen"
       style={{
         backgroundColor: '#f5f7f8',
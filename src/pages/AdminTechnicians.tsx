@@ -113,6 +113,7 @@ export default function AdminTechnicians() {
 
   return (
     <div
+      data-testid="screen-admin-technicians"
       className="min-h-screen"
       style={{
         backgroundColor: '#f5f7f8',
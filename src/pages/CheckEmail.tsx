@@ -60,7 +60,7 @@ export default function CheckEmail() {
   };
 
   return (
-    <div className="check-email-page">
+    <div data-testid="screen-check-email" className="check-email-page">
       {/* Blue Animated Background */}
       <div className="check-email-background">
         <div className="gradient-orb orb-1"></div>
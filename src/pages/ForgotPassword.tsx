@@ -335,6 +335,7 @@ export default function ForgotPassword() {
   // Default / Loading / Error State
   return (
     <div
+      data-testid="screen-forgot-password"
       className="min-h-screen flex items-center justify-center p-4"
       style={{
         backgroundColor: '#f5f7f8',
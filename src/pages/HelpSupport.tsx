@@ -19,7 +19,7 @@ export default function HelpSupport() {
   const isTechnician = currentRole === 'technician';
 
   return (
-    <div className="min-h-screen bg-gradient-to-br from-blue-50 to-blue-100 pb-24">
+    <div data-testid="screen-help-support" className="min-h-screen bg-gradient-to-br from-blue-50 to-blue-100 pb-24">
       {/* Header */}
       <div className="flex items-center justify-between px-4 py-4 bg-white border-b border-gray-200 sticky top-0 z-50 shadow-sm">
         <button
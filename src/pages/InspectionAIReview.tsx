@@ -577,7 +577,7 @@ export default function InspectionAIReview() {
   }
 
   return (
-    <div className="min-h-screen bg-[#f5f5f7]">
+    <div data-testid="screen-inspection-ai-review" className="min-h-screen bg-[#f5f5f7]">
       <AdminSidebar isOpen={sidebarOpen} onClose={() => setSidebarOpen(false)} />
 
       <main className="ml-0 lg:ml-[260px] min-h-screen flex flex-col">
@@ -265,7 +265,7 @@ export default function JobCompletionForm() {
   }
 
   return (
-    <div className="min-h-screen bg-[#f5f7f8] pb-[160px]">
+    <div data-testid="screen-job-completion-form" className="min-h-screen bg-[#f5f7f8] pb-[160px]">
       {/* ───── Sticky Header ───── */}
       <header className="sticky top-0 z-50 bg-white/90 backdrop-blur-md border-b border-gray-200">
         <div className="flex items-center justify-between px-4 py-3">
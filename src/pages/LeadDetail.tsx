@@ -1232,7 +1232,7 @@ export default function LeadDetail() {
   };
 
   return (
-    <div className="min-h-screen bg-gray-50">
+    <div data-testid="screen-lead-detail" className="min-h-screen bg-gray-50">
       {/* Header */}
       <header className="sticky top-0 z-50 bg-white border-b shadow-sm">
         <div className="px-4 py-3">
@@ -782,6 +782,7 @@ const LeadsManagement = () => {
 
   return (
     <div
+      data-testid="screen-leads-management"
       className="h-screen overflow-hidden"
       style={{
         backgroundColor: '#f6f7f8',
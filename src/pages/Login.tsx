@@ -322,6 +322,7 @@ const Login = () => {
 
   return (
     <div
+      data-testid="screen-login"
       className="min-h-screen flex items-center justify-center p-4"
       style={{
         backgroundColor: "#f5f7f8",
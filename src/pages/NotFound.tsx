@@ -34,6 +34,7 @@ const NotFound = () => {
 
   return (
     <div
+      data-testid="screen-not-found"
       className="min-h-screen flex flex-col items-center justify-center px-4 py-8"
       style={{ backgroundColor: "#f5f7f8" }}
     >
@@ -13,7 +13,7 @@ export default function Notifications() {
       icon={Clock}
     >
       {/* Activity Feed */}
-      <div className="bg-white rounded-2xl shadow-sm border border-gray-100 p-4 md:p-6">
+      <div data-testid="screen-notifications" className="bg-white rounded-2xl shadow-sm border border-gray-100 p-4 md:p-6">
         {!isLoading && events.length > 0 && (
           <div className="flex items-center gap-2 mb-4 pb-3 border-b border-gray-100">
             <Activity className="h-4 w-4 text-gray-400" />
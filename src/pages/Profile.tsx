@@ -376,7 +376,7 @@ export default function Profile() {
   }
 
   return (
-    <div className="min-h-screen bg-gradient-to-br from-blue-50 to-blue-100 pb-8">
+    <div data-testid="screen-profile" className="min-h-screen bg-gradient-to-br from-blue-50 to-blue-100 pb-8">
 
       {/* Header - 48px touch target for back button */}
       <div className="flex items-center justify-between px-4 py-4 bg-white border-b border-gray-200 sticky top-0 z-50 shadow-sm">
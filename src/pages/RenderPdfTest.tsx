@@ -91,7 +91,7 @@ export default function RenderPdfTest() {
   }
 
   return (
-    <div className="min-h-screen bg-gray-50 p-6">
+    <div data-testid="screen-render-pdf-test" className="min-h-screen bg-gray-50 p-6">
       <div className="max-w-2xl mx-auto bg-white rounded-lg shadow-sm border border-gray-200 p-6">
         <h1 className="text-2xl font-bold text-gray-900 mb-2">
           Server-side PDF render — fidelity test
@@ -101,7 +101,7 @@ const Reports = () => {
       icon={BarChart3}
       actions={<PeriodFilter value={period} onChange={setPeriod} />}
     >
-      <div className="max-w-[1440px] mx-auto space-y-6">
+      <div data-testid="screen-reports" className="max-w-[1440px] mx-auto space-y-6">
         {/* KPI Cards */}
         <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-4">
           <KPICard
@@ -150,7 +150,7 @@ const RequestInspection = () => {
   const isSubmitting = form.formState.isSubmitting;
 
   return (
-    <main className="min-h-screen bg-muted/40 px-4 py-8">
+    <main data-testid="screen-request-inspection" className="min-h-screen bg-muted/40 px-4 py-8">
       <div className="mx-auto w-full max-w-md">
         <header className="mb-6 text-center">
           <h1 className="text-2xl font-bold text-[#121D73]">Book Your Free Inspection</h1>
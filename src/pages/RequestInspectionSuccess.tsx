@@ -5,7 +5,7 @@ import { Button } from '@/components/ui/button';
 
 const RequestInspectionSuccess = () => {
   return (
-    <main className="flex min-h-screen items-center justify-center bg-muted/40 px-4 py-8">
+    <main data-testid="screen-request-inspection-success" className="flex min-h-screen items-center justify-center bg-muted/40 px-4 py-8">
       <div className="w-full max-w-md rounded-xl border bg-card p-8 text-center shadow-sm">
         <CheckCircle2 className="mx-auto h-14 w-14 text-green-600" aria-hidden="true" />
         <h1 className="mt-4 text-2xl font-bold text-[#121D73]">Thank You for Your Enquiry</h1>
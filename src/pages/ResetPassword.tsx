@@ -313,6 +313,7 @@ export default function ResetPassword() {
   // Password Reset Form
   return (
     <div
+      data-testid="screen-reset-password"
       className="min-h-screen flex items-center justify-center p-4"
       style={{
         backgroundColor: '#f5f7f8',
@@ -118,7 +118,7 @@ export default function Settings() {
   };
 
   return (
-    <div className="min-h-screen bg-gradient-to-br from-blue-50 to-blue-100 pb-24">
+    <div data-testid="screen-settings" className="min-h-screen bg-gradient-to-br from-blue-50 to-blue-100 pb-24">
 
       {/* Header - 48px touch target for back button */}
       <div className="flex items-center justify-between px-4 py-4 bg-white border-b border-gray-200 sticky top-0 z-50 shadow-sm">
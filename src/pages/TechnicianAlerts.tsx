@@ -201,7 +201,7 @@ export default function TechnicianAlerts() {
   };
 
   return (
-    <div className="relative flex min-h-screen w-full flex-col bg-[#f5f7f8]">
+    <div data-testid="screen-technician-alerts" className="relative flex min-h-screen w-full flex-col bg-[#f5f7f8]">
       <AlertsHeader unreadCount={unreadCount} onMarkAllRead={markAllAsRead} />
 
       {isLoading ? (
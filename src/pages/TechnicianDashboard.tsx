@@ -132,6 +132,7 @@ export default function TechnicianDashboard() {
 
   return (
     <div
+      data-testid="screen-technician-dashboard"
       className="min-h-screen relative pb-24"
       style={{ backgroundColor: '#f5f7f8', color: '#1d1d1f' }}
     >
@@ -598,6 +598,7 @@ function PhotoUploadButton({ onClick, label, count = 0, maxCount }: PhotoUploadB
   return (
     <button
       type="button"
+      data-testid="photo-upload"
       onClick={onClick}
       className="flex items-center justify-center gap-2 w-full h-14 bg-white border-2 border-dashed border-gray-300 rounded-xl text-[#007AFF] font-medium hover:bg-gray-50 active:bg-gray-100 transition-colors"
       style={{ minHeight: '56px' }}
@@ -623,7 +624,7 @@ function PhotoGrid({ photos, onRemove, primaryPhotoId, onPrimaryToggle }: PhotoG
       {photos.map((photo) => {
         const isPrimary = primaryPhotoId === photo.id;
         return (
-          <div key={photo.id} className="relative aspect-square rounded-lg overflow-hidden bg-gray-100">
+          <div key={photo.id} data-testid="photo-thumbnail" className="relative aspect-square rounded-lg overflow-hidden bg-gray-100">
             <img
               src={photo.url}
               alt={photo.name}
@@ -4665,7 +4666,7 @@ export default function TechnicianInspectionForm({ adminMode = false }: Technici
   }
 
   return (
-    <div className="min-h-screen bg-[#f5f7f8] pb-[160px]">
+    <div data-testid="screen-technician-inspection-form" className="min-h-screen bg-[#f5f7f8] pb-[160px]">
       <Header
         onBack={handleBack}
         onSave={handleSave}
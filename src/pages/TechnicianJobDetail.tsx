@@ -433,7 +433,7 @@ export default function TechnicianJobDetail() {
   }
 
   return (
-    <div className="min-h-screen bg-slate-50 overflow-x-hidden">
+    <div data-testid="screen-technician-job-detail" className="min-h-screen bg-slate-50 overflow-x-hidden">
       {/* ───── Header ───── */}
       <header className="sticky top-0 z-50 bg-white border-b">
         <div className="px-4">
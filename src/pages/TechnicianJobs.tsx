@@ -419,7 +419,7 @@ export default function TechnicianJobs() {
   };
 
   return (
-    <div className="min-h-screen w-full flex flex-col bg-[#f5f7f8] overflow-x-hidden">
+    <div data-testid="screen-technician-jobs" className="min-h-screen w-full flex flex-col bg-[#f5f7f8] overflow-x-hidden">
       {/* Sticky Header with Tabs */}
       <JobsHeader activeTab={activeTab} onTabChange={setActiveTab} counts={counts} />
 
@@ -2480,7 +2480,7 @@ export default function ViewReportPDF() {
 
   // === REPORT STAGE (default) ===
   return (
-    <div className="min-h-screen bg-gray-50 flex flex-col">
+    <div data-testid="screen-view-report-pdf" className="min-h-screen bg-gray-50 flex flex-col">
       {/* Header */}
       <header className="bg-white border-b border-gray-200 px-4 py-3 sticky top-0 z-40 shadow-sm">
         <div className="flex items-center justify-between max-w-6xl mx-auto">
@@ -0,0 +1,117 @@
+// W3C trace-context continuation for edge functions.
+//
+// The TestSprite harness (testsprite_tests/tracing.py) injects a `traceparent`
+// header into every Supabase and edge-function request the browser makes.
+// When that header is present, spans started here log one JSON line each,
+// prefixed with TRACE_LOG_PREFIX, carrying the caller's trace id. The harness
+// reads them back from the edge runtime logs and merges them into the same
+// OTLP trace as the click that triggered the call.
+//
+// Requests without a traceparent (i.e. real users) get no-op spans: nothing is
+// logged and nothing is forwarded, so production logs are unchanged.
+
+export const TRACE_LOG_PREFIX = '[trace]';
+
+const TRACEPARENT_RE = /^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$/;
+
+function randomHex(bytes: number): string {
+  return Array.from(crypto.getRandomValues(new Uint8Array(bytes)))
+    .map((b) => b.toString(16).padStart(2, '0'))
+    .join('');
+}
+
+function nowMs(): number {
+  return performance.timeOrigin + performance.now();
+}
+
+type SpanAttrs = Record<string, string | number | boolean | null | undefined>;
+
+export class Span {
+  readonly spanId = randomHex(8);
+  private readonly startMs = nowMs();
+  private ended = false;
+
+  constructor(
+    readonly name: string,
+    readonly traceId: string | null,
+    readonly parentSpanId: string | null,
+    private readonly service: string,
+    private readonly attrs: SpanAttrs = {},
+  ) {}
+
+  /** True when the caller sent a traceparent; no-op spans never log. */
+  get recording(): boolean {
+    return this.traceId !== null;
+  }
+
+  /** traceparent value naming this span as the parent of an outgoing call. */
+  get traceparent(): string | null {
+    return this.traceId ? `00-${this.traceId}-${this.spanId}-01` : null;
+  }
+
+  /** Headers to merge into outgoing fetch / supabase-js calls. Empty when not recording. */
+  headers(): Record<string, string> {
+    const value = this.traceparent;
+    return value ? { traceparent: value } : {};
+  }
+
+  child(name: string, attrs: SpanAttrs = {}): Span {
+    return new Span(name, this.traceId, this.spanId, this.service, attrs);
+  }
+
+  setAttr(key: string, value: SpanAttrs[string]): void {
+    this.attrs[key] = value;
+  }
+
+  end(attrs: SpanAttrs = {}): void {
+    if (this.ended || !this.traceId) return;
+    this.ended = true;
+    const endMs = nowMs();
+    console.log(`${TRACE_LOG_PREFIX} ${JSON.stringify({
+      trace_id: this.traceId,
+      span_id: this.spanId,
+      parent_span_id: this.parentSpanId,
+      service: this.service,
+      name: this.name,
+      start_ms: this.startMs,
+      end_ms: endMs,
+      duration_ms: Math.round((endMs - this.startMs) * 10) / 10,
+      attrs: { ...this.attrs, ...attrs },
+    })}`);
+  }
+}
+
+/**
+ * Starts the server span for an incoming request, continuing the caller's
+ * trace when a valid traceparent header is present.
+ */
+export function startRequestSpan(req: Request, service: string, attrs: SpanAttrs = {}): Span {
+  const match = TRACEPARENT_RE.exec(req.headers.get('traceparent') ?? '');
+  const traceId = match && match[1] !== '0'.repeat(32) ? match[1] : null;
+  return new Span(service, traceId, match ? match[2] : null, service, {
+    'http.method': req.method,
+    ...attrs,
+  });
+}
+
+/**
+ * Runs `fn` inside a child span of `parent`. The span ends when `fn` settles;
+ * a thrown error is recorded on the span and rethrown. Accepts any thenable,
+ * so supabase-js query builders can be passed straight through.
+ */
+export async function traced<T>(
+  parent: Span,
+  name: string,
+  fn: (span: Span) => PromiseLike<T>,
+  attrs: SpanAttrs = {},
+): Promise<T> {
+  const span = parent.child(name, attrs);
+  try {
+    return await fn(span);
+  } catch (error) {
+    span.setAttr('error', error instanceof Error ? error.message : String(error));
+    throw error;
+  } finally {
+    span.end();
+  }
+}
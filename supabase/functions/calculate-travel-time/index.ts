@@ -1,6 +1,7 @@
 import "jsr:@supabase/functions-js/edge-runtime.d.ts";
 import { createClient } from 'https://esm.sh/@supabase/supabase-js@2.39.3'
 import { z } from 'https://esm.sh/zod@3.22.4'
+import { startRequestSpan, traced } from '../_shared/trace.ts'
 
 const corsHeaders = {
   'Access-Control-Allow-Origin': '*',
@@ -448,6 +449,10 @@ Deno.serve(async (req) => {
     )
   }
 
+  // Continues the caller's trace when a traceparent header is present (the
+  // TestSprite harness sends one); a no-op for ordinary requests.
+  const span = startRequestSpan(req, 'calculate-travel-time')
+
   try {
     const apiKey = Deno.env.get('GOOGLE_MAPS_API_KEY')
     const supabaseUrl = Deno.env.get('SUPABASE_URL')
@@ -462,6 +467,7 @@ Deno.serve(async (req) => {
     }
 
     const body = await req.json()
+    span.setAttr('action', body?.action ?? 'travel_time')
 
     // Validate request body with Zod
     const parseResult = RequestBodySchema.safeParse(body)
@@ -489,7 +495,8 @@ Deno.serve(async (req) => {
       }
 
       const supabase = createClient(supabaseUrl, serviceRoleKey, {
-        auth: { autoRefreshToken: false, persistSession: false }
+        auth: { autoRefreshToken: false, persistSession: false },
+        global: { headers: span.headers() },
       })
 
       // 1. Get lead address
@@ -578,7 +585,8 @@ Deno.serve(async (req) => {
       let apiResults: Array<{ duration_minutes: number; distance_km: number } | null> = []
 
       if (origins.length > 0 && apiKey) {
-        apiResults = await calculateMultiOriginTravelTimes(origins, leadAddress, apiKey)
+        apiResults = await traced(span, 'maps.distance_matrix', () =>
+          calculateMultiOriginTravelTimes(origins, leadAddress, apiKey), { origins: origins.length })
       }
 
       // 5. Build ranked results combining API and haversine fallback
@@ -690,7 +698,8 @@ Deno.serve(async (req) => {
       }
 
       const supabase = createClient(supabaseUrl, serviceRoleKey, {
-        auth: { autoRefreshToken: false, persistSession: false }
+        auth: { autoRefreshToken: false, persistSession: false },
+        global: { headers: span.headers() },
       })
 
       // 1. Get technician info (name and home address)
@@ -809,7 +818,8 @@ Deno.serve(async (req) => {
       let travelTimeMinutes = 30 // Default 30 min if API fails
       let travelDistanceKm: number | null = null
 
-      const travelResult = await calculateTravelTime(travelOrigin, destination_address, apiKey)
+      const travelResult = await traced(span, 'maps.distance_matrix', () =>
+        calculateTravelTime(travelOrigin, destination_address, apiKey))
       if (travelResult) {
         travelTimeMinutes = travelResult.duration_minutes
         travelDistanceKm = travelResult.distance_km
@@ -880,7 +890,8 @@ Deno.serve(async (req) => {
       }
 
       const supabase = createClient(supabaseUrl, serviceRoleKey, {
-        auth: { autoRefreshToken: false, persistSession: false }
+        auth: { autoRefreshToken: false, persistSession: false },
+        global: { headers: span.headers() },
       })
 
       // 1. Get technician info
@@ -900,7 +911,8 @@ Deno.serve(async (req) => {
       // 2. Calculate travel time from home to destination (once)
       let travelFromHomeMinutes: number | null = null
       if (technicianHome) {
-        const homeTravel = await calculateTravelTime(technicianHome, destination_address, apiKey)
+        const homeTravel = await traced(span, 'maps.distance_matrix', () =>
+          calculateTravelTime(technicianHome, destination_address, apiKey))
         if (homeTravel) {
           travelFromHomeMinutes = homeTravel.duration_minutes
         }
@@ -1138,8 +1150,10 @@ Deno.serve(async (req) => {
 
     console.log(`Calculating travel time: ${origin} -> ${destination}`)
 
-    const response = await fetch(url)
-    const data = await response.json()
+    const data = await traced(span, 'maps.distance_matrix', async () => {
+      const response = await fetch(url)
+      return await response.json()
+    })
 
     console.log('Google Maps API response status:', data.status)
 
@@ -1184,6 +1198,7 @@ Deno.serve(async (req) => {
 
   } catch (error) {
     console.error('Error calculating travel time:', error)
+    span.setAttr('error', error instanceof Error ? error.message : String(error))
     return new Response(
       JSON.stringify({
         error: 'Internal server error',
@@ -1191,5 +1206,7 @@ Deno.serve(async (req) => {
       } as ErrorResponse),
       { status: 500, headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
     )
+  } finally {
+    span.end()
   }
 })
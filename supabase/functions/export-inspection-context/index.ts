@@ -3,6 +3,7 @@
 
 import { createClient } from 'https://esm.sh/@supabase/supabase-js@2'
 import { z } from 'https://esm.sh/zod@3.22.4'
+import { startRequestSpan, traced } from '../_shared/trace.ts'
 
 // ============================================================================
 // ZOD SCHEMAS
@@ -25,6 +26,8 @@ Deno.serve(async (req) => {
     return new Response(null, { headers: corsHeaders })
   }
 
+  const span = startRequestSpan(req, 'export-inspection-context')
+
   try {
     if (req.method !== 'POST') {
       return new Response(
@@ -47,18 +50,20 @@ Deno.serve(async (req) => {
 
     const supabaseUrl = Deno.env.get('SUPABASE_URL')!
     const supabaseServiceKey = Deno.env.get('SUPABASE_SERVICE_ROLE_KEY')!
-    const supabase = createClient(supabaseUrl, supabaseServiceKey)
+    const supabase = createClient(supabaseUrl, supabaseServiceKey, {
+      global: { headers: span.headers() },
+    })
 
     // Fetch lead data
     let lead = null
     const targetLeadId = leadId
 
     if (targetLeadId) {
-      const { data: leadData, error: leadError } = await supabase
+      const { data: leadData, error: leadError } = await traced(span, 'db.leads', () => supabase
         .from('leads')
         .select('id, full_name, phone, email, property_address_street, property_address_suburb, property_address_state, property_address_postcode, issue_description, internal_notes, status, created_at')
         .eq('id', targetLeadId)
-        .single()
+        .single())
 
       if (leadError) {
         console.error('Lead fetch error:', leadError)
@@ -79,7 +84,8 @@ Deno.serve(async (req) => {
       inspQuery.eq('lead_id', targetLeadId)
     }
 
-    const { data: inspectionData, error: inspError } = await inspQuery.order('created_at', { ascending: false }).limit(1).single()
+    const { data: inspectionData, error: inspError } = await traced(span, 'db.inspections', () =>
+      inspQuery.order('created_at', { ascending: false }).limit(1).single())
 
     if (inspError) {
       console.error('Inspection fetch error:', inspError)
@@ -90,13 +96,13 @@ Deno.serve(async (req) => {
     // Fetch calendar booking if exists
     let booking = null
     if (targetLeadId) {
-      const { data: bookingData } = await supabase
+      const { data: bookingData } = await traced(span, 'db.calendar_bookings', () => supabase
         .from('calendar_bookings')
         .select('*')
         .eq('lead_id', targetLeadId)
         .order('created_at', { ascending: false })
         .limit(1)
-        .single()
+        .single())
 
       booking = bookingData
     }
@@ -118,9 +124,12 @@ Deno.serve(async (req) => {
   } catch (error) {
     console.error('Error in export-inspection-context:', error)
     const errorMessage = error instanceof Error ? error.message : 'Unknown error'
+    span.setAttr('error', errorMessage)
     return new Response(
       JSON.stringify({ error: `Export failed: ${errorMessage}` }),
       { status: 500, headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
     )
+  } finally {
+    span.end()
   }
 })
@@ -5,6 +5,7 @@
 
 import { createClient } from 'https://esm.sh/@supabase/supabase-js@2'
 import { z } from 'https://esm.sh/zod@3.22.4'
+import { startRequestSpan, traced } from '../_shared/trace.ts'
 
 // Static PDF assets hosted in Supabase Storage (public bucket)
 const SUPABASE_URL = Deno.env.get('SUPABASE_URL')!
@@ -1622,6 +1623,10 @@ Deno.serve(async (req) => {
     return new Response(null, { headers: corsHeaders })
   }
 
+  // Continues the caller's trace when a traceparent header is present (the
+  // TestSprite harness sends one); a no-op for ordinary requests.
+  const span = startRequestSpan(req, 'generate-inspection-pdf')
+
   try {
     if (req.method !== 'POST') {
       return new Response(
@@ -1645,7 +1650,9 @@ Deno.serve(async (req) => {
 
     // Service-role client for cross-row reads (template fetch, full inspection
     // join). Used for SELECTs only.
-    const supabase = createClient(supabaseUrl, supabaseServiceKey)
+    const supabase = createClient(supabaseUrl, supabaseServiceKey, {
+      global: { headers: span.headers() },
+    })
 
     // JWT-bound client for audited writes. The Authorization header is
     // forwarded so auth.uid() captures the calling admin inside the
@@ -1655,7 +1662,7 @@ Deno.serve(async (req) => {
     const authHeader = req.headers.get('Authorization')
     const supabaseAudited = authHeader
       ? createClient(supabaseUrl, supabaseAnonKey, {
-          global: { headers: { Authorization: authHeader } },
+          global: { headers: { Authorization: authHeader, ...span.headers() } },
         })
       : supabase
     if (!authHeader) {
@@ -1684,6 +1691,8 @@ Deno.serve(async (req) => {
     const { inspectionId, regenerate, returnHtml: returnHtmlRaw, previewOnly } = parsed.data
     // previewOnly is the dominant flag — it implies returnHtml semantically.
     const returnHtml = returnHtmlRaw || previewOnly
+    span.setAttr('inspection_id', inspectionId)
+    span.setAttr('preview_only', previewOnly)
 
     // previewOnly bypasses ALL persistence (no inspections UPDATE, no audit
     // trail), so it must be gated on admin role. Without this, any JWT
@@ -1726,7 +1735,7 @@ Deno.serve(async (req) => {
     // filters on non-inner joins are awkward; the split is cheaper than
     // wrestling with !inner semantics (which would drop inspections that
     // legitimately have no photos).
-    const { data: inspection, error: fetchError } = await supabase
+    const { data: inspection, error: fetchError } = await traced(span, 'db.inspections', () => supabase
       .from('inspections')
       .select(`
         *,
@@ -1734,7 +1743,7 @@ Deno.serve(async (req) => {
         areas:inspection_areas(*,moisture_readings(*))
       `)
       .eq('id', inspectionId)
-      .single()
+      .single())
 
     if (fetchError || !inspection) {
       console.error('Failed to fetch inspection:', fetchError)
@@ -1745,12 +1754,12 @@ Deno.serve(async (req) => {
     }
 
     // Stage 4.3: separate active-photos query (replaces relational select)
-    const { data: activePhotos, error: photosError } = await supabase
+    const { data: activePhotos, error: photosError } = await traced(span, 'db.photos', () => supabase
       .from('photos')
       .select('*')
       .eq('inspection_id', inspectionId)
       .is('deleted_at', null)
-      .order('created_at', { ascending: true })
+      .order('created_at', { ascending: true }))
 
     if (photosError) {
       console.error('Failed to fetch photos:', photosError)
@@ -1766,11 +1775,11 @@ Deno.serve(async (req) => {
     // inspection object. Falls back to the legacy inspections column values
     // for inspections that pre-date the Stage 3.5 backfill (after Stage 3.5
     // those columns are dropped and only the view's values remain).
-    const { data: latestSummary } = await supabase
+    const { data: latestSummary } = await traced(span, 'db.latest_ai_summary', () => supabase
       .from('latest_ai_summary')
       .select('ai_summary_text, what_we_found_text, what_we_will_do_text, what_you_get_text, problem_analysis_content, demolition_content')
       .eq('inspection_id', inspectionId)
-      .maybeSingle()
+      .maybeSingle())
 
     if (latestSummary) {
       ;(inspection as Record<string, unknown>).ai_summary_text = latestSummary.ai_summary_text ?? (inspection as Record<string, unknown>).ai_summary_text
@@ -1818,32 +1827,32 @@ Deno.serve(async (req) => {
     // Fetching unconditionally avoids a DB round-trip ordering dependency.
     console.log('Fetching subfloor data...')
 
-    const { data: sfData } = await supabase
+    const { data: sfData } = await traced(span, 'db.subfloor_data', () => supabase
       .from('subfloor_data')
       .select('*')
       .eq('inspection_id', inspectionId)
-      .single()
+      .single())
 
     if (sfData) {
       subfloorData = sfData as SubfloorData
 
       // Fetch subfloor moisture readings
-      const { data: sfReadings } = await supabase
+      const { data: sfReadings } = await traced(span, 'db.subfloor_readings', () => supabase
         .from('subfloor_readings')
         .select('*')
         .eq('subfloor_id', sfData.id)
-        .order('reading_order', { ascending: true })
+        .order('reading_order', { ascending: true }))
 
       subfloorReadings = (sfReadings || []) as SubfloorReading[]
 
       // Fetch subfloor photos — try by subfloor_id first, fall back to photo_type
       // Photos are already fetched in the main query, so also check those.
       // Stage 4.3: filter soft-deleted rows.
-      const { data: sfPhotos } = await supabase
+      const { data: sfPhotos } = await traced(span, 'db.subfloor_photos', () => supabase
         .from('photos')
         .select('*')
         .eq('subfloor_id', sfData.id)
-        .is('deleted_at', null)
+        .is('deleted_at', null))
 
       if (sfPhotos && sfPhotos.length > 0) {
         subfloorPhotos = sfPhotos as Photo[]
@@ -1866,6 +1875,7 @@ Deno.serve(async (req) => {
     ]
 
     photoSignedUrls = new Map()
+    const signSpan = span.child('storage.sign_urls', { photos: allPhotos.length })
     if (allPhotos.length > 0) {
       console.log(`Generating signed URLs for ${allPhotos.length} photos...`)
 
@@ -1902,12 +1912,15 @@ Deno.serve(async (req) => {
 
       console.log(`Generated ${photoSignedUrls.size} signed URLs`)
     }
+    signSpan.end({ signed: photoSignedUrls.size })
 
     // ===== STEP 4: Fetch the HTML template from Storage =====
     console.log('Fetching template from Storage...')
-    const templateResponse = await fetch(TEMPLATE_URL)
+    const templateSpan = span.child('storage.template_fetch')
+    const templateResponse = await fetch(TEMPLATE_URL, { headers: templateSpan.headers() })
 
     if (!templateResponse.ok) {
+      templateSpan.end({ 'http.status_code': templateResponse.status })
       console.error(`Failed to fetch template: ${templateResponse.status}`)
       return new Response(
         JSON.stringify({ error: 'Failed to fetch PDF template from storage' }),
@@ -1916,6 +1929,7 @@ Deno.serve(async (req) => {
     }
 
     const templateHtml = await templateResponse.text()
+    templateSpan.end({ 'http.status_code': templateResponse.status, bytes: templateHtml.length })
     console.log(`Template fetched: ${(templateHtml.length / 1024).toFixed(1)} KB`)
 
     // Validate template has all required comment markers for regex-based section replacement.
@@ -1944,6 +1958,7 @@ Deno.serve(async (req) => {
     }
 
     // ===== STEP 5: Populate the template =====
+    const renderSpan = span.child('render.populate_template')
     let populatedHtml = generateReportHtml(
       inspection as Inspection,
       templateHtml,
@@ -1955,6 +1970,7 @@ Deno.serve(async (req) => {
 
     // Safety net: strip any unrendered {{placeholder}} tokens so the customer never sees raw template syntax.
     populatedHtml = populatedHtml.replace(/\{\{[a-zA-Z_]+\}\}/g, '')
+    renderSpan.end({ bytes: populatedHtml.length })
 
     // ===== STEP 6: Save and return =====
     const newVersion = regenerate ? (inspection.pdf_version || 0) + 1 : (inspection.pdf_version || 1)
@@ -2001,12 +2017,12 @@ Deno.serve(async (req) => {
     const timestamp = Date.now()
     const filename = `inspection-${inspectionId}-v${newVersion}-${timestamp}.html`
 
-    const { error: uploadError } = await supabase.storage
+    const { error: uploadError } = await traced(span, 'storage.upload_report', () => supabase.storage
       .from('inspection-reports')
       .upload(filename, populatedHtml, {
         contentType: 'text/html',
         upsert: true
-      })
+      }))
 
     if (uploadError) {
       console.error('Failed to upload HTML:', uploadError)
@@ -2053,7 +2069,7 @@ Deno.serve(async (req) => {
     }
 
     // Log to pdf_versions for audit trail
-    const { error: versionError } = await supabase
+    const { error: versionError } = await traced(span, 'db.pdf_versions_insert', () => supabase
       .from('pdf_versions')
       .insert({
         inspection_id: inspectionId,
@@ -2065,7 +2081,7 @@ Deno.serve(async (req) => {
         pdf_url: reportUrl,
         file_size_bytes: new TextEncoder().encode(populatedHtml).length,
         changes_made: regenerate ? { type: 'regeneration', timestamp: new Date().toISOString() } : null
-      })
+      }))
 
     if (versionError) {
       console.error('Failed to log version:', versionError)
@@ -2087,6 +2103,7 @@ Deno.serve(async (req) => {
   } catch (error) {
     console.error('Error in generate-inspection-pdf:', error)
     const errorMessage = error instanceof Error ? error.message : 'Unknown error'
+    span.setAttr('error', errorMessage)
 
     // Log to error_logs table (fire-and-forget)
     try {
@@ -2115,5 +2132,7 @@ Deno.serve(async (req) => {
         headers: { ...corsHeaders, 'Content-Type': 'application/json' }
       }
     )
+  } finally {
+    span.end()
   }
 })
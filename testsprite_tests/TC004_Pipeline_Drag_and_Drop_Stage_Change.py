@@ -6,7 +6,9 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from playwright.async_api import async_playwright, expect
-from testsprite_tests.auth_helper import setup_authenticated_test, cleanup_test
+from testsprite_tests.auth_helper import BASE_URL, setup_authenticated_test, cleanup_test
+from testsprite_tests.run_results import case, current_run
+from testsprite_tests.selector_registry import SelectorRegistry
 
 async def run_test():
     """
@@ -14,9 +16,12 @@ async def run_test():
 
     Tests that the leads management page:
     - Loads correctly with lead data
-    - Displays leads in a table or list format
-    - Has filtering/sorting capabilities
-    - Allows viewing individual lead details
+    - Filters leads by search text
+    - Switches between card and list views
+    - Has sorting capabilities
+
+    Steps, counts and failures are recorded through run_results (events.jsonl,
+    junit.xml, regression report) instead of printed.
 
     REQUIRES AUTHENTICATION - uses admin credentials
     """
@@ -26,78 +31,52 @@ async def run_test():
     page = None
 
     try:
-        # Get authenticated session
-        pw, browser, context, page = await setup_authenticated_test()
-
-        # Navigate to leads management page
-        print("Navigating to leads management...")
-        await page.goto("http://localhost:8080/leads", wait_until="networkidle")
-
-        # Verify we're on the leads page
-        current_url = page.url
-        assert "/leads" in current_url, f"Should be on leads page, but URL is: {current_url}"
-        print("Successfully loaded leads management page")
-
-        # Wait for content to load
-        await page.wait_for_load_state("networkidle")
-        await asyncio.sleep(1)
-
-        # TEST 1: Verify page structure
-        print("TEST 1: Checking page structure...")
-
-        # Look for table or list elements
-        table_elements = page.locator('table, [role="table"], [class*="table"], [class*="list"], [class*="grid"]')
-        table_count = await table_elements.count()
-
-        if table_count > 0:
-            print(f"SUCCESS: Found {table_count} table/list element(s)")
-        else:
-            # Check for any lead-related content
-            lead_content = page.locator('[class*="lead"], [class*="card"], [class*="row"]')
-            content_count = await lead_content.count()
-            print(f"INFO: Found {content_count} lead-related content elements")
-
-        # TEST 2: Check for search/filter functionality
-        print("TEST 2: Checking for search/filter functionality...")
-        search_elements = page.locator('input[type="search"], input[placeholder*="search" i], input[placeholder*="filter" i], [class*="search"], [class*="filter"]')
-        search_count = await search_elements.count()
-
-        if search_count > 0:
-            print(f"SUCCESS: Found {search_count} search/filter element(s)")
-        else:
-            print("INFO: No explicit search/filter elements found")
-
-        # TEST 3: Check for sorting or column headers
-        print("TEST 3: Checking for column headers/sorting...")
-        headers = page.locator('th, [role="columnheader"], [class*="header"], button:has-text("Name"), button:has-text("Status"), button:has-text("Date")')
-        header_count = await headers.count()
-
-        if header_count > 0:
-            print(f"SUCCESS: Found {header_count} header/sorting element(s)")
-        else:
-            print("INFO: Table headers may use different structure")
-
-        # TEST 4: Verify interactive elements
-        print("TEST 4: Checking for interactive elements...")
-        interactive = page.locator('button, a[href], [role="button"], input, select')
-        interactive_count = await interactive.count()
-        assert interactive_count > 0, "Leads page should have interactive elements"
-        print(f"SUCCESS: Found {interactive_count} interactive elements")
-
-        # TEST 5: Check for lead count or status indicators
-        print("TEST 5: Checking for lead indicators...")
-        indicators = page.locator('[class*="count"], [class*="badge"], [class*="total"]')
-        indicator_count = await indicators.count()
-        print(f"INFO: Found {indicator_count} indicator(s)")
-
-        print("TEST PASSED: TC004 - Leads Management page loads and displays correctly!")
-
-    except Exception as e:
-        print(f"TEST FAILED: {e}")
-        raise
+        with case("TC004", "Leads Management Table View and Filtering") as tc:
+            with tc.step("Opening leads management") as step:
+                # Get authenticated session
+                pw, browser, context, page = await setup_authenticated_test()
+                registry = SelectorRegistry(page)
+                await page.goto(f"{BASE_URL}/admin/leads", wait_until="networkidle")
+                await registry.wait_for_screen("LeadsManagement")
+                step.note(page.url)
+
+            with tc.step("Checking lead count") as step:
+                await expect(registry.locator("LeadsManagement", "lead_count")).to_be_visible()
+                lead_count = await registry.count("LeadsManagement", "lead_card")
+                step.metric("lead_cards", lead_count)
+
+            with tc.step("Filtering by search") as step:
+                search = registry.locator("LeadsManagement", "search")
+                assert await registry.count("LeadsManagement", "search") > 0, "Leads page should have a search box"
+                await search.first.fill("no-such-lead-tc004")
+                await expect(registry.locator("LeadsManagement", "lead_card")).to_have_count(0)
+                await search.first.fill("")
+                await expect(registry.locator("LeadsManagement", "lead_card")).to_have_count(lead_count)
+
+            with tc.step("Switching to list view") as step:
+                await registry.locator("LeadsManagement", "view_list").click()
+                list_count = await registry.count("LeadsManagement", "lead_card")
+                step.metric("lead_cards", list_count)
+                assert list_count == lead_count, f"List view shows {list_count} leads, card view {lead_count}"
+                await registry.locator("LeadsManagement", "view_cards").click()
+
+            with tc.step("Checking sort options") as step:
+                sort = registry.locator("LeadsManagement", "sort")
+                assert await registry.count("LeadsManagement", "sort") > 0, "Leads page should have a sort control"
+                await sort.first.select_option("name")
+                await expect(sort.first).to_have_value("name")
+                step.metric("lead_cards", await registry.count("LeadsManagement", "lead_card"))
+
+            with tc.step("Checking pipeline filters") as step:
+                tab_count = await registry.count("LeadsManagement", "pipeline_tab")
+                step.metric("pipeline_tabs", tab_count)
+                assert tab_count > 0, "Leads page should have status tabs"
 
     finally:
         await cleanup_test(pw, browser, context, page)
 
 if __name__ == "__main__":
-    asyncio.run(run_test())
+    try:
+        asyncio.run(run_test())
+    finally:
+        print(f"Results: {current_run().events_path}")
@@ -6,17 +6,22 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from playwright.async_api import async_playwright, expect
-from testsprite_tests.auth_helper import setup_authenticated_test, cleanup_test
+from testsprite_tests.auth_helper import BASE_URL, setup_authenticated_test, cleanup_test
+from testsprite_tests.local_stack import fixture_lead_id
+from testsprite_tests.run_results import case, current_run
+from testsprite_tests.selector_registry import SelectorRegistry
 
 async def run_test():
     """
     TC006: Inspection Form Input Fields and Photo Upload UI
 
-    Tests that the inspection form:
-    - Has photo upload functionality visible
-    - Has file input elements
-    - Shows photo-related UI components
-    - Responds to user interactions
+    Tests that the Area Inspection section of the inspection form has:
+    - Photo upload buttons or existing photos for each area
+    - The file input the upload buttons open
+    - Input fields for area findings
+
+    The admin opens the form in admin mode (/admin/inspection/:leadId) for
+    TESTSPRITE_LEAD_ID, or the most recent lead if that is unset.
 
     REQUIRES AUTHENTICATION - uses admin credentials
     """
@@ -26,81 +31,49 @@ async def run_test():
     page = None
 
     try:
-        # Get authenticated session
-        pw, browser, context, page = await setup_authenticated_test()
-
-        # Navigate to inspection form
-        print("Navigating to inspection form...")
-        await page.goto("http://localhost:8080/inspection/new", wait_until="networkidle")
-
-        # Wait for page to load
-        await page.wait_for_load_state("networkidle")
-        await asyncio.sleep(2)
-
-        current_url = page.url
-        print(f"Current page: {current_url}")
-
-        # Check if we need to select a lead first
-        if "/select-lead" in current_url:
-            print("On select lead page, checking for available leads...")
-            lead_items = page.locator('[class*="lead"], [class*="card"], button:has-text("Start"), button:has-text("Select")')
-            lead_count = await lead_items.count()
-
-            if lead_count > 0:
-                print(f"Found {lead_count} selectable items, clicking first one...")
-                await lead_items.first.click()
-                await asyncio.sleep(2)
-                current_url = page.url
-
-        # TEST 1: Check for photo-related UI elements
-        print("TEST 1: Checking for photo upload UI...")
-
-        photo_elements = page.locator('input[type="file"], button:has-text("Photo"), button:has-text("Upload"), button:has-text("Camera"), button:has-text("Attach"), [class*="photo"], [class*="upload"], [class*="image"]')
-        photo_count = await photo_elements.count()
-
-        if photo_count > 0:
-            print(f"SUCCESS: Found {photo_count} photo-related element(s)")
-        else:
-            # Check if we need to navigate to a specific section
-            print("INFO: Photo elements may be in a specific section")
-            next_button = page.locator('button:has-text("Next")')
-            if await next_button.count() > 0:
-                print("Navigating through sections to find photo upload...")
-
-        # TEST 2: Check for file input elements (hidden or visible)
-        print("TEST 2: Checking for file inputs...")
-        file_inputs = page.locator('input[type="file"]')
-        file_count = await file_inputs.count()
-        print(f"INFO: Found {file_count} file input element(s)")
-
-        # TEST 3: Check for image preview areas
-        print("TEST 3: Checking for image preview areas...")
-        preview_areas = page.locator('[class*="preview"], [class*="thumbnail"], img[src*="blob"], [class*="gallery"]')
-        preview_count = await preview_areas.count()
-        print(f"INFO: Found {preview_count} preview area(s)")
-
-        # TEST 4: Check page has proper form structure
-        print("TEST 4: Checking form structure...")
-        form_structure = page.locator('form, [class*="form"], main, [class*="content"]')
-        form_count = await form_structure.count()
-        assert form_count > 0, "Page should have form structure"
-        print(f"SUCCESS: Found {form_count} form structure element(s)")
-
-        # TEST 5: Check for interactive buttons
-        print("TEST 5: Checking for buttons...")
-        buttons = page.locator('button, [role="button"]')
-        button_count = await buttons.count()
-        assert button_count > 0, "Page should have buttons"
-        print(f"SUCCESS: Found {button_count} button(s)")
-
-        print("TEST PASSED: TC006 - Photo upload UI structure verified!")
-
-    except Exception as e:
-        print(f"TEST FAILED: {e}")
-        raise
+        with case("TC006", "Inspection Form Input Fields and Photo Upload UI") as tc:
+            with tc.step("Opening inspection form") as step:
+                lead_id = fixture_lead_id()
+                step.note(f"lead {lead_id}")
+
+                # Get authenticated session
+                pw, browser, context, page = await setup_authenticated_test()
+                registry = SelectorRegistry(page)
+                await page.goto(f"{BASE_URL}/admin/inspection/{lead_id}", wait_until="networkidle")
+                await registry.wait_for_screen("AdminInspectionForm")
+                step.note(page.url)
+
+            with tc.step("Moving to Area Inspection"):
+                progress = registry.locator("AdminInspectionForm", "progress")
+                for section in (2, 3):
+                    await registry.locator("AdminInspectionForm", "next").click()
+                    await expect(progress).to_contain_text(f"Section {section} of")
+                await expect(registry.locator("AdminInspectionForm", "add_area")).to_be_visible()
+
+            with tc.step("Checking for photo upload UI") as step:
+                upload_count = await registry.count("AdminInspectionForm", "photo_upload")
+                photo_count = await registry.count("AdminInspectionForm", "photo_thumbnail")
+                step.metric("upload_buttons", upload_count)
+                step.metric("photos", photo_count)
+                # An area with all its room photos hides its upload button
+                assert upload_count + photo_count > 0, "Area Inspection should offer photo upload"
+
+            with tc.step("Checking for file inputs") as step:
+                # Hidden; the upload buttons click it
+                file_input_count = await registry.count("AdminInspectionForm", "photo_input")
+                step.metric("file_inputs", file_input_count)
+                assert file_input_count > 0, "Form should keep a file input for photo uploads"
+
+            with tc.step("Checking for input fields") as step:
+                input_count = await registry.count("AdminInspectionForm", "field")
+                step.metric("inputs", input_count)
+                assert input_count > 0, "Area Inspection should have input fields"
 
     finally:
         await cleanup_test(pw, browser, context, page)
 
 if __name__ == "__main__":
-    asyncio.run(run_test())
+    try:
+        asyncio.run(run_test())
+    finally:
+        print(f"Results: {current_run().events_path}")
@@ -6,7 +6,9 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from playwright.async_api import async_playwright, expect
-from testsprite_tests.auth_helper import setup_authenticated_test, cleanup_test
+from testsprite_tests.auth_helper import BASE_URL, setup_authenticated_test, cleanup_test
+from testsprite_tests.run_results import case, current_run
+from testsprite_tests.selector_registry import SelectorRegistry
 
 async def run_test():
     """
@@ -14,9 +16,9 @@ async def run_test():
 
     Tests that the calendar page:
     - Loads correctly after authentication
-    - Displays calendar view
-    - Has event/booking functionality
-    - Shows date navigation
+    - Displays the week view with its bookings
+    - Has week navigation
+    - Has technician filters
 
     REQUIRES AUTHENTICATION - uses admin credentials
     """
@@ -26,82 +28,46 @@ async def run_test():
     page = None
 
     try:
-        # Get authenticated session
-        pw, browser, context, page = await setup_authenticated_test()
-
-        # Navigate to calendar page
-        print("Navigating to calendar page...")
-        await page.goto("http://localhost:8080/calendar", wait_until="networkidle")
-
-        # Wait for page to load
-        await page.wait_for_load_state("networkidle")
-        await asyncio.sleep(1)
-
-        # Verify we're on the calendar page
-        current_url = page.url
-        assert "/calendar" in current_url, f"Should be on calendar page, but URL is: {current_url}"
-        print("Successfully loaded calendar page")
-
-        # TEST 1: Verify calendar structure
-        print("TEST 1: Checking calendar structure...")
-
-        # Check for calendar-related elements
-        calendar_elements = page.locator('[class*="calendar"], [class*="event"], [class*="day"], [class*="week"], [class*="month"]')
-        calendar_count = await calendar_elements.count()
-
-        if calendar_count > 0:
-            print(f"SUCCESS: Found {calendar_count} calendar-related element(s)")
-        else:
-            # Alternative check for grid or schedule
-            grid_elements = page.locator('[class*="grid"], [class*="schedule"], table')
-            grid_count = await grid_elements.count()
-            print(f"INFO: Found {grid_count} grid/schedule element(s)")
-
-        # TEST 2: Check for date navigation
-        print("TEST 2: Checking for date navigation...")
-        nav_buttons = page.locator('button:has-text("Today"), button:has-text("Next"), button:has-text("Prev"), button:has-text("<"), button:has-text(">"), [aria-label*="previous" i], [aria-label*="next" i]')
-        nav_count = await nav_buttons.count()
-
-        if nav_count > 0:
-            print(f"SUCCESS: Found {nav_count} date navigation button(s)")
-        else:
-            print("INFO: Navigation may use different UI pattern")
-
-        # TEST 3: Check for add event functionality
-        print("TEST 3: Checking for add event functionality...")
-        add_buttons = page.locator('button:has-text("New"), button:has-text("Add"), button:has-text("+"), button:has-text("Book"), button:has-text("Event")')
-        add_count = await add_buttons.count()
-
-        if add_count > 0:
-            print(f"SUCCESS: Found {add_count} add event button(s)")
-        else:
-            print("INFO: Add functionality may use different UI")
-
-        # TEST 4: Check for time slots or date cells
-        print("TEST 4: Checking for date/time elements...")
-        time_elements = page.locator('[class*="slot"], [class*="cell"], [class*="time"], [class*="hour"], td')
-        time_count = await time_elements.count()
-
-        if time_count > 0:
-            print(f"SUCCESS: Found {time_count} time/cell element(s)")
-        else:
-            print("INFO: Calendar may use different cell structure")
-
-        # TEST 5: Check for interactive elements
-        print("TEST 5: Checking for interactive elements...")
-        interactive = page.locator('button, a[href], [role="button"], [role="gridcell"]')
-        interactive_count = await interactive.count()
-        assert interactive_count > 0, "Calendar page should have interactive elements"
-        print(f"SUCCESS: Found {interactive_count} interactive elements")
-
-        print("TEST PASSED: TC010 - Calendar page loads and displays correctly!")
-
-    except Exception as e:
-        print(f"TEST FAILED: {e}")
-        raise
+        with case("TC010", "Calendar Page Load and Booking Interface") as tc:
+            with tc.step("Opening calendar page") as step:
+                # Get authenticated session
+                pw, browser, context, page = await setup_authenticated_test()
+                registry = SelectorRegistry(page)
+                await page.goto(f"{BASE_URL}/admin/schedule", wait_until="networkidle")
+                await registry.wait_for_screen("AdminSchedule")
+                step.note(page.url)
+
+            with tc.step("Checking calendar events") as step:
+                event_count = await registry.count("AdminSchedule", "calendar_event")
+                step.metric("events", event_count)
+                if event_count == 0:
+                    step.note("No bookings this week")
+
+            with tc.step("Checking week navigation") as step:
+                for element in ("week_previous", "today", "week_next"):
+                    count = await registry.count("AdminSchedule", element)
+                    step.metric(element, count)
+                    assert count > 0, f"Calendar should have {element}"
+
+            with tc.step("Moving to next week and back") as step:
+                await registry.locator("AdminSchedule", "week_next").click()
+                await page.wait_for_load_state("networkidle")
+                step.metric("next_week_events", await registry.count("AdminSchedule", "calendar_event"))
+                await registry.locator("AdminSchedule", "week_previous").click()
+                await page.wait_for_load_state("networkidle")
+                await expect(registry.locator("AdminSchedule", "calendar_event")).to_have_count(event_count)
+
+            with tc.step("Checking technician filters") as step:
+                step.metric("technicians", await registry.count("AdminSchedule", "technician_filter"))
+                for element in ("all_filter", "cancelled_filter"):
+                    count = await registry.count("AdminSchedule", element)
+                    assert count > 0, f"Calendar should have {element}"
 
     finally:
         await cleanup_test(pw, browser, context, page)
 
 if __name__ == "__main__":
-    asyncio.run(run_test())
+    try:
+        asyncio.run(run_test())
+    finally:
+        print(f"Results: {current_run().events_path}")
@@ -6,7 +6,9 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from playwright.async_api import async_playwright, expect
-from testsprite_tests.auth_helper import setup_authenticated_test, cleanup_test
+from testsprite_tests.auth_helper import BASE_URL, setup_authenticated_test, cleanup_test
+from testsprite_tests.run_results import case, current_run
+from testsprite_tests.selector_registry import SelectorRegistry
 
 async def run_test():
     """
@@ -14,9 +16,8 @@ async def run_test():
 
     Tests that the calendar:
     - Shows existing bookings/events
-    - Has proper event display
-    - Shows technician assignments
-    - Has conflict indication UI (if applicable)
+    - Filters bookings by technician
+    - Switches to the cancelled bookings list and back
 
     REQUIRES AUTHENTICATION - uses admin credentials
     """
@@ -26,78 +27,48 @@ async def run_test():
     page = None
 
     try:
-        # Get authenticated session
-        pw, browser, context, page = await setup_authenticated_test()
-
-        # Navigate to calendar page
-        print("Navigating to calendar page...")
-        await page.goto("http://localhost:8080/calendar", wait_until="networkidle")
-
-        # Wait for page to load
-        await page.wait_for_load_state("networkidle")
-        await asyncio.sleep(1)
-
-        # Verify we're on the calendar page
-        current_url = page.url
-        assert "/calendar" in current_url, f"Should be on calendar page, but URL is: {current_url}"
-        print("Successfully loaded calendar page")
-
-        # TEST 1: Check for event display elements
-        print("TEST 1: Checking for event display...")
-
-        event_elements = page.locator('[class*="event"], [class*="booking"], [class*="appointment"], [data-event], [class*="card"]')
-        event_count = await event_elements.count()
-
-        if event_count > 0:
-            print(f"SUCCESS: Found {event_count} event element(s)")
-        else:
-            print("INFO: No events currently displayed (calendar may be empty)")
-
-        # TEST 2: Check for technician/assignee elements
-        print("TEST 2: Checking for technician elements...")
-        tech_elements = page.locator('[class*="user"], [class*="avatar"], [class*="assignee"], [class*="tech"], [class*="employee"]')
-        tech_count = await tech_elements.count()
-
-        if tech_count > 0:
-            print(f"SUCCESS: Found {tech_count} technician-related element(s)")
-        else:
-            print("INFO: Technician display may vary based on view")
-
-        # TEST 3: Check for view toggles (day/week/month)
-        print("TEST 3: Checking for view toggles...")
-        view_toggles = page.locator('button:has-text("Day"), button:has-text("Week"), button:has-text("Month"), [class*="view"], [role="tablist"]')
-        toggle_count = await view_toggles.count()
-
-        if toggle_count > 0:
-            print(f"SUCCESS: Found {toggle_count} view toggle(s)")
-        else:
-            print("INFO: View toggles may use different UI")
-
-        # TEST 4: Check for date display
-        print("TEST 4: Checking for date display...")
-        date_elements = page.locator('[class*="date"], [class*="header"], [class*="title"], h1, h2, h3')
-        date_count = await date_elements.count()
-
-        if date_count > 0:
-            print(f"SUCCESS: Found {date_count} date-related element(s)")
-        else:
-            print("INFO: Date display may use different format")
-
-        # TEST 5: Check for interactive elements
-        print("TEST 5: Checking for interactivity...")
-        interactive = page.locator('button, a[href], [role="button"], [role="gridcell"]')
-        interactive_count = await interactive.count()
-        assert interactive_count > 0, "Calendar should have interactive elements"
-        print(f"SUCCESS: Found {interactive_count} interactive elements")
-
-        print("TEST PASSED: TC011 - Calendar booking display verified!")
-
-    except Exception as e:
-        print(f"TEST FAILED: {e}")
-        raise
+        with case("TC011", "Calendar Booking and Event Display") as tc:
+            with tc.step("Opening calendar page") as step:
+                # Get authenticated session
+                pw, browser, context, page = await setup_authenticated_test()
+                registry = SelectorRegistry(page)
+                await page.goto(f"{BASE_URL}/admin/schedule", wait_until="networkidle")
+                await registry.wait_for_screen("AdminSchedule")
+                step.note(page.url)
+
+            with tc.step("Checking for event display") as step:
+                event_count = await registry.count("AdminSchedule", "calendar_event")
+                step.metric("events", event_count)
+                if event_count == 0:
+                    step.note("No events currently displayed (calendar may be empty)")
+
+            with tc.step("Filtering by technician") as step:
+                technicians = registry.locator("AdminSchedule", "technician_filter")
+                if await registry.count("AdminSchedule", "technician_filter") == 0:
+                    step.skip("No technicians to filter by")
+                else:
+                    await technicians.first.click()
+                    await page.wait_for_load_state("networkidle")
+                    filtered = await registry.count("AdminSchedule", "calendar_event")
+                    step.metric("events", filtered)
+                    assert filtered <= event_count, f"Filtering by technician showed more events ({filtered} > {event_count})"
+                    await registry.locator("AdminSchedule", "all_filter").click()
+                    await expect(registry.locator("AdminSchedule", "calendar_event")).to_have_count(event_count)
+
+            with tc.step("Showing cancelled bookings"):
+                await registry.locator("AdminSchedule", "cancelled_filter").click()
+                # Week navigation is hidden while the cancelled list is shown
+                await expect(registry.locator("AdminSchedule", "week_next")).to_have_count(0)
+
+            with tc.step("Returning to the calendar"):
+                await registry.locator("AdminSchedule", "all_filter").click()
+                await expect(registry.locator("AdminSchedule", "week_next")).to_be_visible()
 
     finally:
         await cleanup_test(pw, browser, context, page)
 
 if __name__ == "__main__":
-    asyncio.run(run_test())
+    try:
+        asyncio.run(run_test())
+    finally:
+        print(f"Results: {current_run().events_path}")
@@ -6,7 +6,10 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from playwright.async_api import async_playwright, expect
-from testsprite_tests.auth_helper import setup_authenticated_test, cleanup_test
+from testsprite_tests.auth_helper import BASE_URL, DEFAULT_EMAIL, DEFAULT_PASSWORD, get_role_context
+from testsprite_tests.dom_probe import probe, count, overflow, size
+from testsprite_tests.run_results import case, current_run
+from testsprite_tests.selector_registry import SelectorRegistry
 
 async def run_test():
     """
@@ -26,105 +29,86 @@ async def run_test():
     page = None
 
     try:
-        # Get authenticated session with mobile viewport
-        pw = await async_playwright().start()
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=["--disable-dev-shm-usage"]
-        )
-
-        # Create mobile context
-        context = await browser.new_context(
-            viewport={"width": 375, "height": 667},
-            user_agent="Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1"
-        )
-        context.set_default_timeout(30000)
-        page = await context.new_page()
-
-        # Login first
-        print("Logging in on mobile viewport...")
-        await page.goto("http://localhost:8080/login", wait_until="networkidle")
-        await page.fill('input[name="email"]', os.getenv("ADMIN_EMAIL", "admin@mrc.com.au"))
-        await page.fill('input[name="password"]', os.getenv("ADMIN_PASSWORD", "Admin123!"))
-        await page.click('button[type="submit"]')
-
-        try:
-            await page.wait_for_url("**/dashboard**", timeout=15000)
-            print("Login successful on mobile!")
-        except:
-            current_url = page.url
-            if "/login" not in current_url:
-                print(f"Navigated to: {current_url}")
-            else:
-                raise Exception("Login failed on mobile")
-
-        # TEST 1: Check viewport and page dimensions
-        print("TEST 1: Checking mobile viewport...")
-        viewport_width = await page.evaluate("() => window.innerWidth")
-        doc_width = await page.evaluate("() => document.documentElement.scrollWidth")
-
-        assert viewport_width == 375, f"Viewport should be 375px, got {viewport_width}px"
-        print(f"SUCCESS: Viewport width is {viewport_width}px")
-
-        # Check for horizontal scrolling
-        if doc_width > viewport_width:
-            print(f"WARNING: Document width ({doc_width}px) exceeds viewport ({viewport_width}px) - may have horizontal scroll")
-        else:
-            print(f"SUCCESS: No horizontal scrolling detected (doc width: {doc_width}px)")
-
-        # TEST 2: Check touch target sizes
-        print("TEST 2: Checking touch target sizes...")
-
-        buttons = await page.locator('button').all()
-        small_targets = 0
-        for button in buttons[:10]:  # Check first 10 buttons
-            try:
-                box = await button.bounding_box()
-                if box:
-                    size = min(box['width'], box['height'])
-                    if size < 44:  # iOS recommends 44px, we'll accept 44+
-                        small_targets += 1
-            except:
-                pass
-
-        if small_targets == 0:
-            print("SUCCESS: All checked buttons have adequate touch target size")
-        else:
-            print(f"INFO: {small_targets} button(s) may have small touch targets (< 44px)")
-
-        # TEST 3: Check page load performance
-        print("TEST 3: Checking page load performance...")
-        start_time = asyncio.get_event_loop().time()
-        await page.goto("http://localhost:8080/dashboard", wait_until="networkidle")
-        load_time = asyncio.get_event_loop().time() - start_time
-
-        if load_time < 3:
-            print(f"SUCCESS: Page loaded in {load_time:.2f}s (< 3s)")
-        else:
-            print(f"WARNING: Page load time {load_time:.2f}s exceeds 3s target")
-
-        # TEST 4: Check for mobile-friendly navigation
-        print("TEST 4: Checking mobile navigation...")
-        mobile_nav = page.locator('[class*="mobile"], [class*="menu"], button[aria-label*="menu" i], [class*="hamburger"], nav')
-        nav_count = await mobile_nav.count()
-
-        if nav_count > 0:
-            print(f"SUCCESS: Found {nav_count} mobile navigation element(s)")
-        else:
-            print("INFO: Mobile navigation may use standard elements")
-
-        # TEST 5: Check for responsive content
-        print("TEST 5: Checking responsive content...")
-        content_elements = page.locator('main, [class*="content"], [class*="container"]')
-        content_count = await content_elements.count()
-        assert content_count > 0, "Page should have content containers"
-        print(f"SUCCESS: Found {content_count} content container(s)")
-
-        print("TEST PASSED: TC013 - Mobile responsiveness verified!")
-
-    except Exception as e:
-        print(f"TEST FAILED: {e}")
-        raise
+        with case("TC013", "Mobile Responsive Design and Touch Targets") as tc:
+            with tc.step("Signing in on mobile viewport") as step:
+                pw = await async_playwright().start()
+                browser = await pw.chromium.launch(
+                    headless=True,
+                    args=["--disable-dev-shm-usage"]
+                )
+
+                # Sign in through the shared helper, then carry the session
+                # into a mobile context
+                desktop = await get_role_context(browser, DEFAULT_EMAIL, DEFAULT_PASSWORD, "Admin")
+                try:
+                    state = await desktop.storage_state()
+                finally:
+                    await desktop.close()
+
+                context = await browser.new_context(
+                    viewport={"width": 375, "height": 667},
+                    user_agent="Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1",
+                    storage_state=state,
+                )
+                context.set_default_timeout(30000)
+                page = await context.new_page()
+                registry = SelectorRegistry(page)
+                await page.goto(f"{BASE_URL}/admin", wait_until="networkidle")
+                await registry.wait_for_screen("AdminDashboard")
+                step.note(page.url)
+
+            # Viewport, horizontal overflow and touch targets in one round trip
+            results = await probe(page, {
+                "overflow": overflow(),
+                "touch_targets": size("button", min_px=44),
+            })
+
+            with tc.step("Checking mobile viewport") as step:
+                viewport_width = results["overflow"]["viewport_width"]
+                doc_width = results["overflow"]["scroll_width"]
+                step.metric("viewport_width", viewport_width)
+                step.metric("document_width", doc_width)
+
+                assert viewport_width == 375, f"Viewport should be 375px, got {viewport_width}px"
+
+                # Check for horizontal scrolling
+                if doc_width > viewport_width:
+                    step.note(f"Document width ({doc_width}px) exceeds viewport ({viewport_width}px) - may have horizontal scroll")
+
+            with tc.step("Checking touch target sizes") as step:
+                touch = results["touch_targets"]
+                small_targets = touch["violations"]  # iOS recommends 44px, we'll accept 44+
+                step.metric("buttons", touch["count"])
+                step.metric("small_touch_targets", small_targets)
+
+                if small_targets:
+                    step.note(f"Smallest button(s) under 44px: {touch['smallest']}")
+
+            with tc.step("Checking page load performance") as step:
+                start_time = asyncio.get_event_loop().time()
+                await page.goto(f"{BASE_URL}/admin", wait_until="networkidle")
+                await registry.wait_for_screen("AdminDashboard")
+                load_time = asyncio.get_event_loop().time() - start_time
+                step.metric("load_s", round(load_time, 2))
+
+                if load_time >= 3:
+                    step.note(f"Page load time {load_time:.2f}s exceeds 3s target")
+
+            # Menu button and stat cards in one round trip; both are plain CSS
+            results = await probe(page, {
+                "menu": count(registry.selector("AdminDashboard", "menu")),
+                "stats": count(registry.selector("AdminDashboard", "stats_card")),
+            })
+
+            with tc.step("Checking mobile navigation") as step:
+                nav_count = results["menu"]["count"]
+                step.metric("menu_buttons", nav_count)
+                assert nav_count > 0, "Dashboard should have a menu button on mobile"
+
+            with tc.step("Checking responsive content") as step:
+                content_count = results["stats"]["count"]
+                step.metric("stat_cards", content_count)
+                assert content_count > 0, "Dashboard should show stat cards"
 
     finally:
         if page:
@@ -137,4 +121,7 @@ async def run_test():
             await pw.stop()
 
 if __name__ == "__main__":
-    asyncio.run(run_test())
+    try:
+        asyncio.run(run_test())
+    finally:
+        print(f"Results: {current_run().events_path}")
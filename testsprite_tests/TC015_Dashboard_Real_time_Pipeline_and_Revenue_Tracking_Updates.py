@@ -6,16 +6,18 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from playwright.async_api import async_playwright, expect
-from testsprite_tests.auth_helper import setup_authenticated_test, cleanup_test
+from testsprite_tests.auth_helper import BASE_URL, setup_authenticated_test, cleanup_test
+from testsprite_tests.run_results import case, current_run
+from testsprite_tests.selector_registry import SelectorRegistry
 
 async def run_test():
     """
     TC015: Dashboard Real-time Pipeline and Revenue Tracking Updates
 
     Tests that the dashboard displays:
-    - Pipeline statistics (leads count, active jobs, completed)
-    - Revenue tracking
-    - Recent leads activity
+    - Pipeline statistics (jobs, leads to assign, completed, revenue)
+    - Shortcuts from the review and invoice stats to filtered leads
+    - Today's schedule and the other dashboard sections
 
     REQUIRES AUTHENTICATION - uses admin credentials
     """
@@ -25,82 +27,43 @@ async def run_test():
     page = None
 
     try:
-        # Get authenticated session
-        pw, browser, context, page = await setup_authenticated_test()
-
-        # Navigate to dashboard
-        print("Navigating to dashboard...")
-        await page.goto("http://localhost:8080/dashboard", wait_until="networkidle")
-
-        # Verify we're on the dashboard (not redirected to login)
-        current_url = page.url
-        assert "/dashboard" in current_url, f"Should be on dashboard, but URL is: {current_url}"
-        print("Successfully loaded dashboard")
-
-        # Wait for dashboard content to load
-        await page.wait_for_load_state("networkidle")
-
-        # TEST 1: Verify dashboard header/navigation is visible
-        print("TEST 1: Checking dashboard navigation...")
-        logo = page.locator('.dashboard-page, [class*="dashboard"]')
-        await expect(logo.first).to_be_visible(timeout=5000)
-        print("SUCCESS: Dashboard layout loaded")
-
-        # TEST 2: Verify stat cards are visible (leads, jobs, revenue, etc.)
-        print("TEST 2: Checking dashboard statistics...")
-
-        # Check for stat card elements or text indicating stats
-        stat_elements = page.locator('[class*="stat"], [class*="card"], [class*="revenue"], [class*="metric"]')
-        stat_count = await stat_elements.count()
-
-        if stat_count > 0:
-            print(f"SUCCESS: Found {stat_count} stat/card elements on dashboard")
-        else:
-            # Alternative: check for specific stat text
-            leads_text = page.locator('text=/leads/i')
-            jobs_text = page.locator('text=/jobs/i')
-            leads_visible = await leads_text.count() > 0
-            jobs_visible = await jobs_text.count() > 0
-            assert leads_visible or jobs_visible, "Dashboard should show leads or jobs statistics"
-            print("SUCCESS: Found dashboard statistics text")
-
-        # TEST 3: Verify recent activity section
-        print("TEST 3: Checking recent activity...")
-        recent_section = page.locator('text=/recent/i, text=/activity/i, text=/leads/i')
-        recent_visible = await recent_section.count() > 0
-        if recent_visible:
-            print("SUCCESS: Recent activity section visible")
-        else:
-            print("INFO: No explicit recent activity section found (may be empty)")
-
-        # TEST 4: Verify navigation elements work
-        print("TEST 4: Checking navigation elements...")
-        nav_items = page.locator('nav a, nav button, [role="navigation"] a')
-        nav_count = await nav_items.count()
-        assert nav_count > 0, "Dashboard should have navigation elements"
-        print(f"SUCCESS: Found {nav_count} navigation elements")
-
-        # TEST 5: Verify page doesn't have console errors
-        print("TEST 5: Checking for JavaScript errors...")
-        # Note: We'd need to set up console listener before navigation for full check
-        # For now, just verify page loaded without throwing
-
-        # Verify key elements are interactive
-        print("TEST 6: Verifying dashboard is interactive...")
-        # Try to find a clickable element (new lead button, menu, etc.)
-        interactive = page.locator('button, [role="button"], a[href]')
-        interactive_count = await interactive.count()
-        assert interactive_count > 0, "Dashboard should have interactive elements"
-        print(f"SUCCESS: Found {interactive_count} interactive elements")
-
-        print("TEST PASSED: TC015 - Dashboard loads and displays correctly!")
-
-    except Exception as e:
-        print(f"TEST FAILED: {e}")
-        raise
+        with case("TC015", "Dashboard Real-time Pipeline and Revenue Tracking Updates") as tc:
+            with tc.step("Opening dashboard") as step:
+                # Get authenticated session
+                pw, browser, context, page = await setup_authenticated_test()
+                registry = SelectorRegistry(page)
+                await page.goto(f"{BASE_URL}/admin", wait_until="networkidle")
+                await registry.wait_for_screen("AdminDashboard")
+                step.note(page.url)
+
+            with tc.step("Checking dashboard statistics") as step:
+                stat_count = await registry.count("AdminDashboard", "stats_card")
+                step.metric("stat_cards", stat_count)
+                # Jobs, leads to assign, completed, revenue, pending reviews,
+                # overdue invoices; failed webhooks only when there are some
+                assert stat_count >= 6, f"Dashboard should show at least 6 stat cards, found {stat_count}"
+
+            with tc.step("Checking stat shortcuts") as step:
+                link_count = await registry.count("AdminDashboard", "stat_link")
+                step.metric("stat_links", link_count)
+                assert link_count >= 2, "Pending reviews and overdue invoices should link to leads"
+
+            with tc.step("Checking dashboard sections") as step:
+                section_count = await registry.count("AdminDashboard", "section")
+                step.metric("sections", section_count)
+                assert section_count > 0, "Dashboard should show its sections"
+                step.metric("view_all_links", await registry.count("AdminDashboard", "view_all"))
+
+            with tc.step("Opening leads from the sidebar") as step:
+                await registry.locator("AdminDashboard", "nav_leads").click()
+                await registry.wait_for_screen("LeadsManagement")
+                step.note(page.url)
 
     finally:
         await cleanup_test(pw, browser, context, page)
 
 if __name__ == "__main__":
-    asyncio.run(run_test())
+    try:
+        asyncio.run(run_test())
+    finally:
+        print(f"Results: {current_run().events_path}")
@@ -8,10 +8,13 @@ import os
 import asyncio
 from playwright.async_api import async_playwright, Page, BrowserContext
 
+from testsprite_tests.clock_control import install_clock
+
 # Default credentials from environment
 DEFAULT_EMAIL = os.getenv("ADMIN_EMAIL", "admin@mrc.com.au")
 DEFAULT_PASSWORD = os.getenv("ADMIN_PASSWORD", "Admin123!")
 STORAGE_STATE_PATH = "testsprite_tests/tmp/storageState.json"
+BASE_URL = os.getenv("TESTSPRITE_BASE_URL", "http://localhost:8080")
 
 
 async def ensure_storage_dir():
@@ -19,9 +22,26 @@ async def ensure_storage_dir():
     os.makedirs(os.path.dirname(STORAGE_STATE_PATH), exist_ok=True)
 
 
+async def _sign_in(page: Page, email: str, password: str, role: str = "Admin"):
+    """Signs in through the login page at `/`, selecting the role toggle first."""
+    await page.goto(f"{BASE_URL}/", wait_until="domcontentloaded")
+    await page.get_by_role("button", name=role, exact=True).click()
+    await page.get_by_placeholder("Email").fill(email)
+    await page.get_by_placeholder("Password").fill(password)
+    await page.click('button[type="submit"]')
+    try:
+        await page.wait_for_url(f"**/{role.lower()}**", timeout=15000)
+    except Exception:
+        error = page.locator('[role="alert"], .text-destructive').first
+        message = await error.text_content() if await error.count() else None
+        raise Exception(f"Login failed for {email} ({role}). Error: {message}. Current URL: {page.url}")
+
+
 async def login_and_save_state(page: Page, email: str = None, password: str = None):
     """
-    Logs in a user and saves the browser context's storage state.
+    Logs in an admin and saves the browser context's storage state.
+
+    Uses the same login flow as get_role_context (Admin toggle on `/`).
 
     Args:
         page: Playwright page object
@@ -32,29 +52,8 @@ async def login_and_save_state(page: Page, email: str = None, password: str = No
     password = password or DEFAULT_PASSWORD
 
     print(f"Logging in as {email}...")
-    await page.goto("http://localhost:8080/login", wait_until="networkidle")
-
-    # Wait for login form to be ready
-    await page.wait_for_selector('input[name="email"]', state="visible")
-
-    # Fill in login credentials
-    await page.fill('input[name="email"]', email)
-    await page.fill('input[name="password"]', password)
-
-    # Click submit button
-    await page.click('button[type="submit"]')
-
-    # Wait for navigation to dashboard (successful login)
-    try:
-        await page.wait_for_url("**/dashboard**", timeout=15000)
-        print("Login successful! Navigated to dashboard.")
-    except:
-        # Check if we're still on login page with an error
-        current_url = page.url
-        if "/login" in current_url:
-            error_text = await page.locator('.text-destructive, .error').text_content()
-            raise Exception(f"Login failed. Error: {error_text}")
-        print(f"Login appears successful. Current URL: {current_url}")
+    await _sign_in(page, email, password, "Admin")
+    print(f"Login successful! Current URL: {page.url}")
 
     # Save storage state for future use
     await ensure_storage_dir()
@@ -63,26 +62,41 @@ async def login_and_save_state(page: Page, email: str = None, password: str = No
     print(f"Session state saved to {STORAGE_STATE_PATH}")
 
 
-async def get_authenticated_context(playwright, force_new_login: bool = False):
+async def launch_browser(playwright, engine: str = "chromium"):
+    """
+    Launches a headless browser for `engine` ("chromium", "firefox" or "webkit").
+
+    Chromium gets the container-friendly flags the TCs use; the other engines
+    do not accept them.
+    """
+    if engine == "chromium":
+        return await playwright.chromium.launch(
+            headless=True,
+            args=["--window-size=1280,720", "--disable-dev-shm-usage"]
+        )
+    return await getattr(playwright, engine).launch(headless=True)
+
+
+async def get_authenticated_context(playwright, force_new_login: bool = False, engine: str = "chromium"):
     """
     Returns an authenticated browser context.
 
     If storage state exists and force_new_login is False, uses cached state.
-    Otherwise performs fresh login.
+    Otherwise performs fresh login. The saved state is plain cookies and
+    localStorage, so a session saved from one engine works in the others.
+    The context has the virtual clock installed (see clock_control).
 
     Args:
         playwright: Playwright instance
         force_new_login: If True, performs fresh login even if state exists
+        engine: Browser engine to launch ("chromium", "firefox" or "webkit")
 
     Returns:
         tuple: (browser, context) - both need to be closed by caller
     """
     await ensure_storage_dir()
 
-    browser = await playwright.chromium.launch(
-        headless=True,
-        args=["--window-size=1280,720", "--disable-dev-shm-usage"]
-    )
+    browser = await launch_browser(playwright, engine)
 
     if not force_new_login and os.path.exists(STORAGE_STATE_PATH):
         print(f"Using cached authentication from {STORAGE_STATE_PATH}")
@@ -99,10 +113,60 @@ async def get_authenticated_context(playwright, force_new_login: bool = False):
         await context.close()
         context = await browser.new_context(storage_state=STORAGE_STATE_PATH)
 
+    await install_clock(context)
     context.set_default_timeout(30000)
     return browser, context
 
 
+def role_storage_path(email: str) -> str:
+    """Storage state path for one account, so several roles can stay signed in."""
+    slug = "".join(c if c.isalnum() else "_" for c in email.lower())
+    return f"testsprite_tests/tmp/storageState-{slug}.json"
+
+
+async def get_role_context(browser, email: str, password: str, role: str = "Admin",
+                           force_new_login: bool = False):
+    """
+    Returns a context signed in as `email` through the role toggle on the login page.
+
+    Unlike get_authenticated_context this works for technicians too, and
+    caches one storage state per account so an admin and several technicians
+    can share a browser. Like get_authenticated_context, the returned context
+    has the virtual clock installed.
+
+    Args:
+        browser: Browser to create the context in
+        email: Login email
+        password: Login password
+        role: "Admin" or "Technician" - the login page toggle to select
+        force_new_login: If True, performs fresh login even if state exists
+
+    Returns:
+        BrowserContext: caller closes it
+    """
+    await ensure_storage_dir()
+    path = role_storage_path(email)
+
+    if not force_new_login and os.path.exists(path):
+        context = await browser.new_context(storage_state=path)
+    else:
+        print(f"Logging in as {email} ({role})...")
+        context = await browser.new_context()
+        page = await context.new_page()
+        try:
+            await _sign_in(page, email, password, role)
+            await context.storage_state(path=path)
+        finally:
+            await page.close()
+        # The clock has to go in before the first page; start clean
+        await context.close()
+        context = await browser.new_context(storage_state=path)
+
+    await install_clock(context)
+    context.set_default_timeout(30000)
+    return context
+
+
 async def create_authenticated_page(playwright, force_new_login: bool = False):
     """
     Creates an authenticated page ready for testing protected routes.
@@ -0,0 +1,397 @@
+"""
+Network-Condition Chaos Proxy
+
+A local asyncio forward proxy the harness puts between browser contexts and
+the Supabase / Vercel endpoints. Chromium is launched with it as its proxy
+(Playwright routes loopback through it too), so no app config changes.
+
+Traffic to the Supabase URL and to /api/* is shaped by a named profile:
+
+- one-way latency with jitter on each direction's first byte
+- uplink/downlink bandwidth shared across all connections, like one phone link
+- dropped connections, either refused or cut mid-response
+- 5xx bursts on a fixed cycle (a gateway falling over for a few seconds)
+
+Everything else (the dev server's own assets) passes through untouched unless
+--shape-app is given. HTTPS is tunnelled with CONNECT and can be delayed,
+throttled and dropped, but not answered with an injected 5xx.
+
+Each plan entry runs under each profile in a fresh context. The report shows
+time-to-usable (navigation to the start screen's root element), step outcome,
+and retry storms: the same request repeated --storm-count times within
+--storm-window seconds.
+
+    python testsprite_tests/chaos_proxy.py --profiles basement-3g flaky-office-wifi --only TC005 TC013
+    python testsprite_tests/chaos_proxy.py --serve basement-3g --port 8899
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.auth_helper import BASE_URL, STORAGE_STATE_PATH, get_authenticated_context
+from testsprite_tests.local_stack import SUPABASE_URL
+from testsprite_tests.plan_executor import MAIN_SELECTOR, load_compiled_plan, run_case
+from testsprite_tests.selector_registry import screen_for_route
+
+RESULTS_DIR = "testsprite_tests/tmp/chaos"
+PROXY_PORT = int(os.getenv("CHAOS_PROXY_PORT", "8899"))
+CHUNK_SIZE = 16 * 1024
+
+
+@dataclass
+class Profile:
+    """Network conditions applied to shaped traffic."""
+
+    label: str
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    down_kbps: Optional[float] = None
+    up_kbps: Optional[float] = None
+    drop_rate: float = 0.0
+    burst_every_s: Optional[float] = None
+    burst_duration_s: float = 0
+    burst_statuses: tuple = (502, 503, 504)
+
+
+PROFILES = {
+    "office-lan": Profile("office LAN"),
+    "basement-3g": Profile("basement 3G", latency_ms=300, jitter_ms=150, down_kbps=400, up_kbps=100,
+                           drop_rate=0.03),
+    "moving-4g": Profile("4G in a moving van", latency_ms=90, jitter_ms=60, down_kbps=4000, up_kbps=1500,
+                         drop_rate=0.01),
+    "flaky-office-wifi": Profile("flaky office Wi-Fi", latency_ms=40, jitter_ms=80, down_kbps=8000,
+                                 up_kbps=4000, drop_rate=0.05, burst_every_s=60, burst_duration_s=4),
+    "gateway-5xx": Profile("gateway 5xx bursts", latency_ms=20, burst_every_s=20, burst_duration_s=5),
+}
+
+
+def resolve_profile(name: str) -> str:
+    """Accepts 'basement-3g', 'basement 3G' or 'Basement 3g'."""
+    slug = name.strip().lower().replace(" ", "-")
+    if slug in PROFILES:
+        return slug
+    for key, profile in PROFILES.items():
+        if profile.label.lower() == name.strip().lower():
+            return key
+    raise argparse.ArgumentTypeError(f"Unknown profile {name!r}; choose from {', '.join(PROFILES)}")
+
+
+class Link:
+    """One direction of a shared link: serialises bytes at a fixed bit rate."""
+
+    def __init__(self, kbps: Optional[float]):
+        self.bytes_per_s = kbps * 1000 / 8 if kbps else None
+        self.next_free = 0.0
+
+    async def transmit(self, nbytes: int):
+        if not self.bytes_per_s:
+            return
+        now = time.monotonic()
+        start = max(now, self.next_free)
+        self.next_free = start + nbytes / self.bytes_per_s
+        await asyncio.sleep(self.next_free - now)
+
+
+class ChaosProxy:
+    """Forward proxy applying a Profile to matching traffic and logging every request."""
+
+    def __init__(self, profile: Profile, port: int = PROXY_PORT, shape_app: bool = False, seed: int = 1):
+        self.profile = profile
+        self.port = port
+        self.shape_app = shape_app
+        self.rng = random.Random(seed)
+        self.shaped_hosts = {urlsplit(SUPABASE_URL).netloc}
+        self.app_host = urlsplit(BASE_URL).netloc
+        self.down = Link(profile.down_kbps)
+        self.up = Link(profile.up_kbps)
+        self.started = time.monotonic()
+        self.requests = []
+        self.server = None
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def take_requests(self) -> list:
+        """Returns and clears the request log."""
+        requests, self.requests = self.requests, []
+        return requests
+
+    def _shaped(self, host: str, path: str) -> bool:
+        return host in self.shaped_hosts or path.startswith("/api/") or (self.shape_app and host == self.app_host)
+
+    def _in_burst(self) -> bool:
+        every = self.profile.burst_every_s
+        return bool(every) and (time.monotonic() - self.started) % every < self.profile.burst_duration_s
+
+    async def _delay(self):
+        p = self.profile
+        if p.latency_ms or p.jitter_ms:
+            await asyncio.sleep(max(0.0, p.latency_ms + self.rng.uniform(-p.jitter_ms, p.jitter_ms)) / 1000)
+
+    async def _pump(self, reader, writer, link: Optional[Link], first_delay: bool, cut_after: Optional[int], record):
+        sent = 0
+        try:
+            while True:
+                chunk = await reader.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if first_delay and sent == 0:
+                    await self._delay()
+                if link:
+                    await link.transmit(len(chunk))
+                if cut_after is not None and sent + len(chunk) > cut_after:
+                    record["injected"] = "cut"
+                    break
+                writer.write(chunk)
+                await writer.drain()
+                sent += len(chunk)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            record["bytes"] = record.get("bytes", 0) + sent
+            if not writer.is_closing():
+                writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        try:
+            head = await client_reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            client_writer.close()
+            return
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        method, target, version = request_line.split(" ", 2)
+
+        if method == "CONNECT":
+            host, path = target, ""
+        else:
+            url = urlsplit(target)
+            host, path = url.netloc, url.path + (f"?{url.query}" if url.query else "")
+        shaped = self._shaped(host, path)
+        record = {"t": round(time.monotonic() - self.started, 3), "method": method, "host": host,
+                  "path": path, "shaped": shaped, "status": None, "injected": None}
+        self.requests.append(record)
+        start = time.monotonic()
+
+        if shaped and self.rng.random() < self.profile.drop_rate and self.rng.random() < 0.5:
+            record["injected"] = "refused"
+            client_writer.close()
+            return
+        if shaped and method not in ("CONNECT", "OPTIONS") and self._in_burst():
+            status = self.rng.choice(self.profile.burst_statuses)
+            origin = next((h.split(":", 1)[1].strip() for h in header_lines if h.lower().startswith("origin:")), "*")
+            await self._delay()
+            client_writer.write(
+                f"HTTP/1.1 {status} Injected\r\nAccess-Control-Allow-Origin: {origin}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: 2\r\nConnection: close\r\n\r\n{{}}".encode()
+            )
+            await client_writer.drain()
+            client_writer.close()
+            record.update(status=status, injected="5xx", ms=round((time.monotonic() - start) * 1000, 1))
+            return
+
+        hostname, _, port = host.rpartition(":") if ":" in host else (host, "", "")
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(
+                hostname or host, int(port or (443 if method == "CONNECT" else 80))
+            )
+        except OSError:
+            client_writer.write(b"HTTP/1.1 502 Bad Gateway\r\nConnection: close\r\n\r\n")
+            client_writer.close()
+            record.update(status=502, injected="upstream-unreachable")
+            return
+
+        tunnel = method == "CONNECT"
+        if tunnel:
+            client_writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+            await client_writer.drain()
+        else:
+            # One request per upstream connection keeps framing trivial: the
+            # response ends when the upstream closes.
+            headers = [h for h in header_lines if h and not h.lower().startswith(("proxy-connection:", "connection:"))]
+            upgrade = any(h.lower().startswith("upgrade:") for h in headers)
+            headers.append("Connection: upgrade" if upgrade else "Connection: close")
+            forwarded = f"{method} {path or '/'} {version}\r\n" + "".join(f"{h}\r\n" for h in headers) + "\r\n"
+            if shaped:
+                await self._delay()
+                await self.up.transmit(len(forwarded))
+            upstream_writer.write(forwarded.encode("latin-1"))
+
+        cut_after = self.rng.randint(0, 4096) if shaped and self.rng.random() < self.profile.drop_rate else None
+        # Tunnels get their latency on the first chunk each way; plain HTTP
+        # already paid it on the request head and gets it again on the status line.
+        upstream_task = asyncio.create_task(
+            self._pump(client_reader, upstream_writer, self.up if shaped else None, shaped and tunnel, None, {})
+        )
+        try:
+            if not tunnel:
+                status_line = await upstream_reader.readuntil(b"\r\n")
+                record["status"] = int(status_line.split()[1])
+                if shaped:
+                    await self._delay()
+                client_writer.write(status_line)
+            await self._pump(upstream_reader, client_writer, self.down if shaped else None,
+                             shaped and tunnel, cut_after, record)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError, IndexError):
+            client_writer.close()
+        finally:
+            upstream_task.cancel()
+            upstream_writer.close()
+            record["ms"] = round((time.monotonic() - start) * 1000, 1)
+
+
+def retry_storms(requests: list, window_s: float, min_count: int) -> list:
+    """Groups identical shaped requests repeated at least `min_count` times within `window_s`."""
+    by_key = {}
+    for r in requests:
+        if r["shaped"] and r["method"] not in ("CONNECT", "OPTIONS"):
+            by_key.setdefault((r["method"], r["host"], r["path"]), []).append(r["t"])
+    storms = []
+    for (method, host, path), times in by_key.items():
+        times.sort()
+        worst, left = 0, 0
+        for right in range(len(times)):
+            while times[right] - times[left] > window_s:
+                left += 1
+            worst = max(worst, right - left + 1)
+        if worst >= min_count:
+            storms.append({"method": method, "path": path[:120], "max_in_window": worst, "total": len(times)})
+    return sorted(storms, key=lambda s: -s["max_in_window"])
+
+
+async def time_to_usable(context, route: str, timeout_ms: int = 60000) -> Optional[float]:
+    """Milliseconds from navigation until the route's screen root (or main) is visible."""
+    screen = screen_for_route(route)
+    selector = screen.root if screen else MAIN_SELECTOR
+    page = await context.new_page()
+    start = time.perf_counter()
+    try:
+        await page.goto(f"{BASE_URL}{route}", wait_until="commit", timeout=timeout_ms)
+        await page.wait_for_selector(selector, state="visible", timeout=timeout_ms)
+        return round((time.perf_counter() - start) * 1000, 1)
+    except Exception:
+        return None
+    finally:
+        await page.close()
+
+
+async def run_profile(pw, profile_key: str, cases: list, args) -> list:
+    profile = PROFILES[profile_key]
+    results = []
+    async with ChaosProxy(profile, args.port, args.shape_app, args.seed) as proxy:
+        browser = await pw.chromium.launch(
+            headless=True, proxy={"server": f"http://127.0.0.1:{args.port}"},
+            args=["--disable-dev-shm-usage"],
+        )
+        try:
+            for case in cases:
+                print(f"  [{profile.label}] {case.id}: {case.title}")
+                context = await browser.new_context(storage_state=STORAGE_STATE_PATH)
+                context.set_default_timeout(args.timeout_ms)
+                ready_ms = await time_to_usable(context, case.start_route, args.timeout_ms)
+                page = await context.new_page()
+                result = await run_case(browser, case, page=page)
+                await context.close()
+                requests = proxy.take_requests()
+                shaped = [r for r in requests if r["shaped"]]
+                results.append({
+                    "profile": profile_key,
+                    "case": case.id,
+                    "status": result["status"],
+                    "time_to_usable_ms": ready_ms,
+                    "duration_ms": result["duration_ms"],
+                    "failed_step": next((s["description"] for s in result["steps"] if s["status"] == "failed"), None),
+                    "requests": len(shaped),
+                    "injected": {kind: sum(1 for r in shaped if r["injected"] == kind)
+                                 for kind in ("refused", "cut", "5xx")},
+                    "server_errors": sum(1 for r in shaped if (r["status"] or 0) >= 500),
+                    "retry_storms": retry_storms(requests, args.storm_window, args.storm_count),
+                })
+        finally:
+            await browser.close()
+    return results
+
+
+def print_report(results: list):
+    print(f"\n{'profile':<18} {'case':<6} {'status':<7} {'usable ms':>9} {'total ms':>9} {'reqs':>5}"
+          f" {'drop':>5} {'cut':>4} {'5xx':>4} {'storms':>6}")
+    for r in results:
+        usable = f"{r['time_to_usable_ms']:.0f}" if r["time_to_usable_ms"] is not None else "never"
+        print(f"{r['profile']:<18} {r['case']:<6} {r['status']:<7} {usable:>9} {r['duration_ms']:>9.0f}"
+              f" {r['requests']:>5} {r['injected']['refused']:>5} {r['injected']['cut']:>4} {r['injected']['5xx']:>4}"
+              f" {len(r['retry_storms']):>6}")
+    storms = [(r, s) for r in results for s in r["retry_storms"]]
+    if storms:
+        print("\nRetry storms:")
+        for r, s in sorted(storms, key=lambda x: -x[1]["max_in_window"])[:15]:
+            print(f"  {r['profile']:<18} {r['case']:<6} {s['max_in_window']:>3}x {s['method']} {s['path']}")
+
+
+async def serve(profile_key: str, args):
+    async with ChaosProxy(PROFILES[profile_key], args.port, args.shape_app, args.seed) as proxy:
+        print(f"Chaos proxy ({proxy.profile.label}) on 127.0.0.1:{args.port}; Ctrl+C to stop")
+        await asyncio.Event().wait()
+
+
+async def run_matrix(args) -> list:
+    from playwright.async_api import async_playwright
+
+    cases = load_compiled_plan()
+    if args.only:
+        cases = [c for c in cases if c.id in args.only]
+    pw = await async_playwright().start()
+    # Log in without the proxy so the saved session is not affected by chaos
+    browser, context = await get_authenticated_context(pw)
+    await context.close()
+    await browser.close()
+    results = []
+    try:
+        for profile_key in args.profiles:
+            results.extend(await run_profile(pw, profile_key, cases, args))
+    finally:
+        await pw.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run TestSprite plan entries behind a network chaos proxy")
+    parser.add_argument("--profiles", nargs="*", type=resolve_profile, default=["basement-3g", "flaky-office-wifi"])
+    parser.add_argument("--only", nargs="*", help="Plan entry ids to run")
+    parser.add_argument("--port", type=int, default=PROXY_PORT, help="Proxy listen port")
+    parser.add_argument("--shape-app", action="store_true", help="Also shape the dev server's own assets")
+    parser.add_argument("--timeout-ms", type=int, default=60000, help="Time-to-usable and default action timeout")
+    parser.add_argument("--storm-window", type=float, default=10, help="Seconds for retry storm detection")
+    parser.add_argument("--storm-count", type=int, default=4, help="Repeats within the window that count as a storm")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for jitter, drops and status codes")
+    parser.add_argument("--serve", type=resolve_profile, metavar="PROFILE", help="Only run the proxy")
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(serve(args.serve, args))
+        return
+
+    results = asyncio.run(run_matrix(args))
+    print_report(results)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"chaos-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"profiles": {k: asdict(PROFILES[k]) for k in args.profiles}, "results": results}, f, indent=2)
+    print(f"Results saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Virtual Clock Control for TestSprite Tests
+
+The inspection and job-completion forms auto-save on a 30 s interval,
+notifications and inspection leads poll every 30 s, and overdue/reminder
+logic compares against today's date. Instead of sleeping through those,
+contexts from get_authenticated_context() and get_role_context() get
+Playwright's clock installed (time still flows normally until a helper
+moves it), and tests move time explicitly:
+
+    await trigger_auto_save(page)          # fires the 30 s auto-save now
+    await run_timers(page, "05:00")        # every timer due in the next 5 min
+    await skip_ahead(page, 60_000)         # jump 1 min, due timers fire once
+    await travel_days(page, 1)             # tomorrow: overdue/reminder logic
+
+run_timers/skip_ahead/travel_* accept a page or a context. Durations are
+milliseconds or "mm:ss"/"hh:mm:ss" strings, as Playwright's clock takes.
+"""
+import datetime as dt
+import weakref
+
+# TechnicianInspectionForm and useJobCompletionForm auto-save interval
+AUTO_SAVE_MS = 30000
+# useNotifications / useInspectionLeads refetchInterval
+POLL_MS = 30000
+# Real time left for requests started by fired timers to go out
+SETTLE_MS = 250
+
+_installed = weakref.WeakSet()
+
+
+def _context(target):
+    return target.context if hasattr(target, "goto") else target
+
+
+def has_clock(target) -> bool:
+    """True when the clock was installed on this page's or context's context."""
+    return _context(target) in _installed
+
+
+async def install_clock(context, time=None) -> bool:
+    """
+    Installs the fake clock on `context` before any page loads.
+
+    Args:
+        context: BrowserContext with no pages yet
+        time: Optional starting datetime/epoch ms; defaults to now
+
+    Returns:
+        bool: False when this Playwright has no clock API (before 1.45)
+    """
+    if not hasattr(context, "clock"):
+        return False
+    await context.clock.install(time=time)
+    _installed.add(context)
+    return True
+
+
+async def run_timers(target, duration):
+    """Advances virtual time, firing every timer due in between (intervals repeat)."""
+    await _context(target).clock.run_for(duration)
+
+
+async def skip_ahead(target, duration):
+    """Jumps virtual time forward; each timer that came due fires once, like a laptop waking."""
+    await _context(target).clock.fast_forward(duration)
+
+
+async def trigger_auto_save(page, edits_settle_ms: int = SETTLE_MS):
+    """
+    Fires the forms' 30 s auto-save interval immediately.
+
+    The form only saves when it has unsaved changes, so edit a field first.
+    Returns once the save request has had `edits_settle_ms` of real time.
+    """
+    await run_timers(page, AUTO_SAVE_MS + 100)
+    await page.wait_for_timeout(edits_settle_ms)
+
+
+async def travel_to(target, when: dt.datetime):
+    """Sets Date.now() to `when` without firing timers (date logic only)."""
+    await _context(target).clock.set_system_time(when)
+
+
+async def travel_days(page, days: float, reload: bool = True):
+    """
+    Moves the page's clock `days` forward, e.g. 1 to make an invoice due today overdue.
+
+    Components read today's date on render, so the page is reloaded by default.
+    """
+    now_ms = await page.evaluate("Date.now()")
+    await travel_to(page, dt.datetime.fromtimestamp(now_ms / 1000, dt.timezone.utc) + dt.timedelta(days=days))
+    if reload:
+        await page.reload(wait_until="domcontentloaded")
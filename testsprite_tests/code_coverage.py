@@ -0,0 +1,257 @@
+"""
+JS/CSS Code Coverage for TestSprite Tests
+
+Turns on V8 precise coverage and CSS rule-usage tracking through CDP for a
+page, then maps executed ranges back to the Vite chunks that were served.
+The result is the number of shipped-but-never-run JS/CSS bytes per chunk,
+per route or per TC - evidence for code-splitting work on the routes
+technicians open over mobile data.
+
+Chunk sizes are only meaningful against a production build, so point the
+harness at `vite preview` (or a deployed preview) rather than the dev server:
+
+    npm run build && npx vite preview --port 4173
+    TESTSPRITE_BASE_URL=http://localhost:4173 python testsprite_tests/code_coverage.py
+
+Sizes are counted in source characters, which equals bytes for the
+minified ASCII output Vite emits. Coverage is Chromium-only (CDP).
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import urlparse
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.auth_helper import BASE_URL, STORAGE_STATE_PATH, get_authenticated_context
+
+RESULTS_DIR = "testsprite_tests/tmp/coverage"
+
+# Routes technicians and the office hit most, in the current App.tsx map
+DEFAULT_ROUTES = [
+    "/admin",
+    "/admin/leads",
+    "/admin/schedule",
+    "/admin/reports",
+    "/technician",
+    "/technician/jobs",
+    "/technician/inspection",
+]
+
+# Vite emits assets/<name>-<hash>.<ext>; the dev server serves /src/... modules
+_HASHED_ASSET_RE = re.compile(r"^(?P<name>.+?)-[A-Za-z0-9_-]{8}\.(?:js|css)$")
+
+
+def chunk_name(url: str) -> str:
+    """
+    Returns a stable chunk name for a served script or stylesheet URL.
+
+    Production chunks drop their content hash (assets/AdminSchedule-Bx1c9f2e.js
+    -> AdminSchedule.js); dev-server modules keep their /src path.
+    """
+    path = urlparse(url).path
+    basename = os.path.basename(path)
+    match = _HASHED_ASSET_RE.match(basename)
+    if match:
+        return f"{match.group('name')}{os.path.splitext(basename)[1]}"
+    return path or url
+
+
+def _used_js_chars(functions: list, length: int) -> int:
+    """
+    Counts executed characters from V8 block coverage.
+
+    Ranges nest: a function range is refined by inner block ranges with their
+    own counts. Painting ranges outer-to-inner lets the innermost count win.
+    """
+    ranges = [r for fn in functions for r in fn["ranges"]]
+    ranges.sort(key=lambda r: (r["startOffset"], -r["endOffset"]))
+    painted = bytearray(length)
+    for r in ranges:
+        start, end = max(0, r["startOffset"]), min(length, r["endOffset"])
+        if end > start:
+            painted[start:end] = (b"\x01" if r["count"] > 0 else b"\x00") * (end - start)
+    return painted.count(1)
+
+
+def _used_css_chars(rules: list) -> int:
+    spans = sorted((r["startOffset"], r["endOffset"]) for r in rules if r["used"])
+    used, cursor = 0, 0
+    for start, end in spans:
+        start = max(start, cursor)
+        if end > start:
+            used += end - start
+            cursor = end
+    return used
+
+
+class CoverageRecorder:
+    """
+    Records JS and CSS coverage for one page between start() and stop().
+
+    Example:
+        recorder = CoverageRecorder(page)
+        await recorder.start()
+        await page.goto(f"{BASE_URL}/technician/inspection", wait_until="networkidle")
+        chunks = await recorder.stop()
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.client = None
+        self._scripts = {}
+        self._stylesheets = {}
+
+    async def start(self):
+        self.client = await self.page.context.new_cdp_session(self.page)
+        self.client.on("Debugger.scriptParsed", self._on_script_parsed)
+        self.client.on("CSS.styleSheetAdded", self._on_stylesheet_added)
+        await self.client.send("Debugger.enable")
+        await self.client.send("Profiler.enable")
+        await self.client.send("Profiler.startPreciseCoverage", {"callCount": False, "detailed": True})
+        await self.client.send("DOM.enable")
+        await self.client.send("CSS.enable")
+        await self.client.send("CSS.startRuleUsageTracking")
+
+    def _on_script_parsed(self, event):
+        if event.get("url", "").startswith("http"):
+            self._scripts[event["scriptId"]] = event["url"]
+
+    def _on_stylesheet_added(self, event):
+        header = event["header"]
+        if header.get("sourceURL", "").startswith("http"):
+            self._stylesheets[header["styleSheetId"]] = header["sourceURL"]
+
+    async def stop(self) -> list:
+        """
+        Stops tracking and aggregates coverage per chunk.
+
+        Returns:
+            list[dict]: One row per chunk with type, total, used and unused chars
+        """
+        js = await self.client.send("Profiler.takePreciseCoverage")
+        css = await self.client.send("CSS.stopRuleUsageTracking")
+        await self.client.send("Profiler.stopPreciseCoverage")
+
+        chunks = {}
+
+        def add(kind, url, total, used):
+            row = chunks.setdefault(chunk_name(url), {
+                "chunk": chunk_name(url), "type": kind, "url": url, "total": 0, "used": 0,
+            })
+            row["total"] += total
+            row["used"] += used
+
+        for script in js["result"]:
+            if script["scriptId"] not in self._scripts:
+                continue
+            source = await self.client.send("Debugger.getScriptSource", {"scriptId": script["scriptId"]})
+            length = len(source["scriptSource"])
+            add("js", script["url"], length, _used_js_chars(script["functions"], length))
+
+        rules_by_sheet = {}
+        for rule in css["ruleUsage"]:
+            rules_by_sheet.setdefault(rule["styleSheetId"], []).append(rule)
+        for sheet_id, url in self._stylesheets.items():
+            text = await self.client.send("CSS.getStyleSheetText", {"styleSheetId": sheet_id})
+            add("css", url, len(text["text"]), _used_css_chars(rules_by_sheet.get(sheet_id, [])))
+
+        await self.client.detach()
+        rows = list(chunks.values())
+        for row in rows:
+            row["unused"] = row["total"] - row["used"]
+        rows.sort(key=lambda r: r["unused"], reverse=True)
+        return rows
+
+
+def summarise(rows: list) -> dict:
+    """Totals JS and CSS bytes for one route or TC."""
+    summary = {}
+    for kind in ("js", "css"):
+        total = sum(r["total"] for r in rows if r["type"] == kind)
+        unused = sum(r["unused"] for r in rows if r["type"] == kind)
+        summary[kind] = {
+            "total": total,
+            "unused": unused,
+            "unused_pct": round(100 * unused / total, 1) if total else 0.0,
+        }
+    return summary
+
+
+async def measure_route(browser, route: str) -> dict:
+    """
+    Loads one route in a fresh authenticated context and records its coverage.
+
+    A fresh context per route keeps each measurement a cold load, which is what
+    a technician opening the app on site actually downloads.
+    """
+    context = await browser.new_context(storage_state=STORAGE_STATE_PATH)
+    page = await context.new_page()
+    recorder = CoverageRecorder(page)
+    try:
+        await recorder.start()
+        await page.goto(f"{BASE_URL}{route}", wait_until="networkidle", timeout=60000)
+        chunks = await recorder.stop()
+    finally:
+        await context.close()
+    return {"route": route, "summary": summarise(chunks), "chunks": chunks}
+
+
+def print_report(results: list, top: int = 5):
+    """Prints per-route unused JS/CSS and the heaviest dead chunks."""
+    print(f"\n{'Route':<28} {'JS total':>10} {'JS unused':>10} {'CSS total':>10} {'CSS unused':>10}")
+    for result in results:
+        js, css = result["summary"]["js"], result["summary"]["css"]
+        print(f"{result['route']:<28} {js['total'] / 1024:>8.0f}KB {js['unused_pct']:>9.1f}%"
+              f" {css['total'] / 1024:>8.0f}KB {css['unused_pct']:>9.1f}%")
+    for result in results:
+        print(f"\n{result['route']} - largest unused chunks:")
+        for row in result["chunks"][:top]:
+            print(f"  {row['unused'] / 1024:>8.1f}KB unused of {row['total'] / 1024:>8.1f}KB  {row['chunk']}")
+
+
+async def run_coverage(routes: list) -> list:
+    """Measures coverage for each route sequentially against one browser."""
+    from playwright.async_api import async_playwright
+
+    pw = await async_playwright().start()
+    browser, context = await get_authenticated_context(pw)
+    await context.close()
+    try:
+        results = []
+        for route in routes:
+            print(f"Measuring coverage for {route}...")
+            results.append(await measure_route(browser, route))
+        return results
+    finally:
+        await browser.close()
+        await pw.stop()
+
+
+def save_results(results: list, name: str = "routes") -> str:
+    """Writes coverage results to a timestamped JSON file and returns its path."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Coverage saved to {path}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report unused JS/CSS bytes per route")
+    parser.add_argument("routes", nargs="*", default=DEFAULT_ROUTES, help="Routes to measure")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_coverage(args.routes))
+    print_report(results)
+    save_results(results)
+
+
+if __name__ == "__main__":
+    main()
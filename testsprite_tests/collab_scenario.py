@@ -0,0 +1,378 @@
+"""
+Multi-Role Collaborative Editing Scenario
+
+Runs an admin and several technicians against the same lead at the same time
+and measures what each of them experiences:
+
+- notes phase: the admin appends internal notes on LeadDetail (/leads/:id)
+  while every technician appends notes on their job view
+  (/technician/job/:id). App.tsx renders the same LeadDetail page there;
+  TechnicianJobDetail is not routed. LeadDetail builds the new
+  internal_notes value from its cached copy of the lead and writes the whole
+  column back, so concurrent appends can overwrite each other - the failure
+  mode behind docs/internal-notes-loss-diagnosis.md.
+- inspection phase: the admin (/admin/inspection/:leadId) and technicians
+  (TechnicianInspectionForm) each edit a different field and press Save. The
+  form writes the full inspections row, so a stale form can revert a field
+  another editor just saved.
+- throughout, a second admin session reloads AdminSchedule to show how the
+  schedule responds under the write load.
+
+Reported per role: save latency (click to the PostgREST write response),
+last-write-wins losses checked against the database afterwards, and the delay
+before each other session shows a saved note without a manual reload.
+
+Requires the local stack, the dev server and a lead assigned to the
+technician account(s). Values written are tagged and the original column
+values are restored afterwards unless --keep is passed. Without --tech a
+single technician session signs in as TECH_EMAIL; sessions sharing one
+account would not be separate editors, so pass one --tech per technician to
+run more:
+
+    python testsprite_tests/collab_scenario.py --lead-id <uuid>
+    python testsprite_tests/collab_scenario.py --lead-id <uuid> --tech a@mrc.com.au:pw --tech b@mrc.com.au:pw
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright import async_api
+from testsprite_tests.auth_helper import BASE_URL, get_role_context
+from testsprite_tests.local_stack import (
+    ADMIN_EMAIL, ADMIN_PASSWORD, SERVICE_ROLE_KEY, SUPABASE_URL, TECH_EMAIL, TECH_PASSWORD, http_json,
+)
+from testsprite_tests.measure import percentile
+from testsprite_tests.selector_registry import screen_named
+
+RESULTS_DIR = "testsprite_tests/tmp/collab"
+NOTE_INPUT = 'textarea[placeholder^="New entry"]'
+
+# Inspection form fields editors take turns on: (column, placeholder)
+INSPECTION_FIELDS = [
+    ("attention_to", "Company or person name"),
+    ("triage_description", "Describe the issue..."),
+]
+
+
+def _service_headers() -> dict:
+    return {"apikey": SERVICE_ROLE_KEY, "Authorization": f"Bearer {SERVICE_ROLE_KEY}"}
+
+
+def read_row(table: str, column: str, value: str, select: str) -> dict:
+    """Reads the newest matching row with the service role, bypassing RLS."""
+    status, body, _ = http_json(
+        "GET", f"{SUPABASE_URL}/rest/v1/{table}?{column}=eq.{value}&select={select}&order=created_at.desc&limit=1",
+        headers=_service_headers(),
+    )
+    if status != 200:
+        raise Exception(f"Reading {table} failed: {status} {body}")
+    return body[0] if body else {}
+
+
+def write_row(table: str, column: str, value: str, fields: dict):
+    """Restores columns with the service role."""
+    status, body, _ = http_json(
+        "PATCH", f"{SUPABASE_URL}/rest/v1/{table}?{column}=eq.{value}", fields, _service_headers(),
+    )
+    if status not in (200, 204):
+        raise Exception(f"Restoring {table} failed: {status} {body}")
+
+
+class Session:
+    """One signed-in user on one page, plus everything it recorded."""
+
+    def __init__(self, name: str, role: str, page):
+        self.name = name
+        self.role = role
+        self.page = page
+        self.saves = []   # {"tag", "latency_ms", "status", "saved_at"}
+        self.seen = {}    # tag -> monotonic time this page first showed it
+        self.errors = []
+
+    async def save(self, trigger, predicate, tag: str, timeout_ms: int = 15000):
+        """Runs `trigger` and times it until the PostgREST write matching `predicate` responds."""
+        start = time.perf_counter()
+        try:
+            async with self.page.expect_response(predicate, timeout=timeout_ms) as response_info:
+                await trigger()
+            response = await response_info.value
+            status = response.status
+        except async_api.Error as e:
+            status = None
+            self.errors.append(f"{tag}: {str(e).splitlines()[0]}")
+        saved_at = time.perf_counter()
+        self.saves.append({"tag": tag, "latency_ms": (saved_at - start) * 1000, "status": status, "saved_at": saved_at})
+
+
+def _is_write(table: str):
+    return lambda r: f"/rest/v1/{table}" in r.url and r.request.method in ("PATCH", "POST")
+
+
+async def watch_for_tags(session: Session, tags: dict, stop: asyncio.Event, interval: float = 0.25):
+    """Records when tags written by other sessions first appear on this page, without reloading it."""
+    while not stop.is_set():
+        try:
+            text = await session.page.evaluate("document.body.innerText")
+        except async_api.Error:
+            text = ""
+        now = time.perf_counter()
+        for tag in list(tags):
+            if tag not in session.seen and tag in text:
+                session.seen[tag] = now
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def append_notes(session: Session, run_id: str, rounds: int, think_ms: tuple, tags: dict):
+    """Appends `rounds` tagged notes with random think time between them."""
+    for n in range(rounds):
+        await asyncio.sleep(random.uniform(*think_ms) / 1000)
+        tag = f"collab-{run_id}-{session.name}-{n}"
+        tags[tag] = session.name
+        await session.page.fill(NOTE_INPUT, f"{tag} note from {session.name}")
+        button = session.page.get_by_role("button", name="Add Note", exact=True)
+        await session.save(button.click, _is_write("leads"), tag)
+        session.seen[tag] = session.saves[-1]["saved_at"]
+
+
+async def edit_inspection(session: Session, run_id: str, rounds: int, think_ms: tuple, field: tuple, log: list):
+    """Edits one inspection field per round and saves the whole form."""
+    column, placeholder = field
+    for n in range(rounds):
+        await asyncio.sleep(random.uniform(*think_ms) / 1000)
+        tag = f"collab-{run_id}-{session.name}-{n}"
+        await session.page.get_by_placeholder(placeholder, exact=True).fill(tag)
+        button = session.page.get_by_role("button", name="Save", exact=True)
+        await session.save(button.click, _is_write("inspections"), tag)
+        if session.saves[-1]["status"] in (200, 201, 204):
+            log.append({"column": column, "tag": tag, "session": session.name, "saved_at": session.saves[-1]["saved_at"]})
+
+
+async def reload_schedule(page, stop: asyncio.Event, interval: float, timings: list):
+    """Reloads AdminSchedule on a fixed interval and records time to its root element."""
+    root = screen_named("AdminSchedule").root
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await page.goto(f"{BASE_URL}/admin/schedule", wait_until="commit")
+            await page.wait_for_selector(root, timeout=30000)
+            timings.append((time.perf_counter() - start) * 1000)
+        except async_api.Error:
+            timings.append(None)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def open_session(browser, name: str, role: str, email: str, password: str, route: str, screen: str) -> Session:
+    # The login toggle is labelled "Admin" / "Technician" and matched exactly
+    context = await get_role_context(browser, email, password, role.capitalize())
+    page = await context.new_page()
+    await page.goto(f"{BASE_URL}{route}", wait_until="domcontentloaded")
+    await page.wait_for_selector(screen_named(screen).root, timeout=30000)
+    return Session(name, role, page)
+
+
+def summarise_saves(sessions: list) -> dict:
+    by_role = {}
+    for session in sessions:
+        by_role.setdefault(session.role, []).extend(session.saves)
+    summary = {}
+    for role, saves in by_role.items():
+        latencies = [s["latency_ms"] for s in saves if s["status"] is not None]
+        summary[role] = {
+            "saves": len(saves),
+            "failed": sum(1 for s in saves if s["status"] not in (200, 201, 204)),
+            "p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+            "p95_ms": round(percentile(latencies, 95), 1) if latencies else None,
+        }
+    return summary
+
+
+async def notes_phase(browser, args, run_id: str, accounts: list) -> dict:
+    lead = args.lead_id
+    sessions = [await open_session(browser, "admin", "admin", ADMIN_EMAIL, ADMIN_PASSWORD,
+                                   f"/leads/{lead}", "LeadDetail")]
+    for i, (email, password) in enumerate(accounts):
+        sessions.append(await open_session(browser, f"tech{i + 1}", "technician", email, password,
+                                           f"/technician/job/{lead}", "TechnicianLeadDetail"))
+
+    tags, stop = {}, asyncio.Event()
+    watchers = [asyncio.create_task(watch_for_tags(s, tags, stop)) for s in sessions]
+    await asyncio.gather(*(append_notes(s, run_id, args.rounds, args.think_ms, tags) for s in sessions))
+    await asyncio.sleep(args.visibility_window)
+    stop.set()
+    await asyncio.gather(*watchers)
+
+    final = read_row("leads", "id", lead, "internal_notes").get("internal_notes") or ""
+    saved = [(s.name, save) for s in sessions for save in s.saves if save["status"] in (200, 204)]
+    lost = [save["tag"] for _, save in saved if save["tag"] not in final]
+
+    # Visibility of each saved note in every other session, without a reload
+    roles = {s.name: s.role for s in sessions}
+    delays, never_seen = {}, 0
+    for writer, save in saved:
+        for observer in sessions:
+            if observer.name == writer:
+                continue
+            key = f"{roles[writer]}->{observer.role}"
+            if save["tag"] in observer.seen:
+                delays.setdefault(key, []).append((observer.seen[save["tag"]] - save["saved_at"]) * 1000)
+            else:
+                never_seen += 1
+                delays.setdefault(key, [])
+
+    for session in sessions:
+        await session.page.context.close()
+    return {
+        "sessions": len(sessions),
+        "saves": summarise_saves(sessions),
+        "notes_saved": len(saved),
+        "notes_lost": len(lost),
+        "lost_tags": lost,
+        "visibility_ms": {
+            key: {"seen": len(values), "p50": round(statistics.median(values), 1) if values else None,
+                  "max": round(max(values), 1) if values else None}
+            for key, values in delays.items()
+        },
+        "not_visible_without_reload": never_seen,
+        "errors": [e for s in sessions for e in s.errors],
+    }
+
+
+async def inspection_phase(browser, args, run_id: str, accounts: list) -> dict:
+    lead = args.lead_id
+    sessions = [await open_session(browser, "admin", "admin", ADMIN_EMAIL, ADMIN_PASSWORD,
+                                   f"/admin/inspection/{lead}", "AdminInspectionForm")]
+    for i, (email, password) in enumerate(accounts):
+        sessions.append(await open_session(browser, f"tech{i + 1}", "technician", email, password,
+                                           f"/technician/inspection?leadId={lead}", "TechnicianInspectionForm"))
+
+    log = []
+    await asyncio.gather(*(
+        edit_inspection(s, run_id, args.rounds, args.think_ms, INSPECTION_FIELDS[i % len(INSPECTION_FIELDS)], log)
+        for i, s in enumerate(sessions)
+    ))
+
+    # Each field should hold the value from its last successful save
+    final = read_row("inspections", "lead_id", lead, ",".join(c for c, _ in INSPECTION_FIELDS))
+    reverted = []
+    for column, _ in INSPECTION_FIELDS:
+        writes = sorted((w for w in log if w["column"] == column), key=lambda w: w["saved_at"])
+        if writes and final.get(column) != writes[-1]["tag"]:
+            reverted.append({"column": column, "expected": writes[-1]["tag"], "actual": final.get(column)})
+
+    for session in sessions:
+        await session.page.context.close()
+    return {
+        "sessions": len(sessions),
+        "saves": summarise_saves(sessions),
+        "fields_reverted": reverted,
+        "errors": [e for s in sessions for e in s.errors],
+    }
+
+
+def print_report(report: dict):
+    for phase in ("notes", "inspection"):
+        result = report.get(phase)
+        if not result:
+            continue
+        print(f"\n{phase.upper()} ({result['sessions']} sessions)")
+        for role, s in result["saves"].items():
+            print(f"  {role:<11} saves {s['saves']:>3}  failed {s['failed']:>3}  p50 {s['p50_ms']} ms  p95 {s['p95_ms']} ms")
+        if phase == "notes":
+            print(f"  notes lost (last write wins): {result['notes_lost']} of {result['notes_saved']}")
+            for key, v in sorted(result["visibility_ms"].items()):
+                print(f"  visible {key:<24} {v['seen']:>3} seen  p50 {v['p50']} ms  max {v['max']} ms")
+            print(f"  note/observer pairs never shown without reload: {result['not_visible_without_reload']}")
+        else:
+            for r in result["fields_reverted"]:
+                print(f"  REVERTED {r['column']}: expected {r['expected']!r}, found {r['actual']!r}")
+            if not result["fields_reverted"]:
+                print("  no fields reverted")
+        for error in result["errors"][:5]:
+            print(f"  error: {error}")
+    timings = [t for t in report.get("schedule_reload_ms", []) if t is not None]
+    if timings:
+        print(f"\nAdminSchedule reloads under load: {len(timings)}, p50 {statistics.median(timings):.0f} ms,"
+              f" p95 {percentile(timings, 95):.0f} ms")
+
+
+async def run_scenario(args) -> dict:
+    accounts = [tuple(t.split(":", 1)) for t in args.tech] or [(TECH_EMAIL, TECH_PASSWORD)] * args.technicians
+    if not all(email for email, _ in accounts):
+        raise Exception("Set TECH_EMAIL/TECH_PASSWORD or pass --tech email:password")
+    run_id = uuid.uuid4().hex[:6]
+
+    original_notes = read_row("leads", "id", args.lead_id, "internal_notes")
+    original_inspection = read_row("inspections", "lead_id", args.lead_id,
+                                   ",".join(c for c, _ in INSPECTION_FIELDS))
+
+    report = {"lead_id": args.lead_id, "run_id": run_id, "technicians": len(accounts)}
+    pw = await async_api.async_playwright().start()
+    browser = await pw.chromium.launch(headless=True, args=["--disable-dev-shm-usage"])
+    try:
+        schedule_context = await get_role_context(browser, ADMIN_EMAIL, ADMIN_PASSWORD, "Admin")
+        schedule_page = await schedule_context.new_page()
+        stop, timings = asyncio.Event(), []
+        schedule = asyncio.create_task(reload_schedule(schedule_page, stop, args.schedule_interval, timings))
+
+        if "notes" in args.phases:
+            print("Running notes phase...")
+            report["notes"] = await notes_phase(browser, args, run_id, accounts)
+        if "inspection" in args.phases:
+            print("Running inspection phase...")
+            report["inspection"] = await inspection_phase(browser, args, run_id, accounts)
+
+        stop.set()
+        await schedule
+        report["schedule_reload_ms"] = timings
+        await schedule_context.close()
+    finally:
+        await browser.close()
+        await pw.stop()
+        if not args.keep:
+            write_row("leads", "id", args.lead_id, original_notes)
+            if original_inspection:
+                write_row("inspections", "lead_id", args.lead_id, original_inspection)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run admin and technicians against the same lead concurrently")
+    parser.add_argument("--lead-id", required=True, help="Lead assigned to the technician account(s)")
+    parser.add_argument("--technicians", type=int, default=1, help="Technician sessions using TECH_EMAIL (one unless --tech)")
+    parser.add_argument("--tech", action="append", default=[], help="email:password per technician session")
+    parser.add_argument("--rounds", type=int, default=5, help="Saves per session per phase")
+    parser.add_argument("--think-ms", type=int, nargs=2, default=[200, 2000], help="Random think time range")
+    parser.add_argument("--visibility-window", type=float, default=10, help="Seconds to wait for notes to appear")
+    parser.add_argument("--schedule-interval", type=float, default=5, help="Seconds between AdminSchedule reloads")
+    parser.add_argument("--phases", nargs="*", default=["notes", "inspection"], choices=["notes", "inspection"])
+    parser.add_argument("--keep", action="store_true", help="Keep the tagged values instead of restoring")
+    args = parser.parse_args()
+    if args.technicians > 1 and not args.tech:
+        parser.error("More than one technician session needs one --tech email:password per technician")
+
+    report = asyncio.run(run_scenario(args))
+    print_report(report)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"collab-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
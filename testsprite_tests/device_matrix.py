@@ -0,0 +1,253 @@
+"""
+Technician Device Matrix
+
+TC013 emulates an iPhone viewport on desktop-class CPU. This runs the
+technician routes under CDP CPU throttling and network emulation so the
+numbers reflect the mid-range Android phones technicians actually carry.
+
+For each device and route it records, in page time from navigation start:
+
+- screen ready: the route's data-testid root is visible
+- time-to-interactive: the end of the last long task before a 5 s quiet
+  window with no long tasks (the Lighthouse definition, without the network
+  quiet condition)
+- input latency: one route-specific interaction (tab taps, typing into a
+  form field), each measured from the event's timestamp to the next frame
+
+    python testsprite_tests/device_matrix.py --lead-id <uuid>
+    python testsprite_tests/device_matrix.py --cpu 2 4 6 --networks slow-4g 3g --runs 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.auth_helper import BASE_URL, get_role_context
+from testsprite_tests.local_stack import TECH_EMAIL, TECH_PASSWORD
+from testsprite_tests.selector_registry import screen_named
+
+RESULTS_DIR = "testsprite_tests/tmp/device_matrix"
+QUIET_WINDOW_MS = 5000
+
+# (latency ms, download kbps, upload kbps) - DevTools/Lighthouse presets
+NETWORKS = {
+    "wifi": None,
+    "4g": (60, 9000, 3000),
+    "slow-4g": (150, 1600, 750),
+    "3g": (300, 700, 300),
+}
+
+
+@dataclass
+class Device:
+    name: str
+    cpu_rate: float
+    network: str
+    mobile: bool = True
+
+
+DEVICES = {
+    "desktop": Device("desktop", 1, "wifi", mobile=False),
+    "flagship-phone": Device("flagship-phone", 2, "4g"),
+    "mid-android": Device("mid-android", 4, "slow-4g"),
+    "low-android": Device("low-android", 6, "3g"),
+}
+
+# route template, screen, interaction: ("tap", [button names]) or ("type", selector)
+ROUTES = [
+    ("/technician", "TechnicianDashboard", ("tap", ["My Jobs"])),
+    ("/technician/jobs", "TechnicianJobs", ("tap", ["This Week", "All", "Today"])),
+    ("/technician/inspection?leadId={lead_id}", "TechnicianInspectionForm",
+     ("type", 'textarea[placeholder="Describe the issue..."]')),
+    ("/technician/job-completion/{lead_id}", "JobCompletionForm", ("type", "#attention-to")),
+]
+
+# Long tasks, and input-to-next-frame latency for pointer and key events
+_INIT_SCRIPT = """
+window.__deviceMatrix = { longTasks: [], inputs: [] };
+try {
+  new PerformanceObserver((list) => {
+    for (const e of list.getEntries()) window.__deviceMatrix.longTasks.push(e.startTime + e.duration);
+  }).observe({ type: 'longtask', buffered: true });
+} catch (e) {}
+for (const type of ['pointerdown', 'keydown']) {
+  addEventListener(type, (event) => {
+    const started = event.timeStamp;
+    requestAnimationFrame(() => setTimeout(() => {
+      window.__deviceMatrix.inputs.push({ type, ms: performance.now() - started });
+    }, 0));
+  }, { capture: true });
+}
+"""
+
+
+async def apply_device(page, device: Device):
+    """Applies CPU throttling and network conditions through CDP."""
+    cdp = await page.context.new_cdp_session(page)
+    await cdp.send("Emulation.setCPUThrottlingRate", {"rate": device.cpu_rate})
+    conditions = NETWORKS[device.network]
+    if conditions:
+        latency, down_kbps, up_kbps = conditions
+        await cdp.send("Network.enable")
+        await cdp.send("Network.emulateNetworkConditions", {
+            "offline": False,
+            "latency": latency,
+            "downloadThroughput": down_kbps * 1000 / 8,
+            "uploadThroughput": up_kbps * 1000 / 8,
+        })
+    return cdp
+
+
+async def wait_for_tti(page, ready_ms: float, timeout_ms: float) -> Optional[float]:
+    """Waits for a quiet window with no long tasks. Returns TTI or None on timeout."""
+    while True:
+        now, long_tasks = await page.evaluate("[performance.now(), window.__deviceMatrix.longTasks]")
+        last = max(long_tasks, default=0)
+        if now - max(last, ready_ms) >= QUIET_WINDOW_MS:
+            return max(last, ready_ms)
+        if now > timeout_ms:
+            return None
+        await page.wait_for_timeout(250)
+
+
+async def interact(page, interaction: tuple):
+    kind, target = interaction
+    if kind == "tap":
+        for name in target:
+            await page.get_by_role("button", name=name, exact=True).first.click()
+            await page.wait_for_timeout(300)
+    else:
+        field = page.locator(target).first
+        await field.click()
+        await field.press_sequentially("Moisture behind vanity", delay=80)
+    # Let the last input's frame land
+    await page.wait_for_timeout(500)
+
+
+async def measure_route(browser, device: Device, route: str, screen: str, interaction: tuple,
+                        storage_state: str, descriptor: dict, timeout_ms: float) -> dict:
+    options = dict(descriptor) if device.mobile else {"viewport": {"width": 1280, "height": 800}}
+    context = await browser.new_context(storage_state=storage_state, **options)
+    context.set_default_timeout(timeout_ms)
+    await context.add_init_script(_INIT_SCRIPT)
+    page = await context.new_page()
+    await apply_device(page, device)
+    result = {"device": device.name, "route": route, "screen": screen}
+    try:
+        await page.goto(f"{BASE_URL}{route}", wait_until="commit")
+        await page.wait_for_selector(screen_named(screen).root, state="visible")
+        ready = await page.evaluate("performance.now()")
+        result["ready_ms"] = round(ready, 1)
+        tti = await wait_for_tti(page, ready, timeout_ms)
+        result["tti_ms"] = round(tti, 1) if tti is not None else None
+        await interact(page, interaction)
+        inputs = [i["ms"] for i in await page.evaluate("window.__deviceMatrix.inputs")]
+        result["inputs"] = len(inputs)
+        result["input_p50_ms"] = round(statistics.median(inputs), 1) if inputs else None
+        result["input_max_ms"] = round(max(inputs), 1) if inputs else None
+    except Exception as e:
+        result["error"] = str(e).splitlines()[0]
+    finally:
+        await context.close()
+    return result
+
+
+def combine_runs(runs: list) -> dict:
+    """Median of each metric over repeated runs of one device/route."""
+    combined = {k: runs[0][k] for k in ("device", "route", "screen")}
+    for key in ("ready_ms", "tti_ms", "input_p50_ms", "input_max_ms"):
+        values = [r[key] for r in runs if r.get(key) is not None]
+        combined[key] = round(statistics.median(values), 1) if values else None
+    combined["errors"] = sorted({r["error"] for r in runs if r.get("error")})
+    return combined
+
+
+def print_report(results: list, devices: list):
+    screens = list(dict.fromkeys(r["screen"] for r in results))
+    for metric, label in (("tti_ms", "Time to interactive (ms)"), ("input_p50_ms", "Input latency p50 (ms)"),
+                          ("input_max_ms", "Input latency max (ms)")):
+        print(f"\n{label}")
+        print(f"{'screen':<26}" + "".join(f"{d.name:>18}" for d in devices))
+        for screen in screens:
+            row = f"{screen:<26}"
+            for device in devices:
+                match = next((r for r in results if r["screen"] == screen and r["device"] == device.name), None)
+                value = match.get(metric) if match else None
+                row += f"{value:>18.0f}" if value is not None else f"{'-':>18}"
+            print(row)
+    for r in results:
+        for error in r["errors"]:
+            print(f"  {r['device']} {r['screen']}: {error}")
+
+
+async def run_matrix(devices: list, args) -> list:
+    from playwright.async_api import async_playwright
+
+    if not TECH_EMAIL:
+        raise Exception("Set TECH_EMAIL/TECH_PASSWORD for the technician account")
+    routes = []
+    for template, screen, interaction in ROUTES:
+        if "{lead_id}" in template and not args.lead_id:
+            print(f"Skipping {screen}: needs --lead-id")
+            continue
+        if args.screens and screen not in args.screens:
+            continue
+        routes.append((template.format(lead_id=args.lead_id), screen, interaction))
+
+    pw = await async_playwright().start()
+    browser = await pw.chromium.launch(headless=True, args=["--disable-dev-shm-usage"])
+    try:
+        context = await get_role_context(browser, TECH_EMAIL, TECH_PASSWORD, "Technician")
+        storage_state = await context.storage_state()
+        await context.close()
+        descriptor = pw.devices[args.descriptor]
+        results = []
+        for device in devices:
+            for route, screen, interaction in routes:
+                print(f"  {device.name}: {screen}")
+                runs = [await measure_route(browser, device, route, screen, interaction, storage_state,
+                                            descriptor, args.timeout_ms) for _ in range(args.runs)]
+                results.append(combine_runs(runs))
+        return results
+    finally:
+        await browser.close()
+        await pw.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure technician routes under CPU and network throttling")
+    parser.add_argument("--devices", nargs="*", choices=list(DEVICES), default=list(DEVICES))
+    parser.add_argument("--cpu", nargs="*", type=float, help="CPU slowdown factors; with --networks builds a cross product")
+    parser.add_argument("--networks", nargs="*", choices=list(NETWORKS), help="Network profiles for the cross product")
+    parser.add_argument("--lead-id", help="Lead for the inspection and job-completion forms")
+    parser.add_argument("--screens", nargs="*", help="Limit to these screens (e.g. TechnicianJobs)")
+    parser.add_argument("--descriptor", default="Pixel 5", help="Playwright device descriptor for mobile runs")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per device/route (median reported)")
+    parser.add_argument("--timeout-ms", type=float, default=60000, help="Per-route timeout")
+    args = parser.parse_args()
+
+    if args.cpu or args.networks:
+        devices = [Device(f"{cpu:g}x/{network}", cpu, network)
+                   for cpu in (args.cpu or [1]) for network in (args.networks or ["wifi"])]
+    else:
+        devices = [DEVICES[name] for name in args.devices]
+
+    results = asyncio.run(run_matrix(devices, args))
+    print_report(results, devices)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"matrix-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Batched DOM Probes for TestSprite Tests
+
+Evaluates a dictionary of named page checks in a single page.evaluate call
+instead of one CDP round trip per locator.count() / bounding_box(). Probes
+run in the page with document.querySelectorAll, so selectors must be plain
+CSS (no Playwright engines such as role=, text= or :has-text()).
+
+Example:
+    results = await probe(page, {
+        "buttons": count("button"),
+        "main": visible("main"),
+        "small_targets": size("button, input, select", min_px=44),
+        "heading": text("h1", r"Leads"),
+        "overflow": overflow(),
+        "layout": layout(min_px=44),
+    })
+    results.require("buttons", lambda r: r["count"] > 0)
+    results.require("small_targets", lambda r: r["violations"] == 0)
+"""
+from typing import Callable, Optional
+
+# Records layout-shift entries with their source nodes from navigation
+# onwards; install with context.add_init_script before the page loads.
+LAYOUT_SHIFT_SCRIPT = """
+window.__layoutShifts = [];
+try {
+  new PerformanceObserver((list) => {
+    for (const e of list.getEntries()) {
+      if (e.hadRecentInput) continue;
+      window.__layoutShifts.push({ value: e.value, at: e.startTime, nodes: (e.sources || []).map((s) => s.node) });
+    }
+  }).observe({ type: 'layout-shift', buffered: true });
+} catch (e) {}
+"""
+
+# Each check is a plain dict so the whole batch serialises into one evaluate()
+_PROBE_JS = """
+(checks) => {
+  const describe = (el) => {
+    if (!el || el.nodeType !== 1) return el && el.parentElement ? describe(el.parentElement) : null;
+    let label = el.tagName.toLowerCase();
+    if (el.id) label += '#' + el.id;
+    const testid = el.getAttribute('data-testid');
+    if (testid) label += `[data-testid="${testid}"]`;
+    const aria = el.getAttribute('aria-label');
+    const text = (aria || el.textContent || el.getAttribute('placeholder') || '').trim().replace(/\\s+/g, ' ');
+    return text ? `${label} "${text.slice(0, 40)}"` : label;
+  };
+  const layoutAudit = (check, isVisible) => {
+    const width = window.innerWidth;
+    const targets = [];
+    let interactive = 0;
+    for (const el of document.querySelectorAll(check.interactive)) {
+      if (!isVisible(el)) continue;
+      interactive++;
+      let r = el.getBoundingClientRect();
+      // Checkboxes and radios are usually hit through their label
+      const label = el.labels && el.labels[0];
+      if (label && isVisible(label)) {
+        const l = label.getBoundingClientRect();
+        r = { width: Math.max(r.right, l.right) - Math.min(r.left, l.left),
+              height: Math.max(r.bottom, l.bottom) - Math.min(r.top, l.top) };
+      }
+      if (Math.min(r.width, r.height) < check.min_px) {
+        targets.push({ element: describe(el), size: [Math.round(r.width), Math.round(r.height)] });
+      }
+    }
+    // An overflow source sticks out past the viewport while its parent does
+    // not; anything inside a horizontal scroller or clipper is intentional
+    const overflowing = [];
+    const clipped = (el) => {
+      for (let p = el.parentElement; p && p !== document.body; p = p.parentElement) {
+        if (getComputedStyle(p).overflowX !== 'visible') return true;
+      }
+      return false;
+    };
+    for (const el of document.body.querySelectorAll('*')) {
+      const r = el.getBoundingClientRect();
+      if (r.right <= width + 1 || !r.width || !isVisible(el)) continue;
+      const parent = el.parentElement;
+      if (parent && parent !== document.body && parent.getBoundingClientRect().right > width + 1) continue;
+      if (clipped(el)) continue;
+      overflowing.push({ element: describe(el), right: Math.round(r.right), overflow_px: Math.round(r.right - width) });
+    }
+    const shifts = window.__layoutShifts || null;
+    const sources = {};
+    for (const shift of shifts || []) {
+      for (const node of shift.nodes) {
+        const key = describe(node) || '(removed node)';
+        sources[key] = (sources[key] || 0) + shift.value;
+      }
+    }
+    return {
+      viewport_width: width,
+      interactive,
+      touch_violations: targets.length,
+      touch_targets: targets.slice(0, check.limit),
+      overflow_px: Math.max(0, document.documentElement.scrollWidth - width),
+      overflow_sources: overflowing.slice(0, check.limit),
+      cls: shifts ? Math.round(shifts.reduce((sum, s) => sum + s.value, 0) * 1000) / 1000 : null,
+      shift_sources: Object.entries(sources).sort((a, b) => b[1] - a[1]).slice(0, check.limit)
+        .map(([element, value]) => ({ element, value: Math.round(value * 1000) / 1000 })),
+    };
+  };
+  const isVisible = (el) => {
+    const style = getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.display === 'none' || Number(style.opacity) === 0) return false;
+    const r = el.getBoundingClientRect();
+    return r.width > 0 && r.height > 0;
+  };
+  const out = {};
+  for (const [name, check] of Object.entries(checks)) {
+    try {
+      if (check.kind === 'overflow') {
+        const doc = document.documentElement;
+        out[name] = {
+          viewport_width: window.innerWidth,
+          scroll_width: doc.scrollWidth,
+          overflow_px: Math.max(0, doc.scrollWidth - window.innerWidth),
+        };
+        continue;
+      }
+      if (check.kind === 'layout') {
+        out[name] = layoutAudit(check, isVisible);
+        continue;
+      }
+      const all = Array.from(document.querySelectorAll(check.selector));
+      const els = check.visible_only ? all.filter(isVisible) : all;
+      if (check.kind === 'count') {
+        out[name] = { count: els.length };
+      } else if (check.kind === 'visible') {
+        const shown = all.filter(isVisible).length;
+        out[name] = { count: all.length, visible: shown, any_visible: shown > 0 };
+      } else if (check.kind === 'size') {
+        const boxes = els.map((el) => el.getBoundingClientRect()).filter((r) => r.width && r.height);
+        const small = boxes.filter((r) => Math.min(r.width, r.height) < check.min_px);
+        out[name] = {
+          count: boxes.length,
+          violations: small.length,
+          min_side: boxes.length ? Math.min(...boxes.map((r) => Math.min(r.width, r.height))) : null,
+          smallest: small.slice(0, 5).map((r) => [Math.round(r.width), Math.round(r.height)]),
+        };
+      } else if (check.kind === 'text') {
+        const re = new RegExp(check.pattern, check.flags);
+        const texts = els.map((el) => (el.textContent || '').trim());
+        const matched = texts.filter((t) => re.test(t));
+        out[name] = { count: texts.length, matches: matched.length, first: matched[0] ?? texts[0] ?? null };
+      } else {
+        out[name] = { error: `unknown probe kind ${check.kind}` };
+      }
+    } catch (e) {
+      out[name] = { error: String(e) };
+    }
+  }
+  return out;
+}
+"""
+
+
+def count(selector: str, visible_only: bool = False) -> dict:
+    """Number of elements matching `selector`."""
+    return {"kind": "count", "selector": selector, "visible_only": visible_only}
+
+
+def visible(selector: str) -> dict:
+    """Total and visible matches for `selector`."""
+    return {"kind": "visible", "selector": selector}
+
+
+def size(selector: str, min_px: float = 44, visible_only: bool = True) -> dict:
+    """Bounding-box sizes for `selector`, counting boxes whose short side is under `min_px`."""
+    return {"kind": "size", "selector": selector, "min_px": min_px, "visible_only": visible_only}
+
+
+def text(selector: str, pattern: str, ignore_case: bool = True) -> dict:
+    """Text content of `selector` matches tested against a JS regular expression."""
+    return {"kind": "text", "selector": selector, "pattern": pattern, "flags": "i" if ignore_case else ""}
+
+
+def overflow() -> dict:
+    """Document scroll width against the viewport width."""
+    return {"kind": "overflow"}
+
+
+INTERACTIVE = ('a[href], button, input:not([type="hidden"]), select, textarea, [role="button"], '
+               '[role="link"], [role="tab"], [role="checkbox"], [role="switch"], [role="menuitem"], '
+               '[tabindex]:not([tabindex="-1"])')
+
+
+def layout(min_px: float = 44, interactive: str = INTERACTIVE, limit: int = 25) -> dict:
+    """
+    Whole-page layout audit: touch targets under `min_px` among all visible
+    interactive elements, the elements that cause horizontal overflow, and
+    cumulative layout shift by source node (needs LAYOUT_SHIFT_SCRIPT; cls is
+    None without it). Lists are capped at `limit` entries; counts are not.
+    """
+    return {"kind": "layout", "min_px": min_px, "interactive": interactive, "limit": limit}
+
+
+class ProbeResult(dict):
+    """Named probe results with assertion helpers."""
+
+    def require(self, name: str, predicate: Callable[[dict], bool], message: Optional[str] = None):
+        """Asserts `predicate` holds for one named result."""
+        result = self[name]
+        assert "error" not in result, f"Probe {name} failed in page: {result['error']}"
+        assert predicate(result), message or f"Probe {name} failed: {result}"
+
+    def failures(self) -> dict:
+        """Returns the probes that raised inside the page."""
+        return {name: r for name, r in self.items() if "error" in r}
+
+
+async def probe(page_or_frame, checks: dict) -> ProbeResult:
+    """
+    Runs all checks in one page.evaluate round trip.
+
+    Args:
+        page_or_frame: Playwright page or frame to probe
+        checks: Mapping of result name -> check built by count/visible/size/text/overflow/layout
+
+    Returns:
+        ProbeResult mapping each name to its structured result
+    """
+    return ProbeResult(await page_or_frame.evaluate(_PROBE_JS, checks))
@@ -0,0 +1,328 @@
+"""
+Cross-Engine Comparison
+
+Every TC so far runs on Chromium, but technicians use iOS Safari. This loads
+the same routes in Chromium, WebKit and Firefox and puts the numbers side by
+side so WebKit-only rendering or storage regressions show up before a
+technician reports them.
+
+Routes are every signed-in App.tsx route in selector_registry, so shared
+pages (Settings, Profile, HelpSupport) are measured for both roles and the
+technician job view waits for the LeadDetail page it renders. Per engine and
+route (median over --runs):
+
+- screen ready: the route's data-testid root is visible (page time)
+- DOMContentLoaded and load from the navigation timing entry
+- peak RSS of the browser process tree while the route is open
+- JS heap, where the engine exposes performance.memory (Chromium only)
+
+Technician routes load with a phone descriptor for the engine (iPhone on
+WebKit, Pixel on Chromium; Firefox gets the iPhone viewport without mobile
+emulation, which it does not support).
+
+Per engine it also runs an IndexedDB benchmark against a scratch database
+with the same stores and indexes as the offline 'mrc-offline' Dexie
+database (src/lib/offline/db.ts): draft puts, index reads by leadId, and
+photo-queue Blob puts and reads. `--only` additionally runs plan entries on
+each engine through plan_executor and compares per-step durations.
+
+    python testsprite_tests/engine_compare.py
+    python testsprite_tests/engine_compare.py --engines chromium webkit --lead-id <uuid> --runs 5
+    python testsprite_tests/engine_compare.py --only TC005 TC013 --skip-routes
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.auth_helper import BASE_URL, get_role_context, launch_browser
+from testsprite_tests.local_stack import ADMIN_EMAIL, ADMIN_PASSWORD, TECH_EMAIL, TECH_PASSWORD
+from testsprite_tests.measure import RssSampler, tree_rss_bytes
+from testsprite_tests.plan_executor import ENGINES, load_compiled_plan, run_plan
+from testsprite_tests.selector_registry import authenticated_routes, check_routes, screen_named
+
+RESULTS_DIR = "testsprite_tests/tmp/engine_compare"
+SETTLE_MS = 1500
+MOBILE_DESCRIPTORS = {"chromium": "Pixel 5", "webkit": "iPhone 13", "firefox": "iPhone 13"}
+
+_PAGE_METRICS = """
+() => {
+  const nav = performance.getEntriesByType('navigation')[0];
+  return {
+    dcl_ms: nav ? nav.domContentLoadedEventEnd : null,
+    load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd : null,
+    resources: performance.getEntriesByType('resource').length,
+    heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null,
+  };
+}
+"""
+
+# Same stores and indexes as MrcOfflineDb version 2
+_IDB_BENCH = """
+async ({ drafts, photos, photoKb }) => {
+  const name = 'mrc-offline-engine-bench';
+  const req = (r) => new Promise((resolve, reject) => {
+    r.onsuccess = () => resolve(r.result);
+    r.onerror = () => reject(r.error);
+  });
+  const done = (tx) => new Promise((resolve, reject) => {
+    tx.oncomplete = resolve;
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error || new Error('aborted'));
+  });
+  await req(indexedDB.deleteDatabase(name));
+  const open = indexedDB.open(name, 1);
+  open.onupgradeneeded = () => {
+    const db = open.result;
+    const stores = {
+      inspectionDrafts: ['leadId', 'status', 'updatedAt'],
+      photoQueue: ['inspectionDraftId', 'status', 'createdAt'],
+      quarantinedPhotos: ['inspectionDraftId', 'reason', 'quarantinedAt'],
+      syncLog: ['entityType', 'entityId', 'syncedAt'],
+    };
+    for (const [store, indexes] of Object.entries(stores)) {
+      const os = db.createObjectStore(store, { keyPath: 'id' });
+      for (const index of indexes) os.createIndex(index, index);
+    }
+  };
+  const db = await req(open);
+  const timings = {};
+  const time = async (key, fn) => {
+    const start = performance.now();
+    await fn();
+    timings[key] = Math.round((performance.now() - start) * 10) / 10;
+  };
+  try {
+    const filler = 'x'.repeat(4000);
+    await time('draft_put_ms', async () => {
+      const tx = db.transaction('inspectionDrafts', 'readwrite');
+      for (let i = 0; i < drafts; i++) {
+        tx.objectStore('inspectionDrafts').put({
+          id: 'draft-' + i, leadId: 'lead-' + (i % 20), status: 'pending',
+          updatedAt: new Date().toISOString(), formData: { notes: filler, areas: [{ name: 'Area ' + i }] },
+        });
+      }
+      await done(tx);
+    });
+    await time('draft_index_read_ms', async () => {
+      const tx = db.transaction('inspectionDrafts');
+      const index = tx.objectStore('inspectionDrafts').index('leadId');
+      for (let lead = 0; lead < 20; lead++) await req(index.getAll('lead-' + lead));
+    });
+    const bytes = new Uint8Array(photoKb * 1024);
+    for (let i = 0; i < bytes.length; i += 97) bytes[i] = i % 251;
+    await time('photo_put_ms', async () => {
+      // One transaction per photo, as queuePhotoOffline adds them one at a time
+      for (let i = 0; i < photos; i++) {
+        const tx = db.transaction('photoQueue', 'readwrite');
+        tx.objectStore('photoQueue').put({
+          id: 'photo-' + i, inspectionDraftId: 'draft-' + (i % 5), status: 'pending',
+          blob: new Blob([bytes], { type: 'image/jpeg' }), caption: 'Bench ' + i,
+          createdAt: new Date().toISOString(),
+        });
+        await done(tx);
+      }
+    });
+    let readBytes = 0;
+    await time('photo_read_ms', async () => {
+      const rows = await req(db.transaction('photoQueue').objectStore('photoQueue').getAll());
+      for (const row of rows) readBytes += (await row.blob.arrayBuffer()).byteLength;
+    });
+    timings.photo_bytes_ok = readBytes === photos * photoKb * 1024;
+  } catch (e) {
+    timings.error = String(e && e.name ? e.name + ': ' + e.message : e);
+  } finally {
+    db.close();
+    await req(indexedDB.deleteDatabase(name));
+  }
+  return timings;
+}
+"""
+
+
+def context_options(pw, engine: str, role: str) -> dict:
+    if role != "technician":
+        return {"viewport": {"width": 1280, "height": 800}}
+    options = dict(pw.devices[MOBILE_DESCRIPTORS[engine]])
+    options.pop("default_browser_type", None)
+    if engine == "firefox":
+        options.pop("is_mobile", None)
+    return options
+
+
+async def measure_route(browser, options: dict, storage_state: dict, route: str, screen: str,
+                        baseline_rss: int) -> dict:
+    context = await browser.new_context(storage_state=storage_state, **options)
+    context.set_default_timeout(30000)
+    page = await context.new_page()
+    result = {}
+    try:
+        with RssSampler(os.getpid()) as sampler:
+            await page.goto(f"{BASE_URL}{route}", wait_until="commit")
+            await page.wait_for_selector(screen_named(screen).root, state="visible")
+            result["ready_ms"] = round(await page.evaluate("performance.now()"), 1)
+            await page.wait_for_timeout(SETTLE_MS)
+            result.update(await page.evaluate(_PAGE_METRICS))
+        result["rss_mb"] = round((sampler.peak - baseline_rss) / 2**20, 1)
+    except Exception as e:
+        result["error"] = str(e).splitlines()[0]
+    finally:
+        await context.close()
+    return result
+
+
+def combine_runs(runs: list) -> dict:
+    """Median of each metric over repeated runs."""
+    combined = {}
+    for key in ("ready_ms", "dcl_ms", "load_ms", "rss_mb", "heap_bytes", "resources"):
+        values = [r[key] for r in runs if r.get(key) is not None]
+        combined[key] = round(statistics.median(values), 1) if values else None
+    combined["errors"] = sorted({r["error"] for r in runs if r.get("error")})
+    return combined
+
+
+async def run_engine(pw, engine: str, routes: list, args) -> dict:
+    baseline_rss = tree_rss_bytes(os.getpid())
+    browser = await launch_browser(pw, engine)
+    result = {"engine": engine, "version": browser.version, "routes": {}, "indexeddb": None}
+    try:
+        states = {}
+        for role in sorted({role for role, _, _ in routes} | {"admin"}):
+            email, password = (ADMIN_EMAIL, ADMIN_PASSWORD) if role == "admin" else (TECH_EMAIL, TECH_PASSWORD)
+            context = await get_role_context(browser, email, password, role.capitalize())
+            states[role] = await context.storage_state()
+            await context.close()
+
+        for role, route, screen in routes:
+            print(f"  {engine}: {route}")
+            options = context_options(pw, engine, role)
+            runs = [await measure_route(browser, options, states[role], route, screen, baseline_rss)
+                    for _ in range(args.runs)]
+            result["routes"][route] = {"screen": screen, **combine_runs(runs)}
+
+        if not args.skip_indexeddb:
+            context = await browser.new_context(storage_state=states["admin"])
+            page = await context.new_page()
+            try:
+                # Same origin as the app so quota and storage policy match production
+                await page.goto(f"{BASE_URL}/", wait_until="domcontentloaded")
+                result["indexeddb"] = await page.evaluate(_IDB_BENCH, {
+                    "drafts": args.idb_drafts, "photos": args.idb_photos, "photoKb": args.idb_photo_kb,
+                })
+            except Exception as e:
+                result["indexeddb"] = {"error": str(e).splitlines()[0]}
+            finally:
+                await context.close()
+    finally:
+        await browser.close()
+    return result
+
+
+async def compare(engines: list, routes: list, args) -> list:
+    from playwright.async_api import async_playwright
+
+    pw = await async_playwright().start()
+    try:
+        return [await run_engine(pw, engine, routes, args) for engine in engines]
+    finally:
+        await pw.stop()
+
+
+def compare_cases(engines: list, case_ids: list) -> dict:
+    """Runs plan entries once per engine. Returns {engine: [case results]}."""
+    cases = [c for c in load_compiled_plan() if c.id in case_ids]
+    return {engine: asyncio.run(run_plan(cases, parallel=1, engine=engine)) for engine in engines}
+
+
+def _cell(value, width: int = 14, scale: float = 1.0) -> str:
+    return f"{value / scale:>{width}.0f}" if value is not None else f"{'-':>{width}}"
+
+
+def print_report(results: list, case_results: dict):
+    engines = [r["engine"] for r in results]
+    print("\n" + "  ".join(f"{r['engine']} {r['version']}" for r in results))
+    routes = list(dict.fromkeys(route for r in results for route in r["routes"]))
+    for metric, label, scale in (("ready_ms", "Screen ready (ms)", 1), ("load_ms", "Load event (ms)", 1),
+                                 ("rss_mb", "Peak browser RSS (MB)", 1), ("heap_bytes", "JS heap (MB)", 2**20)):
+        if routes:
+            print(f"\n{label}")
+            print(f"{'route':<42}" + "".join(f"{e:>14}" for e in engines))
+        for route in routes:
+            row = f"{route[:41]:<42}"
+            for r in results:
+                row += _cell(r["routes"].get(route, {}).get(metric), scale=scale)
+            print(row)
+    for r in results:
+        for route, data in r["routes"].items():
+            for error in data["errors"]:
+                print(f"  {r['engine']} {route}: {error}")
+
+    if any(r["indexeddb"] for r in results):
+        print("\nIndexedDB (offline store workload, ms)")
+        print(f"{'operation':<22}" + "".join(f"{e:>14}" for e in engines))
+        for key in ("draft_put_ms", "draft_index_read_ms", "photo_put_ms", "photo_read_ms"):
+            print(f"{key:<22}" + "".join(_cell((r["indexeddb"] or {}).get(key)) for r in results))
+        for r in results:
+            idb = r["indexeddb"] or {}
+            if idb.get("error"):
+                print(f"  {r['engine']}: {idb['error']}")
+            elif idb and not idb.get("photo_bytes_ok"):
+                print(f"  {r['engine']}: photo blobs read back with the wrong size")
+
+    if case_results:
+        print("\nPlan entries (ms)")
+        print(f"{'step':<52}" + "".join(f"{e:>14}" for e in case_results))
+        first = next(iter(case_results.values()))
+        for index, case in enumerate(first):
+            runs = [results_[index] for results_ in case_results.values()]
+            print(f"{case['id'] + ' ' + case['title'][:44]:<52}"
+                  + "".join(f"{r['duration_ms']:>9.0f} {r['status'][:4]:>4}" for r in runs))
+            for step_index, step in enumerate(case["steps"]):
+                cells = "".join(_cell(r["steps"][step_index]["duration_ms"]) if len(r["steps"]) > step_index
+                                else _cell(None) for r in runs)
+                print(f"  {step['description'][:48]:<50}{cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare route timing, memory and IndexedDB across browser engines")
+    parser.add_argument("--engines", nargs="*", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--lead-id", help="Lead for routes that take an id")
+    parser.add_argument("--screens", nargs="*", help="Limit to these screens (e.g. TechnicianJobs)")
+    parser.add_argument("--runs", type=int, default=3, help="Loads per engine/route (median reported)")
+    parser.add_argument("--only", nargs="*", help="Plan entries to run on every engine")
+    parser.add_argument("--skip-routes", action="store_true", help="Skip the route pass")
+    parser.add_argument("--skip-indexeddb", action="store_true", help="Skip the IndexedDB benchmark")
+    parser.add_argument("--idb-drafts", type=int, default=200, help="Inspection drafts to write")
+    parser.add_argument("--idb-photos", type=int, default=40, help="Queued photos to write")
+    parser.add_argument("--idb-photo-kb", type=int, default=400, help="Size of each photo blob")
+    args = parser.parse_args()
+
+    if not args.skip_routes:
+        for problem in check_routes():
+            print(f"Registry out of date: {problem}")
+    routes = [] if args.skip_routes else authenticated_routes(args.lead_id)
+    if args.screens:
+        routes = [r for r in routes if r[2] in args.screens]
+    if any(role == "technician" for role, _, _ in routes) and not TECH_EMAIL:
+        print("TECH_EMAIL not set; skipping technician routes")
+        routes = [r for r in routes if r[0] != "technician"]
+
+    results = asyncio.run(compare(args.engines, routes, args))
+    case_results = compare_cases(args.engines, args.only) if args.only else {}
+    print_report(results, case_results)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"compare-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"engines": results, "cases": case_results}, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+EXPLAIN ANALYZE and Missing-Index Report
+
+Takes the PostgREST requests the plan entries actually made (the HARs saved
+by `har_replay.py record`), deduplicates them by table and query shape, and
+asks PostgREST for the EXPLAIN (ANALYZE, BUFFERS) plan of each one through
+its plan media type, so every plan is for the real generated SQL with the
+real role and RLS policies applied. Read requests only: plans for writes
+would execute them.
+
+Sequential scans on the watched tables (leads, inspections, photos,
+calendar_bookings, invoices by default) are flagged. For each flagged scan a
+candidate index is built from its filter columns (equality first, then one
+range column, with IS NULL tests as a partial-index predicate) or, for
+unfiltered scans feeding a sort, the sort key. Each
+candidate is created, every statement that proposed it is planned again,
+and the index is dropped, so the report shows measured before/after cost
+and execution time. Results are only as representative as the data in the
+local database, so run it against one loaded to production scale.
+
+PostgREST only serves plans when db-plan-enabled is on; --enable-plans turns
+it on for the local stack (the setting Supabase's performance guide uses).
+
+    python testsprite_tests/har_replay.py record
+    python testsprite_tests/explain_report.py --enable-plans
+    python testsprite_tests/explain_report.py --tables leads photos --role technician --sql
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.har_replay import HAR_DIR
+from testsprite_tests.local_stack import (
+    ADMIN_EMAIL,
+    ADMIN_PASSWORD,
+    SERVICE_ROLE_KEY,
+    SUPABASE_URL,
+    TECH_EMAIL,
+    TECH_PASSWORD,
+    auth_headers,
+    http_json,
+    password_token,
+    sql_exec,
+    sql_json,
+)
+
+RESULTS_DIR = "testsprite_tests/tmp/explain"
+WATCHED_TABLES = ["leads", "inspections", "photos", "calendar_bookings", "invoices"]
+PLAN_ACCEPT = 'application/vnd.pgrst.plan+json; for="application/json"; options=analyze|buffers'
+# Request headers that change the generated SQL
+_KEPT_HEADERS = ("prefer", "range", "range-unit")
+_REST_PATH = re.compile(r"^/rest/v1/(?!rpc/)([\w-]+)$")
+# "(col = ...", "((col)::text = ...", "(col >= ..." inside a plan Filter
+_FILTER_COLUMN = re.compile(r"\(+(\w+)\)?(?:::[\w ]+?)?\)? (=|<>|<=|>=|<|>|~~\*?|IS NOT NULL|IS NULL)")
+# <> and LIKE patterns cannot use a btree, so they never become index columns
+_RANGE = {"<", ">", "<=", ">="}
+
+
+def load_statements(har_dir: str = HAR_DIR) -> list:
+    """
+    Distinct PostgREST reads from the recorded HARs.
+
+    Statements are keyed by table, select list, filter keys and order, which
+    is what decides the SQL PostgREST generates; the first recording's
+    values are kept for planning.
+    """
+    statements = {}
+    for name in sorted(os.listdir(har_dir)) if os.path.isdir(har_dir) else []:
+        if not name.endswith(".har"):
+            continue
+        with open(os.path.join(har_dir, name)) as f:
+            entries = json.load(f)["log"]["entries"]
+        for entry in entries:
+            request = entry["request"]
+            parts = urlsplit(request["url"])
+            match = _REST_PATH.match(parts.path)
+            if request["method"] != "GET" or not match:
+                continue
+            query = parse_qsl(parts.query, keep_blank_values=True)
+            params = dict(query)
+            shape = (match.group(1), params.get("select", "*"), params.get("order", ""),
+                     tuple(sorted(k for k in params if k not in ("select", "order", "limit", "offset"))))
+            if shape in statements:
+                statements[shape]["seen_in"].add(name[:-4])
+                continue
+            statements[shape] = {
+                "table": match.group(1),
+                "path": f"{parts.path}?{parts.query}",
+                "headers": {h["name"]: h["value"] for h in request["headers"]
+                            if h["name"].lower() in _KEPT_HEADERS},
+                "seen_in": {name[:-4]},
+            }
+    return list(statements.values())
+
+
+def enable_plans():
+    """Turns on PostgREST's plan media type for the local stack."""
+    sql_exec("alter role authenticator set pgrst.db_plan_enabled to 'true'; notify pgrst, 'reload config'")
+    time.sleep(1)
+
+
+def request_headers(role: str) -> dict:
+    if role == "service":
+        return {"apikey": SERVICE_ROLE_KEY, "Authorization": f"Bearer {SERVICE_ROLE_KEY}"}
+    if role == "technician":
+        return auth_headers(password_token(TECH_EMAIL, TECH_PASSWORD))
+    return auth_headers(password_token(ADMIN_EMAIL, ADMIN_PASSWORD))
+
+
+def explain(statement: dict, headers: dict) -> dict:
+    """EXPLAIN (ANALYZE, BUFFERS) of one recorded request, as PostgREST runs it."""
+    status, body, _ = http_json("GET", f"{SUPABASE_URL}{statement['path']}",
+                                headers={**headers, **statement["headers"], "Accept": PLAN_ACCEPT})
+    if status != 200:
+        detail = body if isinstance(body, dict) else body[:200].decode(errors="replace")
+        raise Exception(f"plan request failed: {status} {detail}")
+    return (json.loads(body) if isinstance(body, bytes) else body)[0]
+
+
+def _walk(node: dict, ancestors: tuple = ()):
+    yield node, ancestors
+    for child in node.get("Plans", []):
+        yield from _walk(child, ancestors + (node,))
+
+
+def summarise_plan(plan: dict, tables: list) -> dict:
+    root = plan["Plan"]
+    scans = []
+    for node, ancestors in _walk(root):
+        if node.get("Node Type") != "Seq Scan" or node.get("Relation Name") not in tables:
+            continue
+        sort = next((a for a in reversed(ancestors) if a.get("Node Type") in ("Sort", "Incremental Sort")), None)
+        scans.append({
+            "table": node["Relation Name"],
+            "filter": node.get("Filter"),
+            "rows": node.get("Actual Rows", 0) * node.get("Actual Loops", 1),
+            "removed": node.get("Rows Removed by Filter", 0) * node.get("Actual Loops", 1),
+            "loops": node.get("Actual Loops", 1),
+            "ms": round(node.get("Actual Total Time", 0) * node.get("Actual Loops", 1), 2),
+            "sort_key": sort.get("Sort Key") if sort else None,
+        })
+    return {
+        "cost": root.get("Total Cost"),
+        "execution_ms": plan.get("Execution Time"),
+        "planning_ms": plan.get("Planning Time"),
+        "buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+        "seq_scans": scans,
+    }
+
+
+def candidate_index(scan: dict) -> tuple:
+    """
+    (columns, partial predicate) for a flagged scan: equality filter columns
+    then one range column, with IS [NOT] NULL tests as the partial index
+    predicate; for unfiltered scans feeding a sort, the sort key.
+    """
+    if scan["filter"]:
+        equality, ranged, nulls = [], [], []
+        for column, operator in _FILTER_COLUMN.findall(scan["filter"]):
+            if operator in ("IS NULL", "IS NOT NULL"):
+                nulls.append(f"{column} {operator}")
+            elif operator == "=" and column not in equality:
+                equality.append(column)
+            elif operator in _RANGE and column not in ranged:
+                ranged.append(column)
+        columns = equality + [c for c in ranged if c not in equality][:1]
+        if columns:
+            return columns, " AND ".join(dict.fromkeys(nulls))
+    if scan["sort_key"]:
+        column = scan["sort_key"][0].split(".")[-1].split()[0].strip("()")
+        return [column], ""
+    return [], ""
+
+
+def existing_index_prefixes(table: str) -> list:
+    """Leading column lists of the table's current indexes."""
+    rows = sql_json(f"""
+        select array_agg(a.attname order by k.ord) as columns
+        from pg_index i
+        cross join lateral unnest(i.indkey) with ordinality as k(attnum, ord)
+        join pg_attribute a on a.attrelid = i.indrelid and a.attnum = k.attnum
+        where i.indrelid = 'public.{table}'::regclass
+        group by i.indexrelid
+    """)
+    return [row["columns"] for row in rows]
+
+
+def _index_ddl(name: str, table: str, columns: list, where: str) -> str:
+    return f"CREATE INDEX IF NOT EXISTS {name}\n  ON public.{table}({', '.join(columns)})" + (f"\n  WHERE {where}" if where else "")
+
+
+def measure_candidate(table: str, columns: list, where: str, statements: list, headers: dict) -> list:
+    """Creates the index, re-plans each statement, drops the index."""
+    name = f"explain_report_{table}_{'_'.join(columns)}"[:63]
+    sql_exec(f"{_index_ddl(name, table, columns, where)}; analyze public.{table}")
+    try:
+        after = []
+        for statement in statements:
+            try:
+                after.append(summarise_plan(explain(statement, headers), [table]))
+            except Exception as e:
+                after.append({"error": str(e)})
+        return after
+    finally:
+        sql_exec(f"drop index if exists public.{name}")
+
+
+def build_report(statements: list, tables: list, headers: dict, min_rows: int) -> dict:
+    planned = []
+    for statement in statements:
+        entry = {"table": statement["table"], "path": statement["path"][:300], "seen_in": sorted(statement["seen_in"])}
+        try:
+            entry.update(summarise_plan(explain(statement, headers), tables))
+        except Exception as e:
+            entry["error"] = str(e)
+        planned.append((statement, entry))
+
+    # (table, columns) -> statements whose flagged scans proposed it
+    candidates = {}
+    for statement, entry in planned:
+        for scan in entry.get("seq_scans", []):
+            if scan["rows"] + scan["removed"] < min_rows:
+                continue
+            columns, where = candidate_index(scan)
+            scan["candidate"] = {"columns": columns, "where": where}
+            if columns:
+                candidates.setdefault((scan["table"], tuple(columns), where), []).append((statement, entry))
+
+    measured = []
+    for (table, columns, where), users in candidates.items():
+        prefixes = existing_index_prefixes(table)
+        covered = any(prefix[:len(columns)] == list(columns) for prefix in prefixes)
+        print(f"  candidate {table}({', '.join(columns)}) for {len(users)} statement(s)")
+        after = measure_candidate(table, list(columns), where, [s for s, _ in users], headers)
+        measured.append({
+            "table": table,
+            "columns": list(columns),
+            "where": where,
+            "existing_index_unused": covered,
+            "statements": [{
+                "path": entry["path"],
+                "cost_before": entry["cost"],
+                "cost_after": result.get("cost"),
+                "ms_before": entry["execution_ms"],
+                "ms_after": result.get("execution_ms"),
+                "still_seq_scan": bool(result.get("seq_scans")),
+                "error": result.get("error"),
+            } for (_, entry), result in zip(users, after)],
+        })
+    return {"statements": [entry for _, entry in planned], "candidates": measured}
+
+
+def candidate_sql(report: dict, min_gain: float) -> str:
+    """create index statements for candidates that cut cost by at least `min_gain`."""
+    lines = []
+    for candidate in report["candidates"]:
+        gains = [s["cost_before"] / s["cost_after"] for s in candidate["statements"]
+                 if s["cost_before"] and s["cost_after"]]
+        if not gains or max(gains) < min_gain or candidate["existing_index_unused"]:
+            continue
+        table, columns = candidate["table"], candidate["columns"]
+        lines.append(f"-- {max(gains):.1f}x lower cost on {len(gains)} statement(s)")
+        lines.append(_index_ddl(f"idx_{table}_{'_'.join(columns)}", table, columns, candidate["where"]) + ";")
+    return "\n".join(lines) + "\n"
+
+
+def print_report(report: dict):
+    print(f"\n{'ms':>8} {'cost':>10} {'bufs':>7}  statement")
+    for entry in sorted(report["statements"], key=lambda e: e.get("execution_ms") or 0, reverse=True):
+        if entry.get("error"):
+            print(f"{'-':>8} {'-':>10} {'-':>7}  {entry['path'][:90]}\n           {entry['error'][:120]}")
+            continue
+        print(f"{entry['execution_ms']:>8.1f} {entry['cost']:>10.0f} {entry['buffers']:>7}  {entry['path'][:90]}")
+        for scan in entry["seq_scans"]:
+            print(f"           seq scan {scan['table']}: {scan['rows']} rows kept, {scan['removed']} removed,"
+                  f" {scan['ms']} ms  filter={(scan['filter'] or '-')[:60]}")
+    if report["candidates"]:
+        print("\nCandidate indexes (measured)")
+    for candidate in report["candidates"]:
+        note = "  (an index with these leading columns exists but is not used)" if candidate["existing_index_unused"] else ""
+        where = f" WHERE {candidate['where']}" if candidate["where"] else ""
+        print(f"  {candidate['table']}({', '.join(candidate['columns'])}){where}{note}")
+        for s in candidate["statements"]:
+            if s["error"]:
+                print(f"      error: {s['error'][:100]}")
+                continue
+            print(f"      cost {s['cost_before']:.0f} -> {s['cost_after']:.0f}, {s['ms_before']:.1f} -> {s['ms_after']:.1f} ms"
+                  f"{'  still seq scan' if s['still_seq_scan'] else ''}  {s['path'][:70]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE recorded PostgREST reads and test candidate indexes")
+    parser.add_argument("--har-dir", default=HAR_DIR, help="Directory of HARs from har_replay.py record")
+    parser.add_argument("--tables", nargs="*", default=WATCHED_TABLES, help="Tables to flag sequential scans on")
+    parser.add_argument("--role", choices=["admin", "technician", "service"], default="admin")
+    parser.add_argument("--min-rows", type=int, default=1000, help="Ignore scans over fewer rows than this")
+    parser.add_argument("--enable-plans", action="store_true", help="Turn on PostgREST db-plan-enabled first")
+    parser.add_argument("--sql", action="store_true", help="Also write the worthwhile candidates as SQL")
+    parser.add_argument("--min-gain", type=float, default=2.0, help="Cost ratio a candidate needs for --sql")
+    args = parser.parse_args()
+
+    statements = load_statements(args.har_dir)
+    if not statements:
+        parser.error(f"No PostgREST reads in {args.har_dir}; run `har_replay.py record` first")
+    if args.enable_plans:
+        enable_plans()
+    print(f"Planning {len(statements)} distinct statements as {args.role}")
+    report = build_report(statements, args.tables, request_headers(args.role), args.min_rows)
+    print_report(report)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(RESULTS_DIR, f"explain-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {path}")
+    if args.sql:
+        sql_path = os.path.join(RESULTS_DIR, f"candidate-indexes-{stamp}.sql")
+        with open(sql_path, "w") as f:
+            f.write(candidate_sql(report, args.min_gain))
+        print(f"Candidate indexes written to {sql_path}")
+
+
+if __name__ == "__main__":
+    main()
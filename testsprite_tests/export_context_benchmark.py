@@ -0,0 +1,307 @@
+"""
+export-inspection-context Throughput and Payload Benchmark
+
+export-inspection-context selects a fixed column list from leads but
+`select('*')` from inspections (80 columns) and calendar_bookings, and
+returns the lot pretty-printed. Its output feeds the AI and reporting tools,
+so every byte the consumer ignores is latency and token cost. This seeds
+inspections of increasing size (areas, moisture readings per area, length of
+free-text notes) on the local stack and measures per size. Each lead gets one
+booking: the function returns only the latest, so more would not change the
+payload:
+
+- export latency (median/p95 over --repeat calls) and response bytes,
+- the share of those bytes the consumer never uses: pretty-print whitespace,
+  the always-null parsed_form_data, and columns outside the consumer's field
+  set. The field set is read from InspectionFormData in
+  generate-inspection-summary (camelCase mapped to columns), so it follows
+  the AI consumer as it changes,
+- bytes of the inspection's areas and readings, which the consumer's
+  InspectionFormData expects but the export leaves out.
+
+--batch seeds that many medium inspections and exports them all at each
+--concurrency level, reporting exports/s, latency percentiles and errors.
+Seeded rows are tagged by lead email under SEED_EMAIL_DOMAIN and removed at
+the end unless --keep is given.
+
+    python testsprite_tests/export_context_benchmark.py
+    python testsprite_tests/export_context_benchmark.py --batch 50 --concurrency 1 8 32
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.local_stack import (
+    ADMIN_EMAIL,
+    SERVICE_ROLE_KEY,
+    SUPABASE_URL,
+    http_json,
+    sql_exec,
+)
+from testsprite_tests.measure import percentile
+
+RESULTS_DIR = "testsprite_tests/tmp/export_context"
+FUNCTION = "export-inspection-context"
+CONSUMER_SOURCE = "supabase/functions/generate-inspection-summary/index.ts"
+SEED_EMAIL_DOMAIN = "export-bench.invalid"
+# name -> (areas, readings per area, characters per notes field)
+SIZES = {
+    "minimal": (0, 0, 0),
+    "small": (1, 3, 200),
+    "medium": (4, 6, 2000),
+    "large": (10, 10, 10000),
+    "xl": (25, 20, 50000),
+}
+DEFAULT_CONCURRENCY = [1, 4, 16, 32]
+# InspectionFormData keys whose column differs from the snake_cased key
+CONSUMER_ALIASES = {
+    "clientName": "full_name",
+    "clientEmail": "email",
+    "clientPhone": "phone",
+    "propertyAddress": "property_address_street",
+    "propertySuburb": "property_address_suburb",
+    "propertyState": "property_address_state",
+    "propertyPostcode": "property_address_postcode",
+    "inspector": "inspector_name",
+    "triage": "triage_description",
+    "laborCost": "labour_cost_ex_gst",
+    "equipmentCost": "equipment_cost_ex_gst",
+    "recommendDehumidifier": "recommended_dehumidifier",
+}
+# Free-text columns padded to the size's notes length
+NOTES_COLUMNS = {
+    "leads": ["issue_description", "internal_notes"],
+    "inspections": ["triage_description", "what_we_discovered", "why_this_happened",
+                    "additional_info_technician", "outdoor_comments"],
+    "calendar_bookings": ["description"],
+}
+
+
+def _snake(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def consumer_fields(source: str = CONSUMER_SOURCE) -> set:
+    """Columns the AI consumer reads: InspectionFormData's top-level keys as column names."""
+    with open(source) as f:
+        text = f.read()
+    body = text[text.index("interface InspectionFormData {"):]
+    body = body[:body.index("\n}")]
+    keys = re.findall(r"^  (\w+)\??:", body, re.M)
+    return {CONSUMER_ALIASES.get(k, _snake(k)) for k in keys}
+
+
+def _notes(chars: int, label: str) -> str:
+    if not chars:
+        return None
+    sentence = f"{label}: moisture and mould observations recorded on site. "
+    return (sentence * (chars // len(sentence) + 1))[:chars]
+
+
+def _literal(value) -> str:
+    return "null" if value is None else "'" + str(value).replace("'", "''") + "'"
+
+
+def seed_inspection(size: str, run_id: str, index: int) -> dict:
+    """Creates a lead, inspection, areas, readings and one booking of `size`; returns the ids."""
+    areas, readings, chars = SIZES[size]
+    lead_id, inspection_id = str(uuid.uuid4()), str(uuid.uuid4())
+    notes = {table: {c: _literal(_notes(chars, c)) for c in columns} for table, columns in NOTES_COLUMNS.items()}
+    sql_exec(f"""
+        insert into public.leads (id, full_name, email, phone, property_address_street, property_address_suburb,
+                                  property_address_postcode, property_address_state, issue_description, internal_notes)
+        values ('{lead_id}', 'Export Bench {index}', '{run_id}-{index}@{SEED_EMAIL_DOMAIN}', '0400000000',
+                '{index} Bench St', 'Richmond', '3121', 'VIC',
+                {notes['leads']['issue_description']}, {notes['leads']['internal_notes']});
+        insert into public.inspections (id, lead_id, inspector_id, inspection_date,
+                                        {', '.join(NOTES_COLUMNS['inspections'])})
+        select '{inspection_id}', '{lead_id}', u.id, current_date, {', '.join(notes['inspections'].values())}
+        from auth.users u where u.email = '{ADMIN_EMAIL}';
+        with areas as (
+            insert into public.inspection_areas (inspection_id, area_name, job_time_minutes, area_order, comments)
+            select '{inspection_id}', 'Area ' || a, 60, a, {_literal(_notes(min(chars, 500), 'comments'))}
+            from generate_series(1, {areas}) a
+            returning id
+        )
+        insert into public.moisture_readings (area_id, moisture_percentage, reading_order, title)
+        select areas.id, 10 + r, r, 'Reading ' || r from areas, generate_series(1, {readings}) r;
+        insert into public.calendar_bookings (lead_id, inspection_id, assigned_to, event_type, title,
+                                              start_datetime, end_datetime, description)
+        select '{lead_id}', '{inspection_id}', u.id, 'inspection', 'Inspection',
+               now() + interval '1 day', now() + interval '1 day 2 hours',
+               {notes['calendar_bookings']['description']}
+        from auth.users u where u.email = '{ADMIN_EMAIL}'
+    """)
+    return {"size": size, "lead_id": lead_id, "inspection_id": inspection_id}
+
+
+def delete_seeded():
+    sql_exec(f"""
+        delete from public.calendar_bookings where lead_id in
+            (select id from public.leads where email like '%@{SEED_EMAIL_DOMAIN}');
+        delete from public.inspections where lead_id in
+            (select id from public.leads where email like '%@{SEED_EMAIL_DOMAIN}');
+        delete from public.leads where email like '%@{SEED_EMAIL_DOMAIN}'
+    """)
+
+
+def _headers() -> dict:
+    return {"apikey": SERVICE_ROLE_KEY, "Authorization": f"Bearer {SERVICE_ROLE_KEY}"}
+
+
+def export(fixture: dict) -> dict:
+    start = time.perf_counter()
+    status, body, headers = http_json("POST", f"{SUPABASE_URL}/functions/v1/{FUNCTION}",
+                                      {"leadId": fixture["lead_id"]}, _headers())
+    elapsed = (time.perf_counter() - start) * 1000
+    if headers.get("Content-Length"):
+        size = int(headers["Content-Length"])
+    elif isinstance(body, (dict, list)):
+        size = len(json.dumps(body, indent=2, ensure_ascii=False).encode())  # as the function serialises it
+    else:
+        size = len(body or b"")
+    return {"status": status, "ms": elapsed, "body": body if status == 200 else None, "bytes": size}
+
+
+def _entry_bytes(key: str, value) -> int:
+    return len(json.dumps({key: value}, separators=(",", ":")).encode()) - 1  # "key":value,
+
+
+def payload_breakdown(body: dict, total_bytes: int, used: set) -> dict:
+    """Splits an export into bytes the consumer uses and bytes it never reads."""
+    compact = len(json.dumps(body, separators=(",", ":")).encode())
+    unused_columns, used_bytes = {}, 0
+    for section in ("lead", "inspection", "booking"):
+        for key, value in (body.get(section) or {}).items():
+            size = _entry_bytes(key, value)
+            if key in used:
+                used_bytes += size
+            else:
+                unused_columns[f"{section}.{key}"] = size
+    envelope_unused = _entry_bytes("parsed_form_data", body.get("parsed_form_data"))
+    unused = total_bytes - compact + sum(unused_columns.values()) + envelope_unused
+    return {
+        "bytes": total_bytes,
+        "whitespace_bytes": total_bytes - compact,
+        "used_bytes": used_bytes,
+        "unused_bytes": unused,
+        "unused_share": round(unused / total_bytes, 3) if total_bytes else 0,
+        "unused_columns": dict(sorted(unused_columns.items(), key=lambda kv: kv[1], reverse=True)),
+    }
+
+
+def omitted_bytes(inspection_id: str) -> int:
+    """Compact bytes of the inspection's areas and readings, which the export leaves out."""
+    status, body, _ = http_json(
+        "GET", f"{SUPABASE_URL}/rest/v1/inspection_areas?inspection_id=eq.{inspection_id}"
+               "&select=*,moisture_readings(*)", headers=_headers())
+    return len(json.dumps(body, separators=(",", ":")).encode()) if status == 200 else 0
+
+
+def measure_size(fixture: dict, repeat: int, used: set) -> dict:
+    calls = [export(fixture) for _ in range(repeat)]
+    ok = [c for c in calls if c["status"] == 200]
+    result = {"size": fixture["size"], "shape": SIZES[fixture["size"]], "errors": len(calls) - len(ok)}
+    if not ok:
+        result["error"] = f"HTTP {calls[-1]['status']}"
+        return result
+    timings = [c["ms"] for c in ok]
+    result.update({
+        "median_ms": round(statistics.median(timings), 1),
+        "p95_ms": round(percentile(timings, 95), 1),
+        **payload_breakdown(ok[-1]["body"], ok[-1]["bytes"], used),
+        "omitted_bytes": omitted_bytes(fixture["inspection_id"]),
+    })
+    return result
+
+
+def measure_batch(fixtures: list, concurrency: int) -> dict:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        calls = list(pool.map(export, fixtures))
+    wall = time.perf_counter() - start
+    timings = [c["ms"] for c in calls if c["status"] == 200]
+    return {
+        "concurrency": concurrency,
+        "exports": len(calls),
+        "errors": sum(1 for c in calls if c["status"] != 200),
+        "wall_s": round(wall, 2),
+        "exports_per_s": round(len(calls) / wall, 1),
+        "p50_ms": round(percentile(timings, 50), 1),
+        "p95_ms": round(percentile(timings, 95), 1),
+        "max_ms": round(max(timings), 1) if timings else None,
+        "mb": round(sum(c["bytes"] for c in calls) / 1024 ** 2, 2),
+    }
+
+
+def print_report(sizes: list, batches: list, top: int):
+    print(f"\n{'size':<8} {'areas/rd/notes':<18} {'med ms':>7} {'p95 ms':>7} {'bytes':>8} "
+          f"{'unused':>8} {'share':>6} {'space':>7} {'omitted':>8}")
+    for r in sizes:
+        shape = "/".join(str(v) for v in r["shape"])
+        if r.get("error"):
+            print(f"{r['size']:<8} {shape:<18} {r['error']}")
+            continue
+        print(f"{r['size']:<8} {shape:<18} {r['median_ms']:>7.1f} {r['p95_ms']:>7.1f} {r['bytes']:>8} "
+              f"{r['unused_bytes']:>8} {r['unused_share']:>6.0%} {r['whitespace_bytes']:>7} {r['omitted_bytes']:>8}")
+    largest = next((r for r in reversed(sizes) if not r.get("error")), None)
+    if largest:
+        print(f"\nLargest unused columns ({largest['size']})")
+        for column, size in list(largest["unused_columns"].items())[:top]:
+            print(f"  {size:>8} B  {column}")
+    if batches:
+        print(f"\n{'conc':>5} {'exports':>8} {'errors':>7} {'wall s':>7} {'exp/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'MB':>7}")
+        for b in batches:
+            print(f"{b['concurrency']:>5} {b['exports']:>8} {b['errors']:>7} {b['wall_s']:>7} {b['exports_per_s']:>7} "
+                  f"{b['p50_ms']:>8} {b['p95_ms']:>8} {b['mb']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Benchmark {FUNCTION} latency, payload and batch throughput")
+    parser.add_argument("--sizes", nargs="*", choices=list(SIZES), default=list(SIZES), help="Inspection sizes to seed")
+    parser.add_argument("--repeat", type=int, default=10, help="Exports per size")
+    parser.add_argument("--batch", type=int, default=0, help="Medium inspections to export concurrently")
+    parser.add_argument("--concurrency", nargs="*", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Concurrency levels for --batch")
+    parser.add_argument("--top", type=int, default=15, help="Unused columns to list")
+    parser.add_argument("--keep", action="store_true", help="Leave the seeded rows in place")
+    args = parser.parse_args()
+    if not SERVICE_ROLE_KEY:
+        parser.error("Set SUPABASE_SERVICE_ROLE_KEY (see `supabase status`)")
+
+    used = consumer_fields()
+    run_id = time.strftime("%Y%m%d%H%M%S")
+    sizes, batches = [], []
+    try:
+        print(f"Seeding {len(args.sizes)} sizes" + (f" and {args.batch} batch inspections" if args.batch else ""))
+        fixtures = [seed_inspection(size, run_id, i) for i, size in enumerate(args.sizes)]
+        batch = [seed_inspection("medium", run_id, len(fixtures) + i) for i in range(args.batch)]
+        for fixture in fixtures:
+            print(f"Exporting {fixture['size']}")
+            sizes.append(measure_size(fixture, args.repeat, used))
+        for concurrency in args.concurrency if batch else []:
+            print(f"Exporting {len(batch)} inspections at concurrency {concurrency}")
+            batches.append(measure_batch(batch, concurrency))
+    finally:
+        if not args.keep:
+            delete_seeded()
+
+    print_report(sizes, batches, args.top)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"export-{run_id}.json")
+    with open(path, "w") as f:
+        json.dump({"consumer_fields": sorted(used), "sizes": sizes, "batches": batches}, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+HAR Record-and-Replay Backend
+
+Separates front-end rendering cost from backend variance. `record` runs each
+plan entry against a seeded stack and saves one HAR per entry holding every
+Supabase (REST, auth, storage, edge function) and /api/* exchange. `replay`
+serves those responses from an in-memory index through page.route, with
+zero, fixed or recorded latency, so front-end runs are reproducible and need
+no backend - only the built front end and a saved session.
+
+Lookup order for each intercepted request:
+1. method + full URL + request body hash  (exact)
+2. method + full URL                      (body differs, e.g. timestamps)
+3. method + path + sorted query keys      (query values differ, e.g. today's date)
+Repeated identical requests are answered with the recorded responses in
+order, then the last one again. Misses get a 404 and are reported. Realtime
+websockets are not replayed; they fail to connect and pages keep the data
+they fetched.
+
+    python testsprite_tests/har_replay.py record --only TC005 TC013
+    python testsprite_tests/har_replay.py replay --latency zero --repeat 5
+    python testsprite_tests/har_replay.py replay --latency recorded --only TC013
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.auth_helper import STORAGE_STATE_PATH, get_authenticated_context
+from testsprite_tests.local_stack import SUPABASE_URL
+from testsprite_tests.plan_executor import load_compiled_plan, run_case
+
+HAR_DIR = "testsprite_tests/tmp/har"
+RESULTS_DIR = "testsprite_tests/tmp/har_runs"
+# Headers that describe the recorded transfer rather than the decoded body
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def backend_url_pattern() -> re.Pattern:
+    """Requests that belong to the backend: the Supabase URL and /api/*."""
+    return re.compile(rf"^({re.escape(SUPABASE_URL)}/|https?://[^/]+/api/)")
+
+
+def _body_hash(body) -> str:
+    if not body:
+        return ""
+    if isinstance(body, str):
+        body = body.encode()
+    return hashlib.sha1(body).hexdigest()[:16]
+
+
+def _shape_key(method: str, url: str) -> tuple:
+    parts = urlsplit(url)
+    return method, parts.netloc, parts.path, tuple(sorted({k for k, _ in parse_qsl(parts.query)}))
+
+
+class HarStore:
+    """Indexed in-memory responses from one or more HAR files."""
+
+    def __init__(self):
+        self.exact = {}
+        self.by_url = {}
+        self.by_shape = {}
+        self.served = {}
+        self.hits = {"exact": 0, "url": 0, "shape": 0, "miss": 0}
+        self.misses = []
+
+    def load(self, path: str) -> int:
+        with open(path) as f:
+            entries = json.load(f)["log"]["entries"]
+        pattern = backend_url_pattern()
+        loaded = 0
+        for entry in entries:
+            request, response = entry["request"], entry["response"]
+            if not pattern.match(request["url"]) or response["status"] <= 0:
+                continue
+            content = response.get("content", {})
+            text = content.get("text", "")
+            body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode()
+            recorded = {
+                "status": response["status"],
+                "headers": {h["name"]: h["value"] for h in response["headers"]
+                            if h["name"].lower() not in _DROP_HEADERS},
+                "body": body,
+                "wait_ms": max(0.0, entry.get("timings", {}).get("wait", 0))
+                + max(0.0, entry.get("timings", {}).get("receive", 0)),
+            }
+            method, url = request["method"], request["url"]
+            post = request.get("postData", {}).get("text", "")
+            self.exact.setdefault((method, url, _body_hash(post)), []).append(recorded)
+            self.by_url.setdefault((method, url), []).append(recorded)
+            self.by_shape.setdefault(_shape_key(method, url), []).append(recorded)
+            loaded += 1
+        return loaded
+
+    def lookup(self, method: str, url: str, body) -> dict:
+        for kind, key, index in (
+            ("exact", (method, url, _body_hash(body)), self.exact),
+            ("url", (method, url), self.by_url),
+            ("shape", _shape_key(method, url), self.by_shape),
+        ):
+            responses = index.get(key)
+            if responses:
+                # Serve repeats in recorded order, then keep serving the last one
+                position = self.served.get((kind, key), 0)
+                self.served[(kind, key)] = position + 1
+                self.hits[kind] += 1
+                return responses[min(position, len(responses) - 1)]
+        self.hits["miss"] += 1
+        self.misses.append(f"{method} {url[:150]}")
+        return None
+
+    def reset_sequence(self):
+        """Starts every repeated-request sequence from the beginning again."""
+        self.served.clear()
+
+
+async def install_replay(context, store: HarStore, latency: str):
+    """Routes backend requests in `context` to `store`."""
+    fixed_ms = None if latency in ("zero", "recorded") else float(latency)
+
+    async def handle(route):
+        request = route.request
+        if request.method == "OPTIONS":
+            await route.fulfill(status=204, headers={
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Headers": "*",
+                "Access-Control-Allow-Methods": "GET,POST,PATCH,PUT,DELETE,OPTIONS",
+            })
+            return
+        recorded = store.lookup(request.method, request.url, request.post_data_buffer)
+        if recorded is None:
+            await route.fulfill(status=404, json={"error": "not in HAR"})
+            return
+        delay = recorded["wait_ms"] if latency == "recorded" else fixed_ms
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        await route.fulfill(status=recorded["status"], headers=recorded["headers"], body=recorded["body"])
+
+    await context.route(backend_url_pattern(), handle)
+
+
+async def record(cases: list):
+    from playwright.async_api import async_playwright
+
+    os.makedirs(HAR_DIR, exist_ok=True)
+    pw = await async_playwright().start()
+    browser, context = await get_authenticated_context(pw)
+    await context.close()
+    try:
+        for case in cases:
+            path = os.path.join(HAR_DIR, f"{case.id}.har")
+            context = await browser.new_context(
+                storage_state=STORAGE_STATE_PATH, record_har_path=path,
+                record_har_url_filter=backend_url_pattern(), record_har_content="embed",
+            )
+            context.set_default_timeout(30000)
+            result = await run_case(browser, case, page=await context.new_page())
+            # The HAR is written when the context closes
+            await context.close()
+            store = HarStore()
+            print(f"  {case.id} [{result['status']}] {store.load(path)} backend exchanges -> {path}")
+    finally:
+        await browser.close()
+        await pw.stop()
+
+
+async def replay(cases: list, latency: str, repeat: int) -> list:
+    from playwright.async_api import async_playwright
+
+    if not os.path.exists(STORAGE_STATE_PATH):
+        raise Exception(f"No saved session at {STORAGE_STATE_PATH}; run `record` once first")
+    pw = await async_playwright().start()
+    browser = await pw.chromium.launch(headless=True, args=["--disable-dev-shm-usage"])
+    results = []
+    try:
+        for case in cases:
+            path = os.path.join(HAR_DIR, f"{case.id}.har")
+            if not os.path.exists(path):
+                print(f"  {case.id}: no HAR recorded, skipping")
+                continue
+            store = HarStore()
+            store.load(path)
+            runs = []
+            for _ in range(repeat):
+                store.reset_sequence()
+                context = await browser.new_context(storage_state=STORAGE_STATE_PATH)
+                context.set_default_timeout(30000)
+                await install_replay(context, store, latency)
+                runs.append(await run_case(browser, case, page=await context.new_page()))
+                await context.close()
+            results.append(summarise_case(case.id, runs, store))
+    finally:
+        await browser.close()
+        await pw.stop()
+    return results
+
+
+def summarise_case(case_id: str, runs: list, store: HarStore) -> dict:
+    """Mean and coefficient of variation per case and per step across repeats."""
+    def spread(values):
+        mean = statistics.fmean(values)
+        cv = statistics.stdev(values) / mean if len(values) > 1 and mean else 0.0
+        return round(mean, 1), round(cv, 3)
+
+    mean, cv = spread([r["duration_ms"] for r in runs])
+    steps = []
+    for index, step in enumerate(runs[0]["steps"]):
+        durations = [r["steps"][index]["duration_ms"] for r in runs if len(r["steps"]) > index]
+        step_mean, step_cv = spread(durations)
+        steps.append({"index": step["index"], "description": step["description"][:70],
+                      "mean_ms": step_mean, "cv": step_cv})
+    return {
+        "case": case_id,
+        "runs": len(runs),
+        "passed": sum(1 for r in runs if r["status"] == "passed"),
+        "mean_ms": mean,
+        "cv": cv,
+        "steps": steps,
+        "hits": dict(store.hits),
+        "misses": sorted(set(store.misses))[:20],
+    }
+
+
+def print_report(results: list, latency: str):
+    print(f"\nReplay latency: {latency}")
+    print(f"{'case':<6} {'runs':>4} {'pass':>4} {'mean ms':>9} {'cv':>6} {'exact':>6} {'url':>5} {'shape':>6} {'miss':>5}")
+    for r in results:
+        h = r["hits"]
+        print(f"{r['case']:<6} {r['runs']:>4} {r['passed']:>4} {r['mean_ms']:>9.0f} {r['cv']:>6.1%}"
+              f" {h['exact']:>6} {h['url']:>5} {h['shape']:>6} {h['miss']:>5}")
+        for step in r["steps"]:
+            print(f"         {step['mean_ms']:>9.0f} ms  cv {step['cv']:>6.1%}  {step['description']}")
+        for miss in r["misses"][:5]:
+            print(f"         miss: {miss}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay backend traffic for front-end-only runs")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--only", nargs="*", help="Plan entry ids")
+    parser.add_argument("--latency", default="zero", help="zero, recorded, or fixed milliseconds (replay)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per plan entry (replay)")
+    args = parser.parse_args()
+
+    if args.latency not in ("zero", "recorded"):
+        try:
+            float(args.latency)
+        except ValueError:
+            parser.error("--latency must be zero, recorded or a number of milliseconds")
+
+    cases = load_compiled_plan()
+    if args.only:
+        cases = [c for c in cases if c.id in args.only]
+
+    if args.mode == "record":
+        asyncio.run(record(cases))
+        return
+
+    results = asyncio.run(replay(cases, args.latency, args.repeat))
+    print_report(results, args.latency)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"replay-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"latency": args.latency, "results": results}, f, indent=2)
+    print(f"Results saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Change-Aware Test Selection for TestSprite Tests
+
+Builds a map from each plan TC to the src/ modules it executed and the
+Supabase edge functions it called, then uses it to pick only the TCs a git
+diff can affect. The map comes from a plan run with coverage against the
+Vite dev server, where every executed module is served under its /src path:
+
+    npm run dev
+    python testsprite_tests/plan_executor.py --coverage
+    python testsprite_tests/impact_selection.py build testsprite_tests/tmp/plan_runs/run-<ts>.json
+
+Then, on each change:
+
+    python testsprite_tests/impact_selection.py select --base origin/main
+    python testsprite_tests/impact_selection.py select --base origin/main --run
+
+--run records through run_results like plan_executor.py, so an impact run
+leaves the same events.jsonl and junit.xml as a full one.
+
+Nightly jobs pass --full (or set TESTSPRITE_FULL_SUITE=1) to run everything.
+Selection is conservative: a path only narrows the run when the map ties it
+to specific TCs (an executed src module, a called edge function, a TC
+script). Build config, routing, migrations, shared edge-function code, the
+harness itself, src files or edge functions no TC has exercised, and any
+path the map does not know (api/, public/, vercel.json, ...) all fall back
+to the full suite, with the path that caused it as the reason.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from urllib.parse import urlparse
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPACT_MAP_PATH = os.path.join(TESTS_DIR, "impact_map.json")
+
+# Changes here can affect every screen, so they always select the full suite
+GLOBAL_PATHS = (
+    "package.json",
+    "package-lock.json",
+    "bun.lockb",
+    "index.html",
+    "vite.config.ts",
+    "tailwind.config.ts",
+    "postcss.config.js",
+    "tsconfig.json",
+    "tsconfig.app.json",
+    "src/main.tsx",
+    "src/App.tsx",
+    "src/index.css",
+    "supabase/functions/_shared/",
+    # Schema and RLS sit under every TC
+    "supabase/migrations/",
+    "supabase/config.toml",
+    "testsprite_tests/auth_helper.py",
+    "testsprite_tests/plan_executor.py",
+    "testsprite_tests/testsprite_frontend_test_plan.json",
+)
+
+# Changes here never affect browser behaviour
+IGNORED_PREFIXES = ("docs/", "tests/", "scripts/", "README.md", "testsprite_tests/REGRESSION_TEST_REPORT.md",
+                    "testsprite_tests/test_")
+
+EDGE_FUNCTION_PREFIX = "supabase/functions/"
+
+
+def _module_path(url: str):
+    """Maps a dev-server script URL to its repo path, or None for deps and chunks."""
+    path = urlparse(url).path
+    if path.startswith("/src/"):
+        return path.lstrip("/")
+    return None
+
+
+def build_impact_map(run_results: list) -> dict:
+    """
+    Builds the TC -> modules/functions map from plan executor results.
+
+    Args:
+        run_results: Results saved by plan_executor.py --coverage
+
+    Returns:
+        dict: {"cases": {tc_id: {"modules": [...], "edge_functions": [...]}}}
+    """
+    cases = {}
+    for result in run_results:
+        chunks = result.get("coverage", {}).get("chunks", [])
+        if not chunks:
+            print(f"WARNING: {result['id']} has no coverage - was the run made with --coverage?")
+        modules = sorted({
+            module for module in (_module_path(c["url"]) for c in chunks if c["used"] > 0) if module
+        })
+        cases[result["id"]] = {
+            "modules": modules,
+            "edge_functions": result.get("edge_functions", []),
+        }
+    return {"cases": cases}
+
+
+def load_impact_map(path: str = IMPACT_MAP_PATH) -> dict:
+    """Loads the stored impact map, or an empty map if none has been built."""
+    if not os.path.exists(path):
+        return {"cases": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def changed_files(base: str) -> list:
+    """
+    Returns paths changed since this branch left `base` (like `base...HEAD`),
+    plus uncommitted changes and untracked files that are not ignored.
+    Diffing against `base` itself would also list everything merged into
+    `base` after the branch point.
+    """
+    merge_base = subprocess.run(
+        ["git", "merge-base", base, "HEAD"],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    output = subprocess.run(
+        ["git", "diff", "--name-only", merge_base],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    # A new file is invisible to git diff until it is staged
+    output += subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return sorted({line.strip() for line in output.splitlines() if line.strip()})
+
+
+def select_cases(files: list, impact_map: dict) -> tuple:
+    """
+    Picks the TCs affected by a set of changed files.
+
+    Args:
+        files: Repo-relative paths from git diff
+        impact_map: Map produced by build_impact_map
+
+    Returns:
+        tuple: (selected TC ids or None for the full suite, reasons dict)
+    """
+    cases = impact_map["cases"]
+    if not cases:
+        return None, {"*": "no impact map has been built yet"}
+
+    known_modules = {m for case in cases.values() for m in case["modules"]}
+    selected = set()
+    reasons = {}
+
+    for path in files:
+        if path.startswith(IGNORED_PREFIXES):
+            continue
+        if any(path == g or (g.endswith("/") and path.startswith(g)) for g in GLOBAL_PATHS):
+            return None, {path: "global file - full suite"}
+
+        if path.startswith(EDGE_FUNCTION_PREFIX):
+            function = path[len(EDGE_FUNCTION_PREFIX):].split("/")[0]
+            hits = {tc for tc, case in cases.items() if function in case["edge_functions"]}
+            if not hits:
+                return None, {path: f"edge function {function} not called by any TC - full suite"}
+        elif path.startswith("src/"):
+            if path not in known_modules:
+                return None, {path: "src file not executed by any TC - full suite"}
+            hits = {tc for tc, case in cases.items() if path in case["modules"]}
+        elif path.startswith("testsprite_tests/TC"):
+            hits = {path.split("/")[1][:5]} & set(cases)
+            if not hits:
+                return None, {path: "TC script with no plan entry in the impact map - full suite"}
+        else:
+            # api/, public/, vercel.json, harness helpers, ...: nothing in the
+            # map says which TCs they reach, so assume all of them
+            return None, {path: "path not covered by the impact map - full suite"}
+
+        for tc in hits:
+            reasons.setdefault(tc, path)
+        selected |= hits
+
+    return sorted(selected), reasons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Select TestSprite TCs affected by a change")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the impact map from a plan run with --coverage")
+    build.add_argument("run_results", help="JSON written by plan_executor.py --coverage")
+
+    select = sub.add_parser("select", help="Select TCs for a git diff")
+    select.add_argument("--base", default="origin/main", help="Git ref to diff against")
+    select.add_argument("--full", action="store_true", help="Select the full suite (nightly)")
+    select.add_argument("--run", action="store_true", help="Run the selection with plan_executor")
+    select.add_argument("--parallel", type=int, default=4, help="Concurrent browser contexts when running")
+    select.add_argument("--report", action="store_true", help="With --run, also rewrite REGRESSION_TEST_REPORT.md")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        with open(args.run_results) as f:
+            impact_map = build_impact_map(json.load(f))
+        with open(IMPACT_MAP_PATH, "w") as f:
+            json.dump(impact_map, f, indent=2, sort_keys=True)
+        print(f"Impact map for {len(impact_map['cases'])} TC(s) written to {IMPACT_MAP_PATH}")
+        return
+
+    if args.full or os.getenv("TESTSPRITE_FULL_SUITE") == "1":
+        selected, reasons = None, {"*": "full suite requested"}
+    else:
+        selected, reasons = select_cases(changed_files(args.base), load_impact_map())
+
+    if selected is None:
+        print(f"Full suite: {next(iter(reasons.values()))}")
+    elif not selected:
+        print("No TCs affected by this change")
+    else:
+        print(f"Selected {len(selected)} TC(s):")
+        for tc in selected:
+            print(f"  {tc}  <- {reasons[tc]}")
+
+    if args.run and selected != []:
+        import asyncio
+        from testsprite_tests.plan_executor import load_compiled_plan, print_report, run_plan, save_results
+        from testsprite_tests.run_results import REPORT_PATH, RunRecorder
+
+        cases = load_compiled_plan()
+        if selected is not None:
+            cases = [c for c in cases if c.id in selected]
+        recorder = RunRecorder("impact")
+        print(f"Streaming events to {recorder.events_path}")
+        results = asyncio.run(run_plan(cases, parallel=args.parallel, results=recorder))
+        print_report(results)
+        save_results(results)
+        for kind, path in recorder.finish(REPORT_PATH if args.report else None).items():
+            print(f"{kind}: {path}")
+        if any(r["status"] != "passed" for r in results):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
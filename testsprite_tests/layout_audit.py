@@ -0,0 +1,150 @@
+"""
+Layout and Touch-Target Audit
+
+TC013 checks the first ten buttons on one page. This visits every signed-in
+route in selector_registry (one per App.tsx route, so shared pages such as
+Settings are audited for both roles) for its role at phone and tablet widths, in parallel contexts, and runs one dom_probe
+layout pass per route covering every visible interactive element:
+
+- touch targets whose short side is under 44 px
+- the elements that push the document wider than the viewport
+- cumulative layout shift up to the audit, by source element
+
+Before auditing, the registry is checked against the App.tsx route table;
+mismatches are printed, and fail the run under --strict.
+
+    python testsprite_tests/layout_audit.py
+    python testsprite_tests/layout_audit.py --lead-id <uuid> --widths 375 --parallel 8 --strict
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.auth_helper import BASE_URL, get_role_context, launch_browser
+from testsprite_tests.dom_probe import LAYOUT_SHIFT_SCRIPT, layout, probe
+from testsprite_tests.local_stack import ADMIN_EMAIL, ADMIN_PASSWORD, TECH_EMAIL, TECH_PASSWORD
+from testsprite_tests.selector_registry import authenticated_routes, check_routes, screen_named
+
+RESULTS_DIR = "testsprite_tests/tmp/layout_audit"
+HEIGHTS = {375: 812, 768: 1024}
+# Lets late data (lists, images) land so its shifts and overflow are counted
+SETTLE_MS = 1000
+
+
+async def audit_route(browser, storage_state: dict, role: str, route: str, screen: str,
+                      width: int, min_px: float) -> dict:
+    context = await browser.new_context(
+        storage_state=storage_state,
+        viewport={"width": width, "height": HEIGHTS.get(width, 900)},
+        is_mobile=width < 768, has_touch=True,
+    )
+    context.set_default_timeout(20000)
+    await context.add_init_script(LAYOUT_SHIFT_SCRIPT)
+    page = await context.new_page()
+    result = {"role": role, "route": route, "screen": screen, "width": width}
+    start = time.perf_counter()
+    try:
+        await page.goto(f"{BASE_URL}{route}", wait_until="commit")
+        await page.wait_for_selector(screen_named(screen).root, state="visible")
+        await page.wait_for_timeout(SETTLE_MS)
+        result.update((await probe(page, {"layout": layout(min_px=min_px)}))["layout"])
+    except Exception as e:
+        result["error"] = str(e).splitlines()[0]
+    finally:
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000)
+        await context.close()
+    return result
+
+
+async def run_audit(routes: list, widths: list, parallel: int, min_px: float) -> list:
+    from playwright.async_api import async_playwright
+
+    pw = await async_playwright().start()
+    browser = await launch_browser(pw)
+    try:
+        states = {}
+        for role in sorted({role for role, _, _ in routes}):
+            email, password = (ADMIN_EMAIL, ADMIN_PASSWORD) if role == "admin" else (TECH_EMAIL, TECH_PASSWORD)
+            context = await get_role_context(browser, email, password, role.capitalize())
+            states[role] = await context.storage_state()
+            await context.close()
+
+        semaphore = asyncio.Semaphore(parallel)
+
+        async def bounded(role, route, screen, width):
+            async with semaphore:
+                return await audit_route(browser, states[role], role, route, screen, width, min_px)
+
+        return await asyncio.gather(*(bounded(role, route, screen, width)
+                                      for role, route, screen in routes for width in widths))
+    finally:
+        await browser.close()
+        await pw.stop()
+
+
+def print_report(results: list, elapsed_s: float):
+    print(f"\n{'screen':<26} {'width':>5} {'targets':>8} {'small':>6} {'overflow':>9} {'cls':>6} {'ms':>6}")
+    for r in results:
+        if r.get("error"):
+            print(f"{r['screen']:<26} {r['width']:>5}  error: {r['error']}")
+            continue
+        cls = f"{r['cls']:>6.3f}" if r["cls"] is not None else f"{'-':>6}"
+        print(f"{r['screen']:<26} {r['width']:>5} {r['interactive']:>8} {r['touch_violations']:>6}"
+              f" {r['overflow_px']:>7}px {cls} {r['duration_ms']:>6}")
+        for target in r["touch_targets"][:5]:
+            print(f"      small {target['size'][0]}x{target['size'][1]}  {target['element']}")
+        for source in r["overflow_sources"][:3]:
+            print(f"      overflow +{source['overflow_px']}px  {source['element']}")
+        for source in r["shift_sources"][:3]:
+            print(f"      shift {source['value']:.3f}  {source['element']}")
+    audited = [r for r in results if not r.get("error")]
+    print(f"\n{len(audited)}/{len(results)} route/width pairs audited in {elapsed_s:.1f} s: "
+          f"{sum(r['touch_violations'] for r in audited)} small targets, "
+          f"{sum(1 for r in audited if r['overflow_px'])} with horizontal overflow")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit touch targets, overflow and layout shift on every route")
+    parser.add_argument("--widths", nargs="*", type=int, default=[375, 768])
+    parser.add_argument("--roles", nargs="*", choices=["admin", "technician"], default=["admin", "technician"])
+    parser.add_argument("--lead-id", help="Lead for routes that take an id")
+    parser.add_argument("--screens", nargs="*", help="Limit to these screens (e.g. TechnicianJobs)")
+    parser.add_argument("--parallel", type=int, default=6, help="Concurrent browser contexts")
+    parser.add_argument("--min-px", type=float, default=44, help="Minimum touch target side")
+    parser.add_argument("--strict", action="store_true", help="Exit 1 on any small target or overflow")
+    args = parser.parse_args()
+
+    mismatches = check_routes()
+    for problem in mismatches:
+        print(f"Registry out of date: {problem}")
+
+    routes = [r for r in authenticated_routes(args.lead_id) if r[0] in args.roles]
+    if args.screens:
+        routes = [r for r in routes if r[2] in args.screens]
+    if any(role == "technician" for role, _, _ in routes) and not TECH_EMAIL:
+        print("TECH_EMAIL not set; skipping technician routes")
+        routes = [r for r in routes if r[0] != "technician"]
+
+    start = time.perf_counter()
+    results = asyncio.run(run_audit(routes, args.widths, args.parallel, args.min_px))
+    print_report(results, time.perf_counter() - start)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"audit-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {path}")
+
+    if args.strict and (mismatches or any(r.get("error") or r["touch_violations"] or r["overflow_px"]
+                                          for r in results)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Measurement Helpers for TestSprite Benchmarks
+
+Latency percentiles and /proc-based process-tree memory readings shared by
+the benchmark and soak scripts. Stdlib only; the memory helpers need Linux.
+"""
+import math
+import os
+import threading
+
+
+def percentile(values: list, pct: float) -> float:
+    """
+    Nearest-rank percentile of `values`.
+
+    Args:
+        values: Samples in any order
+        pct: Percentile between 0 and 100
+
+    Returns:
+        float: the sample at that rank, or 0.0 when there are no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def children_map() -> dict:
+    """Maps each running pid to the pids of its direct children."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # comm may contain spaces; ppid is the 2nd field after the ')'
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident memory of one process, or 0 if it has exited."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def tree_rss_bytes(pid: int) -> int:
+    """Sums resident memory of `pid` and all of its descendants."""
+    children = children_map()
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        total += rss_bytes(current)
+    return total
+
+
+class RssSampler:
+    """Samples process-tree RSS in a background thread and keeps the peak."""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss_bytes(self.pid))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,300 @@
+"""
+check-photo-moisture-orphans Scaling Benchmark
+
+The orphan sweep selects every unlinked, live photo older than an hour, sorts
+by created_at, filters captions against MOISTURE_CAPTION_RE in JS and returns
+every orphan id. Photos grow by about a hundred per job, so the sweep's cost
+tracks total photo history. This loads synthetic photos in steps (10k to 2M
+by default) and at each size invokes the function on the local stack and
+records:
+
+- wall time, response bytes, checked_count and orphans_found per invocation,
+- peak memory of the edge runtime container while it runs (docker stats),
+- rows examined and buffers for the function's query, from EXPLAIN ANALYZE,
+- ground truth from SQL: candidates, orphans, and the bytes a full sweep
+  would pull into the function and return in orphan_ids.
+
+PostgREST caps responses at max-rows (1000 unless configured), so past that
+the function silently checks only the newest candidates; checked_count and
+orphans_found are compared against the SQL counts to show how many orphans go
+unseen. Sizes are flagged where a full sweep would exceed the hosted edge
+function limits in EDGE_LIMITS.
+
+Synthetic rows have storage_path under SYNTHETIC_PREFIX and are deleted at the
+end unless --keep is given (a later run reuses them). The photos audit
+triggers are disabled while loading and deleting so audit_logs isn't flooded.
+
+    python testsprite_tests/orphan_sweep_benchmark.py
+    python testsprite_tests/orphan_sweep_benchmark.py --sizes 10000 100000 --moisture-share 0.2 --keep
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.local_stack import SERVICE_ROLE_KEY, SUPABASE_URL, http_json, sql_exec, sql_explain, sql_json
+
+RESULTS_DIR = "testsprite_tests/tmp/orphan_sweep"
+FUNCTION = "check-photo-moisture-orphans"
+DEFAULT_SIZES = [10000, 50000, 200000, 500000, 1000000, 2000000]
+SYNTHETIC_PREFIX = "bench/orphan-sweep/"
+EDGE_CONTAINER = os.getenv("EDGE_RUNTIME_CONTAINER", "supabase_edge_runtime_ecyivrxjpsmjmexqatym")
+AUDIT_TRIGGERS = ["audit_photos_insert", "audit_photos_delete"]
+LOAD_BATCH = 250000
+# Hosted Supabase edge function limits (wall clock per request, memory)
+EDGE_LIMITS = {"wall_s": 150, "memory_mb": 256}
+# Parsed JS objects take several times their JSON size in the isolate
+JS_HEAP_FACTOR = 3
+# Same pattern as MOISTURE_CAPTION_RE in the function (case-insensitive)
+CAPTION_RE = r"^moisture$|\d+(\.\d+)?%"
+CANDIDATES_WHERE = ("moisture_reading_id is null and deleted_at is null "
+                    "and created_at < now() - interval '1 hour'")
+_MEM_RE = re.compile(r"([\d.]+)\s*([KMG]i?B|B)")
+_UNITS = {"B": 1, "KB": 1e3, "MB": 1e6, "GB": 1e9, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3}
+
+
+class ContainerMemorySampler:
+    """Streams `docker stats` for a container in the background and keeps the peak."""
+
+    def __init__(self, container: str = EDGE_CONTAINER):
+        self.container = container
+        self.peak = None
+        self._process = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        for line in self._process.stdout:
+            match = _MEM_RE.search(line)
+            if match:
+                used = float(match.group(1)) * _UNITS[match.group(2)]
+                self.peak = max(self.peak or 0, used)
+
+    def __enter__(self):
+        try:
+            self._process = subprocess.Popen(
+                ["docker", "stats", "--format", "{{.MemUsage}}", self.container],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            )
+        except OSError:
+            return self  # no docker CLI; memory is reported as unknown
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._process:
+            self._process.terminate()
+            self._process.wait()
+            self._thread.join(timeout=2)
+
+
+def synthetic_count() -> int:
+    return sql_json(f"select count(*) as n from public.photos where storage_path like '{SYNTHETIC_PREFIX}%'")[0]["n"]
+
+
+def _set_audit_triggers(enabled: bool):
+    action = "enable" if enabled else "disable"
+    sql_exec("; ".join(f"alter table public.photos {action} trigger {t}" for t in AUDIT_TRIGGERS))
+
+
+def load_photos(start: int, stop: int, moisture_share: float, orphan_rate: float, history_days: int):
+    """
+    Inserts synthetic photos start+1..stop.
+
+    Captions: `moisture_share` carry a moisture caption (4 in 5 the "moisture"
+    sentinel, the rest a typed "42.5%"), half the remainder none and half free
+    text. Moisture photos are linked to an existing reading except
+    `orphan_rate` of them. 2% are soft-deleted and 0.1% are inside the one-hour
+    grace period; the rest spread over `history_days`.
+    """
+    reading = sql_json("select id from public.moisture_readings limit 1")
+    linked = f"'{reading[0]['id']}'::uuid" if reading else "null"
+    for batch_start in range(start, stop, LOAD_BATCH):
+        batch_stop = min(batch_start + LOAD_BATCH, stop)
+        sql_exec(f"""
+            insert into public.photos (photo_type, storage_path, file_name, file_size, mime_type,
+                                       caption, moisture_reading_id, deleted_at, created_at)
+            select 'area', '{SYNTHETIC_PREFIX}' || i || '.jpg', i || '.jpg', 350000, 'image/jpeg',
+                   case when r.caption_roll < {moisture_share}
+                          then case when r.kind_roll < 0.8 then 'moisture'
+                                    else round((r.kind_roll * 100)::numeric, 1) || '%' end
+                        when r.kind_roll < 0.5 then null
+                        else 'Area photo ' || i end,
+                   case when r.caption_roll < {moisture_share} and r.link_roll >= {orphan_rate}
+                        then {linked} end,
+                   case when r.delete_roll < 0.02 then now() end,
+                   case when r.age_roll < 0.001 then now() - interval '10 minutes'
+                        else now() - interval '1 hour' - r.age_roll * interval '{history_days} days' end
+            from generate_series({batch_start + 1}, {batch_stop}) i,
+                 -- referencing i makes the lateral roll new values per row
+                 lateral (select random() as caption_roll, random() as kind_roll, random() as link_roll,
+                                 random() as delete_roll, random() as age_roll, i as seq) r
+        """, timeout=1800)
+    sql_exec("analyze public.photos")
+
+
+def delete_synthetic():
+    _set_audit_triggers(False)
+    try:
+        sql_exec(f"delete from public.photos where storage_path like '{SYNTHETIC_PREFIX}%'", timeout=1800)
+    finally:
+        _set_audit_triggers(True)
+
+
+def ground_truth() -> dict:
+    """Candidates and orphans the sweep should see, and what a full sweep would move."""
+    row = sql_json(f"""
+        select count(*) as candidates,
+               count(*) filter (where caption ~* '{CAPTION_RE}') as orphans,
+               coalesce(sum(octet_length(json_build_object(
+                   'id', id, 'caption', caption, 'area_id', area_id,
+                   'inspection_id', inspection_id, 'created_at', created_at)::text) + 1), 0) as candidate_bytes
+        from public.photos where {CANDIDATES_WHERE}
+    """, timeout=1800)[0]
+    row["total_photos"] = sql_json("select count(*) as n from public.photos")[0]["n"]
+    # '"<uuid>",' per id plus the envelope
+    row["full_response_bytes"] = row["orphans"] * 39 + 80
+    return row
+
+
+def _plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def explain_sweep(max_rows: int) -> dict:
+    """Plan of the function's query as PostgREST runs it (ordered, capped at max-rows)."""
+    plan = sql_explain(f"""
+        select id, caption, area_id, inspection_id, created_at from public.photos
+        where {CANDIDATES_WHERE} order by created_at desc limit {max_rows}
+    """)
+    nodes = list(_plan_nodes(plan["Plan"]))
+    scans = [n for n in nodes if "Relation Name" in n]
+    return {
+        "execution_ms": round(plan["Execution Time"], 1),
+        "rows_examined": sum((n.get("Actual Rows", 0) + n.get("Rows Removed by Filter", 0)) * n.get("Actual Loops", 1)
+                             for n in scans),
+        "scan": ", ".join(sorted({f"{n['Node Type']}" + (f" using {n['Index Name']}" if n.get("Index Name") else "")
+                                  for n in scans})),
+        "sort": next((n["Sort Method"] for n in nodes if "Sort Method" in n), None),
+        "shared_hit": plan["Plan"].get("Shared Hit Blocks", 0),
+        "shared_read": plan["Plan"].get("Shared Read Blocks", 0),
+    }
+
+
+def invoke(repeat: int) -> dict:
+    headers = {"apikey": SERVICE_ROLE_KEY, "Authorization": f"Bearer {SERVICE_ROLE_KEY}"}
+    timings, body, status, size = [], None, None, 0
+    with ContainerMemorySampler() as memory:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            status, body, _ = http_json("POST", f"{SUPABASE_URL}/functions/v1/{FUNCTION}", {}, headers,
+                                        timeout=EDGE_LIMITS["wall_s"] + 30)
+            timings.append((time.perf_counter() - start) * 1000)
+            size = len(json.dumps(body)) if isinstance(body, dict) else len(body or b"")
+            if status != 200:
+                break
+    ok = status == 200 and isinstance(body, dict)
+    return {
+        "status": status,
+        "median_ms": round(statistics.median(timings), 1),
+        "max_ms": round(max(timings), 1),
+        "response_bytes": size,
+        "checked_count": body.get("checked_count") if ok else None,
+        "orphans_found": body.get("orphans_found") if ok else None,
+        "peak_memory_mb": round(memory.peak / 1024 ** 2, 1) if memory.peak else None,
+        "error": None if ok else str(body)[:200],
+    }
+
+
+def flags(function: dict, truth: dict) -> list:
+    found = []
+    if function["checked_count"] is not None and function["checked_count"] < truth["candidates"]:
+        found.append(f"capped at {function['checked_count']} of {truth['candidates']} candidates; "
+                     f"{truth['orphans'] - (function['orphans_found'] or 0)} orphans unseen")
+    if function["max_ms"] > EDGE_LIMITS["wall_s"] * 1000:
+        found.append(f"invocation over the {EDGE_LIMITS['wall_s']} s wall-clock limit")
+    if function["peak_memory_mb"] and function["peak_memory_mb"] > EDGE_LIMITS["memory_mb"]:
+        found.append(f"edge runtime peaked over {EDGE_LIMITS['memory_mb']} MB")
+    full_sweep_mb = truth["candidate_bytes"] * JS_HEAP_FACTOR / 1024 ** 2
+    if full_sweep_mb > EDGE_LIMITS["memory_mb"]:
+        found.append(f"an uncapped sweep would hold ~{full_sweep_mb:.0f} MB of candidates "
+                     f"(limit {EDGE_LIMITS['memory_mb']} MB)")
+    return found
+
+
+def measure(size: int, repeat: int, max_rows: int) -> dict:
+    truth = ground_truth()
+    plan = explain_sweep(max_rows)
+    function = invoke(repeat)
+    return {"size": size, **truth, "plan": plan, "function": function, "flags": flags(function, truth)}
+
+
+def print_report(results: list):
+    print(f"\n{'photos':>9} {'cands':>9} {'orphans':>8} {'checked':>8} {'found':>6} {'ms':>8} "
+          f"{'resp B':>8} {'mem MB':>7} {'examined':>9} {'db ms':>7} {'full resp':>10} {'full cand MB':>12}")
+    for r in results:
+        f = r["function"]
+        print(f"{r['total_photos']:>9} {r['candidates']:>9} {r['orphans']:>8} {str(f['checked_count']):>8} "
+              f"{str(f['orphans_found']):>6} {f['median_ms']:>8.0f} {f['response_bytes']:>8} "
+              f"{str(f['peak_memory_mb'] or '-'):>7} {r['plan']['rows_examined']:>9} {r['plan']['execution_ms']:>7.0f} "
+              f"{r['full_response_bytes']:>10} {r['candidate_bytes'] / 1024 ** 2:>12.1f}")
+    for r in results:
+        for flag in r["flags"]:
+            print(f"  {r['size']:>9}: {flag}")
+        if r["function"]["error"]:
+            print(f"  {r['size']:>9}: function {r['function']['status']}: {r['function']['error']}")
+    if results:
+        print(f"\nScan at largest size: {results[-1]['plan']['scan']} (sort: {results[-1]['plan']['sort']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Benchmark {FUNCTION} against growing photo history")
+    parser.add_argument("--sizes", nargs="*", type=int, default=DEFAULT_SIZES, help="Synthetic photo counts")
+    parser.add_argument("--moisture-share", type=float, default=0.1, help="Share of photos with a moisture caption")
+    parser.add_argument("--orphan-rate", type=float, default=0.01, help="Share of moisture photos left unlinked")
+    parser.add_argument("--history-days", type=int, default=730, help="Spread of created_at")
+    parser.add_argument("--repeat", type=int, default=3, help="Invocations per size")
+    parser.add_argument("--max-rows", type=int, default=1000, help="PostgREST max-rows of the stack")
+    parser.add_argument("--keep", action="store_true", help="Leave the synthetic photos in place")
+    args = parser.parse_args()
+    if not SERVICE_ROLE_KEY:
+        parser.error("Set SUPABASE_SERVICE_ROLE_KEY (see `supabase status`)")
+
+    results = []
+    loaded = synthetic_count()
+    try:
+        for size in sorted(args.sizes):
+            if size > loaded:
+                print(f"Loading synthetic photos {loaded} -> {size}")
+                _set_audit_triggers(False)
+                try:
+                    load_photos(loaded, size, args.moisture_share, args.orphan_rate, args.history_days)
+                finally:
+                    _set_audit_triggers(True)
+                loaded = size
+            print(f"Invoking {FUNCTION} at {size} synthetic photos")
+            results.append(measure(size, args.repeat, args.max_rows))
+    finally:
+        if not args.keep:
+            print("Deleting synthetic photos")
+            delete_synthetic()
+
+    print_report(results)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"orphans-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"args": vars(args), "edge_limits": EDGE_LIMITS, "results": results}, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
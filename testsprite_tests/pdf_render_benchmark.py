@@ -0,0 +1,207 @@
+"""
+PDF Renderer Concurrency and Cold-Start Benchmark
+
+Runs api/render-pdf.ts and api/render-job-report-pdf.ts under a local Node
+stand-in of the Vercel runtime (vercel_standin.mjs) and fires 1-32
+concurrent render requests at each. Both handlers call puppeteer.launch with
+@sparticuz/chromium on every invocation; the benchmark measures what that
+costs when the office regenerates reports for a batch of jobs:
+
+- cold (first wave on a fresh process) vs warm latency
+- Chromium launch time per request
+- peak RSS per render (stand-in process plus every Chromium child)
+- PDF bytes and failure rate
+
+Each level is repeated with STANDIN_REUSE_BROWSER=1, where every request
+shares one already-running Chromium, to show what a warm browser would save.
+
+Requires the local Supabase stack, Linux (/proc for RSS) and `npm install`:
+
+    python testsprite_tests/pdf_render_benchmark.py --inspection-id <uuid>
+    python testsprite_tests/pdf_render_benchmark.py --job-completion-id <uuid> --levels 1 4 16
+
+render-pdf runs in 'legacy' mode by default, which renders without writing
+pdf_versions rows. render-job-report-pdf only supports hard_save, so every
+request there creates a version row on the local stack.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.local_stack import ANON_KEY, SUPABASE_URL, http_json, password_token
+from testsprite_tests.measure import RssSampler, children_map, percentile, tree_rss_bytes
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STANDIN_PATH = "testsprite_tests/vercel_standin.mjs"
+RESULTS_DIR = "testsprite_tests/tmp/pdf_bench"
+DEFAULT_LEVELS = [1, 2, 4, 8, 16, 32]
+STANDIN_PORT = int(os.getenv("STANDIN_PORT", "3901"))
+
+
+class StandIn:
+    """A vercel_standin.mjs process serving one handler."""
+
+    def __init__(self, handler: str, reuse_browser: bool, port: int = STANDIN_PORT):
+        self.handler = handler
+        self.reuse_browser = reuse_browser
+        self.port = port
+        self.process = None
+        self.startup_ms = None
+
+    def __enter__(self):
+        env = dict(os.environ, STANDIN_REUSE_BROWSER="1" if self.reuse_browser else "0")
+        env.setdefault("VITE_SUPABASE_URL", SUPABASE_URL)
+        env.setdefault("VITE_SUPABASE_ANON_KEY", ANON_KEY)
+        start = time.perf_counter()
+        self.process = subprocess.Popen(
+            ["npx", "tsx", STANDIN_PATH, self.handler, str(self.port)],
+            cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise Exception(f"Stand-in exited: {self.process.stderr.read().decode()[-500:]}")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        else:
+            raise Exception("Stand-in did not start listening within 60s")
+        self.startup_ms = (time.perf_counter() - start) * 1000
+        return self
+
+    def __exit__(self, *exc):
+        # npx -> node: terminate the whole tree so no Chromium is left behind
+        children = children_map()
+        stack, pids = [self.process.pid], []
+        while stack:
+            pid = stack.pop()
+            pids.append(pid)
+            stack.extend(children.get(pid, []))
+        for pid in reversed(pids):
+            try:
+                os.kill(pid, 15)
+            except OSError:
+                pass
+        self.process.wait(timeout=10)
+
+
+def render_once(port: int, token: str, body: dict) -> dict:
+    """Sends one render request and returns its timing and outcome."""
+    start = time.perf_counter()
+    try:
+        status, payload, headers = http_json(
+            "POST", f"http://127.0.0.1:{port}/", body,
+            {"Authorization": f"Bearer {token}"}, timeout=120,
+        )
+    except Exception as e:
+        return {"ok": False, "status": None, "error": str(e), "latency_ms": (time.perf_counter() - start) * 1000}
+    ok = status == 200 and headers.get("Content-Type") == "application/pdf"
+    return {
+        "ok": ok,
+        "status": status,
+        "latency_ms": (time.perf_counter() - start) * 1000,
+        "handler_ms": float(headers.get("X-Standin-Handler-Ms", 0)),
+        "launch_ms": float(headers.get("X-Standin-Launch-Ms", 0)),
+        "pdf_bytes": len(payload) if ok else 0,
+        "error": None if ok else str(payload)[:200],
+    }
+
+
+def summarise_wave(results: list, peak_rss: int, idle_rss: int, concurrency: int) -> dict:
+    """Aggregates one wave of concurrent requests."""
+    latencies = [r["latency_ms"] for r in results]
+    succeeded = [r for r in results if r["ok"]]
+    return {
+        "requests": len(results),
+        "failures": len(results) - len(succeeded),
+        "failure_rate": round((len(results) - len(succeeded)) / len(results), 3),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "mean_launch_ms": round(statistics.fmean(r.get("launch_ms", 0) for r in results), 1),
+        "mean_pdf_bytes": round(statistics.fmean(r["pdf_bytes"] for r in succeeded)) if succeeded else 0,
+        "peak_rss_per_render_mb": round(max(0, peak_rss - idle_rss) / concurrency / 1024 / 1024, 1),
+        "errors": sorted({r["error"] for r in results if r["error"]})[:3],
+    }
+
+
+def run_level(handler: str, body: dict, token: str, concurrency: int, reuse_browser: bool, warm_waves: int) -> dict:
+    """Starts a fresh stand-in, then runs one cold and `warm_waves` warm waves."""
+    print(f"  {os.path.basename(handler)} x{concurrency} reuse_browser={reuse_browser}...")
+    with StandIn(handler, reuse_browser) as standin, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        idle_rss = tree_rss_bytes(standin.process.pid)
+        waves = []
+        for wave in range(1 + warm_waves):
+            with RssSampler(standin.process.pid) as sampler:
+                results = list(pool.map(lambda _: render_once(standin.port, token, body), range(concurrency)))
+            summary = summarise_wave(results, sampler.peak, idle_rss, concurrency)
+            summary["wave"] = "cold" if wave == 0 else "warm"
+            waves.append(summary)
+    return {
+        "handler": handler,
+        "concurrency": concurrency,
+        "reuse_browser": reuse_browser,
+        "startup_ms": round(standin.startup_ms, 1),
+        "waves": waves,
+    }
+
+
+def print_report(results: list):
+    """Prints one line per handler/level/browser mode/wave."""
+    print(f"\n{'handler':<26} {'conc':>4} {'browser':<8} {'wave':<5} {'p50 ms':>9} {'p95 ms':>9}"
+          f" {'launch ms':>9} {'RSS/render':>10} {'PDF KB':>8} {'fail':>6}")
+    for result in results:
+        for wave in result["waves"]:
+            print(f"{os.path.basename(result['handler']):<26} {result['concurrency']:>4}"
+                  f" {'shared' if result['reuse_browser'] else 'per-req':<8} {wave['wave']:<5}"
+                  f" {wave['p50_ms']:>9.0f} {wave['p95_ms']:>9.0f} {wave['mean_launch_ms']:>9.0f}"
+                  f" {wave['peak_rss_per_render_mb']:>8.0f}MB {wave['mean_pdf_bytes'] / 1024:>8.0f}"
+                  f" {wave['failure_rate']:>6.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the puppeteer PDF render endpoints")
+    parser.add_argument("--inspection-id", help="Inspection UUID for api/render-pdf.ts")
+    parser.add_argument("--job-completion-id", help="Job completion UUID for api/render-job-report-pdf.ts")
+    parser.add_argument("--mode", default="legacy", choices=["legacy", "hard_save"], help="render-pdf mode")
+    parser.add_argument("--levels", nargs="*", type=int, default=DEFAULT_LEVELS, help="Concurrency levels")
+    parser.add_argument("--warm-waves", type=int, default=2, help="Warm waves after the cold wave")
+    parser.add_argument("--skip-shared", action="store_true", help="Skip the shared-browser comparison")
+    args = parser.parse_args()
+
+    targets = []
+    if args.inspection_id:
+        targets.append(("api/render-pdf.ts", {"inspectionId": args.inspection_id, "mode": args.mode}))
+    if args.job_completion_id:
+        targets.append(("api/render-job-report-pdf.ts", {"jobCompletionId": args.job_completion_id, "mode": "hard_save"}))
+    if not targets:
+        parser.error("pass --inspection-id and/or --job-completion-id")
+
+    token = password_token()
+    modes = [False] if args.skip_shared else [False, True]
+    results = []
+    for handler, body in targets:
+        for concurrency in args.levels:
+            for reuse_browser in modes:
+                results.append(run_level(handler, body, token, concurrency, reuse_browser, args.warm_waves))
+
+    print_report(results)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
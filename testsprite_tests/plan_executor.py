@@ -0,0 +1,642 @@
+"""
+Compiled Plan Executor for TestSprite Tests
+
+Runs testsprite_frontend_test_plan.json directly instead of the hand-written
+TC scripts, which have drifted from the plan titles. Each plan entry is
+compiled once into a list of resolved operations (route, selector, timeout),
+the compiled plan is cached on disk keyed by the plan's content hash, and the
+whole plan runs in parallel browser contexts sharing one authenticated
+browser. Every step is timed and reported using the plan's own vocabulary,
+and streamed through run_results.py (events.jsonl, junit.xml, regression
+report under tmp/results/). With --trace, each entry is also traced as
+OpenTelemetry spans through tracing.py (tmp/traces/).
+
+Usage:
+    python testsprite_tests/plan_executor.py
+    python testsprite_tests/plan_executor.py --only TC003 TC005 --parallel 2
+    python testsprite_tests/plan_executor.py --compile-only
+    python testsprite_tests/plan_executor.py --report   # rewrites REGRESSION_TEST_REPORT.md
+    python testsprite_tests/plan_executor.py --trace --only TC013
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlparse
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.auth_helper import (
+    BASE_URL,
+    STORAGE_STATE_PATH,
+    get_authenticated_context,
+)
+from testsprite_tests.clock_control import SETTLE_MS, has_clock, install_clock, run_timers
+from testsprite_tests.code_coverage import CoverageRecorder, summarise
+from testsprite_tests.dom_probe import probe, size
+from testsprite_tests.local_stack import EDGE_FUNCTION_RE
+from testsprite_tests.run_results import REPORT_PATH, RunRecorder
+from testsprite_tests.selector_registry import SelectorRegistry, screen_for_route
+from testsprite_tests.tracing import Tracer
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PLAN_PATH = os.path.join(TESTS_DIR, "testsprite_frontend_test_plan.json")
+PRD_PATH = os.path.join(TESTS_DIR, "standard_prd.json")
+CACHE_PATH = "testsprite_tests/tmp/compiled_plan.json"
+RESULTS_DIR = "testsprite_tests/tmp/plan_runs"
+ENGINES = ["chromium", "firefox", "webkit"]
+
+# The plan and PRD were written against the Sprint 1 route map. These are the
+# routes that replaced them in src/App.tsx.
+ROUTE_ALIASES = {
+    "/login": "/",
+    "/dashboard": "/admin",
+    "/analytics": "/admin/reports",
+    "/leads": "/admin/leads",
+    "/leads-pipeline": "/admin/leads",
+    "/reports": "/admin/reports",
+    "/calendar": "/admin/schedule",
+    "/settings": "/admin/settings",
+    "/inspection/new": "/technician/inspection",
+    "/inspection-select-lead": "/technician/inspection",
+    "/customer-booking": "/request-inspection",
+}
+
+# Feature keyword -> route, used when a step names a screen but not a path.
+# Extended at compile time with the keyFeatures routes from standard_prd.json.
+FEATURE_ROUTES = {
+    "dashboard": "/admin",
+    "inspection": "/technician/inspection",
+    "pipeline": "/admin/leads",
+    "kanban": "/admin/leads",
+    "lead capture": "/request-inspection",
+    "booking": "/admin/schedule",
+    "calendar": "/admin/schedule",
+    "report": "/admin/reports",
+    "pdf": "/admin/reports",
+    "settings": "/admin/settings",
+}
+
+SUBMIT_SELECTOR = 'button[type="submit"]'
+# Action verb -> button label, for steps that name the control they press.
+BUTTON_VERBS = {
+    "regenerate": "Regenerate",
+    "approve": "Approve",
+    "save": "Save",
+    "generat": "Generate",
+}
+FILL_SELECTOR = ("input:visible:not([type=hidden]):not([type=checkbox]):not([type=radio]):not([type=file]), "
+                 "textarea:visible")
+# Input type -> value fill_visible_inputs types; anything else gets "TestSprite".
+FILL_VALUES = {
+    "number": "1",
+    "email": "testsprite@example.com",
+    "tel": "0412 345 678",
+    "date": "2026-01-15",
+}
+MAIN_SELECTOR = "main, #root > *"
+ERROR_SELECTOR = '[role="alert"], .text-destructive'
+
+# A step that matches no compile rule becomes an "unresolved" op and is
+# reported as skipped rather than silently passing. A case whose assertions
+# were all unresolved is reported as incomplete (or skipped), never passed.
+_PATH_RE = re.compile(r"(?<![\w/])(/[a-z][a-z0-9\-/:]*)")
+_SECONDS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:s\b|sec|second)")
+_PIXELS_RE = re.compile(r"(\d+)\s*px")
+
+
+@dataclass
+class Operation:
+    """A single resolved operation compiled from one plan step."""
+    kind: str
+    selector: Optional[str] = None
+    route: Optional[str] = None
+    value: Optional[float] = None
+    timeout_ms: int = 15000
+
+
+@dataclass
+class CompiledStep:
+    """A plan step together with the operations it compiled to."""
+    index: int
+    type: str
+    description: str
+    ops: list = field(default_factory=list)
+
+
+@dataclass
+class CompiledCase:
+    """A compiled plan entry ready for execution."""
+    id: str
+    title: str
+    priority: str
+    start_route: str
+    steps: list = field(default_factory=list)
+
+
+def resolve_route(path: str) -> str:
+    """Maps a plan route onto the current App.tsx route table."""
+    path = path.rstrip("/") or "/"
+    if path in ROUTE_ALIASES:
+        return ROUTE_ALIASES[path]
+    for legacy, current in ROUTE_ALIASES.items():
+        if legacy != "/" and path.startswith(legacy + "/"):
+            return current + path[len(legacy):]
+    return path
+
+
+def load_feature_routes(prd_path: str = PRD_PATH) -> dict:
+    """Returns FEATURE_ROUTES merged with the first route of each PRD key feature."""
+    routes = dict(FEATURE_ROUTES)
+    if not os.path.exists(prd_path):
+        return routes
+    with open(prd_path) as f:
+        prd = json.load(f)
+    for feature in prd.get("code_summary", {}).get("keyFeatures", []):
+        keyword = feature["name"].split()[0].lower()
+        if feature["routes"] and keyword not in routes:
+            routes[keyword] = resolve_route(feature["routes"][0])
+    return routes
+
+
+_FEATURE_ROUTES = None
+
+
+def _route_from_text(text: str) -> Optional[str]:
+    global _FEATURE_ROUTES
+    match = _PATH_RE.search(text)
+    if match:
+        return resolve_route(match.group(1))
+    if _FEATURE_ROUTES is None:
+        _FEATURE_ROUTES = load_feature_routes()
+    lowered = text.lower()
+    for keyword, route in _FEATURE_ROUTES.items():
+        if keyword in lowered:
+            return route
+    return None
+
+
+def compile_step(index: int, step: dict, current_route: str = None) -> CompiledStep:
+    """
+    Compiles one plan step into resolved operations.
+
+    Args:
+        index: Position of the step within its plan entry
+        step: Plan step dict with "type" and "description"
+        current_route: Route the case is on when the step runs; a form step
+            that names another screen's form navigates there first
+
+    Returns:
+        CompiledStep with zero or more operations
+    """
+    description = step["description"]
+    text = description.lower()
+    compiled = CompiledStep(index=index, type=step["type"], description=description)
+    ops = compiled.ops
+    route = _route_from_text(description)
+
+    if step["type"] == "action":
+        if re.search(r"\b(navigate|access|open|start)\b", text) and route:
+            ops.append(Operation("goto", route=route))
+        elif re.search(r"close and reopen|reload", text):
+            ops.append(Operation("reload"))
+        elif text.startswith("wait"):
+            seconds = _SECONDS_RE.search(text)
+            ops.append(Operation("wait", value=float(seconds.group(1)) if seconds else 1.0))
+        elif re.search(r"\bcompleted?\b.*\bform\b", text):
+            # "Submit completed inspection form ..." presumes data the plan
+            # never creates; clicking submit on whatever screen is open would
+            # pass without doing it
+            ops.append(Operation("unresolved"))
+        else:
+            # Form steps compose: "Fill and submit inspection form offline"
+            # goes to the form, drops the network, fills it and submits it.
+            fills = re.search(r"\b(fill|enter|modify)\b", text)
+            submits = re.search(r"\bsubmit\b", text)
+            if (fills or submits) and "form" in text and route and route != current_route:
+                ops.append(Operation("goto", route=route))
+            if re.search(r"back online|reconnect", text):
+                ops.append(Operation("set_offline", value=0))
+            elif re.search(r"offline|loss of network", text):
+                ops.append(Operation("set_offline", value=1))
+            if fills:
+                ops.append(Operation("fill_visible_inputs", selector=FILL_SELECTOR))
+            if submits:
+                ops.append(Operation("click", selector=SUBMIT_SELECTOR))
+            elif any(verb in text for verb in BUTTON_VERBS):
+                label = next(label for verb, label in BUTTON_VERBS.items() if verb in text)
+                ops.append(Operation("click", selector=f'button:has-text("{label}")'))
+            if not ops:
+                ops.append(Operation("unresolved"))
+    else:
+        if re.search(r"under\s+\d|load time", text):
+            seconds = _SECONDS_RE.search(text)
+            ops.append(Operation("assert_load_time", value=float(seconds.group(1)) if seconds else 3.0))
+        elif "touch target" in text:
+            pixels = _PIXELS_RE.search(text)
+            ops.append(Operation("assert_touch_targets", selector="button, input, select, textarea",
+                                 value=float(pixels.group(1)) if pixels else 44.0))
+        elif re.search(r"no application errors|validation messages", text):
+            kind = "assert_no_errors" if "no application errors" in text else "assert_errors_shown"
+            ops.append(Operation(kind, selector=ERROR_SELECTOR))
+        elif re.search(r"\b(appear|visible|display|shown|observe)\b", text):
+            ops.append(Operation("assert_rendered", selector=MAIN_SELECTOR))
+        else:
+            ops.append(Operation("unresolved"))
+
+    return compiled
+
+
+def compile_case(entry: dict) -> CompiledCase:
+    """Compiles a whole plan entry, picking a start route from its steps."""
+    start_route = _route_from_text(entry["title"])
+    for step in entry["steps"]:
+        if start_route:
+            break
+        start_route = _route_from_text(step["description"])
+    start_route = start_route or "/admin"
+
+    case = CompiledCase(
+        id=entry["id"],
+        title=entry["title"],
+        priority=entry.get("priority", ""),
+        start_route=start_route,
+    )
+    current_route = start_route
+    for i, step in enumerate(entry["steps"]):
+        compiled = compile_step(i, step, current_route)
+        current_route = next((op.route for op in reversed(compiled.ops) if op.kind == "goto"), current_route)
+        case.steps.append(compiled)
+    return case
+
+
+def _plan_digest(plan_path: str) -> str:
+    digest = hashlib.sha256()
+    for path in (plan_path, PRD_PATH, __file__):
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _case_from_dict(data: dict) -> CompiledCase:
+    steps = [
+        CompiledStep(
+            index=s["index"], type=s["type"], description=s["description"],
+            ops=[Operation(**op) for op in s["ops"]],
+        )
+        for s in data["steps"]
+    ]
+    return CompiledCase(
+        id=data["id"], title=data["title"], priority=data["priority"],
+        start_route=data["start_route"], steps=steps,
+    )
+
+
+def load_compiled_plan(plan_path: str = PLAN_PATH, force: bool = False) -> list:
+    """
+    Returns the compiled plan, reusing the on-disk cache when the plan is unchanged.
+
+    Args:
+        plan_path: Path to the TestSprite frontend test plan
+        force: If True, recompiles even if a matching cache exists
+
+    Returns:
+        list[CompiledCase] in plan order
+    """
+    digest = _plan_digest(plan_path)
+    if not force and os.path.exists(CACHE_PATH):
+        with open(CACHE_PATH) as f:
+            cached = json.load(f)
+        if cached.get("digest") == digest:
+            return [_case_from_dict(c) for c in cached["cases"]]
+
+    with open(plan_path) as f:
+        plan = json.load(f)
+    cases = [compile_case(entry) for entry in plan]
+
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    with open(CACHE_PATH, "w") as f:
+        json.dump({"digest": digest, "cases": [asdict(c) for c in cases]}, f, indent=2)
+    print(f"Compiled {len(cases)} plan entries to {CACHE_PATH}")
+    return cases
+
+
+class _PageOps:
+    """Executes compiled operations against one page, caching locators per selector."""
+
+    def __init__(self, page):
+        self.page = page
+        self.locators = {}
+        self.registry = SelectorRegistry(page)
+        self.console_errors = []
+        self.last_load_s = None
+        self.edge_functions = set()
+        page.on("console", self._on_console)
+        page.on("request", self._on_request)
+
+    def detach(self):
+        """Removes this runner's listeners so a long-lived page can be reused."""
+        self.page.remove_listener("console", self._on_console)
+        self.page.remove_listener("request", self._on_request)
+
+    def _on_console(self, msg):
+        if msg.type == "error":
+            self.console_errors.append(msg.text)
+
+    def _on_request(self, request):
+        match = EDGE_FUNCTION_RE.search(request.url)
+        if match:
+            self.edge_functions.add(match.group(1))
+
+    def locator(self, selector: str):
+        if selector not in self.locators:
+            self.locators[selector] = self.page.locator(selector)
+        return self.locators[selector]
+
+    async def goto(self, route: str, timeout_ms: int):
+        start = time.perf_counter()
+        await self.page.goto(f"{BASE_URL}{route}", wait_until="networkidle", timeout=timeout_ms)
+        self.last_load_s = time.perf_counter() - start
+
+    async def run(self, op: Operation) -> str:
+        """Runs one operation. Returns a short detail string; raises on failure."""
+        page = self.page
+        if op.kind == "goto":
+            await self.goto(op.route, op.timeout_ms)
+            return f"{op.route} in {self.last_load_s:.2f}s"
+        if op.kind == "reload":
+            await page.reload(wait_until="networkidle", timeout=op.timeout_ms)
+            return page.url
+        if op.kind == "wait":
+            if has_clock(page):
+                # Fire the timers the plan is waiting on instead of sleeping,
+                # keeping up to a second of real time for the requests they send
+                await run_timers(page, int(op.value * 1000))
+                await page.wait_for_timeout(max(SETTLE_MS, min(op.value * 1000, 1000)))
+                return f"{op.value:g}s (virtual)"
+            await page.wait_for_timeout(op.value * 1000)
+            return f"{op.value:g}s"
+        if op.kind == "set_offline":
+            await page.context.set_offline(bool(op.value))
+            return "offline" if op.value else "online"
+        if op.kind == "click":
+            target = self.locator(op.selector).first
+            await target.click(timeout=op.timeout_ms)
+            return op.selector
+        if op.kind == "fill_visible_inputs":
+            # locator.fill types through the browser, so React's controlled
+            # inputs see the change (a bare `el.value = ...` is ignored)
+            fields = self.locator(op.selector)
+            filled = 0
+            for i in range(await fields.count()):
+                target = fields.nth(i)
+                if not await target.is_editable() or await target.input_value():
+                    continue
+                kind = (await target.get_attribute("type") or "text").lower()
+                await target.fill(FILL_VALUES.get(kind, "TestSprite"), timeout=op.timeout_ms)
+                filled += 1
+            return f"{filled} field(s)"
+        if op.kind == "assert_rendered":
+            assert "/login" not in page.url and page.url.rstrip("/") != BASE_URL, f"Bounced to login: {page.url}"
+            screen = screen_for_route(urlparse(page.url).path)
+            if screen:
+                await self.registry.wait_for_screen(screen.name, timeout=op.timeout_ms)
+                return screen.name
+            count = await self.locator(op.selector).count()
+            assert count > 0, f"Nothing rendered for {op.selector}"
+            return f"{count} match(es)"
+        if op.kind == "assert_load_time":
+            assert self.last_load_s is not None, "No navigation timed yet"
+            assert self.last_load_s < op.value, f"Load took {self.last_load_s:.2f}s (limit {op.value:g}s)"
+            return f"{self.last_load_s:.2f}s < {op.value:g}s"
+        if op.kind == "assert_touch_targets":
+            results = await probe(page, {"targets": size(op.selector, min_px=op.value)})
+            small = results["targets"]["violations"]
+            assert small == 0, f"{small} target(s) under {op.value:g}px: {results['targets']['smallest']}"
+            return f"{results['targets']['count']} target(s) >= {op.value:g}px"
+        if op.kind == "assert_errors_shown":
+            count = await self.locator(op.selector).count()
+            assert count > 0, "No validation messages shown"
+            return f"{count} message(s)"
+        if op.kind == "assert_no_errors":
+            assert not self.console_errors, f"Console errors: {self.console_errors[:3]}"
+            return "clean console"
+        raise ValueError(f"Unknown operation kind {op.kind!r}; recompile the plan with --recompile")
+
+
+async def run_case(browser, case: CompiledCase, coverage: bool = False, page=None, step_hook=None,
+                   tracer=None) -> dict:
+    """
+    Runs one compiled plan entry in its own browser context.
+
+    Args:
+        browser: Shared Playwright browser
+        case: CompiledCase to execute
+        coverage: If True, records JS/CSS coverage for the whole case
+        page: Existing page to run in instead of a fresh context (left open)
+        step_hook: Optional async callable(step, step_result) awaited before
+            each step (step_result None) and after it
+        tracer: Optional tracing.Tracer; the case, its steps and its requests
+            become one trace, with traceparent sent to Supabase
+
+    Returns:
+        dict: Case result with per-step timings
+    """
+    owns_context = page is None
+    if owns_context:
+        context = await browser.new_context(storage_state=STORAGE_STATE_PATH)
+        context.set_default_timeout(30000)
+        await install_clock(context)
+        page = await context.new_page()
+    runner = _PageOps(page)
+    recorder = CoverageRecorder(page) if coverage else None
+    asserted = 0
+    result = {"id": case.id, "title": case.title, "status": "passed", "steps": []}
+    trace = None
+    case_start = time.perf_counter()
+
+    try:
+        if tracer:
+            trace = await tracer.attach(page, case.id, case.title)
+            step_hook = trace.step_hook(step_hook)
+        if recorder:
+            await recorder.start()
+        await runner.goto(case.start_route, 30000)
+        for step in case.steps:
+            step_result = {
+                "index": step.index,
+                "type": step.type,
+                "description": step.description,
+                "status": "passed",
+                "details": [],
+            }
+            if step_hook:
+                await step_hook(step, None)
+            start = time.perf_counter()
+            for op in step.ops:
+                if op.kind == "unresolved":
+                    step_result["status"] = "skipped"
+                    continue
+                try:
+                    step_result["details"].append(await runner.run(op))
+                    if op.kind.startswith("assert_"):
+                        asserted += 1
+                except Exception as e:
+                    step_result["status"] = "failed"
+                    step_result["error"] = str(e).splitlines()[0]
+                    break
+            step_result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            if step_hook:
+                await step_hook(step, step_result)
+            result["steps"].append(step_result)
+            if step_result["status"] == "failed":
+                result["status"] = "failed"
+                break
+        if result["status"] == "passed" and not asserted:
+            # Nothing was checked, so nothing passed
+            unresolved = sum(1 for s in result["steps"] if s["status"] == "skipped")
+            result["status"] = "incomplete" if unresolved < len(result["steps"]) else "skipped"
+            result["error"] = f"No assertion executed ({unresolved} of {len(result['steps'])} steps unresolved)"
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e).splitlines()[0]
+    finally:
+        result["duration_ms"] = round((time.perf_counter() - case_start) * 1000, 1)
+        result["selectors"] = runner.registry.summary()
+        result["edge_functions"] = sorted(runner.edge_functions)
+        if recorder:
+            chunks = await recorder.stop()
+            result["coverage"] = {"summary": summarise(chunks), "chunks": chunks}
+        if trace:
+            await trace.detach(result["status"], result.get("error"))
+        if owns_context:
+            await context.close()
+        else:
+            runner.detach()
+
+    return result
+
+
+async def run_plan(cases: list, parallel: int = 4, coverage: bool = False, engine: str = "chromium",
+                   results=None, tracer=None) -> list:
+    """
+    Runs compiled plan entries concurrently, at most `parallel` contexts at a time.
+
+    Args:
+        cases: list[CompiledCase] to run
+        parallel: Maximum number of concurrent browser contexts
+        coverage: If True, records JS/CSS coverage per plan entry (Chromium only)
+        engine: Browser engine ("chromium", "firefox" or "webkit")
+        results: Optional run_results.RunRecorder that streams step events
+            and collects each case result
+        tracer: Optional tracing.Tracer that traces every case
+
+    Returns:
+        list[dict] of case results in plan order
+    """
+    from playwright.async_api import async_playwright
+
+    pw = await async_playwright().start()
+    # Log in once so every context can reuse the saved storage state
+    browser, context = await get_authenticated_context(pw, engine=engine)
+    await context.close()
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def bounded(case):
+        async with semaphore:
+            print(f"Running {case.id}: {case.title}")
+            if results is None:
+                return await run_case(browser, case, coverage=coverage, tracer=tracer)
+            result = await run_case(browser, case, coverage=coverage, tracer=tracer,
+                                    step_hook=results.plan_hook(case.id, case.title))
+            results.add_plan_result(result)
+            return result
+
+    try:
+        return await asyncio.gather(*(bounded(case) for case in cases))
+    finally:
+        await browser.close()
+        await pw.stop()
+
+
+def print_report(results: list):
+    """Prints a per-step timing table for each case."""
+    for result in results:
+        print(f"\n{result['id']} [{result['status'].upper()}] {result['title']} ({result['duration_ms']:.0f} ms)")
+        if result.get("error"):
+            print(f"  error: {result['error']}")
+        for step in result["steps"]:
+            detail = step.get("error") or "; ".join(step["details"])
+            print(f"  {step['duration_ms']:>9.1f} ms  {step['status']:<7} {step['type']:<9} {step['description'][:70]}")
+            if detail:
+                print(f"               -> {detail[:100]}")
+
+    counts = Counter(r["status"] for r in results)
+    others = ", ".join(f"{n} {status}" for status, n in counts.items() if status != "passed")
+    print(f"\n{counts['passed']}/{len(results)} plan entries passed" + (f" ({others})" if others else ""))
+
+
+def save_results(results: list) -> str:
+    """Writes run results to a timestamped JSON file and returns its path."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"run-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {path}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the TestSprite frontend plan directly")
+    parser.add_argument("--only", nargs="*", help="Plan entry ids to run (e.g. TC003 TC005)")
+    parser.add_argument("--parallel", type=int, default=4, help="Concurrent browser contexts")
+    parser.add_argument("--recompile", action="store_true", help="Ignore the compiled plan cache")
+    parser.add_argument("--compile-only", action="store_true", help="Print compiled ops and exit")
+    parser.add_argument("--coverage", action="store_true", help="Record JS/CSS coverage per plan entry")
+    parser.add_argument("--engine", default="chromium", choices=ENGINES, help="Browser engine")
+    parser.add_argument("--report", action="store_true", help="Also rewrite REGRESSION_TEST_REPORT.md")
+    parser.add_argument("--trace", action="store_true", help="Write OpenTelemetry spans to tmp/traces/")
+    parser.add_argument("--otlp-endpoint", help="Also send spans to this OTLP/HTTP collector "
+                                                "(e.g. http://localhost:4318/v1/traces); implies --trace")
+    args = parser.parse_args()
+    if args.coverage and args.engine != "chromium":
+        parser.error("--coverage needs CDP, which only Chromium has")
+
+    cases = load_compiled_plan(force=args.recompile)
+    if args.only:
+        cases = [c for c in cases if c.id in args.only]
+
+    if args.compile_only:
+        for case in cases:
+            checks = sum(1 for step in case.steps for op in step.ops if op.kind.startswith("assert_"))
+            print(f"{case.id} start={case.start_route}" + ("" if checks else "  (no executable assertion)"))
+            for step in case.steps:
+                kinds = ", ".join(op.kind for op in step.ops)
+                print(f"  [{kinds}] {step.description}")
+        return
+
+    recorder = RunRecorder("plan")
+    tracer = Tracer("plan", endpoint=args.otlp_endpoint) if args.trace or args.otlp_endpoint else None
+    results = asyncio.run(run_plan(cases, parallel=args.parallel, coverage=args.coverage, engine=args.engine,
+                                   results=recorder, tracer=tracer))
+    print_report(results)
+    save_results(results)
+    if tracer:
+        print(f"Imported {tracer.import_function_spans()} edge function span(s)")
+        for kind, path in tracer.export().items():
+            print(f"{kind}: {path}")
+    for kind, path in recorder.finish(REPORT_PATH if args.report else None).items():
+        print(f"{kind}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Per-Screen and Per-Step Postgres Query Attribution
+
+Snapshots pg_stat_statements on the local Supabase Postgres before and after
+each screen load or plan step and attributes the difference to it, so each
+screen can be tied to the PostgREST queries it drives. Only statements run as
+the PostgREST request roles (anon, authenticated, service_role) are counted,
+which leaves out Realtime, auth and cron housekeeping. Scopes run one at a
+time; anything else writing to the database in the meantime is attributed to
+the running scope.
+
+Screens default to the ones the plan calls /leads-pipeline, /calendar,
+/reports and the inspection form, mapped to their current routes through
+plan_executor's ROUTE_ALIASES.
+
+    python testsprite_tests/query_attribution.py --lead-id <uuid>
+    python testsprite_tests/query_attribution.py --only TC003 TC010 --per-step
+    python testsprite_tests/query_attribution.py --routes /admin/leads --top 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.auth_helper import BASE_URL, get_authenticated_context, get_role_context, launch_browser
+from testsprite_tests.local_stack import ADMIN_EMAIL, ADMIN_PASSWORD, TECH_EMAIL, TECH_PASSWORD, sql_json
+from testsprite_tests.plan_executor import load_compiled_plan, resolve_route, run_case
+from testsprite_tests.selector_registry import screen_for_route
+
+RESULTS_DIR = "testsprite_tests/tmp/query_attribution"
+LEGACY_SCREENS = ["/leads-pipeline", "/calendar", "/reports", "/inspection/new"]
+REQUEST_ROLES = ("anon", "authenticated", "service_role")
+# Lets follow-up queries (counts, related rows) land after the screen renders
+SETTLE_MS = 2000
+
+
+def _stats_relation() -> str:
+    """pg_stat_statements qualified with the schema Supabase installed it in."""
+    rows = sql_json("select extnamespace::regnamespace::text as schema from pg_extension "
+                    "where extname = 'pg_stat_statements'")
+    if not rows:
+        raise Exception("pg_stat_statements is not installed; run "
+                        "`create extension pg_stat_statements with schema extensions`")
+    return f"{rows[0]['schema']}.pg_stat_statements"
+
+
+def snapshot(relation: str, roles: tuple = REQUEST_ROLES) -> dict:
+    """
+    Cumulative counters per statement for the current database.
+
+    pg_stat_statements keeps one entry per (queryid, user, toplevel), so the
+    same statement run by two roles, or both directly and nested inside a
+    function, has separate counters; they are keyed apart here too.
+
+    Returns:
+        dict: (queryid, role, toplevel) -> {query, calls, total_ms, rows, blks_hit, blks_read}
+    """
+    role_list = ", ".join(f"'{r}'" for r in roles)
+    rows = sql_json(f"""
+        select s.queryid::text as queryid, r.rolname as role, s.toplevel, s.query, s.calls,
+               s.total_exec_time as total_ms, s.rows,
+               s.shared_blks_hit as blks_hit, s.shared_blks_read as blks_read
+        from {relation} s
+        join pg_roles r on r.oid = s.userid
+        where s.dbid = (select oid from pg_database where datname = current_database())
+          and r.rolname in ({role_list})
+    """)
+    return {(row.pop("queryid"), row.pop("role"), row.pop("toplevel")): row for row in rows}
+
+
+def diff(before: dict, after: dict) -> list:
+    """Statements whose call count grew between two snapshots, with the deltas."""
+    deltas = []
+    for key, now in after.items():
+        then = before.get(key, {"calls": 0, "total_ms": 0.0, "rows": 0, "blks_hit": 0, "blks_read": 0})
+        calls = now["calls"] - then["calls"]
+        # A drop means pg_stat_statements was reset between snapshots
+        if calls <= 0:
+            continue
+        queryid, role, toplevel = key
+        deltas.append({
+            "queryid": queryid,
+            "query": " ".join(now["query"].split()),
+            "role": role,
+            "toplevel": toplevel,
+            "calls": calls,
+            "total_ms": round(now["total_ms"] - then["total_ms"], 2),
+            "rows": now["rows"] - then["rows"],
+            "blks_hit": now["blks_hit"] - then["blks_hit"],
+            "blks_read": now["blks_read"] - then["blks_read"],
+        })
+    return sorted(deltas, key=lambda d: d["total_ms"], reverse=True)
+
+
+class Attribution:
+    """Takes snapshots around scopes and keeps the per-scope deltas."""
+
+    def __init__(self, roles: tuple = REQUEST_ROLES):
+        self.relation = _stats_relation()
+        self.roles = roles
+        self.scopes = []
+        self._before = None
+
+    async def start(self):
+        self._before = await asyncio.to_thread(snapshot, self.relation, self.roles)
+
+    async def stop(self, scope: str, **labels):
+        after = await asyncio.to_thread(snapshot, self.relation, self.roles)
+        statements = diff(self._before, after)
+        # Nested statements' time is already inside the top-level call's
+        toplevel = [s for s in statements if s["toplevel"]]
+        self.scopes.append({
+            "scope": scope,
+            **labels,
+            "statements": statements,
+            "calls": sum(s["calls"] for s in toplevel),
+            "total_ms": round(sum(s["total_ms"] for s in toplevel), 2),
+            "rows": sum(s["rows"] for s in toplevel),
+        })
+        self._before = after
+
+
+async def _role_state(browser, role: str, states: dict) -> dict:
+    if role not in states:
+        email, password = (ADMIN_EMAIL, ADMIN_PASSWORD) if role == "admin" else (TECH_EMAIL, TECH_PASSWORD)
+        if not email:
+            raise Exception("Set TECH_EMAIL/TECH_PASSWORD for technician screens")
+        context = await get_role_context(browser, email, password, role.capitalize())
+        states[role] = await context.storage_state()
+        await context.close()
+    return states[role]
+
+
+async def attribute_routes(browser, attribution: Attribution, routes: list, lead_id: str = None):
+    states = {}
+    for legacy in routes:
+        route = resolve_route(legacy)
+        screen = screen_for_route(route)
+        if screen is None:
+            print(f"  {legacy}: no registered screen, skipping")
+            continue
+        if screen.name == "TechnicianInspectionForm":
+            if not lead_id:
+                print(f"  {legacy}: needs --lead-id, skipping")
+                continue
+            route = f"{route}?leadId={lead_id}"
+        context = await browser.new_context(storage_state=await _role_state(browser, screen.role, states))
+        context.set_default_timeout(30000)
+        page = await context.new_page()
+        print(f"  {legacy} -> {route}")
+        await attribution.start()
+        try:
+            await page.goto(f"{BASE_URL}{route}", wait_until="domcontentloaded")
+            await page.wait_for_selector(screen.root, state="visible")
+            await page.wait_for_timeout(SETTLE_MS)
+        except Exception as e:
+            print(f"    {str(e).splitlines()[0]}")
+        finally:
+            await context.close()
+            await attribution.stop(legacy, route=route, screen=screen.name)
+
+
+async def attribute_cases(browser, attribution: Attribution, cases: list, per_step: bool):
+    for case in cases:
+        print(f"  {case.id}: {case.title}")
+
+        async def hook(step, step_result):
+            if step_result is None:
+                await attribution.start()
+            else:
+                await attribution.stop(f"{case.id} step {step.index}", case=case.id,
+                                       step=step.description[:70], status=step_result["status"])
+
+        if per_step:
+            await run_case(browser, case, step_hook=hook)
+        else:
+            await attribution.start()
+            result = await run_case(browser, case)
+            await attribution.stop(case.id, case=case.id, status=result["status"])
+
+
+async def run(args) -> list:
+    from playwright.async_api import async_playwright
+
+    attribution = Attribution()
+    pw = await async_playwright().start()
+    if args.only:
+        # run_case uses the shared session saved by get_authenticated_context
+        browser, context = await get_authenticated_context(pw)
+        await context.close()
+    else:
+        browser = await launch_browser(pw)
+    try:
+        if args.only:
+            cases = [c for c in load_compiled_plan() if c.id in args.only]
+            await attribute_cases(browser, attribution, cases, args.per_step)
+        else:
+            await attribute_routes(browser, attribution, args.routes, args.lead_id)
+    finally:
+        await browser.close()
+        await pw.stop()
+    return attribution.scopes
+
+
+def print_report(scopes: list, top: int):
+    for scope in scopes:
+        label = scope["scope"] + (f" -> {scope['route']}" if scope.get("route") else "")
+        if scope.get("step"):
+            label += f"  {scope['step']}"
+        print(f"\n{label}: {scope['calls']} calls, {scope['total_ms']:.1f} ms, {scope['rows']} rows")
+        statements = scope["statements"]
+        for key, title in (("total_ms", "by total time"), ("calls", "by calls"), ("rows", "by rows")):
+            if not statements:
+                break
+            print(f"  top {title}")
+            for s in sorted(statements, key=lambda s: s[key], reverse=True)[:top]:
+                nested = "" if s["toplevel"] else "(nested) "
+                print(f"    {s['total_ms']:>9.1f} ms {s['calls']:>5}x {s['rows']:>7} rows  {s['role']:<13} "
+                      f"{nested}{s['query'][:90]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Attribute pg_stat_statements deltas to screens or plan steps")
+    parser.add_argument("--routes", nargs="*", default=LEGACY_SCREENS, help="Screens to load (legacy paths are mapped)")
+    parser.add_argument("--lead-id", help="Lead for the inspection form")
+    parser.add_argument("--only", nargs="*", help="Attribute plan entries instead of screen loads")
+    parser.add_argument("--per-step", action="store_true", help="With --only, attribute each step separately")
+    parser.add_argument("--top", type=int, default=5, help="Statements per ranking")
+    args = parser.parse_args()
+
+    scopes = asyncio.run(run(args))
+    print_report(scopes, args.top)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"attribution-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(scopes, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""
+Realtime Subscriber Swarm
+
+Models every open tab's realtime subscriptions without browsers. Each
+simulated tab is one websocket to Supabase Realtime (Phoenix protocol,
+vsn 1.0.0) joining the channels the app opens for its role:
+
+- admin:      notifications-changes (notifications, user_id=eq.<id>) and
+              inspection-leads-changes (leads, status=eq.inspection_waiting)
+- technician: notifications-changes and technician-jobs-<id>
+              (calendar_bookings, assigned_to=eq.<id>)
+
+After the swarm has subscribed, notifications are inserted for one user at
+rising write rates. Every tab of that user should get every insert, so per
+stage the report gives delivered vs expected (loss) and delivery latency
+from the insert request and from the commit timestamp. Subscribe time is
+from phx_join to the "Subscribed to PostgreSQL" system message.
+
+Realtime only streams tables in the supabase_realtime publication; the
+migrations add calendar_bookings only. The publication is checked first,
+and --publish adds notifications for the run (local stack only) and
+removes it afterwards.
+
+    python testsprite_tests/realtime_swarm.py --tabs 500 --publish
+    python testsprite_tests/realtime_swarm.py --tabs 2000 --tech-share 0.8 --rates 1 10 50 100
+"""
+import argparse
+import asyncio
+import base64
+import datetime as dt
+import json
+import os
+import resource
+import struct
+import sys
+import time
+import uuid
+from urllib.parse import urlsplit
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.local_stack import (
+    ADMIN_EMAIL,
+    ADMIN_PASSWORD,
+    ANON_KEY,
+    SERVICE_ROLE_KEY,
+    SUPABASE_URL,
+    TECH_EMAIL,
+    TECH_PASSWORD,
+    http_json,
+    jwt_claims,
+    password_token,
+    sql_exec,
+    sql_json,
+)
+from testsprite_tests.measure import percentile
+
+RESULTS_DIR = "testsprite_tests/tmp/realtime_swarm"
+HEARTBEAT_S = 25
+SUBSCRIBE_TIMEOUT_S = 30
+MARKER = "realtime-swarm"
+
+
+class WebSocket:
+    """Minimal RFC 6455 client over asyncio streams: text frames, ping/pong, close."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, url: str, timeout: float = 15):
+        parts = urlsplit(url)
+        secure = parts.scheme == "wss"
+        port = parts.port or (443 if secure else 80)
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, port, ssl=secure or None), timeout)
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        writer.write((f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+        status = head.split(b"\r\n", 1)[0]
+        if b" 101 " not in status + b" ":
+            writer.close()
+            raise Exception(f"websocket upgrade refused: {status.decode(errors='replace')}")
+        return cls(reader, writer)
+
+    def _frame(self, opcode: int, payload: bytes) -> bytes:
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, 0x80 | length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 0x80 | 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 0x80 | 127, length)
+        mask = os.urandom(4)
+        if not payload:
+            return header + mask
+        repeated = (mask * (length // 4 + 1))[:length]
+        masked = (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(length, "big")
+        return header + mask + masked
+
+    async def send(self, text: str):
+        self.writer.write(self._frame(0x1, text.encode()))
+        await self.writer.drain()
+
+    async def recv(self):
+        """Next text message, or None once the server closes."""
+        message = b""
+        while True:
+            first, second = await self.reader.readexactly(2)
+            opcode, length = first & 0x0F, second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+            mask = await self.reader.readexactly(4) if second & 0x80 else None
+            payload = await self.reader.readexactly(length)
+            if mask:
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+            if opcode == 0x8:
+                return None
+            if opcode == 0x9:
+                self.writer.write(self._frame(0xA, payload))
+                continue
+            if opcode == 0xA:
+                continue
+            message += payload
+            if first & 0x80:
+                return message.decode()
+
+    async def close(self):
+        try:
+            self.writer.write(self._frame(0x8, struct.pack("!H", 1000)))
+            await self.writer.drain()
+        except (ConnectionError, RuntimeError):
+            pass
+        self.writer.close()
+
+
+def channel_configs(role: str, user_id: str) -> dict:
+    """Channel name -> postgres_changes config, as the hooks subscribe for `role`."""
+    channels = {"notifications-changes": {"event": "*", "schema": "public", "table": "notifications",
+                                          "filter": f"user_id=eq.{user_id}"}}
+    if role == "admin":
+        channels["inspection-leads-changes"] = {"event": "*", "schema": "public", "table": "leads",
+                                                "filter": "status=eq.inspection_waiting"}
+    else:
+        channels[f"technician-jobs-{user_id}"] = {"event": "*", "schema": "public", "table": "calendar_bookings",
+                                                  "filter": f"assigned_to=eq.{user_id}"}
+    return channels
+
+
+class Tab:
+    """One simulated browser tab: a socket and the role's channels."""
+
+    def __init__(self, index: int, role: str, user_id: str, token: str, swarm):
+        self.index = index
+        self.role = role
+        self.user_id = user_id
+        self.token = token
+        self.swarm = swarm
+        self.socket = None
+        self.ref = 0
+        self.joins = {}
+        self.subscribe_ms = {}
+        self.errors = []
+        self._tasks = []
+
+    def _next_ref(self) -> str:
+        self.ref += 1
+        return str(self.ref)
+
+    async def open(self, url: str):
+        self.socket = await WebSocket.connect(url)
+        self._tasks = [asyncio.create_task(self._read()), asyncio.create_task(self._heartbeat())]
+        for name, config in channel_configs(self.role, self.user_id).items():
+            ref = self._next_ref()
+            self.joins[f"realtime:{name}"] = (time.perf_counter(), asyncio.get_running_loop().create_future())
+            await self.socket.send(json.dumps({
+                "topic": f"realtime:{name}", "event": "phx_join", "ref": ref, "join_ref": ref,
+                "payload": {"config": {"broadcast": {"ack": False, "self": False}, "presence": {"key": ""},
+                                       "postgres_changes": [config], "private": False},
+                            "access_token": self.token},
+            }))
+        results = await asyncio.wait_for(asyncio.gather(*(future for _, future in self.joins.values()),
+                                                        return_exceptions=True), SUBSCRIBE_TIMEOUT_S)
+        for result in results:
+            if isinstance(result, Exception):
+                self.errors.append(str(result))
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_S)
+            await self.socket.send(json.dumps({"topic": "phoenix", "event": "heartbeat", "payload": {},
+                                               "ref": self._next_ref()}))
+
+    def _settle(self, topic: str, error: str = None):
+        started, future = self.joins.get(topic, (None, None))
+        if future is None or future.done():
+            return
+        if error:
+            future.set_exception(Exception(f"{topic}: {error}"))
+        else:
+            self.subscribe_ms[topic] = (time.perf_counter() - started) * 1000
+            future.set_result(True)
+
+    async def _read(self):
+        try:
+            while True:
+                raw = await self.socket.recv()
+                if raw is None:
+                    break
+                received = time.perf_counter()
+                message = json.loads(raw)
+                event, topic, payload = message.get("event"), message.get("topic"), message.get("payload") or {}
+                if event == "system" and payload.get("extension") == "postgres_changes":
+                    self._settle(topic, None if payload.get("status") == "ok" else payload.get("message"))
+                elif event == "phx_reply" and payload.get("status") == "error":
+                    self._settle(topic, json.dumps(payload.get("response"))[:200])
+                elif event == "phx_error" or event == "phx_close":
+                    self._settle(topic, event)
+                elif event == "postgres_changes":
+                    self.swarm.delivered(self, payload.get("data") or {}, received)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        for topic in self.joins:
+            self._settle(topic, "socket closed")
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        if self.socket:
+            await self.socket.close()
+
+
+class Swarm:
+    """Holds the tabs and matches deliveries to the writes that caused them."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.tabs = []
+        self.sent = {}
+        self.deliveries = {}
+
+    def delivered(self, tab: Tab, data: dict, received: float):
+        record = data.get("record") or {}
+        title = record.get("title") or ""
+        if data.get("type") != "INSERT" or not title.startswith(f"{MARKER}:{self.run_id}:"):
+            return
+        seq = int(title.rsplit(":", 1)[1])
+        sent = self.sent.get(seq)
+        commit = data.get("commit_timestamp")
+        commit_ms = None
+        if commit:
+            committed = dt.datetime.fromisoformat(commit.replace("Z", "+00:00"))
+            commit_ms = (time.time() - (time.perf_counter() - received) - committed.timestamp()) * 1000
+        self.deliveries.setdefault(seq, []).append({
+            "tab": tab.index,
+            "ms": (received - sent) * 1000 if sent else None,
+            "commit_ms": commit_ms,
+        })
+
+
+def realtime_url() -> str:
+    base = SUPABASE_URL.replace("https://", "wss://").replace("http://", "ws://")
+    return f"{base}/realtime/v1/websocket?apikey={ANON_KEY}&vsn=1.0.0"
+
+
+def published_tables() -> set:
+    rows = sql_json("select tablename from pg_publication_tables where pubname = 'supabase_realtime'")
+    return {row["tablename"] for row in rows}
+
+
+async def open_tabs(swarm: Swarm, users: dict, tabs: int, tech_share: float, connect_parallel: int):
+    semaphore = asyncio.Semaphore(connect_parallel)
+    roles = ["technician" if "technician" in users and i < round(tabs * tech_share) else "admin"
+             for i in range(tabs)]
+
+    async def open_one(index, role):
+        user = users[role]
+        tab = Tab(index, role, user["id"], user["token"], swarm)
+        swarm.tabs.append(tab)
+        async with semaphore:
+            try:
+                await tab.open(realtime_url())
+            except Exception as e:
+                tab.errors.append(str(e).splitlines()[0] if str(e) else type(e).__name__)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(open_one(i, role) for i, role in enumerate(roles)))
+    return time.perf_counter() - start
+
+
+def _insert_notification(user_id: str, title: str) -> int:
+    status, _, _ = http_json("POST", f"{SUPABASE_URL}/rest/v1/notifications", [{
+        "user_id": user_id, "type": "system", "title": title, "message": "Realtime swarm load test",
+    }], {"apikey": SERVICE_ROLE_KEY, "Authorization": f"Bearer {SERVICE_ROLE_KEY}", "Prefer": "return=minimal"})
+    return status
+
+
+async def write_stage(swarm: Swarm, user_id: str, rate: float, seconds: float, seq_start: int) -> list:
+    """Inserts `rate` notifications per second for `seconds`. Returns the sequence numbers sent."""
+    sent, tasks = [], []
+    interval = 1 / rate
+    start = time.perf_counter()
+    for n in range(int(rate * seconds)):
+        delay = start + n * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        seq = seq_start + n
+        swarm.sent[seq] = time.perf_counter()
+        sent.append(seq)
+        tasks.append(asyncio.create_task(asyncio.to_thread(
+            _insert_notification, user_id, f"{MARKER}:{swarm.run_id}:{seq}")))
+    statuses = await asyncio.gather(*tasks)
+    failed = {seq for seq, status in zip(sent, statuses) if status >= 300}
+    return [seq for seq in sent if seq not in failed]
+
+
+def summarise_stage(swarm: Swarm, rate: float, seqs: list, subscribers: int) -> dict:
+    latencies = [d["ms"] for seq in seqs for d in swarm.deliveries.get(seq, []) if d["ms"] is not None]
+    commit = [d["commit_ms"] for seq in seqs for d in swarm.deliveries.get(seq, []) if d["commit_ms"] is not None]
+    expected = len(seqs) * subscribers
+    delivered = sum(len(swarm.deliveries.get(seq, [])) for seq in seqs)
+    return {
+        "rate": rate,
+        "writes": len(seqs),
+        "expected": expected,
+        "delivered": delivered,
+        "loss": round(1 - delivered / expected, 4) if expected else None,
+        "p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 1) if latencies else None,
+        "max_ms": round(max(latencies), 1) if latencies else None,
+        "commit_p95_ms": round(percentile(commit, 95), 1) if commit else None,
+    }
+
+
+async def run(args) -> dict:
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if args.tabs + 100 > hard:
+        print(f"Warning: {args.tabs} sockets near the open-file limit ({hard})")
+
+    published = published_tables()
+    added = False
+    if "notifications" not in published:
+        if not args.publish:
+            raise Exception("notifications is not in the supabase_realtime publication, so no channel "
+                            "would receive the writes; rerun with --publish (local stack only)")
+        sql_exec("alter publication supabase_realtime add table public.notifications")
+        added = True
+    for table in ("leads", "calendar_bookings"):
+        if table not in published:
+            print(f"Note: {table} is not published; its channels subscribe but never deliver")
+
+    users = {}
+    for role, email, password in (("admin", ADMIN_EMAIL, ADMIN_PASSWORD), ("technician", TECH_EMAIL, TECH_PASSWORD)):
+        if email:
+            token = password_token(email, password)
+            users[role] = {"token": token, "id": jwt_claims(token)["sub"]}
+    target_role = args.target if args.target in users else "admin"
+
+    swarm = Swarm(uuid.uuid4().hex[:8])
+    try:
+        print(f"Opening {args.tabs} tabs...")
+        open_s = await open_tabs(swarm, users, args.tabs, args.tech_share, args.connect_parallel)
+        live = [t for t in swarm.tabs if not t.errors]
+        subscribe = [ms for t in live for ms in t.subscribe_ms.values()]
+        subscribers = sum(1 for t in live if t.role == target_role)
+        print(f"  {len(live)}/{args.tabs} tabs subscribed in {open_s:.1f} s; {subscribers} receive {target_role} writes")
+
+        stages, seq = [], 0
+        for rate in args.rates:
+            print(f"  {rate:g} writes/s for {args.stage_seconds:g} s")
+            seqs = await write_stage(swarm, users[target_role]["id"], rate, args.stage_seconds, seq)
+            seq += int(rate * args.stage_seconds)
+            await asyncio.sleep(args.drain_seconds)
+            stages.append(summarise_stage(swarm, rate, seqs, subscribers))
+        errors = {}
+        for tab in swarm.tabs:
+            for error in tab.errors:
+                errors[error] = errors.get(error, 0) + 1
+        return {
+            "tabs": args.tabs,
+            "subscribed_tabs": len(live),
+            "open_seconds": round(open_s, 2),
+            "subscribe_p50_ms": round(percentile(subscribe, 50), 1) if subscribe else None,
+            "subscribe_p95_ms": round(percentile(subscribe, 95), 1) if subscribe else None,
+            "subscribe_max_ms": round(max(subscribe), 1) if subscribe else None,
+            "target_role": target_role,
+            "subscribers": subscribers,
+            "stages": stages,
+            "errors": errors,
+        }
+    finally:
+        await asyncio.gather(*(tab.close() for tab in swarm.tabs), return_exceptions=True)
+        sql_exec(f"delete from public.notifications where title like '{MARKER}:{swarm.run_id}:%'")
+        if added:
+            sql_exec("alter publication supabase_realtime drop table public.notifications")
+
+
+def print_report(result: dict):
+    print(f"\n{result['subscribed_tabs']}/{result['tabs']} tabs subscribed in {result['open_seconds']} s"
+          f" (subscribe p50 {result['subscribe_p50_ms']} ms, p95 {result['subscribe_p95_ms']} ms,"
+          f" max {result['subscribe_max_ms']} ms)")
+    print(f"Writes for {result['target_role']}, fanned out to {result['subscribers']} tabs\n")
+    print(f"{'writes/s':>8} {'writes':>7} {'expected':>9} {'delivered':>10} {'loss':>7}"
+          f" {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} {'commit p95':>11}")
+    for s in result["stages"]:
+        loss = f"{s['loss']:.1%}" if s["loss"] is not None else "-"
+        cells = "".join(f"{s[k]:>8}" if s[k] is not None else f"{'-':>8}"
+                        for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+        print(f"{s['rate']:>8g} {s['writes']:>7} {s['expected']:>9} {s['delivered']:>10} {loss:>7}{cells}"
+              f" {s['commit_p95_ms'] if s['commit_p95_ms'] is not None else '-':>11}")
+    for error, count in sorted(result["errors"].items(), key=lambda e: -e[1])[:10]:
+        print(f"  {count} tab(s): {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hold many realtime subscriptions and measure fan-out")
+    parser.add_argument("--tabs", type=int, default=200, help="Simulated tabs (one socket each)")
+    parser.add_argument("--tech-share", type=float, default=0.5, help="Fraction of tabs signed in as the technician")
+    parser.add_argument("--target", choices=["admin", "technician"], default="admin", help="Whose notifications to write")
+    parser.add_argument("--rates", nargs="*", type=float, default=[1, 5, 20, 50], help="Writes per second per stage")
+    parser.add_argument("--stage-seconds", type=float, default=15)
+    parser.add_argument("--drain-seconds", type=float, default=5, help="Wait after each stage for late deliveries")
+    parser.add_argument("--connect-parallel", type=int, default=50, help="Sockets opening at once")
+    parser.add_argument("--publish", action="store_true", help="Add notifications to the publication for the run")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"swarm-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
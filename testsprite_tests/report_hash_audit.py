@@ -0,0 +1,365 @@
+"""
+reportHash Cache-Effectiveness Audit
+
+hashHtml/normalizeHtmlForHash exist in three mirrored copies:
+
+- api/_shared/reportHash.ts                (Vercel/Node - writes pdf_versions.html_hash on hard save)
+- src/lib/utils/reportHash.ts              (browser - checkSendMismatch compares against it)
+- supabase/functions/_shared/reportHash.ts (Deno edge functions)
+
+A hard save stores the Node hash; the send path re-fetches preview HTML and
+compares the browser hash against it. A match skips the re-render, so any
+divergence between copies silently turns every send into a full render.
+
+This audit:
+1. Hashes a large generated corpus (realistic report HTML plus Unicode,
+   whitespace and signed-URL edge cases) with every copy under the runtime
+   that ships it and reports any disagreement.
+2. Replays edit-then-regenerate sequences from the inspection and
+   job-completion flows. Every regenerate re-signs photo URLs, as
+   generate-inspection-pdf does. It counts how often the hash matches and the
+   render is skipped, checks that against the ground truth (did the data
+   actually change?) and converts skips into render time saved.
+3. Optionally fetches real preview HTML twice from the local stack's edge
+   functions to confirm the live output hashes deterministically.
+
+The browser copy runs under Node (same V8 regex engine and WebCrypto API as
+Chromium). The Deno copy is skipped with a note if `deno` is not installed.
+
+    python testsprite_tests/report_hash_audit.py
+    python testsprite_tests/report_hash_audit.py --corpus 20000 --sequences 500 --inspection-id <uuid>
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import random
+import shutil
+import string
+import subprocess
+import sys
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.local_stack import SUPABASE_URL, auth_headers, http_json, password_token
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNNER_PATH = "testsprite_tests/report_hash_runner.mjs"
+RESULTS_DIR = "testsprite_tests/tmp/report_hash"
+PDF_BENCH_DIR = "testsprite_tests/tmp/pdf_bench"
+DEFAULT_RENDER_MS = 6000.0
+
+# name -> (module, command prefix)
+IMPLEMENTATIONS = {
+    "vercel-node": ("api/_shared/reportHash.ts", ["npx", "tsx"]),
+    "browser": ("src/lib/utils/reportHash.ts", ["npx", "tsx"]),
+    "supabase-deno": ("supabase/functions/_shared/reportHash.ts", ["deno", "run", "--allow-read"]),
+}
+# The pair the send path actually compares
+STORED_IMPL, CURRENT_IMPL = "vercel-node", "browser"
+
+STORAGE_HOST = "ecyivrxjpsmjmexqatym.supabase.co"
+FIRST_NAMES = ["Chloé", "Liam", "Ngọc", "Siobhán", "Mohammed", "Zoë", "Jack", "Aroha"]
+SUBURBS = ["Brunswick", "Footscray", "St Kilda", "Box Hill", "Werribee", "Frankston"]
+AREAS = ["Master Bedroom", "Ensuite", "Laundry", "Subfloor", "Kitchen", "Living Room"]
+# Characters that differ between regex engines' \s classes or survive
+# TextEncoder differently - the edge cases a mirror is most likely to get wrong
+EDGE_SNIPPETS = [" ", "﻿", " ", "　", "\r\n", "\t", "’", "🏠", "\ud83d", "&amp;", "'"]
+
+
+def _token(rng: random.Random, length: int = 48) -> str:
+    return "".join(rng.choices(string.ascii_letters + string.digits + "._-", k=length))
+
+
+def photo_url(rng: random.Random, path: str, signed: bool = True) -> str:
+    """A storage URL as generate-inspection-pdf emits it, freshly signed on every call."""
+    if signed:
+        return (f"https://{STORAGE_HOST}/storage/v1/object/sign/inspection-photos/{path}"
+                f"?token={_token(rng)}&expires={rng.randint(10**9, 2 * 10**9)}")
+    return f"https://{STORAGE_HOST}/storage/v1/object/public/inspection-photos/{path}"
+
+
+def new_state(rng: random.Random, flow: str) -> dict:
+    """Report data for one inspection or job completion."""
+    lead = f"{rng.getrandbits(64):016x}"
+    return {
+        "flow": flow,
+        "number": f"MRC-2026-{rng.randint(1, 9999):04d}",
+        "customer": f"{rng.choice(FIRST_NAMES)} {rng.choice(['Nguyen', 'Smith', 'O’Brien', 'Papadopoulos'])}",
+        "address": f"{rng.randint(1, 300)} Example St, {rng.choice(SUBURBS)} VIC 3{rng.randint(0, 999):03d}",
+        "summary": "Elevated moisture detected behind the ensuite vanity. Remediation recommended.",
+        "areas": [
+            {"name": name, "reading": round(rng.uniform(10, 40), 1)}
+            for name in rng.sample(AREAS, rng.randint(2, 5))
+        ],
+        "photos": [f"{lead}/{rng.getrandbits(64):016x}.jpg" for _ in range(rng.randint(4, 30))],
+        "total": round(rng.uniform(800, 12000), 2),
+        "hours": rng.randint(4, 24),
+    }
+
+
+def render_html(state: dict, rng: random.Random) -> str:
+    """Renders report HTML from state. Photo URLs are re-signed on every call."""
+    rows = "".join(
+        f"<tr><td>{area['name']}</td><td>{area['reading']}%</td></tr>" for area in state["areas"]
+    )
+    photos = "".join(
+        f'<img class="photo" src="{photo_url(rng, path)}" alt="Photo {i + 1}">'
+        for i, path in enumerate(state["photos"])
+    )
+    title = "Inspection Report" if state["flow"] == "inspection" else "Job Completion Report"
+    return (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title} {state['number']}</title></head>"
+        f"<body><section class=\"cover\"><h1>{title}</h1><p>{state['customer']}</p><p>{state['address']}</p></section>"
+        f"<section class=\"summary\"><p>{state['summary']}</p></section>"
+        f"<table class=\"readings\">{rows}</table><section class=\"photos\">{photos}</section>"
+        f"<p class=\"total\">Total (inc. GST): ${state['total']:,.2f} for {state['hours']} hours</p>"
+        f"</body></html>"
+    )
+
+
+def edge_case_html(rng: random.Random) -> str:
+    """A document with Unicode and whitespace edge cases placed around storage URLs."""
+    parts = []
+    for _ in range(rng.randint(3, 12)):
+        snippet = rng.choice(EDGE_SNIPPETS)
+        url = photo_url(rng, f"{rng.getrandbits(32):08x}/{rng.getrandbits(32):08x}.jpg", signed=rng.random() < 0.8)
+        quote = rng.choice(['"', "'", ""])
+        parts.append(f"<p>{snippet}<img src={quote}{url}{quote}{snippet}>{snippet}</p>")
+    return "<html><body>" + "".join(parts) + "</body></html>"
+
+
+# Edits a user can make between regenerates: (name, mutate(state, rng))
+EDITS = {
+    "inspection": [
+        ("edit_summary", lambda s, r: s.update(summary=s["summary"] + " Follow-up recommended.")),
+        ("add_photo", lambda s, r: s["photos"].append(f"{r.getrandbits(64):016x}.jpg")),
+        ("remove_photo", lambda s, r: s["photos"].pop() if len(s["photos"]) > 1 else None),
+        ("change_reading", lambda s, r: s["areas"][0].update(reading=round(r.uniform(10, 40), 1))),
+        ("change_price", lambda s, r: s.update(total=round(s["total"] * 1.1, 2))),
+    ],
+    "job_completion": [
+        ("edit_notes", lambda s, r: s.update(summary=s["summary"] + " Dehumidifier collected.")),
+        ("add_after_photo", lambda s, r: s["photos"].append(f"{r.getrandbits(64):016x}.jpg")),
+        ("change_hours", lambda s, r: s.update(hours=s["hours"] + 1)),
+    ],
+}
+
+
+def build_sequences(rng: random.Random, flow: str, count: int, edit_probability: float) -> list:
+    """
+    Builds replay sequences for one flow.
+
+    Each sequence starts with a hard save and then alternates optional edits
+    with sends. Every send regenerates the HTML; a mismatch triggers a fresh
+    hard save, as the admin is prompted to re-save before sending.
+
+    Returns:
+        list[list[dict]]: events with the HTML generated at that point
+    """
+    sequences = []
+    for seq in range(count):
+        state = new_state(rng, flow)
+        events = [{"id": f"{flow}-{seq}-0", "kind": "hard_save", "html": render_html(state, rng),
+                   "content": json.dumps(state, sort_keys=True)}]
+        for step in range(1, rng.randint(4, 9)):
+            edits = []
+            while rng.random() < edit_probability and len(edits) < 3:
+                name, mutate = rng.choice(EDITS[flow])
+                before = copy.deepcopy(state)
+                mutate(state, rng)
+                edits.append(name)
+                # Occasionally the user undoes the edit before regenerating
+                if rng.random() < 0.1:
+                    state = before
+                    edits[-1] += "+revert"
+            events.append({
+                "id": f"{flow}-{seq}-{step}", "kind": "send", "edits": edits,
+                "html": render_html(state, rng), "content": json.dumps(state, sort_keys=True),
+            })
+        sequences.append(events)
+    return sequences
+
+
+def run_implementation(name: str, corpus_path: str) -> dict:
+    """Hashes the corpus with one copy. Returns {"hashes", "elapsed_ms"} or {"skipped"}."""
+    module, command = IMPLEMENTATIONS[name]
+    if not shutil.which(command[0]):
+        return {"skipped": f"{command[0]} not installed"}
+    completed = subprocess.run(
+        [*command, RUNNER_PATH, module, corpus_path],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        return {"skipped": f"runner failed: {completed.stderr.strip()[-300:]}"}
+    output = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {"hashes": {h["id"]: h["hash"] for h in output["hashes"]}, "elapsed_ms": output["elapsedMs"]}
+
+
+def compare_parity(results: dict) -> list:
+    """Pairwise disagreement counts between the copies that ran."""
+    ran = [name for name, r in results.items() if "hashes" in r]
+    pairs = []
+    for i, a in enumerate(ran):
+        for b in ran[i + 1:]:
+            diff = [key for key, h in results[a]["hashes"].items() if results[b]["hashes"].get(key) != h]
+            pairs.append({"a": a, "b": b, "mismatches": len(diff), "examples": diff[:5]})
+    return pairs
+
+
+def evaluate_replay(sequences: list, stored: dict, current: dict, render_ms: float) -> dict:
+    """
+    Applies checkSendMismatch's rule to every send and scores it against ground truth.
+
+    A send skips the render when the current (browser) hash equals the hash
+    stored at the last hard save (Node). Ground truth is whether the report
+    data changed since that hard save.
+    """
+    totals = {"sends": 0, "skipped": 0, "rendered": 0, "expected_skips": 0,
+              "wasted_renders": 0, "stale_sends": 0, "edits": {}}
+    for events in sequences:
+        saved_hash, saved_content = stored[events[0]["id"]], events[0]["content"]
+        for event in events[1:]:
+            totals["sends"] += 1
+            unchanged = event["content"] == saved_content
+            match = current[event["id"]] == saved_hash
+            totals["expected_skips"] += unchanged
+            for edit in event["edits"]:
+                totals["edits"][edit] = totals["edits"].get(edit, 0) + 1
+            if match:
+                totals["skipped"] += 1
+                totals["stale_sends"] += not unchanged
+            else:
+                totals["rendered"] += 1
+                totals["wasted_renders"] += unchanged
+                # Mismatch prompts a re-save, which becomes the new baseline
+                saved_hash, saved_content = stored[event["id"]], event["content"]
+
+    sends = totals["sends"] or 1
+    totals["skip_rate"] = round(totals["skipped"] / sends, 3)
+    totals["expected_skip_rate"] = round(totals["expected_skips"] / sends, 3)
+    totals["render_ms_saved"] = round(totals["skipped"] * render_ms)
+    totals["render_ms_wasted"] = round(totals["wasted_renders"] * render_ms)
+    return totals
+
+
+def latest_render_ms() -> tuple:
+    """Median single-request warm render time from the latest pdf_render_benchmark run."""
+    runs = sorted(glob.glob(os.path.join(PDF_BENCH_DIR, "bench-*.json")))
+    if runs:
+        with open(runs[-1]) as f:
+            for result in json.load(f):
+                if result["concurrency"] == 1 and not result["reuse_browser"]:
+                    warm = [w for w in result["waves"] if w["wave"] == "warm"]
+                    if warm:
+                        return warm[0]["p50_ms"], runs[-1]
+    return DEFAULT_RENDER_MS, "assumed default"
+
+
+def live_determinism(function: str, body: dict) -> dict:
+    """Fetches preview HTML twice from an edge function and hashes both with the Node copy."""
+    token = password_token()
+    documents = []
+    for _ in range(2):
+        status, payload, _ = http_json(
+            "POST", f"{SUPABASE_URL}/functions/v1/{function}", {**body, "previewOnly": True}, auth_headers(token),
+        )
+        if status != 200 or not isinstance(payload, dict) or "html" not in payload:
+            return {"function": function, "error": f"{status} {str(payload)[:200]}"}
+        documents.append(payload["html"])
+
+    corpus_path = os.path.join(RESULTS_DIR, f"live-{function}.jsonl")
+    with open(corpus_path, "w") as f:
+        for i, html in enumerate(documents):
+            f.write(json.dumps({"id": str(i), "html": html}) + "\n")
+    result = run_implementation(STORED_IMPL, corpus_path)
+    if "skipped" in result:
+        return {"function": function, "error": result["skipped"]}
+    return {
+        "function": function,
+        "raw_identical": documents[0] == documents[1],
+        "hash_identical": result["hashes"]["0"] == result["hashes"]["1"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit reportHash parity and cache effectiveness")
+    parser.add_argument("--corpus", type=int, default=2000, help="Random documents for the parity check")
+    parser.add_argument("--sequences", type=int, default=200, help="Replay sequences per flow")
+    parser.add_argument("--edit-probability", type=float, default=0.35, help="Chance of an edit before each send")
+    parser.add_argument("--render-ms", type=float, help="Render cost per PDF (default: latest pdf benchmark)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--inspection-id", help="Also check live generate-inspection-pdf determinism")
+    parser.add_argument("--job-completion-id", help="Also check live generate-job-report-pdf determinism")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+
+    print("Generating corpus and replay sequences...")
+    flows = {flow: build_sequences(rng, flow, args.sequences, args.edit_probability)
+             for flow in ("inspection", "job_completion")}
+    corpus_path = os.path.join(RESULTS_DIR, "corpus.jsonl")
+    with open(corpus_path, "w") as f:
+        for i in range(args.corpus):
+            html = edge_case_html(rng) if i % 3 == 0 else render_html(new_state(rng, "inspection"), rng)
+            f.write(json.dumps({"id": f"random-{i}", "html": html}) + "\n")
+        for sequences in flows.values():
+            for events in sequences:
+                for event in events:
+                    f.write(json.dumps({"id": event["id"], "html": event["html"]}) + "\n")
+
+    implementations = {}
+    for name in IMPLEMENTATIONS:
+        print(f"Hashing corpus with {name}...")
+        implementations[name] = run_implementation(name, corpus_path)
+
+    report = {"implementations": {}, "parity": compare_parity(implementations), "replay": {}, "live": []}
+    for name, result in implementations.items():
+        if "skipped" in result:
+            report["implementations"][name] = {"skipped": result["skipped"]}
+            print(f"  {name}: SKIPPED ({result['skipped']})")
+        else:
+            per_sec = len(result["hashes"]) / (result["elapsed_ms"] / 1000) if result["elapsed_ms"] else 0
+            report["implementations"][name] = {"documents": len(result["hashes"]), "docs_per_sec": round(per_sec)}
+            print(f"  {name}: {len(result['hashes'])} docs, {per_sec:,.0f} docs/s")
+
+    print("\nParity:")
+    for pair in report["parity"]:
+        verdict = "identical" if pair["mismatches"] == 0 else f"{pair['mismatches']} MISMATCHES e.g. {pair['examples']}"
+        print(f"  {pair['a']} vs {pair['b']}: {verdict}")
+
+    if "hashes" in implementations[STORED_IMPL] and "hashes" in implementations[CURRENT_IMPL]:
+        render_ms, source = (args.render_ms, "--render-ms") if args.render_ms else latest_render_ms()
+        print(f"\nReplay (render cost {render_ms:.0f} ms from {source}):")
+        for flow, sequences in flows.items():
+            totals = evaluate_replay(sequences, implementations[STORED_IMPL]["hashes"],
+                                     implementations[CURRENT_IMPL]["hashes"], render_ms)
+            report["replay"][flow] = totals
+            print(f"  {flow}: {totals['sends']} sends, skipped {totals['skip_rate']:.1%}"
+                  f" (expected {totals['expected_skip_rate']:.1%}), saved {totals['render_ms_saved'] / 1000:,.0f}s,"
+                  f" wasted renders {totals['wasted_renders']}, stale sends {totals['stale_sends']}")
+
+    if args.inspection_id:
+        report["live"].append(live_determinism("generate-inspection-pdf", {"inspectionId": args.inspection_id}))
+    if args.job_completion_id:
+        report["live"].append(live_determinism("generate-job-report-pdf", {"jobCompletionId": args.job_completion_id}))
+    for live in report["live"]:
+        print(f"\nLive {live['function']}: {live}")
+
+    path = os.path.join(RESULTS_DIR, f"audit-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {path}")
+
+    mismatched = any(pair["mismatches"] for pair in report["parity"])
+    stale = any(t["stale_sends"] for t in report["replay"].values())
+    if mismatched or stale:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
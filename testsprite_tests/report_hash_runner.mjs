@@ -0,0 +1,23 @@
+// Hashes a JSONL corpus with one of the three reportHash.ts copies, for
+// testsprite_tests/report_hash_audit.py. Runs unchanged under both runtimes
+// so each copy is exercised by the runtime that ships it:
+//   npx tsx testsprite_tests/report_hash_runner.mjs api/_shared/reportHash.ts corpus.jsonl
+//   deno run --allow-read testsprite_tests/report_hash_runner.mjs supabase/functions/_shared/reportHash.ts corpus.jsonl
+//
+// Prints one JSON object: { elapsedMs, hashes: [{ id, hash }] }.
+
+import { readFile } from 'node:fs/promises';
+import path from 'node:path';
+import { pathToFileURL } from 'node:url';
+
+const [modulePath, corpusPath] = globalThis.Deno ? Deno.args : process.argv.slice(2);
+const { hashHtml } = await import(pathToFileURL(path.resolve(modulePath)).href);
+
+const lines = (await readFile(corpusPath, 'utf8')).split('\n').filter(Boolean);
+const hashes = [];
+const started = performance.now();
+for (const line of lines) {
+  const { id, html } = JSON.parse(line);
+  hashes.push({ id, hash: await hashHtml(html) });
+}
+console.log(JSON.stringify({ elapsedMs: performance.now() - started, hashes }));
@@ -0,0 +1,225 @@
+"""
+RLS Policy Overhead Benchmark
+
+The same screens run under admin and technician JWTs, and
+docs/SUPABASE_ADVISOR_AUDIT.md lists 24 auth_rls_initplan and 24
+multiple_permissive_policies findings. This puts a latency figure on them
+in two passes:
+
+1. Request replay: every distinct PostgREST read recorded by
+   `har_replay.py record` is replayed under service-role (RLS bypassed),
+   admin and technician tokens. The difference from service-role, per
+   statement and per table, is what RLS costs that role end to end.
+2. Per policy: for each permissive SELECT policy on the touched tables,
+   `count(*)` over the table filtered by just that policy's USING
+   expression is timed with each user's JWT claims set (so auth.uid() and
+   the role helpers resolve as them), against an unfiltered count, and the
+   whole table is counted as `authenticated` with all policies applied.
+   Policies calling auth.*()/current_setting() outside a scalar subquery
+   (re-evaluated per row) and policies with their own subquery are marked.
+
+Run it against a database loaded to production scale; on a handful of rows
+every policy looks free.
+
+    python testsprite_tests/har_replay.py record
+    python testsprite_tests/rls_benchmark.py
+    python testsprite_tests/rls_benchmark.py --tables leads inspections photos --repeat 20
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.explain_report import WATCHED_TABLES, load_statements, request_headers
+from testsprite_tests.har_replay import HAR_DIR
+from testsprite_tests.local_stack import (
+    ADMIN_EMAIL,
+    ADMIN_PASSWORD,
+    SUPABASE_URL,
+    TECH_EMAIL,
+    TECH_PASSWORD,
+    http_json,
+    jwt_claims,
+    password_token,
+    sql_explain,
+    sql_json,
+)
+
+RESULTS_DIR = "testsprite_tests/tmp/rls_benchmark"
+# auth.uid(), auth.jwt(), auth.role() or current_setting() not directly inside "( SELECT"
+_PER_ROW_CALL = re.compile(r"(?<!SELECT )\b(auth\.(uid|jwt|role)\(\)|current_setting\()")
+
+
+def replay_statements(statements: list, roles: list, repeat: int) -> list:
+    """Median latency and rows of each recorded read under each role."""
+    headers = {role: request_headers(role) for role in roles}
+    results = []
+    for statement in statements:
+        row = {"table": statement["table"], "path": statement["path"][:300]}
+        for role in roles:
+            timings, rows, error = [], None, None
+            for attempt in range(repeat + 1):
+                start = time.perf_counter()
+                status, body, _ = http_json("GET", f"{SUPABASE_URL}{statement['path']}",
+                                            headers={**headers[role], **statement["headers"]})
+                elapsed = (time.perf_counter() - start) * 1000
+                if status >= 400:
+                    error = f"{status}"
+                    break
+                if attempt:  # first request warms caches and the prepared statement
+                    timings.append(elapsed)
+                rows = len(body) if isinstance(body, list) else 1
+            row[role] = {"ms": round(statistics.median(timings), 2) if timings else None,
+                         "rows": rows, "error": error}
+        results.append(row)
+    return results
+
+
+def table_summary(replayed: list, roles: list) -> list:
+    """Per table: summed median latency per role and the overhead over service-role."""
+    tables = {}
+    for row in replayed:
+        entry = tables.setdefault(row["table"], {"table": row["table"], "statements": 0,
+                                                 **{role: 0.0 for role in roles}})
+        if any(row[role]["ms"] is None for role in roles):
+            continue
+        entry["statements"] += 1
+        for role in roles:
+            entry[role] = round(entry[role] + row[role]["ms"], 2)
+    summary = list(tables.values())
+    for entry in summary:
+        for role in roles:
+            if role != "service":
+                entry[f"{role}_overhead_ms"] = round(entry[role] - entry["service"], 2)
+    return sorted(summary, key=lambda e: max(e.get(f"{r}_overhead_ms", 0) for r in roles), reverse=True)
+
+
+def select_policies(tables: list) -> list:
+    table_list = ", ".join(f"'{t}'" for t in tables)
+    return sql_json(f"""
+        select tablename as table, policyname as policy, cmd, roles::text[] as roles, qual
+        from pg_policies
+        where schemaname = 'public' and tablename in ({table_list})
+          and permissive = 'PERMISSIVE' and cmd in ('SELECT', 'ALL') and qual is not null
+          and roles && array['authenticated', 'public']::name[]
+        order by tablename, policyname
+    """)
+
+
+def _scanned_rows(node: dict) -> int:
+    """Rows leaving the table scan(s) of a count(*) plan, across parallel workers."""
+    if "Relation Name" in node:
+        return node.get("Actual Rows", 0) * node.get("Actual Loops", 1)
+    return sum(_scanned_rows(child) for child in node.get("Plans", []))
+
+
+def _median_execution(query: str, repeat: int, **kwargs) -> tuple:
+    plans = [sql_explain(query, **kwargs) for _ in range(repeat)]
+    return round(statistics.median(p["Execution Time"] for p in plans), 2), _scanned_rows(plans[-1]["Plan"])
+
+
+def _worst_overhead(policy: dict) -> float:
+    return max((u.get("overhead_ms") or 0 for u in policy["users"].values()), default=0)
+
+
+def measure_policies(tables: list, users: dict, repeat: int) -> dict:
+    """
+    Per table: unfiltered count, count as `authenticated` with all policies per
+    user, and per policy the count filtered by its USING expression per user.
+    """
+    policies = select_policies(tables)
+    results = {}
+    for table in tables:
+        baseline_ms, total_rows = _median_execution(f"select count(*) from public.{table}", repeat)
+        entry = {"table": table, "baseline_ms": baseline_ms, "rows": total_rows, "all_policies": {}, "policies": []}
+        for user, claims in users.items():
+            settings = {"request.jwt.claims": json.dumps(claims)}
+            ms, rows = _median_execution(f"select count(*) from public.{table}", repeat,
+                                         settings=settings, role="authenticated")
+            entry["all_policies"][user] = {"ms": ms, "overhead_ms": round(ms - baseline_ms, 2), "rows": rows}
+        for policy in (p for p in policies if p["table"] == table):
+            measured = {"policy": policy["policy"], "cmd": policy["cmd"], "qual": policy["qual"],
+                        "per_row_auth_call": bool(_PER_ROW_CALL.search(policy["qual"])),
+                        "subquery": "SELECT" in policy["qual"].replace("( SELECT auth.", ""),
+                        "users": {}}
+            for user, claims in users.items():
+                try:
+                    ms, rows = _median_execution(f"select count(*) from public.{table} where ({policy['qual']})",
+                                                 repeat, settings={"request.jwt.claims": json.dumps(claims)})
+                    measured["users"][user] = {"ms": ms, "overhead_ms": round(ms - baseline_ms, 2), "rows": rows}
+                except Exception as e:
+                    measured["users"][user] = {"error": str(e)[:200]}
+            entry["policies"].append(measured)
+        results[table] = entry
+    return results
+
+
+def print_report(tables: list, roles: list, policies: dict):
+    if tables:
+        print("\nReplayed reads, summed median latency per table (ms)")
+        print(f"{'table':<24} {'stmts':>5}" + "".join(f"{r:>12}" for r in roles)
+              + "".join(f"{r + ' +':>14}" for r in roles if r != "service"))
+    for entry in tables:
+        print(f"{entry['table']:<24} {entry['statements']:>5}" + "".join(f"{entry[r]:>12.1f}" for r in roles)
+              + "".join(f"{entry[r + '_overhead_ms']:>14.1f}" for r in roles if r != "service"))
+
+    for table, entry in policies.items():
+        print(f"\n{table}: {entry['rows']} rows, unfiltered count {entry['baseline_ms']:.1f} ms")
+        for user, result in entry["all_policies"].items():
+            print(f"  all policies as {user:<11} {result['ms']:>9.1f} ms (+{result['overhead_ms']:.1f}), {result['rows']} visible")
+        for policy in sorted(entry["policies"], key=_worst_overhead, reverse=True):
+            marks = ", ".join(m for m, on in (("auth call per row", policy["per_row_auth_call"]),
+                                              ("subquery", policy["subquery"])) if on)
+            print(f"  policy \"{policy['policy']}\" ({policy['cmd']}){'  [' + marks + ']' if marks else ''}")
+            for user, result in policy["users"].items():
+                if result.get("error"):
+                    print(f"      {user:<11} error: {result['error'][:90]}")
+                else:
+                    print(f"      {user:<11} {result['ms']:>9.1f} ms (+{result['overhead_ms']:.1f}), {result['rows']} pass")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure RLS latency per role, table and policy")
+    parser.add_argument("--har-dir", default=HAR_DIR, help="Directory of HARs from har_replay.py record")
+    parser.add_argument("--tables", nargs="*", help="Tables for the per-policy pass (default: replayed tables)")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed repeats per request")
+    parser.add_argument("--policy-repeat", type=int, default=3, help="EXPLAIN ANALYZE repeats per policy")
+    parser.add_argument("--skip-replay", action="store_true", help="Only run the per-policy pass")
+    args = parser.parse_args()
+
+    roles = ["service", "admin"] + (["technician"] if TECH_EMAIL else [])
+    users = {"admin": jwt_claims(password_token(ADMIN_EMAIL, ADMIN_PASSWORD))}
+    if TECH_EMAIL:
+        users["technician"] = jwt_claims(password_token(TECH_EMAIL, TECH_PASSWORD))
+    else:
+        print("TECH_EMAIL not set; measuring admin and service-role only")
+
+    replayed, tables = [], []
+    if not args.skip_replay:
+        statements = load_statements(args.har_dir)
+        if not statements:
+            parser.error(f"No PostgREST reads in {args.har_dir}; run `har_replay.py record` or pass --skip-replay")
+        print(f"Replaying {len(statements)} distinct reads as {', '.join(roles)}")
+        replayed = replay_statements(statements, roles, args.repeat)
+        tables = table_summary(replayed, roles)
+
+    policy_tables = args.tables or [t["table"] for t in tables] or WATCHED_TABLES
+    print(f"Timing policies on {', '.join(policy_tables)}")
+    policies = measure_policies(policy_tables, users, args.policy_repeat)
+    print_report(tables, roles, policies)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"rls-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"statements": replayed, "tables": tables, "policies": policies}, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
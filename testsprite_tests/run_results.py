@@ -0,0 +1,506 @@
+"""
+Structured Results for TestSprite Runs
+
+Replaces the TCs' print("TEST n: ...") / print("SUCCESS: ...") progress and
+the hand-copied REGRESSION_TEST_REPORT.md with machine-readable results.
+Each named step is a timed context manager:
+
+    from testsprite_tests.run_results import case
+
+    with case("TC004", "Leads Management Table View") as tc:
+        with tc.step("Checking page structure") as step:
+            count = await page.locator("table").count()
+            step.metric("tables", count)
+            step.artifact("screenshot", path)
+        with tc.step("Saving lead") as step:
+            for attempt in range(3):
+                ...
+                step.retry("toast not shown")
+
+While a run is going, every case/step start and end is appended to
+events.jsonl (step durations, retries, metrics, artifacts, errors), so other
+tooling can follow a run live. When the run finishes, junit.xml, results.json
+and REGRESSION_TEST_REPORT.md are written next to it under
+tmp/results/<run id>/. plan_executor.py and every TC script record through
+the same API; `run` runs the TCs in-process so they all land in one run.
+
+    python testsprite_tests/run_results.py run TC004 TC005 --report
+    python testsprite_tests/run_results.py report testsprite_tests/tmp/results/<run id>/events.jsonl
+"""
+import argparse
+import asyncio
+import atexit
+import contextlib
+import datetime as dt
+import glob
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from xml.etree import ElementTree
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = "testsprite_tests/tmp/results"
+REPORT_PATH = os.path.join(TESTS_DIR, "REGRESSION_TEST_REPORT.md")
+# Same variable as auth_helper.BASE_URL, read here so `report` runs without Playwright
+BASE_URL = os.getenv("TESTSPRITE_BASE_URL", "http://localhost:8080")
+
+
+class Step:
+    """One timed step of a case; metrics and artifacts attach to it."""
+
+    def __init__(self, index: int, name: str):
+        self.index = index
+        self.name = name
+        self.status = "passed"
+        self.duration_ms = None
+        self.retries = 0
+        self.metrics = {}
+        self.artifacts = {}
+        self.notes = []
+        self.error = None
+
+    def metric(self, name: str, value, unit: str = None):
+        self.metrics[name] = {"value": value, "unit": unit} if unit else value
+
+    def artifact(self, name: str, path: str):
+        self.artifacts[name] = path
+
+    def retry(self, reason: str = ""):
+        """Counts one retry of this step's action."""
+        self.retries += 1
+        if reason:
+            self.notes.append(f"retry {self.retries}: {reason}")
+
+    def note(self, text: str):
+        self.notes.append(text)
+
+    def skip(self, reason: str = ""):
+        self.status = "skipped"
+        if reason:
+            self.notes.append(reason)
+
+    def as_dict(self) -> dict:
+        return {"index": self.index, "name": self.name, "status": self.status, "duration_ms": self.duration_ms,
+                "retries": self.retries, "metrics": self.metrics, "artifacts": self.artifacts,
+                "notes": self.notes, "error": self.error}
+
+
+class CaseRecorder:
+    """Steps of one TC; created by RunRecorder.case()."""
+
+    def __init__(self, run: "RunRecorder", case_id: str, title: str):
+        self.run = run
+        self.id = case_id
+        self.title = title
+        self.status = "passed"
+        self.steps = []
+        self.duration_ms = None
+        self.error = None
+        self.traceback = None
+        self.artifacts = {}
+
+    @contextlib.contextmanager
+    def step(self, name: str):
+        """Times the enclosed block as one step; an exception fails the step and propagates."""
+        step = Step(len(self.steps) + 1, name)
+        self.steps.append(step)
+        self.run.emit("step_start", case=self.id, step=step.index, name=name)
+        start = time.perf_counter()
+        try:
+            yield step
+        except BaseException as e:
+            step.status = "failed"
+            step.error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+            raise
+        finally:
+            step.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            self.run.emit("step_end", case=self.id, **step.as_dict())
+
+    def artifact(self, name: str, path: str):
+        self.artifacts[name] = path
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "title": self.title, "status": self.status, "duration_ms": self.duration_ms,
+                "error": self.error, "traceback": self.traceback, "artifacts": self.artifacts,
+                "steps": [s.as_dict() for s in self.steps]}
+
+
+class RunRecorder:
+    """
+    Collects the cases of one run and streams them to events.jsonl.
+
+    Args:
+        name: Run label, e.g. "plan" or "tc"
+        out_dir: Directory for the run's files (default tmp/results/<name>-<timestamp>)
+    """
+
+    def __init__(self, name: str = "run", out_dir: str = None):
+        self.run_id = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.out_dir = out_dir or os.path.join(RESULTS_DIR, self.run_id)
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.events_path = os.path.join(self.out_dir, "events.jsonl")
+        self.cases = []
+        self.started_at = dt.datetime.now(dt.timezone.utc)
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._events = open(self.events_path, "a")
+        self._finished = False
+        self._streamed = set()
+        self.emit("run_start", name=name, base_url=BASE_URL)
+
+    def emit(self, event: str, **fields):
+        record = {"ts": dt.datetime.now(dt.timezone.utc).isoformat(timespec="milliseconds"),
+                  "t": round(time.perf_counter() - self._start, 3), "run": self.run_id, "event": event, **fields}
+        with self._lock:
+            self._events.write(json.dumps(record, default=str) + "\n")
+            self._events.flush()
+
+    @contextlib.contextmanager
+    def case(self, case_id: str, title: str = ""):
+        """Times the enclosed block as one TC; an exception fails it and propagates."""
+        recorder = CaseRecorder(self, case_id, title)
+        self.cases.append(recorder)
+        self.emit("case_start", case=case_id, title=title)
+        start = time.perf_counter()
+        try:
+            yield recorder
+        except BaseException as e:
+            recorder.status = "failed"
+            recorder.error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+            recorder.traceback = traceback.format_exc(limit=8)
+            raise
+        finally:
+            recorder.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            if recorder.status == "passed" and any(s.status == "failed" for s in recorder.steps):
+                recorder.status = "failed"
+            self.emit("case_end", case=case_id, status=recorder.status, duration_ms=recorder.duration_ms,
+                      error=recorder.error, traceback=recorder.traceback, artifacts=recorder.artifacts)
+
+    def plan_hook(self, case_id: str, title: str):
+        """step_hook for plan_executor.run_case that streams its steps as events."""
+        self._streamed.add(case_id)
+        self.emit("case_start", case=case_id, title=title)
+
+        async def hook(step, step_result):
+            if step_result is None:
+                self.emit("step_start", case=case_id, step=step.index, name=step.description)
+            else:
+                self.emit("step_end", case=case_id, **_plan_step(step_result))
+
+        return hook
+
+    def add_plan_result(self, result: dict):
+        """
+        Records a finished plan_executor case result. Its status is kept as
+        is, so "incomplete" and "skipped" cases are never counted as passed.
+        """
+        recorder = CaseRecorder(self, result["id"], result["title"])
+        recorder.status = result["status"]
+        recorder.duration_ms = result.get("duration_ms")
+        recorder.error = result.get("error")
+        if recorder.id not in self._streamed:
+            self.emit("case_start", case=recorder.id, title=recorder.title)
+        for step_result in result["steps"]:
+            step = Step(step_result["index"], step_result["description"])
+            for key, value in _plan_step(step_result).items():
+                setattr(step, key, value)
+            recorder.steps.append(step)
+            if not recorder.error and step.error:
+                recorder.error = step.error
+        self.cases.append(recorder)
+        self.emit("case_end", case=recorder.id, status=recorder.status, duration_ms=recorder.duration_ms,
+                  error=recorder.error, traceback=None, artifacts={})
+
+    def finish(self, report_path: str = None) -> dict:
+        """Writes junit.xml, results.json and the regression report; returns their paths."""
+        if self._finished:
+            return {}
+        self._finished = True
+        cases = [c.as_dict() for c in self.cases]
+        self.emit("run_end", cases=len(cases), passed=sum(1 for c in cases if c["status"] == "passed"),
+                  duration_ms=round((time.perf_counter() - self._start) * 1000, 1))
+        self._events.close()
+        meta = {"run_id": self.run_id, "started_at": self.started_at.isoformat(timespec="seconds"),
+                "base_url": BASE_URL, "events": self.events_path}
+        paths = {"events": self.events_path,
+                 "junit": write_junit(cases, os.path.join(self.out_dir, "junit.xml"), self.run_id),
+                 "results": os.path.join(self.out_dir, "results.json"),
+                 "report": write_report(cases, os.path.join(self.out_dir, "REGRESSION_TEST_REPORT.md"), meta)}
+        with open(paths["results"], "w") as f:
+            json.dump({**meta, "cases": cases}, f, indent=2)
+        if report_path:
+            paths["report"] = write_report(cases, report_path, meta)
+        return paths
+
+
+def _plan_step(step_result: dict) -> dict:
+    return {"index": step_result["index"], "name": step_result["description"], "status": step_result["status"],
+            "duration_ms": step_result.get("duration_ms"), "retries": 0, "metrics": {}, "artifacts": {},
+            "notes": step_result.get("details", []), "error": step_result.get("error")}
+
+
+_current = None
+
+
+def current_run() -> RunRecorder:
+    """The process-wide run; created on first use and finished at exit."""
+    global _current
+    if _current is None:
+        _current = RunRecorder("tc")
+        atexit.register(_current.finish)
+    return _current
+
+
+def case(case_id: str, title: str = ""):
+    """`with case("TC004", "..."):` on the process-wide run."""
+    return current_run().case(case_id, title)
+
+
+def load_events(path: str) -> tuple:
+    """Rebuilds (meta, cases) from an events.jsonl, including runs that never finished."""
+    cases, meta = {}, {"events": path}
+
+    def case_entry(event):
+        return cases.setdefault(event["case"], {"id": event["case"], "title": event.get("title", ""),
+                                                "status": "running", "duration_ms": None, "error": None,
+                                                "traceback": None, "artifacts": {}, "steps": []})
+
+    with open(path) as f:
+        for line in f:
+            event = json.loads(line)
+            kind = event["event"]
+            if kind == "run_start":
+                meta.update(run_id=event["run"], started_at=event["ts"], base_url=event.get("base_url"))
+            elif kind == "case_start":
+                case_entry(event)
+            elif kind == "step_end":
+                step = {k: v for k, v in event.items() if k not in ("ts", "t", "run", "event", "case")}
+                case_entry(event)["steps"].append(step)
+            elif kind == "case_end":
+                case_entry(event).update({k: event.get(k) for k in
+                                          ("status", "duration_ms", "error", "traceback", "artifacts")})
+    return meta, list(cases.values())
+
+
+def write_junit(cases: list, path: str, suite_name: str) -> str:
+    """JUnit XML: one <testsuite> per TC, one <testcase> per step with its duration."""
+    root = ElementTree.Element("testsuites", name=suite_name)
+    for c in cases:
+        steps = c["steps"] or [{"index": 0, "name": c["title"] or c["id"], "status": c["status"],
+                                "duration_ms": c["duration_ms"], "error": c["error"], "notes": []}]
+        suite = ElementTree.SubElement(
+            root, "testsuite", name=f"{c['id']} {c['title']}".strip(), tests=str(len(steps)),
+            failures=str(sum(1 for s in steps if s["status"] == "failed")),
+            skipped=str(sum(1 for s in steps if s["status"] == "skipped")),
+            time=f"{(c['duration_ms'] or 0) / 1000:.3f}")
+        for step in steps:
+            testcase = ElementTree.SubElement(suite, "testcase", classname=c["id"],
+                                              name=f"{step['index']:02d} {step['name']}",
+                                              time=f"{(step['duration_ms'] or 0) / 1000:.3f}")
+            if step["status"] == "failed":
+                failure = ElementTree.SubElement(testcase, "failure", message=step.get("error") or "failed")
+                failure.text = c.get("traceback") or step.get("error") or ""
+            elif step["status"] == "skipped":
+                ElementTree.SubElement(testcase, "skipped")
+            extra = [f"{k}={v}" for k, v in (step.get("metrics") or {}).items()]
+            extra += [f"artifact {k}: {v}" for k, v in (step.get("artifacts") or {}).items()]
+            if step.get("retries"):
+                extra.append(f"retries={step['retries']}")
+            if extra or step.get("notes"):
+                ElementTree.SubElement(testcase, "system-out").text = "\n".join(extra + list(step.get("notes") or []))
+        if c["status"] == "failed" and not any(s["status"] == "failed" for s in steps):
+            testcase = ElementTree.SubElement(suite, "testcase", classname=c["id"], name="case", time="0")
+            ElementTree.SubElement(testcase, "failure", message=c.get("error") or "failed").text = c.get("traceback") or ""
+        elif c["status"] in ("incomplete", "skipped"):
+            # Every step may have "passed" without a single check running
+            testcase = ElementTree.SubElement(suite, "testcase", classname=c["id"], name="case", time="0")
+            ElementTree.SubElement(testcase, "skipped", message=c.get("error") or c["status"])
+    ElementTree.indent(root)
+    ElementTree.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+    return path
+
+
+def _failing_step(c: dict) -> dict:
+    return next((s for s in c["steps"] if s["status"] == "failed"), None)
+
+
+def write_report(cases: list, path: str, meta: dict, slowest: int = 10) -> str:
+    """Regression report in the layout of the hand-written REGRESSION_TEST_REPORT.md."""
+    total = len(cases)
+    passed = sum(1 for c in cases if c["status"] == "passed")
+    failed = sum(1 for c in cases if c["status"] == "failed")
+    # plan_executor reports cases that checked nothing as incomplete/skipped
+    others = {}
+    for c in cases:
+        if c["status"] not in ("passed", "failed"):
+            others[c["status"]] = others.get(c["status"], 0) + 1
+    rate = f"{passed / total:.2%}" if total else "n/a"
+    duration_s = sum(c["duration_ms"] or 0 for c in cases) / 1000
+    lines = [
+        "# MRC Lead Management System - Regression Test Report",
+        "",
+        f"**Report Date:** {(meta.get('started_at') or '')[:10]}",
+        "**Test Framework:** TestSprite (Playwright-based E2E)",
+        "**Application:** MRC Lead Management System",
+        f"**Environment:** {meta.get('base_url') or ''}",
+        f"**Run:** `{meta.get('run_id', '')}`",
+        "",
+        "---",
+        "",
+        "## Executive Summary",
+        "",
+        "| Metric | Value |",
+        "|--------|-------|",
+        f"| **Total Test Cases** | {total} |",
+        f"| **Passed** | {passed} ({rate}) |",
+        f"| **Failed** | {failed} |",
+    ]
+    for status, count in others.items():
+        label = "Not Finished" if status == "running" else status.capitalize()
+        lines.append(f"| **{label}** | {count} |")
+    lines += [
+        f"| **Pass Rate** | {rate} |",
+        f"| **Total Case Time** | {duration_s:.1f} s |",
+        "",
+        "---",
+        "",
+        "## Test Results Summary Table",
+        "",
+        "| Test Case ID | Test Case Name | Status | Duration | Notes |",
+        "|--------------|----------------|--------|----------|-------|",
+    ]
+    for c in cases:
+        step = _failing_step(c)
+        if c["status"] == "passed":
+            notes = f"{len(c['steps'])} steps"
+        else:
+            notes = (f"Step {step['index']} \"{step['name']}\": " if step else "") + (c.get("error") or "")
+        notes = notes.replace("|", "\\|").replace("\n", " ")[:160]
+        lines.append(f"| {c['id']} | {c['title']} | **{c['status'].upper()}** | "
+                     f"{(c['duration_ms'] or 0) / 1000:.1f} s | {notes} |")
+
+    steps = [(c, s) for c in cases for s in c["steps"] if s.get("duration_ms") is not None]
+    if steps:
+        lines += ["", "---", "", "## Slowest Steps", "",
+                  "| Test Case ID | Step | Duration | Retries | Status |",
+                  "|--------------|------|----------|---------|--------|"]
+        for c, s in sorted(steps, key=lambda cs: cs[1]["duration_ms"], reverse=True)[:slowest]:
+            lines.append(f"| {c['id']} | {s['index']}. {s['name'][:70]} | {s['duration_ms'] / 1000:.2f} s | "
+                         f"{s.get('retries') or 0} | {s['status']} |")
+
+    measured = [(c, s) for c, s in steps if s.get("metrics")]
+    if measured:
+        lines += ["", "---", "", "## Captured Metrics", "", "| Test Case ID | Step | Metric | Value |",
+                  "|--------------|------|--------|-------|"]
+        for c, s in measured:
+            for name, value in s["metrics"].items():
+                shown = f"{value['value']} {value['unit']}" if isinstance(value, dict) else value
+                lines.append(f"| {c['id']} | {s['index']} | {name} | {shown} |")
+
+    failures = [c for c in cases if c["status"] != "passed"]
+    if failures:
+        lines += ["", "---", "", "## Failed Tests Details" if not others else "## Failed and Incomplete Tests Details"]
+    for c in failures:
+        step = _failing_step(c)
+        error = c.get("error") or (step or {}).get("error") or "unknown"
+        error_type, _, message = error.partition(": ")
+        lines += ["", f"### {c['id']} - {c['title']}", ""]
+        if c["status"] != "failed":
+            lines.append(f"**Status:** {c['status'].upper()}")
+        if step:
+            lines.append(f"**Failing Step:** {step['index']}. {step['name']}")
+        lines += [f"**Error Type:** {error_type if message else 'Error'}",
+                  f"**Message:** {message or error}"]
+        artifacts = {**(c.get("artifacts") or {}), **((step or {}).get("artifacts") or {})}
+        if artifacts:
+            lines.append("**Artifacts:** " + ", ".join(f"[{k}]({v})" for k, v in artifacts.items()))
+        if c.get("traceback"):
+            lines += ["", "**Stderr:**", "```", c["traceback"].rstrip(), "```"]
+        lines += ["", "---"]
+
+    lines += ["", f"*Report generated by testsprite_tests/run_results.py from `{meta.get('events', '')}`*", ""]
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+    return path
+
+
+def _tc_title(path: str) -> tuple:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    case_id, _, title = stem.partition("_")
+    return case_id, title.replace("___", " - ").replace("_", " ")
+
+
+def run_tc(run: RunRecorder, path: str) -> str:
+    """
+    Runs a TC script's run_test() in-process against `run`; returns its status.
+
+    The TC records its own case through case(). One that fails or returns
+    before opening it (import error, login failure) is recorded as a failed
+    case under its file name, so every script shows up in the results.
+    """
+    global _current
+    previous, _current = _current, run
+    recorded = len(run.cases)
+    error = None
+    try:
+        spec = importlib.util.spec_from_file_location(f"testsprite_tests.{os.path.basename(path)[:-3]}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        asyncio.run(module.run_test())
+    except Exception as e:
+        error = e  # recorded on the case; keep running the other TCs
+    finally:
+        _current = previous
+    if len(run.cases) == recorded:
+        case_id, title = _tc_title(path)
+        with contextlib.suppress(Exception), run.case(case_id, title):
+            raise error or RuntimeError("run_test() recorded no case")
+    return run.cases[-1].status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Structured TestSprite results: run TCs or rebuild a report")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="Run TC scripts into one structured run")
+    run_parser.add_argument("only", nargs="*", help="TC ids to run (default: all)")
+    run_parser.add_argument("--report", action="store_true", help=f"Also write {os.path.relpath(REPORT_PATH)}")
+    run_parser.add_argument("--dir", default=TESTS_DIR, help="Directory holding the TC scripts")
+    report_parser = sub.add_parser("report", help="Rebuild the regression report from an events.jsonl")
+    report_parser.add_argument("events", help="events.jsonl of a run")
+    report_parser.add_argument("--out", default=REPORT_PATH, help="Report path")
+    args = parser.parse_args()
+
+    if args.command == "report":
+        meta, cases = load_events(args.events)
+        print(f"Report written to {write_report(cases, args.out, meta)}")
+        return
+
+    paths = sorted(glob.glob(os.path.join(args.dir, "TC[0-9]*_*.py")))
+    if args.only:
+        paths = [p for p in paths if _tc_title(p)[0] in args.only]
+    run = RunRecorder("tc")
+    print(f"Streaming events to {run.events_path}")
+    for path in paths:
+        print(f"\n=== {os.path.basename(path)} ===")
+        run_tc(run, path)
+    outputs = run.finish(REPORT_PATH if args.report else None)
+    passed = sum(1 for c in run.cases if c.status == "passed")
+    print(f"\n{passed}/{len(run.cases)} TCs passed")
+    for kind, path in outputs.items():
+        print(f"{kind}: {path}")
+    sys.exit(0 if passed == len(run.cases) else 1)
+
+
+if __name__ == "__main__":
+    # Run as the importable module: TCs import testsprite_tests.run_results,
+    # and `case`/_current must be that module's, not __main__'s, or they
+    # record into a second run of their own
+    from testsprite_tests import run_results
+    run_results.main()
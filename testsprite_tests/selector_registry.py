@@ -0,0 +1,410 @@
+"""
+Selector Registry for TestSprite Tests
+
+One entry per routed screen, keyed by its src/App.tsx route, so a page
+component mounted on several routes (Settings, Profile and HelpSupport for
+both roles, TechnicianInspectionForm in admin mode, LeadDetail as the
+technician job view) gets an entry per route. Each screen also has a unique
+name for lookups. Every page root carries a stable
+data-testid="screen-<page>" so tests no longer
+depend on absolute XPaths (TC007) or whole-DOM class-substring scans like
+[class*="card"] (TC003-TC016). Secondary elements use existing data-testids
+or Playwright role/placeholder selectors, which resolve via the accessibility
+tree instead of walking every element's class attribute.
+
+Every resolution through the registry is timed and its match count recorded,
+so the slowest and most ambiguous selectors can be reported after a run.
+
+Example:
+    registry = SelectorRegistry(page)
+    await page.goto(f"{BASE_URL}/admin/leads")
+    await registry.wait_for_screen("LeadsManagement")
+    count = await registry.count("AdminSchedule", "technician_grid")
+    registry.print_report()
+
+check_routes() compares the registry with the route table parsed from
+src/App.tsx, so a route added or re-pointed in the app shows up as a
+mismatch instead of a screen that audits silently skip.
+"""
+import json
+import os
+import re
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+TIMINGS_PATH = "testsprite_tests/tmp/selector_timings.json"
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "App.tsx")
+
+
+@dataclass(frozen=True)
+class Screen:
+    """A routed page and the named selectors tests may use on it."""
+    name: str
+    route: str
+    role: Optional[str]
+    component: str
+    elements: dict = field(default_factory=dict)
+
+    @property
+    def root(self) -> str:
+        return self.elements["root"]
+
+
+def _testid(value: str) -> str:
+    return f'[data-testid="{value}"]'
+
+
+def _screen(name: str, testid: str, route: str, role: Optional[str], component: str = None,
+            **elements) -> Screen:
+    return Screen(name=name, route=route, role=role, component=component or name,
+                  elements={"root": _testid(testid), **elements})
+
+
+ADMIN_NAV = {
+    "nav_dashboard": 'role=button[name="Dashboard"]',
+    "nav_leads": 'role=button[name="Leads"]',
+    "nav_schedule": 'role=button[name="Schedule"]',
+    "nav_reports": 'role=button[name="Reports"]',
+    "nav_activity": 'role=button[name="Recent Activity"]',
+}
+TECHNICIAN_NAV = {
+    "nav_home": 'nav >> role=button[name="Home"]',
+    "nav_jobs": 'nav >> role=button[name="My Jobs"]',
+    "nav_alerts": 'nav >> role=button[name="Alerts"]',
+}
+# TechnicianInspectionForm in either mode. The header title is overridden in
+# admin mode, so the current section is identified by its content instead
+INSPECTION_FORM = {
+    "save": 'role=button[name=/save/i]',
+    "next": 'role=button[name=/next/i]',
+    "previous": 'role=button[name=/previous/i]',
+    "progress": 'text=/Section \\d+ of \\d+/',
+    "field": 'main input:not([type="hidden"]), main textarea, main select',
+    "add_area": 'role=button[name=/add another area/i]',
+    "photo_upload": _testid("photo-upload"),
+    "photo_input": 'input[type="file"]',
+    "photo_thumbnail": _testid("photo-thumbnail"),
+}
+SETTINGS = {
+    "back": 'role=button[name="Go back"]',
+    "section": 'role=heading[level=2]',
+    "profile": 'role=button[name=/my profile/i]',
+    "change_password": 'role=button[name=/change password/i]',
+}
+
+# Keyed by App.tsx route. Routes with params use the App.tsx placeholder;
+# callers substitute ids before navigating. src/pages/TechnicianJobDetail.tsx
+# is imported in App.tsx but not routed: /technician/job/:id renders
+# LeadDetail, so it has no entry here (see UNROUTED_PAGES).
+SCREENS = {
+    screen.route: screen
+    for screen in (
+        _screen("Login", "screen-login", "/", None,
+                email='[placeholder="Email"]',
+                password='[placeholder="Password"]',
+                role_admin='role=button[name="Admin"]',
+                role_technician='role=button[name="Technician"]',
+                submit='button[type="submit"]'),
+        _screen("ForgotPassword", "screen-forgot-password", "/forgot-password", None),
+        _screen("CheckEmail", "screen-check-email", "/check-email", None),
+        _screen("ResetPassword", "screen-reset-password", "/reset-password", None),
+        _screen("RequestInspection", "screen-request-inspection", "/request-inspection", None,
+                submit='button[type="submit"]'),
+        _screen("RequestInspectionSuccess", "screen-request-inspection-success",
+                "/request-inspection/success", None),
+        _screen("AdminDashboard", "screen-admin-dashboard", "/admin", "admin",
+                # Plain CSS so dom_probe can batch them
+                menu='button[aria-label="Open menu"]',
+                stats_card=_testid("stats-card"),
+                stat_link='[data-testid="screen-admin-dashboard"] div[role="button"]',
+                section='role=heading[level=2]',
+                view_all='role=button[name=/view all/i]',
+                **ADMIN_NAV),
+        _screen("AdminSchedule", "screen-admin-schedule", "/admin/schedule", "admin",
+                technician_grid=_testid("technician-grid"),
+                inspection_date=_testid("inspection-date"),
+                inspection_time=_testid("inspection-time"),
+                availability_error=_testid("availability-error"),
+                recs_error=_testid("recs-error"),
+                recs_empty=_testid("recs-empty"),
+                week_previous='role=button[name="Previous week"]',
+                week_next='role=button[name="Next week"]',
+                today='role=button[name="Today"]',
+                calendar_event=_testid("calendar-event"),
+                technician_filter=_testid("technician-filter"),
+                all_filter='role=button[name=/^All$/]',
+                cancelled_filter='role=button[name=/cancelled/i]',
+                **ADMIN_NAV),
+        _screen("AdminTechnicians", "screen-admin-technicians", "/admin/technicians", "admin"),
+        _screen("AdminTechnicianDetail", "screen-admin-technician-detail", "/admin/technicians/:id", "admin"),
+        _screen("LeadsManagement", "screen-leads-management", "/admin/leads", "admin",
+                search='input[type="search"], [placeholder*="Search"]',
+                new_lead='role=button[name=/new lead/i]',
+                pipeline_tab=_testid("pipeline-tab"),
+                sort='role=combobox',
+                view_cards='role=button[name="Card view"]',
+                view_list='role=button[name="List view"]',
+                lead_count='text=/\\d+ of \\d+ leads/',
+                lead_card=_testid("lead-card"),
+                **ADMIN_NAV),
+        _screen("InspectionAIReview", "screen-inspection-ai-review", "/admin/inspection-ai-review/:leadId", "admin"),
+        _screen("AdminInvoiceHelper", "screen-admin-invoice-helper", "/admin/invoice/:leadId", "admin"),
+        _screen("Reports", "screen-reports", "/admin/reports", "admin",
+                period='role=button[name=/^(today|this week|this month|this year)$/i]',
+                kpi_card=_testid("kpi-card"),
+                chart_title='role=heading[level=3]',
+                **ADMIN_NAV),
+        _screen("Notifications", "screen-notifications", "/admin/activity", "admin",
+                activity_event=_testid("activity-event"),
+                empty='text="No activity yet"',
+                **ADMIN_NAV),
+        _screen("Settings", "screen-settings", "/admin/settings", "admin",
+                manage_users='role=button[name=/manage users/i]',
+                **SETTINGS),
+        _screen("RenderPdfTest", "screen-render-pdf-test", "/admin/render-test", "admin"),
+        _screen("HelpSupport", "screen-help-support", "/admin/help", "admin"),
+        _screen("Profile", "screen-profile", "/admin/profile", "admin",
+                sign_out='role=button[name=/sign out/i]'),
+        _screen("AdminInspectionForm", "screen-technician-inspection-form", "/admin/inspection/:leadId", "admin",
+                component="TechnicianInspectionForm", **INSPECTION_FORM),
+        _screen("LeadDetail", "screen-lead-detail", "/leads/:id", "admin"),
+        _screen("ViewReportPDF", "screen-view-report-pdf", "/inspection/:inspectionId/report", "admin",
+                regenerate='role=button[name=/regenerate/i]',
+                approve='role=button[name=/approve/i]'),
+        _screen("AdminJobReport", "screen-view-report-pdf", "/admin/job-report/:leadId", "admin",
+                component="ViewReportPDF"),
+        _screen("ReportById", "screen-view-report-pdf", "/report/:id", "admin", component="ViewReportPDF"),
+        _screen("TechnicianDashboard", "screen-technician-dashboard", "/technician", "technician",
+                **TECHNICIAN_NAV),
+        _screen("TechnicianJobs", "screen-technician-jobs", "/technician/jobs", "technician",
+                **TECHNICIAN_NAV),
+        _screen("TechnicianAlerts", "screen-technician-alerts", "/technician/alerts", "technician",
+                **TECHNICIAN_NAV),
+        _screen("TechnicianInspectionForm", "screen-technician-inspection-form",
+                "/technician/inspection", "technician", **INSPECTION_FORM),
+        _screen("TechnicianLeadDetail", "screen-lead-detail", "/technician/job/:id", "technician",
+                component="LeadDetail"),
+        _screen("JobCompletionForm", "screen-job-completion-form",
+                "/technician/job-completion/:leadId", "technician",
+                lightbox=_testid("lightbox-gesture-surface")),
+        _screen("TechnicianProfile", "screen-profile", "/technician/profile", "technician", component="Profile",
+                sign_out='role=button[name=/sign out/i]'),
+        _screen("TechnicianSettings", "screen-settings", "/technician/settings", "technician",
+                component="Settings", **SETTINGS),
+        _screen("TechnicianHelpSupport", "screen-help-support", "/technician/help", "technician",
+                component="HelpSupport"),
+        _screen("NotFound", "screen-not-found", "*", None),
+    )
+}
+
+SCREENS_BY_NAME = {screen.name: screen for screen in SCREENS.values()}
+
+# Pages under src/pages that App.tsx imports but never routes
+UNROUTED_PAGES = {"TechnicianJobDetail"}
+
+
+def screen_named(name: str) -> Screen:
+    """Returns the screen registered under `name` (e.g. "TechnicianSettings")."""
+    try:
+        return SCREENS_BY_NAME[name]
+    except KeyError:
+        raise KeyError(f"No screen registered as {name}") from None
+
+
+def screen_for_route(route: str) -> Optional[Screen]:
+    """Returns the registered screen whose route pattern matches `route`."""
+    path = route.split("?")[0].rstrip("/") or "/"
+    for screen in SCREENS.values():
+        if screen.route == "*":
+            continue
+        pattern = screen.route.split("/")
+        parts = path.split("/")
+        if len(pattern) == len(parts) and all(
+            p.startswith(":") or p == actual for p, actual in zip(pattern, parts)
+        ):
+            return screen
+    return None
+
+
+# Screens whose route needs a fixture other than a lead (technician, AI
+# review, invoice or rendered report), so route crawls skip them
+NEEDS_FIXTURE = {"RenderPdfTest", "AdminTechnicianDetail", "InspectionAIReview",
+                 "AdminInvoiceHelper", "ViewReportPDF", "AdminJobReport", "ReportById"}
+
+_ROUTE_RE = re.compile(r'<Route\s+path="([^"]+)"\s+element=\{(.*?)\}\s*/>', re.S)
+_ROLES_RE = re.compile(r"allowedRoles=\{\[\s*\"(\w+)\"")
+_WRAPPERS = {"ProtectedRoute", "RoleProtectedRoute", "Suspense", "PageErrorBoundary", "GlobalLoader"}
+
+
+def app_routes(app_path: str = APP_PATH) -> dict:
+    """
+    Parses the route table from src/App.tsx.
+
+    Returns:
+        dict: route -> (page component, allowed role or None)
+    """
+    with open(app_path) as f:
+        source = f.read()
+    routes = {}
+    for match in _ROUTE_RE.finditer(source):
+        element = match.group(2)
+        component = next((c for c in re.findall(r"<([A-Z]\w*)", element) if c not in _WRAPPERS), None)
+        role = _ROLES_RE.search(element)
+        routes[match.group(1)] = (component, role.group(1) if role else None)
+    return routes
+
+
+def check_routes(app_path: str = APP_PATH) -> list:
+    """
+    Compares SCREENS with the App.tsx route table.
+
+    Returns:
+        list[str]: one line per mismatch; empty when the registry matches
+    """
+    table = app_routes(app_path)
+    problems = []
+    for route, (component, role) in table.items():
+        screen = SCREENS.get(route)
+        if screen is None:
+            problems.append(f"{route} renders {component} but has no registry entry")
+        elif (screen.component, screen.role) != (component, role):
+            problems.append(f"{route} is registered as {screen.component} ({screen.role}) "
+                            f"but App.tsx renders {component} ({role})")
+    for route, screen in SCREENS.items():
+        if route not in table:
+            problems.append(f"{screen.name} is registered at {route}, which App.tsx does not route")
+    routed = {component for component, _ in table.values()}
+    pages_dir = os.path.join(os.path.dirname(app_path), "pages")
+    pages = {name[:-4] for name in os.listdir(pages_dir) if name.endswith(".tsx")} if os.path.isdir(pages_dir) else set()
+    for page in sorted(pages - routed - UNROUTED_PAGES):
+        problems.append(f"src/pages/{page}.tsx is not routed in App.tsx")
+    for page in sorted(UNROUTED_PAGES & routed):
+        problems.append(f"{page} is listed in UNROUTED_PAGES but App.tsx now routes it")
+    return problems
+
+
+def authenticated_routes(lead_id: Optional[str] = None) -> list:
+    """
+    Concrete (role, route, screen) for every signed-in screen.
+
+    Lead routes (/leads/:id, the technician job view, the inspection form in
+    both modes and the completion form) are included only when `lead_id` is
+    given.
+    """
+    routes = []
+    for screen in SCREENS.values():
+        if screen.role is None or screen.name in NEEDS_FIXTURE:
+            continue
+        route = screen.route
+        if screen.name == "TechnicianInspectionForm":
+            if not lead_id:
+                continue
+            route = f"{route}?leadId={lead_id}"
+        elif ":" in route:
+            if not lead_id:
+                continue
+            route = route.split(":")[0] + lead_id
+        routes.append((screen.role, route, screen.name))
+    return routes
+
+
+class SelectorRegistry:
+    """
+    Page-bound view of SCREENS that caches locators and times every resolution.
+
+    Args:
+        page: Playwright page to resolve selectors against
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self._locators = {}
+        # (screen, element) -> list of (duration_ms, match_count)
+        self.samples = {}
+
+    def selector(self, screen: str, element: str = "root") -> str:
+        """Returns the raw selector string for a registered element of a named screen."""
+        try:
+            return SCREENS_BY_NAME[screen].elements[element]
+        except KeyError:
+            raise KeyError(f"No selector registered for {screen}.{element}") from None
+
+    def locator(self, screen: str, element: str = "root"):
+        """Returns a cached Playwright locator for a registered element."""
+        key = (screen, element)
+        if key not in self._locators:
+            self._locators[key] = self.page.locator(self.selector(screen, element))
+        return self._locators[key]
+
+    def _record(self, key, start: float, count: int):
+        duration_ms = (time.perf_counter() - start) * 1000
+        self.samples.setdefault(key, []).append((duration_ms, count))
+
+    async def count(self, screen: str, element: str = "root") -> int:
+        """Resolves a registered element and returns its match count, timing the lookup."""
+        start = time.perf_counter()
+        count = await self.locator(screen, element).count()
+        self._record((screen, element), start, count)
+        return count
+
+    async def count_raw(self, selector: str) -> int:
+        """Times an ad-hoc selector so legacy scans show up in the same report."""
+        start = time.perf_counter()
+        count = await self.page.locator(selector).count()
+        self._record(("<raw>", selector), start, count)
+        return count
+
+    async def wait_for_screen(self, screen: str, timeout: int = 15000):
+        """Waits for a screen's root testid, failing with the URL we actually landed on."""
+        start = time.perf_counter()
+        try:
+            await self.locator(screen).wait_for(state="attached", timeout=timeout)
+        except Exception:
+            raise AssertionError(f"{screen} did not render (at {self.page.url})") from None
+        self._record((screen, "root"), start, 1)
+
+    def summary(self) -> list:
+        """
+        Aggregates recorded samples per selector.
+
+        Returns:
+            list[dict] sorted by p95 duration, slowest first
+        """
+        rows = []
+        for (screen, element), samples in self.samples.items():
+            durations = sorted(d for d, _ in samples)
+            counts = [c for _, c in samples]
+            p95_index = max(0, int(round(0.95 * len(durations))) - 1)
+            rows.append({
+                "screen": screen,
+                "element": element,
+                "selector": element if screen == "<raw>" else self.selector(screen, element),
+                "calls": len(samples),
+                "mean_ms": round(statistics.fmean(durations), 2),
+                "p95_ms": round(durations[p95_index], 2),
+                "max_matches": max(counts),
+            })
+        rows.sort(key=lambda r: r["p95_ms"], reverse=True)
+        return rows
+
+    def print_report(self, limit: int = 10):
+        """Prints the slowest and the most ambiguous selectors seen so far."""
+        rows = self.summary()
+        print(f"Slowest selectors (top {limit}):")
+        for row in rows[:limit]:
+            print(f"  {row['p95_ms']:>8.2f} ms p95  {row['calls']:>4}x  {row['screen']}.{row['element']}")
+
+        # Roots and named controls should match exactly one element
+        ambiguous = sorted((r for r in rows if r["max_matches"] > 1), key=lambda r: r["max_matches"], reverse=True)
+        print(f"Ambiguous selectors ({len(ambiguous)}):")
+        for row in ambiguous[:limit]:
+            print(f"  {row['max_matches']:>6} matches  {row['screen']}.{row['element']}  {row['selector'][:60]}")
+
+    def save(self, path: str = TIMINGS_PATH) -> str:
+        """Writes the summary as JSON and returns the path."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
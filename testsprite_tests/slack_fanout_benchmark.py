@@ -0,0 +1,408 @@
+"""
+Slack Fan-out Benchmark
+
+send-slack-notification and receive-framer-lead (buildSlackBlocks) post
+every event to the Slack webhook on its own, with no retry: a 429 from Slack
+is returned to the caller (send-slack-notification) or only logged
+(receive-framer-lead), and the notification is gone. send-slack-notification
+also rejects more than 10 calls a minute per client IP itself. This pushes a
+burst of lead, booking and invoice events through the functions against a
+local Slack stand-in that rate-limits like Slack's incoming webhooks (token
+bucket, HTTP 429 with Retry-After), and measures:
+
+- delivered per second, drops, and end-to-end delay (event sent -> accepted
+  by the stand-in) per event type,
+- retry behaviour: 429s served by the stand-in, attempts per delivered
+  message, and function responses by status (the function's own limiter is
+  counted separately from Slack 429s passed through).
+
+The same burst is then replayed in digest mode: events are coalesced for
+--digest-window seconds into one message per flush, and a 429 is retried
+after Retry-After. The functions have no digest mode, so it is modelled in
+the harness, posting to the stand-in directly; the comparison shows how many
+notifications direct fan-out loses or delays against what coalescing would.
+
+The functions must post to the stand-in, which listens on all interfaces so
+the edge runtime container can reach it:
+
+    echo "SLACK_WEBHOOK_URL=http://host.docker.internal:3902/services/slack-bench" >> supabase/functions/.env
+    supabase functions serve --env-file supabase/functions/.env
+    python testsprite_tests/slack_fanout_benchmark.py --burst lead=30 booking=10 invoice=10
+    python testsprite_tests/slack_fanout_benchmark.py --framer --burst-seconds 2 --digest-window 10
+
+Lead events go through send-slack-notification's new_lead event by default;
+--framer posts them to receive-framer-lead instead, which creates leads and
+webhook_submissions rows (emails under SEED_EMAIL_DOMAIN, removed afterwards).
+send-slack-notification authenticates with INTERNAL_WEBHOOK_SECRET when set,
+as the email_logs trigger does, otherwise with the admin's JWT.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.local_stack import ANON_KEY, SUPABASE_URL, auth_headers, http_json, password_token, sql_exec
+from testsprite_tests.measure import percentile
+
+RESULTS_DIR = "testsprite_tests/tmp/slack_fanout"
+STANDIN_PORT = int(os.getenv("SLACK_STANDIN_PORT", "3902"))
+STANDIN_PATH = "/services/slack-bench"
+SEED_EMAIL_DOMAIN = "slack-bench.invalid"
+INTERNAL_WEBHOOK_SECRET = os.getenv("INTERNAL_WEBHOOK_SECRET", "")
+# Slack incoming webhooks: about one message per second, short bursts tolerated
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 4
+DEFAULT_MIX = {"lead": 20, "booking": 10, "invoice": 10}
+# Slack caps a message's text; a digest splits past this many lines
+DIGEST_MAX_LINES = 50
+_MARKER_RE = re.compile(r"slack-bench:(\w+):(\d+)")
+
+
+class SlackStandIn:
+    """
+    Local incoming-webhook endpoint with a token-bucket rate limit.
+
+    Accepted posts return 200 "ok"; over the limit it answers 429 with
+    Retry-After, as Slack does. Every event marker in a post body is recorded
+    with its attempt count and the time it was accepted.
+
+    Only posts carrying the current run's markers count. A post left over
+    from an earlier run (a direct send still in flight when digest mode
+    starts) is answered 200 without spending a token and counted as stray.
+    """
+
+    def __init__(self, rate: float, burst: int, port: int = STANDIN_PORT):
+        self.rate = rate
+        self.burst = burst
+        self.port = port
+        self.lock = threading.Lock()
+        self.reset(None)
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode(errors="replace")
+                status, retry_after = standin.receive(body)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain")
+                if retry_after:
+                    self.send_header("Retry-After", str(retry_after))
+                self.end_headers()
+                self.wfile.write(b"ok" if status == 200 else b"rate_limited")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def reset(self, run_id: str):
+        with self.lock:
+            self.run_id = run_id
+            self.tokens = float(self.burst)
+            self.refilled = time.monotonic()
+            self.accepted = {}   # marker -> accepted time (time.time())
+            self.attempts = {}   # marker -> posts carrying it, including 429s
+            self.posts = 0
+            self.rejected = 0
+            self.stray = 0
+
+    def receive(self, body: str) -> tuple:
+        found = _MARKER_RE.findall(body)
+        with self.lock:
+            if found and all(run != self.run_id for run, _ in found):
+                self.stray += 1
+                return 200, None
+            markers = [f"{run}:{seq}" for run, seq in found if run == self.run_id]
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            for marker in markers:
+                self.attempts[marker] = self.attempts.get(marker, 0) + 1
+            if self.tokens < 1:
+                self.rejected += 1
+                return 429, max(1, round((1 - self.tokens) / self.rate))
+            self.tokens -= 1
+            self.posts += 1
+            accepted_at = time.time()
+            for marker in markers:
+                self.accepted.setdefault(marker, accepted_at)
+            return 200, None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}{STANDIN_PATH}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def build_events(mix: dict, run_id: str) -> list:
+    """Interleaved events; each carries a `slack-bench:<run>:<seq>` marker in a rendered field."""
+    events, seq = [], 0
+    remaining = dict(mix)
+    while any(remaining.values()):
+        for kind in list(remaining):
+            if not remaining[kind]:
+                continue
+            remaining[kind] -= 1
+            seq += 1
+            marker = f"slack-bench:{run_id}:{seq}"
+            events.append({"kind": kind, "marker": f"{run_id}:{seq}", "seq": seq,
+                           "name": f"Bench Lead {seq} {marker}"})
+    return events
+
+
+def _slack_payload(event: dict) -> dict:
+    """send-slack-notification body for an event, as the app's notification helpers send it."""
+    if event["kind"] == "lead":
+        return {"event": "new_lead", "full_name": event["name"], "phone": "0400000000",
+                "email": f"lead{event['seq']}@{SEED_EMAIL_DOMAIN}", "suburb": "Richmond", "lead_source": "website"}
+    if event["kind"] == "booking":
+        return {"event": "inspection_booked", "leadName": event["name"], "propertyAddress": "1 Bench St, Richmond",
+                "technicianName": "Bench Tech", "bookingDate": time.strftime("%d/%m/%Y")}
+    return {"event": "custom", "leadName": event["name"],
+            "message": f"💰 Invoice INV-{event['seq']:05d} marked as sent for {event['name']} — $1100.00"}
+
+
+def _framer_payload(event: dict) -> dict:
+    return {"full_name": event["name"], "phone": f"04{event['seq']:08d}",
+            "email": f"lead{event['seq']}@{SEED_EMAIL_DOMAIN}", "street": f"{event['seq']} Bench St",
+            "suburb": "Richmond", "postcode": "3121", "issue_description": "Mould in bathroom"}
+
+
+def _digest_line(event: dict) -> str:
+    text = {"lead": "🏠 New lead", "booking": "📅 Inspection booked", "invoice": "💰 Invoice sent"}[event["kind"]]
+    return f"{text}: {event['name']}"
+
+
+class DirectSender:
+    """Posts each event through the edge functions, as production does."""
+
+    def __init__(self, framer: bool):
+        self.framer = framer
+        if INTERNAL_WEBHOOK_SECRET:
+            self.slack_headers = {"apikey": ANON_KEY, "x-internal-secret": INTERNAL_WEBHOOK_SECRET}
+        else:
+            self.slack_headers = auth_headers(password_token())
+
+    def send(self, event: dict) -> dict:
+        if self.framer and event["kind"] == "lead":
+            url, body, headers = f"{SUPABASE_URL}/functions/v1/receive-framer-lead", _framer_payload(event), {}
+        else:
+            url, body, headers = (f"{SUPABASE_URL}/functions/v1/send-slack-notification",
+                                  _slack_payload(event), self.slack_headers)
+        status, response, _ = http_json("POST", url, body, headers)
+        text = json.dumps(response) if isinstance(response, dict) else str(response)[:200]
+        if status == 429 and "Slack" not in text:
+            outcome = "function_rate_limited"
+        elif status == 429:
+            outcome = "slack_429"
+        else:
+            outcome = "ok" if status < 300 else f"http_{status}"
+        return {"status": status, "outcome": outcome}
+
+
+class DigestSender:
+    """Coalesces events for `window` seconds into one Slack post, retrying 429s after Retry-After."""
+
+    def __init__(self, webhook: str, window: float):
+        self.webhook = webhook
+        self.window = window
+        self.pending = []
+        self.lock = threading.Lock()
+        self.stats = {"posts": 0, "retries": 0, "failures": 0}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def send(self, event: dict) -> dict:
+        with self.lock:
+            self.pending.append(event)
+        return {"status": 202, "outcome": "queued"}
+
+    def _post(self, lines: list):
+        body = {"text": f"*{len(lines)} notifications*\n" + "\n".join(lines)}
+        for _ in range(10):
+            status, _, headers = http_json("POST", self.webhook, body)
+            if status != 429:
+                self.stats["posts"] += 1
+                if status >= 300:
+                    self.stats["failures"] += 1
+                return
+            self.stats["retries"] += 1
+            time.sleep(float(headers.get("Retry-After") or 1))
+        self.stats["failures"] += 1
+
+    def flush(self):
+        with self.lock:
+            batch, self.pending = self.pending, []
+        for start in range(0, len(batch), DIGEST_MAX_LINES):
+            self._post([_digest_line(e) for e in batch[start:start + DIGEST_MAX_LINES]])
+
+    def _run(self):
+        while not self._stop.wait(self.window):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+
+def fire_burst(sender, events: list, burst_seconds: float, workers: int = 16) -> list:
+    """Sends `events` spread evenly over `burst_seconds`; returns each event with its send time and outcome."""
+    start = time.time()
+    gap = burst_seconds / max(1, len(events))
+
+    def send(indexed):
+        index, event = indexed
+        time.sleep(max(0.0, start + index * gap - time.time()))
+        sent_at = time.time()
+        return {**event, "sent_at": sent_at, **sender.send(event)}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(send, enumerate(events)))
+
+
+def summarise(mode: str, sent: list, standin: SlackStandIn, started: float, extra: dict = None) -> dict:
+    delivered = [e for e in sent if e["marker"] in standin.accepted]
+    delays = [standin.accepted[e["marker"]] - e["sent_at"] for e in delivered]
+    last = max(standin.accepted.values(), default=started)
+    by_kind = {}
+    for kind in sorted({e["kind"] for e in sent}):
+        events = [e for e in sent if e["kind"] == kind]
+        kind_delays = [standin.accepted[e["marker"]] - e["sent_at"] for e in events if e["marker"] in standin.accepted]
+        by_kind[kind] = {"sent": len(events), "delivered": len(kind_delays), "dropped": len(events) - len(kind_delays),
+                         "p50_delay_s": round(percentile(kind_delays, 50), 2),
+                         "p95_delay_s": round(percentile(kind_delays, 95), 2)}
+    outcomes = {}
+    for e in sent:
+        outcomes[e["outcome"]] = outcomes.get(e["outcome"], 0) + 1
+    delivered_attempts = [standin.attempts[e["marker"]] for e in delivered]
+    return {
+        "mode": mode,
+        "sent": len(sent),
+        "delivered": len(delivered),
+        "dropped": len(sent) - len(delivered),
+        "delivered_per_s": round(len(delivered) / max(0.001, last - started), 2),
+        "p50_delay_s": round(percentile(delays, 50), 2),
+        "p95_delay_s": round(percentile(delays, 95), 2),
+        "max_delay_s": round(max(delays), 2) if delays else None,
+        "slack_posts": standin.posts,
+        "slack_429s": standin.rejected,
+        "stray_posts": standin.stray,
+        "mean_attempts": round(statistics.fmean(delivered_attempts), 2) if delivered_attempts else None,
+        "outcomes": outcomes,
+        "by_kind": by_kind,
+        **(extra or {}),
+    }
+
+
+def run_mode(mode: str, standin: SlackStandIn, events: list, run_id: str, args) -> dict:
+    standin.reset(run_id)
+    started = time.time()
+    if mode == "direct":
+        sent = fire_burst(DirectSender(args.framer), events, args.burst_seconds)
+        extra = None
+    else:
+        digest = DigestSender(standin.url, args.digest_window)
+        sent = fire_burst(digest, events, args.burst_seconds)
+        digest.close()
+        extra = {"digest": digest.stats}
+    # Late accepts: receive-framer-lead posts to Slack after responding
+    deadline = time.time() + args.drain
+    while time.time() < deadline and any(e["marker"] not in standin.accepted for e in sent):
+        time.sleep(0.5)
+    return summarise(mode, sent, standin, started, extra)
+
+
+def delete_seeded():
+    sql_exec(f"""
+        delete from public.leads where email like '%@{SEED_EMAIL_DOMAIN}';
+        delete from public.webhook_submissions where raw_payload->>'email' like '%@{SEED_EMAIL_DOMAIN}'
+    """)
+
+
+def print_report(results: list):
+    print(f"\n{'mode':<7} {'sent':>5} {'deliv':>6} {'drop':>5} {'deliv/s':>8} {'p50 s':>6} {'p95 s':>6} "
+          f"{'max s':>6} {'posts':>6} {'429s':>5} {'attempts':>8}")
+    for r in results:
+        print(f"{r['mode']:<7} {r['sent']:>5} {r['delivered']:>6} {r['dropped']:>5} {r['delivered_per_s']:>8} "
+              f"{r['p50_delay_s']:>6} {r['p95_delay_s']:>6} {str(r['max_delay_s']):>6} {r['slack_posts']:>6} "
+              f"{r['slack_429s']:>5} {str(r['mean_attempts']):>8}")
+    for r in results:
+        print(f"\n{r['mode']}: " + ", ".join(f"{k} {v}" for k, v in r["outcomes"].items()))
+        for kind, k in r["by_kind"].items():
+            print(f"  {kind:<8} {k['delivered']}/{k['sent']} delivered, {k['dropped']} dropped, "
+                  f"delay p50 {k['p50_delay_s']} s p95 {k['p95_delay_s']} s")
+        if r["stray_posts"]:
+            print(f"  {r['stray_posts']} late posts from an earlier mode ignored")
+        if r.get("digest"):
+            d = r["digest"]
+            print(f"  digest: {d['posts']} posts, {d['retries']} retried after 429, {d['failures']} failed")
+
+
+def _parse_mix(values: list) -> dict:
+    mix = {}
+    for value in values:
+        kind, _, count = value.partition("=")
+        if kind not in DEFAULT_MIX or not count.isdigit():
+            raise argparse.ArgumentTypeError(f"expected lead|booking|invoice=<count>, got {value}")
+        mix[kind] = int(count)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Slack fan-out against a rate-limited stand-in")
+    parser.add_argument("--burst", nargs="*", default=[f"{k}={v}" for k, v in DEFAULT_MIX.items()],
+                        help="Events per type, e.g. lead=30 booking=10 invoice=10")
+    parser.add_argument("--burst-seconds", type=float, default=5, help="Spread of the burst")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Stand-in messages per second")
+    parser.add_argument("--bucket", type=int, default=DEFAULT_BURST, help="Stand-in burst allowance")
+    parser.add_argument("--digest-window", type=float, default=5, help="Digest coalescing window in seconds")
+    parser.add_argument("--drain", type=float, default=30, help="Seconds to wait for late deliveries")
+    parser.add_argument("--modes", nargs="*", choices=["direct", "digest"], default=["direct", "digest"])
+    parser.add_argument("--framer", action="store_true", help="Send lead events through receive-framer-lead")
+    args = parser.parse_args()
+    mix = _parse_mix(args.burst)
+
+    stamp = time.strftime("%H%M%S")
+    results = []
+    try:
+        with SlackStandIn(args.rate, args.bucket) as standin:
+            print(f"Slack stand-in on {standin.url} ({args.rate}/s, bucket {args.bucket})")
+            for mode in args.modes:
+                # Own markers per mode, so late posts from the previous mode are not counted
+                run_id = f"{stamp}_{mode}"
+                events = build_events(mix, run_id)
+                print(f"{mode}: {len(events)} events over {args.burst_seconds} s")
+                results.append(run_mode(mode, standin, events, run_id, args))
+    finally:
+        if args.framer:
+            delete_seeded()
+
+    print_report(results)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"fanout-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"args": vars(args), "mix": mix, "results": results}, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Soak Mode for TestSprite Journeys
+
+Loops weighted plan entries for hours in long-lived pages, the way the office
+leaves the app open for a whole shift, and samples every minute:
+
+- browser process-tree RSS and Chromium process count
+- JS heap, DOM nodes and event listeners per session page
+- Postgres connections by application (pg_stat_activity)
+- edge-function latency: CORS preflight probes plus the journeys' own calls
+- step latency and failures since the previous sample
+
+Samples and step timings are appended to JSONL as the run goes, so a crashed
+or interrupted soak can still be analysed. A session whose loop dies with an
+error stops running journeys; its error is saved and listed in the report. The report fits a linear trend to
+each metric and flags growth beyond --drift-threshold over the run, and flags
+any step whose p95 in the last window is --degrade-ratio times the first.
+
+Requires the local stack, the dev server and `psql` on PATH:
+
+    python testsprite_tests/soak.py --duration 4h --sessions 2 --weight TC005=3 --weight TC015=2
+    python testsprite_tests/soak.py --analyse testsprite_tests/tmp/soak/soak-20260301-090000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.auth_helper import STORAGE_STATE_PATH, get_authenticated_context
+from testsprite_tests.local_stack import ANON_KEY, EDGE_FUNCTION_RE, SUPABASE_URL, http_json, sql_json
+from testsprite_tests.measure import children_map, percentile, rss_bytes, tree_rss_bytes
+from testsprite_tests.plan_executor import load_compiled_plan, run_case
+
+RESULTS_DIR = "testsprite_tests/tmp/soak"
+DEFAULT_PROBE_FUNCTIONS = ["calculate-travel-time", "generate-inspection-pdf", "send-slack-notification"]
+# Metrics fitted for drift: (sample key, unit)
+DRIFT_METRICS = [
+    ("browser_rss_mb", "MB"),
+    ("js_heap_mb", "MB"),
+    ("dom_nodes", "nodes"),
+    ("js_listeners", "listeners"),
+    ("pg_connections", "conns"),
+    ("edge_probe_ms", "ms"),
+    ("step_p95_ms", "ms"),
+]
+_DURATION_RE = re.compile(r"^(\d+(?:\.\d+)?)([hms]?)$")
+
+
+def parse_duration(text: str) -> float:
+    """'4h', '90m', '45s' or plain seconds -> seconds."""
+    match = _DURATION_RE.match(text.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Bad duration: {text}")
+    value, unit = float(match.group(1)), match.group(2) or "s"
+    return value * {"h": 3600, "m": 60, "s": 1}[unit]
+
+
+def linear_fit(xs: list, ys: list) -> tuple:
+    """Least-squares fit. Returns (slope, intercept, r_squared)."""
+    n = len(xs)
+    if n < 3:
+        return 0.0, (ys[0] if ys else 0.0), 0.0
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    if sxx == 0:
+        return 0.0, mean_y, 0.0
+    slope = sxy / sxx
+    r_squared = (sxy * sxy) / (sxx * syy) if syy else 0.0
+    return slope, mean_y - slope * mean_x, r_squared
+
+
+class SoakSession:
+    """One long-lived page with a CDP session for heap and DOM counters."""
+
+    def __init__(self, name: str, page, cdp):
+        self.name = name
+        self.page = page
+        self.cdp = cdp
+        self.edge_latencies = []  # (function, ms) since last sample
+        page.on("requestfinished", self._on_finished)
+
+    def _on_finished(self, request):
+        match = EDGE_FUNCTION_RE.search(request.url)
+        if match and request.timing.get("responseEnd", -1) > 0:
+            self.edge_latencies.append((match.group(1), request.timing["responseEnd"]))
+
+    async def memory(self) -> dict:
+        heap = await self.cdp.send("Runtime.getHeapUsage")
+        counters = await self.cdp.send("Memory.getDOMCounters")
+        return {"heap": heap["usedSize"], "nodes": counters["nodes"], "listeners": counters["jsEventListeners"]}
+
+
+def browser_tree() -> tuple:
+    """RSS and Chromium process count for everything this process spawned (driver + browser)."""
+    own = os.getpid()
+    children = children_map()
+    total = tree_rss_bytes(own) - rss_bytes(own)
+    stack, chromium = list(children.get(own, [])), 0
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                chromium += "chrom" in f.read()
+        except OSError:
+            continue
+    return total, chromium
+
+
+def pg_connections() -> dict:
+    rows = sql_json(
+        "select coalesce(nullif(application_name, ''), backend_type) as app, count(*) as n "
+        "from pg_stat_activity where datname = current_database() group by 1"
+    )
+    return {row["app"]: row["n"] for row in rows}
+
+
+def probe_functions(functions: list) -> dict:
+    """Times a CORS preflight to each function: routing plus worker boot, no side effects."""
+    latencies = {}
+    for name in functions:
+        start = time.perf_counter()
+        try:
+            status, _, _ = http_json("OPTIONS", f"{SUPABASE_URL}/functions/v1/{name}",
+                                     headers={"apikey": ANON_KEY}, timeout=30)
+            latencies[name] = round((time.perf_counter() - start) * 1000, 1) if status < 500 else None
+        except Exception:
+            latencies[name] = None
+    return latencies
+
+
+async def session_loop(session: SoakSession, cases: list, weights: list, stop: asyncio.Event,
+                       started: float, step_log, counters: dict, rng: random.Random):
+    """Runs weighted journeys back to back in one page until stopped."""
+    while not stop.is_set():
+        case = rng.choices(cases, weights)[0]
+        result = await run_case(None, case, page=session.page)
+        await session.page.context.set_offline(False)
+        counters["cases"] += 1
+        counters["failures"] += result["status"] != "passed"
+        minute = (time.perf_counter() - started) / 60
+        for step in result["steps"]:
+            entry = {
+                "t_min": round(minute, 2), "session": session.name, "case": case.id, "step": step["index"],
+                "description": step["description"][:80], "status": step["status"], "duration_ms": step["duration_ms"],
+            }
+            counters["recent_steps"].append(entry)
+            step_log.write(json.dumps(entry) + "\n")
+        step_log.flush()
+
+
+async def take_sample(sessions: list, started: float, counters: dict, functions: list) -> dict:
+    rss, chromium = browser_tree()
+    memories = [await s.memory() for s in sessions]
+    try:
+        connections = await asyncio.to_thread(pg_connections)
+    except Exception as e:
+        print(f"  pg_stat_activity unavailable: {e}")
+        connections = {}
+    probes = await asyncio.to_thread(probe_functions, functions)
+    passive = [ms for s in sessions for _, ms in s.edge_latencies]
+    for s in sessions:
+        s.edge_latencies.clear()
+    steps = [e["duration_ms"] for e in counters["recent_steps"] if e["status"] == "passed"]
+    failed = sum(1 for e in counters["recent_steps"] if e["status"] == "failed")
+    counters["recent_steps"].clear()
+    probe_values = [v for v in probes.values() if v is not None]
+    return {
+        "t_min": round((time.perf_counter() - started) / 60, 2),
+        "browser_rss_mb": round(rss / 1024 / 1024, 1),
+        "chromium_processes": chromium,
+        "js_heap_mb": round(sum(m["heap"] for m in memories) / 1024 / 1024, 1),
+        "dom_nodes": sum(m["nodes"] for m in memories),
+        "js_listeners": sum(m["listeners"] for m in memories),
+        "pg_connections": sum(connections.values()) if connections else None,
+        "pg_by_app": connections,
+        "edge_probe_ms": round(statistics.fmean(probe_values), 1) if probe_values else None,
+        "edge_probes": probes,
+        "edge_calls": len(passive),
+        "edge_call_p50_ms": round(statistics.median(passive), 1) if passive else None,
+        "steps": len(steps),
+        "step_failures": failed,
+        "step_p95_ms": round(percentile(steps, 95), 1) if steps else None,
+        "cases_total": counters["cases"],
+        "case_failures_total": counters["failures"],
+    }
+
+
+def analyse(run_dir: str, drift_threshold: float, window_min: float, degrade_ratio: float) -> dict:
+    """Fits drift to the samples and compares step p95 between the first and last windows."""
+    with open(os.path.join(run_dir, "samples.jsonl")) as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+    with open(os.path.join(run_dir, "steps.jsonl")) as f:
+        steps = [json.loads(line) for line in f if line.strip()]
+    errors = []
+    if os.path.exists(os.path.join(run_dir, "errors.jsonl")):
+        with open(os.path.join(run_dir, "errors.jsonl")) as f:
+            errors = [json.loads(line) for line in f if line.strip()]
+
+    drift = []
+    for key, unit in DRIFT_METRICS:
+        points = [(s["t_min"] / 60, s[key]) for s in samples if s.get(key) is not None]
+        if len(points) < 3:
+            continue
+        xs, ys = zip(*points)
+        slope, intercept, r_squared = linear_fit(list(xs), list(ys))
+        span_h = xs[-1] - xs[0]
+        growth = slope * span_h / intercept if intercept else 0.0
+        drift.append({
+            "metric": key, "unit": unit, "start": round(intercept, 1), "per_hour": round(slope, 2),
+            "growth": round(growth, 3), "r_squared": round(r_squared, 2),
+            "flagged": growth > drift_threshold and r_squared >= 0.5,
+        })
+
+    degraded = []
+    if steps:
+        end = max(s["t_min"] for s in steps)
+        by_step = {}
+        for s in steps:
+            if s["status"] == "passed":
+                by_step.setdefault((s["case"], s["step"], s["description"]), []).append(s)
+        for (case, index, description), entries in by_step.items():
+            first = [e["duration_ms"] for e in entries if e["t_min"] <= window_min]
+            last = [e["duration_ms"] for e in entries if e["t_min"] >= end - window_min]
+            if len(first) < 5 or len(last) < 5 or end < 2 * window_min:
+                continue
+            before, after = percentile(first, 95), percentile(last, 95)
+            if before and after / before >= degrade_ratio:
+                degraded.append({"case": case, "step": index, "description": description,
+                                 "first_p95_ms": before, "last_p95_ms": after, "ratio": round(after / before, 2)})
+        degraded.sort(key=lambda d: -d["ratio"])
+
+    return {"samples": len(samples), "steps": len(steps), "drift": drift, "degraded_steps": degraded,
+            "session_errors": errors}
+
+
+def print_report(report: dict):
+    print(f"\nDrift over {report['samples']} samples / {report['steps']} steps:")
+    print(f"  {'metric':<16} {'start':>10} {'per hour':>10} {'growth':>8} {'r2':>5}")
+    for d in report["drift"]:
+        flag = "  <-- DRIFT" if d["flagged"] else ""
+        print(f"  {d['metric']:<16} {d['start']:>10.1f} {d['per_hour']:>+10.2f} {d['growth']:>8.1%} {d['r_squared']:>5.2f}{flag}")
+    if report["degraded_steps"]:
+        print("\nSteps whose p95 degraded:")
+        for d in report["degraded_steps"]:
+            print(f"  {d['case']} step {d['step']}: {d['first_p95_ms']:.0f} -> {d['last_p95_ms']:.0f} ms"
+                  f" (x{d['ratio']})  {d['description'][:60]}")
+    else:
+        print("\nNo step p95 degradation detected")
+    if report["session_errors"]:
+        print("\nSessions that stopped early:")
+        for e in report["session_errors"]:
+            print(f"  {e['session']}: {e['error']}")
+
+
+async def run_soak(args, run_dir: str):
+    from playwright.async_api import async_playwright
+
+    cases = load_compiled_plan()
+    if args.only:
+        cases = [c for c in cases if c.id in args.only]
+    overrides = dict(w.split("=", 1) for w in args.weight)
+    weights = [float(overrides.get(c.id, 1)) for c in cases]
+    rng = random.Random(args.seed)
+
+    pw = await async_playwright().start()
+    browser, context = await get_authenticated_context(pw)
+    await context.close()
+    sessions = []
+    for i in range(args.sessions):
+        context = await browser.new_context(storage_state=STORAGE_STATE_PATH)
+        context.set_default_timeout(30000)
+        page = await context.new_page()
+        sessions.append(SoakSession(f"s{i + 1}", page, await context.new_cdp_session(page)))
+
+    stop = asyncio.Event()
+    counters = {"cases": 0, "failures": 0, "recent_steps": []}
+    started = time.perf_counter()
+    print(f"Soaking {len(cases)} journeys in {args.sessions} session(s) for {args.duration / 3600:.1f}h -> {run_dir}")
+    with open(os.path.join(run_dir, "steps.jsonl"), "a") as step_log, \
+            open(os.path.join(run_dir, "samples.jsonl"), "a") as sample_log:
+        loops = [asyncio.create_task(session_loop(s, cases, weights, stop, started, step_log, counters, rng))
+                 for s in sessions]
+        try:
+            while time.perf_counter() - started < args.duration:
+                await asyncio.sleep(min(args.interval, args.duration - (time.perf_counter() - started)))
+                sample = await take_sample(sessions, started, counters, args.probe_functions)
+                sample_log.write(json.dumps(sample) + "\n")
+                sample_log.flush()
+                print(f"  t={sample['t_min']:>6.1f}m rss={sample['browser_rss_mb']:.0f}MB heap={sample['js_heap_mb']:.1f}MB"
+                      f" nodes={sample['dom_nodes']} pg={sample['pg_connections']} edge={sample['edge_probe_ms']}ms"
+                      f" steps={sample['steps']} p95={sample['step_p95_ms']}ms cases={sample['cases_total']}")
+        finally:
+            stop.set()
+            # Journeys finish their current case before stopping
+            outcomes = await asyncio.gather(*loops, return_exceptions=True)
+            errors = [{"session": s.name, "error": f"{type(e).__name__}: {e}"}
+                      for s, e in zip(sessions, outcomes) if isinstance(e, BaseException)]
+            with open(os.path.join(run_dir, "errors.jsonl"), "a") as error_log:
+                for error in errors:
+                    print(f"  session {error['session']} stopped: {error['error']}")
+                    error_log.write(json.dumps(error) + "\n")
+            await browser.close()
+            await pw.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loop weighted TestSprite journeys for hours and detect drift")
+    parser.add_argument("--duration", type=parse_duration, default=parse_duration("4h"), help="e.g. 4h, 90m")
+    parser.add_argument("--interval", type=float, default=60, help="Seconds between samples")
+    parser.add_argument("--sessions", type=int, default=2, help="Long-lived pages running journeys")
+    parser.add_argument("--only", nargs="*", help="Plan entry ids to include")
+    parser.add_argument("--weight", action="append", default=[], help="TCxxx=weight (default 1)")
+    parser.add_argument("--probe-functions", nargs="*", default=DEFAULT_PROBE_FUNCTIONS, help="Edge functions to probe")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for journey selection")
+    parser.add_argument("--drift-threshold", type=float, default=0.2, help="Flag metrics growing by more than this fraction")
+    parser.add_argument("--window", type=float, default=30, help="Minutes in the first/last p95 windows")
+    parser.add_argument("--degrade-ratio", type=float, default=1.5, help="Flag steps whose last/first p95 exceeds this")
+    parser.add_argument("--analyse", metavar="RUN_DIR", help="Only analyse an existing soak directory")
+    args = parser.parse_args()
+
+    run_dir = args.analyse
+    if not run_dir:
+        run_dir = os.path.join(RESULTS_DIR, f"soak-{time.strftime('%Y%m%d-%H%M%S')}")
+        os.makedirs(run_dir, exist_ok=True)
+        try:
+            asyncio.run(run_soak(args, run_dir))
+        except KeyboardInterrupt:
+            print("Interrupted - analysing samples collected so far")
+
+    report = analyse(run_dir, args.drift_threshold, args.window, args.degrade_ratio)
+    print_report(report)
+    with open(os.path.join(run_dir, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {os.path.join(run_dir, 'report.json')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+import sys
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.explain_report import _FILTER_COLUMN, candidate_index
+
+
+def _scan(filter_=None, sort_key=None):
+    return {"filter": filter_, "sort_key": sort_key}
+
+
+def test_filter_column_reads_casts_and_null_tests():
+    assert _FILTER_COLUMN.findall("((status)::text = 'new'::text)") == [("status", "=")]
+    assert _FILTER_COLUMN.findall("((deleted_at IS NULL) AND (start_datetime >= now()))") == [
+        ("deleted_at", "IS NULL"), ("start_datetime", ">=")]
+    assert _FILTER_COLUMN.findall("((full_name)::text ~~* '%bob%'::text)") == [("full_name", "~~*")]
+
+
+def test_equality_columns_then_one_range_column():
+    scan = _scan("((deleted_at IS NULL) AND (assigned_to = 'a'::uuid) AND (start_datetime >= now()) "
+                 "AND (end_datetime < now()))")
+    assert candidate_index(scan) == (["assigned_to", "start_datetime"], "deleted_at IS NULL")
+
+
+def test_repeated_range_column_is_listed_once():
+    assert candidate_index(_scan("((created_at > now()) AND (created_at < now()))")) == (["created_at"], "")
+
+
+def test_unindexable_filter_falls_back_to_sort_key():
+    scan = _scan("((full_name)::text ~~* 'x'::text)", ["leads.created_at DESC"])
+    assert candidate_index(scan) == (["created_at"], "")
+
+
+def test_no_filter_or_sort_has_no_candidate():
+    assert candidate_index(_scan()) == ([], "")
+    assert candidate_index(_scan("((full_name)::text ~~* 'x'::text)")) == ([], "")
@@ -0,0 +1,40 @@
+import json
+import os
+import sys
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.export_context_benchmark import payload_breakdown
+
+
+def _export():
+    return {
+        "lead": {"full_name": "Jane Citizen", "internal_notes": "call after 5pm"},
+        "inspection": {"inspector_name": "Sam", "outdoor_comments": "x" * 40},
+        "booking": None,
+        "parsed_form_data": None,
+    }
+
+
+def test_compact_body_splits_used_and_unused_columns():
+    body = _export()
+    total = len(json.dumps(body, separators=(",", ":")).encode())
+    result = payload_breakdown(body, total, {"full_name", "inspector_name"})
+    assert result["whitespace_bytes"] == 0
+    assert list(result["unused_columns"]) == ["inspection.outdoor_comments", "lead.internal_notes"]
+    assert result["used_bytes"] == len('"full_name":"Jane Citizen",') + len('"inspector_name":"Sam",')
+    # unused columns plus the always-null parsed_form_data entry
+    assert result["unused_bytes"] == sum(result["unused_columns"].values()) + len('"parsed_form_data":null,')
+
+
+def test_pretty_print_whitespace_counts_as_unused():
+    body = _export()
+    compact = len(json.dumps(body, separators=(",", ":")).encode())
+    pretty = len(json.dumps(body, indent=2).encode())
+    used = {"full_name", "internal_notes", "inspector_name", "outdoor_comments"}
+    result = payload_breakdown(body, pretty, used)
+    assert result["whitespace_bytes"] == pretty - compact
+    assert result["unused_columns"] == {}
+    assert result["unused_bytes"] == pretty - compact + len('"parsed_form_data":null,')
+    assert result["unused_share"] == round(result["unused_bytes"] / pretty, 3)
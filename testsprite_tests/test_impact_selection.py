@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.impact_selection import changed_files, select_cases
+
+IMPACT_MAP = {
+    "cases": {
+        "TC004": {"modules": ["src/pages/LeadsManagement.tsx", "src/components/ui/button.tsx"],
+                  "edge_functions": []},
+        "TC008": {"modules": ["src/pages/ViewReportPDF.tsx", "src/components/ui/button.tsx"],
+                  "edge_functions": ["generate-inspection-pdf"]},
+    }
+}
+
+
+def test_src_file_selects_the_cases_that_ran_it():
+    selected, reasons = select_cases(["src/components/ui/button.tsx"], IMPACT_MAP)
+    assert selected == ["TC004", "TC008"]
+    assert reasons["TC004"] == "src/components/ui/button.tsx"
+
+
+def test_edge_function_selects_its_callers():
+    selected, _ = select_cases(["supabase/functions/generate-inspection-pdf/index.ts"], IMPACT_MAP)
+    assert selected == ["TC008"]
+
+
+def test_ignored_paths_select_nothing():
+    paths = ["docs/RUNBOOK.md", "tests/e2e/smoke.spec.ts", "testsprite_tests/test_impact_selection.py"]
+    assert select_cases(paths, IMPACT_MAP) == ([], {})
+
+
+def test_unmapped_paths_fall_back_to_full_suite():
+    for path in ["api/render-pdf.ts", "public/manifest.json", "testsprite_tests/har_replay.py"]:
+        selected, reasons = select_cases([path], IMPACT_MAP)
+        assert selected is None
+        assert "full suite" in reasons[path]
+
+
+def test_migrations_fall_back_to_full_suite():
+    path = "supabase/migrations/20260101000000_add_index.sql"
+    selected, reasons = select_cases(["src/pages/LeadsManagement.tsx", path], IMPACT_MAP)
+    assert selected is None
+    assert path in reasons
+
+
+def test_uncalled_edge_function_falls_back_to_full_suite():
+    path = "supabase/functions/send-email/index.ts"
+    selected, reasons = select_cases([path], IMPACT_MAP)
+    assert selected is None
+    assert "send-email" in reasons[path]
+
+
+def test_unexecuted_src_file_falls_back_to_full_suite():
+    selected, _ = select_cases(["src/pages/Settings.tsx"], IMPACT_MAP)
+    assert selected is None
+
+
+def test_tc_script_selects_itself():
+    selected, _ = select_cases(["testsprite_tests/TC004_Pipeline_Drag_and_Drop_Stage_Change.py"], IMPACT_MAP)
+    assert selected == ["TC004"]
+    selected, _ = select_cases(["testsprite_tests/TC012_Automated_Email_Sending_for_All_8_Templates.py"],
+                               IMPACT_MAP)
+    assert selected is None
+
+
+def test_empty_map_runs_full_suite():
+    selected, reasons = select_cases(["src/pages/LeadsManagement.tsx"], {"cases": {}})
+    assert selected is None
+    assert "*" in reasons
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@example.com", *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+
+def test_changed_files_includes_untracked_files(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / ".gitignore").write_text("dist/\n")
+    (tmp_path / "a.ts").write_text("a")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    (tmp_path / "a.ts").write_text("changed")
+    (tmp_path / "new.ts").write_text("new")
+    (tmp_path / "dist").mkdir()
+    (tmp_path / "dist" / "bundle.js").write_text("ignored")
+
+    monkeypatch.chdir(tmp_path)
+    assert changed_files("main") == ["a.ts", "new.ts"]
@@ -0,0 +1,20 @@
+import os
+import sys
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.measure import children_map, percentile, tree_rss_bytes
+
+
+def test_percentile_is_nearest_rank():
+    values = [50, 10, 40, 20, 30]
+    assert percentile(values, 50) == 30
+    assert percentile(values, 95) == 50
+    assert percentile(values, 0) == 10
+    assert percentile([], 95) == 0.0
+
+
+def test_process_tree_includes_this_process():
+    assert os.getpid() in children_map().get(os.getppid(), [])
+    assert tree_rss_bytes(os.getpid()) > 0
@@ -0,0 +1,93 @@
+import os
+import sys
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.plan_executor import (
+    FILL_SELECTOR,
+    SUBMIT_SELECTOR,
+    compile_case,
+    compile_step,
+    resolve_route,
+)
+
+
+def _kinds(step):
+    return [op.kind for op in step.ops]
+
+
+def test_resolve_route_maps_legacy_routes():
+    assert resolve_route("/login") == "/"
+    assert resolve_route("/dashboard/") == "/admin"
+    assert resolve_route("/leads/123") == "/admin/leads/123"
+
+
+def test_resolve_route_keeps_current_routes():
+    assert resolve_route("/") == "/"
+    assert resolve_route("/admin/schedule") == "/admin/schedule"
+    assert resolve_route("/technician/job/1") == "/technician/job/1"
+
+
+def test_navigation_step_compiles_to_goto():
+    step = compile_step(0, {"type": "action", "description": "Navigate to /calendar"})
+    assert _kinds(step) == ["goto"]
+    assert step.ops[0].route == "/admin/schedule"
+
+
+def test_wait_step_reads_seconds():
+    step = compile_step(0, {"type": "action", "description": "Wait 2.5 seconds for sync"})
+    assert _kinds(step) == ["wait"]
+    assert step.ops[0].value == 2.5
+
+
+def test_offline_form_step_composes_fill_and_submit():
+    step = compile_step(0, {"type": "action", "description": "Fill and submit inspection form offline"},
+                        current_route="/technician/inspection")
+    assert _kinds(step) == ["set_offline", "fill_visible_inputs", "click"]
+    assert step.ops[0].value == 1
+    assert step.ops[1].selector == FILL_SELECTOR
+    assert step.ops[2].selector == SUBMIT_SELECTOR
+
+
+def test_form_step_on_another_screen_navigates_first():
+    step = compile_step(0, {"type": "action", "description": "Fill and submit inspection form offline"},
+                        current_route="/admin")
+    assert _kinds(step) == ["goto", "set_offline", "fill_visible_inputs", "click"]
+    assert step.ops[0].route == "/technician/inspection"
+
+
+def test_completed_form_step_is_unresolved():
+    step = compile_step(0, {"type": "action",
+                            "description": "Submit completed inspection form with AI summary and photos"})
+    assert _kinds(step) == ["unresolved"]
+
+
+def test_button_verb_clicks_labelled_button():
+    step = compile_step(0, {"type": "action", "description": "Approve the report"})
+    assert _kinds(step) == ["click"]
+    assert step.ops[0].selector == 'button:has-text("Approve")'
+
+
+def test_assertions_compile_to_checks():
+    load = compile_step(0, {"type": "assertion", "description": "Confirm page load times are under 3 seconds"})
+    touch = compile_step(1, {"type": "assertion", "description": "Verify touch targets are at least 48px"})
+    vague = compile_step(2, {"type": "assertion", "description": "Validate GST of 10% is applied on subtotal"})
+    assert (_kinds(load), load.ops[0].value) == (["assert_load_time"], 3.0)
+    assert (_kinds(touch), touch.ops[0].value) == (["assert_touch_targets"], 48.0)
+    assert _kinds(vague) == ["unresolved"]
+
+
+def test_compile_case_threads_current_route():
+    case = compile_case({
+        "id": "TC900",
+        "title": "Settings persistence",
+        "steps": [
+            {"type": "action", "description": "Navigate to /calendar"},
+            {"type": "action", "description": "Fill the settings form"},
+            {"type": "action", "description": "Fill the settings form again"},
+        ],
+    })
+    assert case.start_route == "/admin/settings"
+    assert [op.kind for op in case.steps[1].ops] == ["goto", "fill_visible_inputs"]
+    assert [op.kind for op in case.steps[2].ops] == ["fill_visible_inputs"]
@@ -0,0 +1,58 @@
+import os
+import sys
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.query_attribution import diff
+
+
+def _stat(calls, total_ms, rows=0, query="select 1"):
+    return {"query": query, "calls": calls, "total_ms": total_ms, "rows": rows,
+            "blks_hit": calls * 10, "blks_read": calls}
+
+
+def _key(queryid, role="authenticated", toplevel=True):
+    return (queryid, role, toplevel)
+
+
+def test_diff_reports_growth_slowest_first():
+    before = {_key(1): _stat(5, 10.0, 50), _key(2): _stat(1, 1.0)}
+    after = {_key(1): _stat(7, 14.5, 70), _key(2): _stat(4, 31.0),
+             _key(3): _stat(2, 6.0, query="select\n  *   from leads")}
+    deltas = diff(before, after)
+    assert [d["queryid"] for d in deltas] == [2, 3, 1]
+    assert deltas[2] == {"queryid": 1, "query": "select 1", "role": "authenticated", "toplevel": True,
+                         "calls": 2, "total_ms": 4.5, "rows": 20, "blks_hit": 20, "blks_read": 2}
+
+
+def test_diff_counts_new_statements_from_zero_and_normalises_whitespace():
+    deltas = diff({}, {_key(3): _stat(2, 6.0, query="select\n  *   from leads")})
+    assert deltas[0]["query"] == "select * from leads"
+    assert deltas[0]["calls"] == 2
+
+
+def test_diff_skips_statements_that_did_not_run():
+    before = {_key(1): _stat(5, 10.0)}
+    assert diff(before, {_key(1): _stat(5, 10.0)}) == []
+    # pg_stat_statements was reset between snapshots
+    assert diff(before, {_key(1): _stat(2, 3.0)}) == []
+
+
+def test_diff_keeps_roles_sharing_a_queryid_apart():
+    # Same statement text, so the same queryid, run by two request roles
+    before = {_key(7, "anon"): _stat(10, 5.0), _key(7, "authenticated"): _stat(3, 9.0)}
+    after = {_key(7, "anon"): _stat(10, 5.0), _key(7, "authenticated"): _stat(5, 15.0)}
+    deltas = diff(before, after)
+    assert [(d["role"], d["calls"], d["total_ms"]) for d in deltas] == [("authenticated", 2, 6.0)]
+
+    # A reset of one role's entry does not hide the other role's growth
+    after = {_key(7, "anon"): _stat(1, 0.5), _key(7, "authenticated"): _stat(4, 12.0)}
+    assert [(d["role"], d["calls"]) for d in diff(before, after)] == [("authenticated", 1)]
+
+
+def test_diff_keeps_nested_calls_apart_from_top_level():
+    before = {_key(7): _stat(1, 2.0), _key(7, toplevel=False): _stat(4, 1.0)}
+    after = {_key(7): _stat(2, 4.0), _key(7, toplevel=False): _stat(10, 2.5)}
+    deltas = diff(before, after)
+    assert [(d["toplevel"], d["calls"]) for d in deltas] == [(True, 1), (False, 6)]
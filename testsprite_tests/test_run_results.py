@@ -0,0 +1,121 @@
+import json
+import os
+import subprocess
+import sys
+from xml.etree import ElementTree
+
+import pytest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.run_results import RunRecorder, load_events, run_tc, write_junit
+
+
+@pytest.fixture
+def run(tmp_path):
+    recorder = RunRecorder("unit", out_dir=str(tmp_path))
+    yield recorder
+    recorder.finish()
+
+
+def _case(status, steps, error=None):
+    return {"id": "TC900", "title": "Example", "status": status, "duration_ms": 1200.0, "error": error,
+            "traceback": None, "artifacts": {}, "steps": steps}
+
+
+def _step(index, status, **extra):
+    return {"index": index, "name": f"step {index}", "status": status, "duration_ms": 100.0, "error": None,
+            "notes": [], **extra}
+
+
+def test_load_events_rebuilds_cases(run):
+    with run.case("TC900", "Example") as tc:
+        with tc.step("Open page") as step:
+            step.metric("tables", 2)
+    with pytest.raises(AssertionError):
+        with run.case("TC901", "Broken") as tc:
+            with tc.step("Check"):
+                assert False, "no rows"
+    run.emit("case_start", case="TC902", title="Interrupted")
+
+    meta, cases = load_events(run.events_path)
+    assert meta["run_id"] == run.run_id
+    assert [(c["id"], c["status"]) for c in cases] == [("TC900", "passed"), ("TC901", "failed"),
+                                                       ("TC902", "running")]
+    assert cases[0]["steps"][0]["metrics"] == {"tables": 2}
+    assert cases[1]["error"] == "AssertionError: no rows"
+
+
+def test_write_junit_marks_failed_and_skipped_steps(tmp_path):
+    path = write_junit([_case("failed", [_step(1, "passed", metrics={"rows": 3}),
+                                         _step(2, "failed", error="TimeoutError: main"),
+                                         _step(3, "skipped")])],
+                       str(tmp_path / "junit.xml"), "unit")
+    suite = ElementTree.parse(path).getroot().find("testsuite")
+    assert (suite.get("tests"), suite.get("failures"), suite.get("skipped")) == ("3", "1", "1")
+    cases = suite.findall("testcase")
+    assert cases[0].find("system-out").text == "rows=3"
+    assert cases[1].find("failure").get("message") == "TimeoutError: main"
+    assert cases[2].find("skipped") is not None
+
+
+def test_write_junit_reports_incomplete_case_as_skipped(tmp_path):
+    error = "No assertion executed (2 of 2 steps unresolved)"
+    path = write_junit([_case("incomplete", [_step(1, "passed"), _step(2, "passed")], error)],
+                       str(tmp_path / "junit.xml"), "unit")
+    suite = ElementTree.parse(path).getroot().find("testsuite")
+    case = suite.findall("testcase")[-1]
+    assert case.get("name") == "case"
+    assert case.find("skipped").get("message") == error
+    assert suite.find("testcase/failure") is None
+
+
+def test_write_junit_adds_case_failure_without_failed_step(tmp_path):
+    path = write_junit([_case("failed", [_step(1, "passed")], "RuntimeError: browser crashed")],
+                       str(tmp_path / "junit.xml"), "unit")
+    cases = ElementTree.parse(path).getroot().findall("testsuite/testcase")
+    assert [c.get("name") for c in cases] == ["01 step 1", "case"]
+    assert cases[1].find("failure").get("message") == "RuntimeError: browser crashed"
+
+
+def test_write_junit_uses_case_as_step_when_none_recorded(tmp_path):
+    path = write_junit([_case("failed", [], "RuntimeError: browser crashed")], str(tmp_path / "junit.xml"), "unit")
+    cases = ElementTree.parse(path).getroot().findall("testsuite/testcase")
+    assert [c.get("name") for c in cases] == ["00 Example"]
+    assert cases[0].find("failure").get("message") == "RuntimeError: browser crashed"
+
+
+def test_run_tc_records_a_script_that_fails_before_its_case(run, tmp_path):
+    path = tmp_path / "TC902_Broken_Login.py"
+    path.write_text(
+        "async def run_test():\n"
+        "    raise RuntimeError('login failed')\n"
+    )
+
+    assert run_tc(run, str(path)) == "failed"
+    assert [(c.id, c.title) for c in run.cases] == [("TC902", "Broken Login")]
+    assert run.cases[0].error == "RuntimeError: login failed"
+
+
+def test_cli_records_structured_tc_into_one_run(tmp_path):
+    tc_dir = tmp_path / "tcs"
+    tc_dir.mkdir()
+    (tc_dir / "TC901_Example.py").write_text(
+        "from testsprite_tests.run_results import case\n"
+        "\n"
+        "async def run_test():\n"
+        "    with case('TC901', 'Example') as tc:\n"
+        "        with tc.step('Only step') as step:\n"
+        "            step.metric('rows', 1)\n"
+    )
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_results.py")
+    completed = subprocess.run([sys.executable, script, "run", "--dir", str(tc_dir)],
+                               cwd=tmp_path, capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr
+
+    events_path = completed.stdout.split("Streaming events to ", 1)[1].splitlines()[0]
+    with open(tmp_path / events_path) as f:
+        kinds = [json.loads(line)["event"] for line in f]
+    assert kinds == ["run_start", "case_start", "step_start", "step_end", "case_end", "run_end"]
+    assert "1/1 TCs passed" in completed.stdout
@@ -0,0 +1,64 @@
+import glob
+import os
+import re
+import sys
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.selector_registry import SCREENS, SCREENS_BY_NAME, check_routes, screen_for_route, screen_named
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(TESTS_DIR), "src")
+# registry.count("LeadsManagement", "lead_card") and friends in the TC scripts
+_LOOKUP_RE = re.compile(r'registry\.(?:count|locator|selector|wait_for_screen)\("(\w+)"(?:, "(\w+)")?\)')
+_TESTID_RE = re.compile(r'data-testid="([^"]+)"')
+
+
+def test_registry_matches_app_routes():
+    assert check_routes() == []
+
+
+def test_check_routes_reports_drift(tmp_path):
+    (tmp_path / "pages").mkdir()
+    (tmp_path / "pages" / "Orphan.tsx").write_text("export default function Orphan() {}\n")
+    app = tmp_path / "App.tsx"
+    app.write_text("""
+        <Route path="/" element={<Login />} />
+        <Route path="/admin" element={<ProtectedRoute><RoleProtectedRoute allowedRoles={["technician"]}>
+          <AdminDashboard /></RoleProtectedRoute></ProtectedRoute>} />
+        <Route path="/brand-new" element={<BrandNew />} />
+    """)
+    problems = check_routes(str(app))
+    assert "/admin is registered as AdminDashboard (admin) but App.tsx renders AdminDashboard (technician)" in problems
+    assert "/brand-new renders BrandNew but has no registry entry" in problems
+    assert "src/pages/Orphan.tsx is not routed in App.tsx" in problems
+    assert any("/technician/job/:id, which App.tsx does not route" in p for p in problems)
+
+
+def test_technician_job_route_renders_lead_detail():
+    screen = screen_for_route("/technician/job/123")
+    assert screen is screen_named("TechnicianLeadDetail")
+    assert (screen.component, screen.root) == ("LeadDetail", '[data-testid="screen-lead-detail"]')
+    assert screen_for_route("/no/such/page") is None
+
+
+def test_tc_lookups_are_registered():
+    lookups = set()
+    for path in glob.glob(os.path.join(TESTS_DIR, "TC[0-9]*_*.py")):
+        with open(path) as f:
+            lookups.update((m.group(1), m.group(2) or "root") for m in _LOOKUP_RE.finditer(f.read()))
+    assert lookups
+    missing = sorted(f"{name}.{element}" for name, element in lookups
+                     if element not in getattr(SCREENS_BY_NAME.get(name), "elements", {}))
+    assert missing == []
+
+
+def test_registered_testids_exist_in_src():
+    source = ""
+    for path in glob.glob(os.path.join(SRC_DIR, "**", "*.tsx"), recursive=True):
+        with open(path) as f:
+            source += f.read()
+    testids = {t for screen in SCREENS.values() for selector in screen.elements.values()
+               for t in _TESTID_RE.findall(selector)}
+    assert sorted(t for t in testids if f'data-testid="{t}"' not in source) == []
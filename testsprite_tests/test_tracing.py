@@ -0,0 +1,51 @@
+import json
+import os
+import sys
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.tracing import KIND_INTERNAL, KIND_SERVER, STATUS_ERROR, STATUS_OK, parse_function_spans
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+def _line(name, span_id, parent, start_ms, end_ms, trace_id=TRACE_ID, **attrs):
+    record = {"trace_id": trace_id, "span_id": span_id, "parent_span_id": parent,
+              "service": "generate-inspection-pdf", "name": name, "start_ms": start_ms, "end_ms": end_ms,
+              "duration_ms": end_ms - start_ms, "attrs": attrs}
+    return "[trace] " + json.dumps(record)
+
+
+LOG = "\n".join([
+    "Listening on http://localhost:9999/",
+    "2026-01-01T00:00:00Z INFO " + _line("generate-inspection-pdf", "a" * 16, "b" * 16, 1000.0, 1900.5,
+                                         **{"http.method": "POST"}),
+    _line("db.inspections", "c" * 16, "a" * 16, 1010.0, 1040.25),
+    _line("storage.upload", "d" * 16, "a" * 16, 1500.0, 1800.0, error="Bucket not found"),
+    "[trace] {not json",
+    _line("db.leads", "e" * 16, "f" * 16, 1.0, 2.0, trace_id="0" * 31 + "1"),
+])
+
+
+def test_parses_request_and_child_spans():
+    spans = parse_function_spans(LOG)
+    assert [s.name for s in spans] == ["generate-inspection-pdf", "db.inspections", "storage.upload", "db.leads"]
+    request, read = spans[0], spans[1]
+    assert (request.kind, request.parent_id, request.span_id) == (KIND_SERVER, "b" * 16, "a" * 16)
+    assert request.attrs["http.method"] == "POST"
+    assert (read.kind, read.parent_id) == (KIND_INTERNAL, "a" * 16)
+    assert read.duration_ms == 30.25
+
+
+def test_error_attribute_sets_error_status():
+    spans = {s.name: s for s in parse_function_spans(LOG)}
+    assert spans["storage.upload"].status == STATUS_ERROR
+    assert spans["db.inspections"].status == STATUS_OK
+
+
+def test_filters_to_known_traces():
+    spans = parse_function_spans(LOG, trace_ids={TRACE_ID})
+    assert len(spans) == 3
+    assert all(s.trace_id == TRACE_ID for s in spans)
+    assert parse_function_spans(LOG, trace_ids=set()) == []
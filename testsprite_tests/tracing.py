@@ -0,0 +1,391 @@
+"""
+OpenTelemetry Tracing for TestSprite Tests
+
+Emits one trace per plan entry: a root span for the TC, a child span per step
+and a client span per browser request made during that step. Requests to the
+Supabase URL (REST, auth, storage, edge functions) are intercepted with
+context.route and continued with a W3C `traceparent` header naming their
+request span, so the edge functions that use supabase/functions/_shared/trace.ts
+continue the same trace. Their spans are logged as `[trace] {...}` lines and
+pulled back from the edge runtime container's logs when the run ends, which
+puts a slow "Generate PDF" click, its POST to generate-inspection-pdf and that
+function's template fetch, database reads and render in one tree.
+
+Spans are written as OTLP/JSON (the collector's file-exporter format) under
+tmp/traces/, and optionally POSTed to an OTLP/HTTP collector. Only the
+stdlib is used; no OpenTelemetry SDK is needed to produce or read them.
+
+Routing a context turns off Chromium's HTTP cache for routed requests, so
+traced runs are slightly slower than untraced ones on repeated Supabase GETs.
+
+Usage:
+    python testsprite_tests/plan_executor.py --trace --only TC013
+    python testsprite_tests/plan_executor.py --otlp-endpoint http://localhost:4318/v1/traces
+    python testsprite_tests/tracing.py show testsprite_tests/tmp/traces/plan-20260101-120000.json --case TC013
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import re
+import secrets
+import subprocess
+import sys
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.local_stack import EDGE_FUNCTION_RE, SUPABASE_URL, http_json
+
+TRACES_DIR = "testsprite_tests/tmp/traces"
+SERVICE_NAME = "testsprite-harness"
+EDGE_CONTAINER = os.getenv("EDGE_RUNTIME_CONTAINER", "supabase_edge_runtime_ecyivrxjpsmjmexqatym")
+# Must match TRACE_LOG_PREFIX in supabase/functions/_shared/trace.ts
+TRACE_LOG_PREFIX = "[trace] "
+
+# OTLP SpanKind / StatusCode values
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+
+def _new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def _new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+class Span:
+    """One finished or in-flight span. Times are Unix epoch nanoseconds."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: str = None, kind: int = KIND_INTERNAL,
+                 service: str = SERVICE_NAME, attrs: dict = None, start_ns: int = None, span_id: str = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id or _new_span_id()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.service = service
+        self.attrs = dict(attrs or {})
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.status = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def end(self, status: int = STATUS_OK, end_ns: int = None, **attrs):
+        if self.end_ns is not None:
+            return
+        self.attrs.update(attrs)
+        self.status = status
+        self.end_ns = max(end_ns or time.time_ns(), self.start_ns)
+
+    def as_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attr(k, v) for k, v in self.attrs.items() if v is not None],
+            "status": {"code": self.status or STATUS_ERROR},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status == STATUS_ERROR and "error" in self.attrs:
+            span["status"]["message"] = str(self.attrs["error"])
+        return span
+
+
+def _otlp_attr(key: str, value) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _attr_value(value: dict):
+    if "intValue" in value:
+        return int(value["intValue"])
+    for kind in ("boolValue", "doubleValue", "stringValue"):
+        if kind in value:
+            return value[kind]
+    return None
+
+
+class CaseTrace:
+    """
+    The trace for one plan entry on one page.
+
+    Owns the TC root span, opens a span per step through step_hook, and turns
+    every request the page makes into a client span under the current step.
+    """
+
+    def __init__(self, tracer, page, case_id: str, title: str):
+        self.tracer = tracer
+        self.page = page
+        self.root = tracer.start_span(f"{case_id} {title}", attrs={"tc.id": case_id, "tc.title": title})
+        self.current = None
+        self.requests = {}
+        self._pattern = re.compile(rf"^{re.escape(SUPABASE_URL)}/")
+
+    async def attach(self):
+        """Starts intercepting Supabase requests and listening to every request."""
+        await self.page.context.route(self._pattern, self._route)
+        self.page.on("request", self._on_request)
+        self.page.on("requestfinished", self._on_finished)
+        self.page.on("requestfailed", self._on_failed)
+        return self
+
+    async def detach(self, status: str = "passed", error: str = None):
+        """Removes the route and listeners, then ends any open spans and the root."""
+        await self.page.context.unroute(self._pattern, self._route)
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_finished)
+        self.page.remove_listener("requestfailed", self._on_failed)
+        for span in self.requests.values():
+            span.end(STATUS_ERROR, error="still in flight when the case ended")
+        self.requests.clear()
+        if self.current:
+            self.current.end(STATUS_ERROR, error="step did not finish")
+        self.root.end(STATUS_OK if status == "passed" else STATUS_ERROR, **{"tc.status": status, "error": error})
+
+    def step_hook(self, inner=None):
+        """Wraps a plan_executor step_hook so each step also gets a span."""
+
+        async def hook(step, step_result):
+            if step_result is None:
+                self.current = self.tracer.start_span(
+                    f"step {step.index}: {step.description[:80]}", parent=self.root,
+                    attrs={"step.index": step.index, "step.type": step.type})
+            elif self.current:
+                failed = step_result["status"] == "failed"
+                self.current.end(STATUS_ERROR if failed else STATUS_OK,
+                                 **{"step.status": step_result["status"], "error": step_result.get("error")})
+                self.current = None
+            if inner:
+                await inner(step, step_result)
+
+        return hook
+
+    def _span_for(self, request) -> Span:
+        span = self.requests.get(request)
+        if span is None:
+            url = request.url.split("?", 1)[0]
+            attrs = {"http.method": request.method, "http.url": url, "http.resource_type": request.resource_type}
+            match = EDGE_FUNCTION_RE.search(url)
+            if match:
+                attrs["edge_function"] = match.group(1)
+            path = url.split("://", 1)[-1].split("/", 1)[-1]
+            span = self.tracer.start_span(f"{request.method} /{path}", parent=self.current or self.root,
+                                          kind=KIND_CLIENT, attrs=attrs)
+            self.requests[request] = span
+        return span
+
+    async def _route(self, route):
+        request = route.request
+        span = self._span_for(request)
+        await route.continue_(headers={**request.headers, "traceparent": span.traceparent})
+
+    def _on_request(self, request):
+        self._span_for(request)
+
+    def _timed_end(self, request, span: Span, status: int, **attrs):
+        timing = request.timing
+        start_ms, end_ms = timing.get("startTime", -1), timing.get("responseEnd", -1)
+        if start_ms > 0:
+            span.start_ns = int(start_ms * 1e6)
+            span.end(status, end_ns=int((start_ms + max(end_ms, 0)) * 1e6), **attrs)
+        else:
+            span.end(status, **attrs)
+
+    async def _on_finished(self, request):
+        span = self.requests.pop(request, None)
+        if span is None:
+            return
+        response = await request.response()
+        code = response.status if response else None
+        self._timed_end(request, span, STATUS_ERROR if code and code >= 500 else STATUS_OK,
+                        **{"http.status_code": code})
+
+    def _on_failed(self, request):
+        span = self.requests.pop(request, None)
+        if span is not None:
+            self._timed_end(request, span, STATUS_ERROR, error=request.failure)
+
+
+class Tracer:
+    """Collects spans for a run and exports them as OTLP/JSON."""
+
+    def __init__(self, name: str = "plan", endpoint: str = None, out_dir: str = TRACES_DIR):
+        self.name = name
+        self.endpoint = endpoint
+        self.out_dir = out_dir
+        self.spans = []
+        self.started = dt.datetime.now(dt.timezone.utc)
+
+    def start_span(self, name: str, parent: Span = None, kind: int = KIND_INTERNAL, attrs: dict = None) -> Span:
+        trace_id = parent.trace_id if parent else _new_trace_id()
+        span = Span(name, trace_id, parent.span_id if parent else None, kind=kind, attrs=attrs)
+        self.spans.append(span)
+        return span
+
+    async def attach(self, page, case_id: str, title: str) -> CaseTrace:
+        """Starts the trace for one plan entry on `page`."""
+        return await CaseTrace(self, page, case_id, title).attach()
+
+    def trace_ids(self) -> set:
+        return {span.trace_id for span in self.spans}
+
+    def import_function_spans(self, container: str = EDGE_CONTAINER) -> int:
+        """
+        Reads `[trace]` lines from the edge runtime logs since this run
+        started and adds the ones belonging to this run's traces.
+
+        Returns:
+            int: Number of function spans imported (0 without a docker CLI)
+        """
+        since = self.started.strftime("%Y-%m-%dT%H:%M:%SZ")
+        try:
+            proc = subprocess.run(["docker", "logs", "--since", since, container],
+                                  capture_output=True, text=True, timeout=60)
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            return 0
+        spans = parse_function_spans(proc.stdout + proc.stderr, self.trace_ids())
+        known = {span.span_id for span in self.spans}
+        fresh = [span for span in spans if span.span_id not in known]
+        self.spans.extend(fresh)
+        return len(fresh)
+
+    def export(self) -> dict:
+        """Writes the spans as OTLP/JSON and, if configured, sends them to a collector."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"{self.name}-{self.started.strftime('%Y%m%d-%H%M%S')}.json")
+        payload = to_otlp(self.spans)
+        with open(path, "w") as f:
+            json.dump(payload, f)
+        written = {"traces": path}
+        if self.endpoint:
+            status, body, _ = http_json("POST", self.endpoint, payload, timeout=30)
+            if status >= 300:
+                print(f"OTLP export to {self.endpoint} failed: {status} {str(body)[:200]}")
+            else:
+                written["collector"] = self.endpoint
+        return written
+
+
+def parse_function_spans(log_text: str, trace_ids: set = None) -> list:
+    """Parses `[trace] {...}` log lines written by _shared/trace.ts into spans."""
+    decoder = json.JSONDecoder()
+    spans = []
+    for line in log_text.splitlines():
+        at = line.find(TRACE_LOG_PREFIX)
+        if at < 0:
+            continue
+        try:
+            record, _ = decoder.raw_decode(line[at + len(TRACE_LOG_PREFIX):])
+        except ValueError:
+            continue
+        if trace_ids is not None and record.get("trace_id") not in trace_ids:
+            continue
+        # The function's request span is the server side of a harness client span
+        kind = KIND_SERVER if record["name"] == record["service"] else KIND_INTERNAL
+        span = Span(record["name"], record["trace_id"], record.get("parent_span_id"), kind=kind,
+                    service=record["service"], attrs=record.get("attrs"),
+                    start_ns=int(record["start_ms"] * 1e6), span_id=record["span_id"])
+        span.end(STATUS_ERROR if span.attrs.get("error") else STATUS_OK, end_ns=int(record["end_ms"] * 1e6))
+        spans.append(span)
+    return spans
+
+
+def to_otlp(spans: list) -> dict:
+    """Groups spans by service into an OTLP/JSON ExportTraceServiceRequest."""
+    by_service = {}
+    for span in spans:
+        by_service.setdefault(span.service, []).append(span.as_otlp())
+    return {"resourceSpans": [
+        {
+            "resource": {"attributes": [_otlp_attr("service.name", service)]},
+            "scopeSpans": [{"scope": {"name": "testsprite_tests.tracing"}, "spans": service_spans}],
+        }
+        for service, service_spans in by_service.items()
+    ]}
+
+
+def load_otlp(path: str) -> list:
+    """Reads an OTLP/JSON file back into a flat list of span dicts."""
+    with open(path) as f:
+        payload = json.load(f)
+    spans = []
+    for resource in payload.get("resourceSpans", []):
+        service = next((_attr_value(a["value"]) for a in resource.get("resource", {}).get("attributes", [])
+                        if a["key"] == "service.name"), "")
+        for scope in resource.get("scopeSpans", []):
+            for span in scope.get("spans", []):
+                spans.append({
+                    "service": service,
+                    "trace_id": span["traceId"],
+                    "span_id": span["spanId"],
+                    "parent_id": span.get("parentSpanId"),
+                    "name": span["name"],
+                    "start_ns": int(span["startTimeUnixNano"]),
+                    "duration_ms": (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6,
+                    "error": span.get("status", {}).get("code") == STATUS_ERROR,
+                    "attrs": {a["key"]: _attr_value(a["value"]) for a in span.get("attributes", [])},
+                })
+    return spans
+
+
+def print_trees(spans: list, case: str = None, min_ms: float = 0):
+    """Prints each trace as an indented span tree with durations."""
+    children = {}
+    for span in spans:
+        children.setdefault(span["parent_id"], []).append(span)
+    ids = {span["span_id"] for span in spans}
+    # Roots are spans without a parent, or whose parent never made it into the file
+    roots = [s for s in spans if not s["parent_id"] or s["parent_id"] not in ids]
+
+    def walk(span, depth):
+        if depth and span["duration_ms"] < min_ms:
+            return
+        marker = " !" if span["error"] else ""
+        service = "" if span["service"] == SERVICE_NAME else f"  [{span['service']}]"
+        print(f"{span['duration_ms']:>10.1f} ms  {'  ' * depth}{span['name'][:90]}{service}{marker}")
+        for child in sorted(children.get(span["span_id"], []), key=lambda s: s["start_ns"]):
+            walk(child, depth + 1)
+
+    for root in sorted(roots, key=lambda s: s["start_ns"]):
+        if case and root["attrs"].get("tc.id") != case:
+            continue
+        print(f"\ntrace {root['trace_id']}")
+        walk(root, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect OTLP/JSON traces written by the TestSprite harness")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="Print span trees from a traces file")
+    show.add_argument("path", help="OTLP/JSON file under tmp/traces/")
+    show.add_argument("--case", help="Only the trace for this plan entry (e.g. TC013)")
+    show.add_argument("--min-ms", type=float, default=0, help="Hide child spans shorter than this")
+    args = parser.parse_args()
+
+    print_trees(load_otlp(args.path), case=args.case, min_ms=args.min_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+// Minimal local stand-in for the Vercel Node runtime, used by
+// testsprite_tests/pdf_render_benchmark.py. Serves one api/*.ts handler on a
+// local port with the VercelRequest/VercelResponse helpers it relies on
+// (req.body, res.status().json()/send()/end()).
+//
+// Run through tsx so the TypeScript handler is compiled on import:
+//   npx tsx testsprite_tests/vercel_standin.mjs api/render-pdf.ts 3901
+//
+// STANDIN_REUSE_BROWSER=1 patches puppeteer.launch to hand every request a
+// view onto one shared, already-running Chromium, so the benchmark can
+// compare the current launch-per-request design against a warm browser.
+//
+// Every response carries X-Standin-* timing headers: whether it was the
+// process's first request (cold), total handler time and Chromium launch time.
+
+import http from 'node:http';
+import path from 'node:path';
+import { AsyncLocalStorage } from 'node:async_hooks';
+import { pathToFileURL } from 'node:url';
+import puppeteer from 'puppeteer-core';
+
+const [, , handlerPath, portArg] = process.argv;
+const port = Number(portArg ?? 3901);
+const reuseBrowser = process.env.STANDIN_REUSE_BROWSER === '1';
+const requestStats = new AsyncLocalStorage();
+
+const realLaunch = puppeteer.launch.bind(puppeteer);
+let sharedBrowser = null;
+
+puppeteer.launch = async (options) => {
+  const stats = requestStats.getStore();
+  const started = performance.now();
+  let browser;
+  if (reuseBrowser) {
+    sharedBrowser ??= realLaunch(options).catch((error) => {
+      // Let the next request retry the launch rather than replay this failure
+      sharedBrowser = null;
+      throw error;
+    });
+    const shared = await sharedBrowser;
+    const pages = [];
+    browser = {
+      newPage: async () => {
+        const page = await shared.newPage();
+        pages.push(page);
+        return page;
+      },
+      // The handler closes "its" browser in a finally block; only close the
+      // pages it opened so the shared Chromium stays warm.
+      close: async () => {
+        await Promise.all(pages.map((p) => p.close().catch(() => {})));
+      },
+    };
+  } else {
+    browser = await realLaunch(options);
+  }
+  if (stats) stats.launchMs += performance.now() - started;
+  return browser;
+};
+
+const { default: handler } = await import(pathToFileURL(path.resolve(handlerPath)).href);
+let served = 0;
+
+function readJson(req) {
+  return new Promise((resolve) => {
+    const chunks = [];
+    req.on('data', (c) => chunks.push(c));
+    req.on('end', () => {
+      const raw = Buffer.concat(chunks).toString('utf8');
+      try {
+        resolve(raw ? JSON.parse(raw) : undefined);
+      } catch {
+        resolve(undefined);
+      }
+    });
+  });
+}
+
+function decorate(res, stats) {
+  const stamp = () => {
+    if (res.headersSent) return;
+    res.setHeader('X-Standin-Cold', stats.cold ? '1' : '0');
+    res.setHeader('X-Standin-Handler-Ms', (performance.now() - stats.started).toFixed(1));
+    res.setHeader('X-Standin-Launch-Ms', stats.launchMs.toFixed(1));
+  };
+  const end = res.end.bind(res);
+  res.status = (code) => {
+    res.statusCode = code;
+    return res;
+  };
+  res.json = (body) => {
+    stamp();
+    res.setHeader('Content-Type', 'application/json');
+    return end(JSON.stringify(body));
+  };
+  res.send = (body) => {
+    stamp();
+    return end(body);
+  };
+  res.end = (...args) => {
+    stamp();
+    return end(...args);
+  };
+  return res;
+}
+
+const server = http.createServer(async (req, res) => {
+  const stats = { cold: served++ === 0, started: performance.now(), launchMs: 0 };
+  req.body = await readJson(req);
+  await requestStats.run(stats, async () => {
+    try {
+      await handler(req, decorate(res, stats));
+    } catch (err) {
+      console.error('[vercel-standin] handler threw', err);
+      if (!res.headersSent) res.status(500).json({ error: 'Handler threw' });
+    }
+  });
+});
+
+server.listen(port, '127.0.0.1', () => {
+  console.log(`[vercel-standin] ${handlerPath} listening on ${port} (reuseBrowser=${reuseBrowser})`);
+});
@@ -0,0 +1,320 @@
+"""
+Inspection Form Write-Amplification Meter
+
+TechnicianInspectionForm's handleSave writes the whole form on every save:
+the full inspections row, then every inspection_area, moisture reading,
+subfloor row and reading, whatever actually changed. Saves fire from the 30 s
+auto-save interval and on every section change. This types a scripted
+inspection one field at a time as the technician, fires the auto-save after
+each edit through the virtual clock, and measures per field edit:
+
+- network writes to PostgREST (POST/PATCH/PUT/DELETE) per table,
+- request payload bytes, and rows/columns carried in the payloads,
+- database rows inserted/updated/deleted, from pg_stat_user_tables deltas.
+
+Each edit changes one column of one row, so a save writing more than that is
+flagged as a full-record write; the per-field table shows how far each edit is
+from a targeted update. After each section's edits one more edit is saved by
+"Next Section" to measure the navigation save as well.
+
+The lead's inspection is overwritten with the script's values; use a seeded
+lead on the local stack. Fields that are not on screen (e.g. subfloor fields
+when the lead has no subfloor) are reported as skipped.
+
+    python testsprite_tests/write_amplification.py --lead-id <uuid>
+    python testsprite_tests/write_amplification.py --lead-id <uuid> --sections 1 3 --no-db
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testsprite_tests.auth_helper import BASE_URL, get_role_context, launch_browser
+from testsprite_tests.clock_control import has_clock, trigger_auto_save
+from testsprite_tests.local_stack import SUPABASE_URL, TECH_EMAIL, TECH_PASSWORD, sql_json
+from testsprite_tests.selector_registry import screen_named
+
+RESULTS_DIR = "testsprite_tests/tmp/write_amplification"
+WRITE_METHODS = ("POST", "PATCH", "PUT", "DELETE")
+FORM_TABLES = ["inspections", "inspection_areas", "moisture_readings", "subfloor_data", "subfloor_readings"]
+# A write carrying more columns than this for a one-field edit is a full-record write
+TARGETED_MAX_COLUMNS = 3
+# Real time for the save's requests to finish once nothing new is in flight
+QUIET_MS = 750
+# pg_stat_user_tables is flushed by the writing backend about once a second
+STATS_FLUSH_S = 1.2
+
+# (section, field, placeholder, value); the first matching input in the section is used
+EDITS = [
+    (1, "triage_description", "Describe the issue...", "Black mould on bathroom ceiling, musty odour"),
+    (1, "attention_to", "Company or person name", "Property Manager"),
+    (3, "area_name", "e.g., Master Bedroom, Kitchen...", "Bathroom"),
+    (3, "mould_location", "e.g., Behind fridge, Grout between shower tiles...", "Ceiling above shower"),
+    (3, "area_comments", "Additional comments...", "Exhaust fan not vented"),
+    (3, "moisture_reading", "0-100", "42"),
+    (3, "reading_location", "Location (e.g., Wall near window)", "Wall behind vanity"),
+    (3, "internal_notes", "Private notes for office...", "Tenant home weekdays"),
+    (4, "subfloor_observations", "Describe subfloor condition...", "Damp soil, no vapour barrier"),
+    (4, "subfloor_comments", "Additional notes...", "Access hatch in laundry"),
+    (4, "subfloor_reading_location", "Location (e.g., Under shower area)", "Under bathroom"),
+    (4, "subfloor_moisture", "Moisture % (0-100)", "31"),
+    (5, "outdoor_comments", "Outdoor observations...", "Downpipe discharging against wall"),
+]
+
+
+def table_of(url: str) -> str:
+    """PostgREST table of a /rest/v1/<table> URL, or None for other requests."""
+    path = urlparse(url).path
+    if not path.startswith("/rest/v1/") or path.startswith("/rest/v1/rpc/"):
+        return None
+    return path[len("/rest/v1/"):].strip("/") or None
+
+
+def payload_shape(body: bytes) -> tuple:
+    """(rows, columns) carried by a JSON write body; columns is the widest row."""
+    if not body:
+        return 0, 0
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return 0, 0
+    rows = data if isinstance(data, list) else [data]
+    return len(rows), max((len(r) for r in rows if isinstance(r, dict)), default=0)
+
+
+class WriteRecorder:
+    """Collects PostgREST writes from a page and tracks which are still in flight."""
+
+    def __init__(self, page):
+        self.writes = []
+        self._pending = set()
+        self._rest_origin = urlparse(SUPABASE_URL).netloc
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+
+    def _on_request(self, request):
+        if request.method not in WRITE_METHODS or urlparse(request.url).netloc != self._rest_origin:
+            return
+        table = table_of(request.url)
+        if table is None:
+            return
+        body = request.post_data_buffer or b""
+        rows, columns = payload_shape(body)
+        self._pending.add(request)
+        self.writes.append({"table": table, "method": request.method, "bytes": len(body),
+                            "rows": rows, "columns": columns,
+                            "upsert": "merge-duplicates" in (request.headers.get("prefer") or "")})
+
+    def _on_done(self, request):
+        self._pending.discard(request)
+
+    async def settle(self, page, quiet_ms: int = QUIET_MS, timeout_ms: int = 15000):
+        """Waits until no write has been in flight for `quiet_ms`."""
+        quiet = waited = 0
+        while quiet < quiet_ms and waited < timeout_ms:
+            await page.wait_for_timeout(100)
+            waited += 100
+            quiet = 0 if self._pending else quiet + 100
+
+    def since(self, mark: int) -> list:
+        return self.writes[mark:]
+
+
+def row_counters(tables: list = FORM_TABLES) -> dict:
+    """Cumulative inserted/updated/deleted tuples per table."""
+    table_list = ", ".join(f"'{t}'" for t in tables)
+    rows = sql_json(f"""
+        select relname as table, n_tup_ins as ins, n_tup_upd as upd, n_tup_del as del
+        from pg_stat_user_tables where schemaname = 'public' and relname in ({table_list})
+    """)
+    return {row.pop("table"): row for row in rows}
+
+
+def row_deltas(before: dict, after: dict) -> dict:
+    deltas = {}
+    for table, now in after.items():
+        then = before.get(table, {"ins": 0, "upd": 0, "del": 0})
+        changed = {k: now[k] - then[k] for k in ("ins", "upd", "del") if now[k] - then[k]}
+        if changed:
+            deltas[table] = changed
+    return deltas
+
+
+def summarise_writes(writes: list, db_rows: dict = None) -> dict:
+    """Totals for one save, and whether it stayed a targeted one-column update."""
+    tables = sorted({w["table"] for w in writes})
+    widest = max((w["columns"] for w in writes), default=0)
+    summary = {
+        "writes": len(writes),
+        "bytes": sum(w["bytes"] for w in writes),
+        "payload_rows": sum(w["rows"] for w in writes),
+        "widest_columns": widest,
+        "tables": tables,
+        "by_table": {t: sum(1 for w in writes if w["table"] == t) for t in tables},
+        "kind": "none" if not writes else
+                "targeted" if len(writes) == 1 and widest <= TARGETED_MAX_COLUMNS else "full-record",
+    }
+    if db_rows is not None:
+        summary["db_rows"] = db_rows
+        summary["db_rows_changed"] = sum(sum(c.values()) for c in db_rows.values())
+    return summary
+
+
+async def _measure(page, recorder: WriteRecorder, action, with_db: bool) -> dict:
+    before = await asyncio.to_thread(row_counters) if with_db else None
+    mark = len(recorder.writes)
+    await action()
+    await recorder.settle(page)
+    db_rows = None
+    if with_db:
+        await asyncio.sleep(STATS_FLUSH_S)
+        db_rows = row_deltas(before, await asyncio.to_thread(row_counters))
+    return {**summarise_writes(recorder.since(mark), db_rows), "requests": recorder.since(mark)}
+
+
+async def _go_to_section(page, section: int, current: int, next_button: str) -> int:
+    while current < section:
+        await page.locator(next_button).first.click()
+        await page.wait_for_timeout(500)
+        current += 1
+    return current
+
+
+async def run(lead_id: str, sections: list, with_db: bool) -> dict:
+    from playwright.async_api import async_playwright
+
+    screen = screen_named("TechnicianInspectionForm")
+    edits = [e for e in EDITS if not sections or e[0] in sections]
+    fields, navigation = [], []
+    pw = await async_playwright().start()
+    browser = await launch_browser(pw)
+    try:
+        context = await get_role_context(browser, TECH_EMAIL, TECH_PASSWORD, "Technician")
+        page = await context.new_page()
+        if not has_clock(page):
+            raise Exception("Auto-save is driven through Playwright's clock; needs Playwright 1.45+")
+        recorder = WriteRecorder(page)
+        await page.goto(f"{BASE_URL}{screen.route}?leadId={lead_id}", wait_until="domcontentloaded")
+        await page.wait_for_selector(screen.root, state="visible")
+        await recorder.settle(page)
+
+        current = 1
+        for section in sorted({e[0] for e in edits}):
+            current = await _go_to_section(page, section, current, screen.elements["next"])
+            section_edits = [e for e in edits if e[0] == section]
+            last_field = None
+            for _, field, placeholder, value in section_edits:
+                field_input = page.get_by_placeholder(placeholder, exact=True).first
+                try:
+                    await field_input.wait_for(state="visible", timeout=3000)
+                except Exception:
+                    print(f"  {section}/{field}: not on screen, skipped")
+                    fields.append({"section": section, "field": field, "skipped": True})
+                    continue
+
+                async def edit_and_auto_save():
+                    await field_input.fill(value)
+                    await trigger_auto_save(page)
+
+                result = await _measure(page, recorder, edit_and_auto_save, with_db)
+                fields.append({"section": section, "field": field, **result})
+                print(f"  {section}/{field}: {result['writes']} writes, {result['bytes']} B, {result['kind']}")
+                if not value.isdigit():  # numeric inputs can't take the revision suffix
+                    last_field = (field, field_input, value)
+
+            if last_field is None:
+                continue
+            field, field_input, value = last_field
+
+            async def edit_and_navigate():
+                await field_input.fill(value + " (rev)")
+                await page.locator(screen.elements["next"]).first.click()
+
+            result = await _measure(page, recorder, edit_and_navigate, with_db)
+            current += 1
+            navigation.append({"section": section, "field": field, **result})
+            print(f"  section {section} -> next: {result['writes']} writes, {result['bytes']} B")
+        await context.close()
+    finally:
+        await browser.close()
+        await pw.stop()
+    return {"fields": fields, "navigation": navigation, "sections": section_totals(fields, navigation)}
+
+
+def section_totals(fields: list, navigation: list) -> list:
+    totals = {}
+    for scope, entries in (("auto_save", fields), ("navigation", navigation)):
+        for entry in entries:
+            if entry.get("skipped"):
+                continue
+            total = totals.setdefault(entry["section"], {"section": entry["section"], "edits": 0, "saves": 0,
+                                                         "writes": 0, "bytes": 0, "db_rows_changed": 0})
+            total["edits"] += 1
+            total["saves"] += 1 if entry["writes"] else 0
+            total["writes"] += entry["writes"]
+            total["bytes"] += entry["bytes"]
+            total["db_rows_changed"] += entry.get("db_rows_changed", 0)
+    for total in totals.values():
+        total["writes_per_edit"] = round(total["writes"] / total["edits"], 1)
+        total["bytes_per_edit"] = round(total["bytes"] / total["edits"])
+    return [totals[s] for s in sorted(totals)]
+
+
+def print_report(results: dict):
+    print("\nPer field edit (auto-save)")
+    print(f"{'sec':>3} {'field':<26} {'writes':>6} {'bytes':>8} {'rows':>5} {'cols':>5} {'db rows':>8}  {'kind':<12} tables")
+    for entry in results["fields"]:
+        if entry.get("skipped"):
+            print(f"{entry['section']:>3} {entry['field']:<26} {'skipped':>6}")
+            continue
+        db = entry.get("db_rows_changed", "-")
+        tables = ", ".join(f"{t}x{n}" for t, n in entry["by_table"].items())
+        print(f"{entry['section']:>3} {entry['field']:<26} {entry['writes']:>6} {entry['bytes']:>8} "
+              f"{entry['payload_rows']:>5} {entry['widest_columns']:>5} {db:>8}  {entry['kind']:<12} {tables}")
+
+    if results["navigation"]:
+        print("\nSection change (Next Section)")
+        for entry in results["navigation"]:
+            print(f"{entry['section']:>3} {entry['field']:<26} {entry['writes']:>6} {entry['bytes']:>8} "
+                  f"{entry['payload_rows']:>5} {entry['widest_columns']:>5} {entry.get('db_rows_changed', '-'):>8}")
+
+    print("\nPer section")
+    print(f"{'sec':>3} {'edits':>5} {'saves':>5} {'writes':>6} {'bytes':>9} {'db rows':>8} {'writes/edit':>11} {'bytes/edit':>10}")
+    for total in results["sections"]:
+        print(f"{total['section']:>3} {total['edits']:>5} {total['saves']:>5} {total['writes']:>6} {total['bytes']:>9} "
+              f"{total['db_rows_changed']:>8} {total['writes_per_edit']:>11} {total['bytes_per_edit']:>10}")
+
+    measured = [e for e in results["fields"] if not e.get("skipped") and e["writes"]]
+    full = [e for e in measured if e["kind"] == "full-record"]
+    if measured:
+        print(f"\n{len(full)}/{len(measured)} one-field edits saved as full-record writes; "
+              f"a targeted update would be 1 write of <= {TARGETED_MAX_COLUMNS} columns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure writes per field edit in the inspection form")
+    parser.add_argument("--lead-id", required=True, help="Lead whose inspection the script edits")
+    parser.add_argument("--sections", nargs="*", type=int, help="Only edit fields in these sections")
+    parser.add_argument("--no-db", action="store_true", help="Skip pg_stat_user_tables row counts")
+    args = parser.parse_args()
+    if not TECH_EMAIL:
+        parser.error("Set TECH_EMAIL/TECH_PASSWORD for the technician login")
+
+    results = asyncio.run(run(args.lead_id, args.sections, not args.no_db))
+    print_report(results)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"writes-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"lead_id": args.lead_id, **results}, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()